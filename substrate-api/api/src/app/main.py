@@ -58,6 +58,13 @@ async def lifespan(app: FastAPI):
     llm = LLMService.get_instance()
     log.info(f"LLM configured: {llm.provider.value} / {llm.model}")
 
+    # Pre-connect to provider hosts so first requests skip TCP/TLS setup
+    from app.services.http_pool import OutboundHTTP, warmup_targets
+    try:
+        await OutboundHTTP.get_instance().warmup(warmup_targets())
+    except Exception as e:
+        log.warning(f"HTTP warmup skipped: {e}")
+
     yield
 
     # Cleanup
@@ -82,6 +89,12 @@ async def lifespan(app: FastAPI):
     if StorageService._instance:
         await StorageService._instance.close()
 
+    # Close the shared outbound connection pool
+    from app.services.http_pool import OutboundHTTP
+
+    if OutboundHTTP._instance:
+        await OutboundHTTP._instance.aclose()
+
     log.info("Shutdown complete")
 
 
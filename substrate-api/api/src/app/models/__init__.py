@@ -13,6 +13,7 @@ from app.models.character import (
     CharacterPersonality,
     CharacterToneStyle,
     CharacterBoundaries,
+    CharacterPromptView,
 )
 from app.models.world import World, WorldSummary
 from app.models.series import (
@@ -29,6 +30,7 @@ from app.models.engagement import (
     EngagementCreate,
     EngagementUpdate,
     EngagementWithCharacter,
+    EngagementView,
 )
 from app.models.session import (
     Session,
@@ -101,6 +103,7 @@ __all__ = [
     "OnboardingData",
     # Character
     "Character",
+    "CharacterPromptView",
     "CharacterSummary",
     "CharacterPersonality",
     "CharacterToneStyle",
@@ -121,6 +124,7 @@ __all__ = [
     "EngagementCreate",
     "EngagementUpdate",
     "EngagementWithCharacter",
+    "EngagementView",
     # Session
     "Session",
     "SessionCreate",
@@ -1,7 +1,8 @@
 """Character models."""
 import json
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, Field, field_validator
@@ -228,6 +229,31 @@ class Character(BaseModel):
         return CharacterBoundaries(**self.boundaries)
 
 
+@dataclass(slots=True)
+class CharacterPromptView:
+    """The character fields the conversation prompt needs (read model).
+
+    Loaded with CHARACTER_PROMPT_COLUMNS instead of SELECT * into Character.
+    """
+
+    id: UUID
+    name: str
+    system_prompt: str
+    boundaries: Dict[str, Any]
+
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any]) -> "CharacterPromptView":
+        return cls(
+            id=row["id"],
+            name=row["name"],
+            system_prompt=row["system_prompt"],
+            boundaries=Character.ensure_dict(row["boundaries"]),
+        )
+
+
+CHARACTER_PROMPT_COLUMNS = "id, name, system_prompt, boundaries"
+
+
 # ============================================================================
 # Character Creation Contract - Input Models
 # ============================================================================
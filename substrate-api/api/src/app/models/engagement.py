@@ -1,7 +1,8 @@
 """Engagement models (formerly Relationship)."""
 import json
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, Field, field_validator
@@ -122,6 +123,34 @@ class Engagement(BaseModel):
         from_attributes = True
 
 
+@dataclass(slots=True)
+class EngagementView:
+    """The engagement fields the conversation context needs (read model).
+
+    dynamic and milestones stay raw (as stored); MemoryService
+    relationship_dynamic_from_row() parses them. They are None when read
+    with ENGAGEMENT_SUMMARY_COLUMNS (relationship state served from cache).
+    """
+
+    total_sessions: int
+    first_met_at: Optional[datetime]
+    dynamic: Any
+    milestones: Any
+
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any]) -> "EngagementView":
+        return cls(
+            total_sessions=row["total_sessions"] or 0,
+            first_met_at=row["first_met_at"],
+            dynamic=row["dynamic"] if "dynamic" in row else None,
+            milestones=row["milestones"] if "milestones" in row else None,
+        )
+
+
+ENGAGEMENT_VIEW_COLUMNS = "total_sessions, first_met_at, dynamic, milestones"
+ENGAGEMENT_SUMMARY_COLUMNS = "total_sessions, first_met_at"
+
+
 class EngagementWithCharacter(Engagement):
     """Engagement with embedded character summary."""
 
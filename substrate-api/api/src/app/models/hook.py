@@ -86,6 +86,12 @@ class Hook(BaseModel):
         from_attributes = True
 
 
+_HOOK_FIELDS = tuple(Hook.model_fields)
+
+# Columns Hook reads; conversation-path queries select these instead of *
+HOOK_COLUMNS = ", ".join(_HOOK_FIELDS)
+
+
 class ExtractedHook(BaseModel):
     """Hook extracted from conversation by LLM."""
 
@@ -44,6 +44,7 @@ class MemoryEvent(BaseModel):
     user_id: UUID
     character_id: Optional[UUID] = None
     episode_id: Optional[UUID] = None
+    series_id: Optional[UUID] = None
 
     # Classification
     type: MemoryType
@@ -87,6 +88,13 @@ class MemoryEvent(BaseModel):
         from_attributes = True
 
 
+_MEMORY_EVENT_FIELDS = tuple(MemoryEvent.model_fields)
+
+# Columns MemoryEvent reads; conversation-path queries select these instead
+# of * (which also drags the embedding vector along)
+MEMORY_EVENT_COLUMNS = ", ".join(_MEMORY_EVENT_FIELDS)
+
+
 # NOTE: MemoryQuery model removed - was never used
 # Memory retrieval is done directly in MemoryService.get_relevant_memories()
 
@@ -0,0 +1,76 @@
+"""Memory export/import models.
+
+Exports are NDJSON: one {"kind": ..., "data": {...}} object per line, framed
+by a header line ("export") and a trailer line ("end") with record counts.
+Imports accept the same format; header/trailer lines are ignored.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from app.models.hook import HookType
+from app.models.memory import MemoryType
+
+EXPORT_FORMAT_VERSION = 1
+
+
+class MemoryImportRecord(BaseModel):
+    """A memory_events row as written by the export (embedding excluded)."""
+
+    id: Optional[UUID] = None
+    character_id: Optional[UUID] = None
+    episode_id: Optional[UUID] = None
+    series_id: Optional[UUID] = None
+    type: MemoryType
+    category: Optional[str] = None
+    content: Dict[str, Any] = Field(default_factory=dict)
+    summary: str = Field(..., min_length=1, max_length=2000)
+    emotional_valence: int = Field(0, ge=-2, le=2)
+    importance_score: float = Field(0.5, ge=0, le=1)
+    base_importance: Optional[float] = Field(None, ge=0, le=1)
+    reference_count: int = Field(0, ge=0)
+    last_referenced_at: Optional[datetime] = None
+    is_active: bool = True
+    created_at: Optional[datetime] = None
+
+
+class HookImportRecord(BaseModel):
+    """A hooks row as written by the export."""
+
+    id: Optional[UUID] = None
+    character_id: UUID
+    episode_id: Optional[UUID] = None
+    type: HookType
+    priority: int = Field(1, ge=1, le=5)
+    content: str = Field(..., min_length=1, max_length=2000)
+    suggested_opener: Optional[str] = None
+    trigger_after: Optional[datetime] = None
+    trigger_before: Optional[datetime] = None
+    triggered_at: Optional[datetime] = None
+    is_active: bool = True
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+    created_at: Optional[datetime] = None
+
+
+class EngagementDynamicImportRecord(BaseModel):
+    """Relationship dynamic for an existing engagement."""
+
+    character_id: UUID
+    dynamic: Dict[str, Any]
+    milestones: List[str] = Field(default_factory=list)
+
+
+class MemoryImportReport(BaseModel):
+    """Outcome of a bulk import."""
+
+    dry_run: bool = False
+    lines: int = 0
+    memories_inserted: int = 0
+    hooks_inserted: int = 0
+    engagements_updated: int = 0
+    skipped: int = 0  # id already present, or character doesn't exist
+    rejected: int = 0  # failed validation, or no engagement to update
+    errors: List[str] = Field(default_factory=list)  # first few, with line numbers
+    duration_ms: float = 0.0
@@ -5,11 +5,14 @@ from datetime import datetime, timedelta
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from pydantic import BaseModel
 
 from app.deps import get_db
 from app.dependencies import get_current_user_id
+from app.models.memory_transfer import MemoryImportReport
+from app.routes.memory import export_response
+from app.services.memory_transfer import MemoryImporter
 
 log = logging.getLogger("uvicorn.error")
 
@@ -647,3 +650,38 @@ async def get_activation_funnel(
         cohort_retention=cohort_retention,
         insights=insights,
     )
+
+
+# =============================================================================
+# Memory export/import (support)
+# =============================================================================
+
+
+@router.get("/users/{target_user_id}/memory/export")
+async def export_user_memories(
+    target_user_id: UUID,
+    request: Request,
+    series_id: Optional[UUID] = Query(None),
+    character_id: Optional[UUID] = Query(None),
+    include: Optional[List[str]] = Query(None),
+    include_inactive: bool = Query(False),
+    user_id: UUID = Depends(get_current_user_id),
+    db=Depends(get_db),
+):
+    """Stream a user's memories, hooks and relationship dynamics as NDJSON."""
+    await verify_admin_access(request, user_id, db)
+    return export_response(db, target_user_id, series_id, character_id, include, include_inactive)
+
+
+@router.post("/users/{target_user_id}/memory/import", response_model=MemoryImportReport)
+async def import_user_memories(
+    target_user_id: UUID,
+    request: Request,
+    dry_run: bool = Query(False),
+    user_id: UUID = Depends(get_current_user_id),
+    db=Depends(get_db),
+):
+    """Bulk import NDJSON memories/hooks/dynamics into a user's account."""
+    email = await verify_admin_access(request, user_id, db)
+    log.info(f"Admin memory import for {target_user_id} by {email} (dry_run={dry_run})")
+    return await MemoryImporter(db).run(target_user_id, request.stream(), dry_run=dry_run)
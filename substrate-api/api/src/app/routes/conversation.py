@@ -10,12 +10,22 @@ from app.deps import get_db
 from app.dependencies import get_current_user_id, get_optional_user_id
 from app.models.message import MessageCreate, Message
 from app.models.session import Session
+from app.routes.admin import is_admin_email
 from app.services.conversation import ConversationService
 from app.services.rate_limiter import RateLimitExceededError
+from app.services.turn_trace import DEBUG_HEADER as TURN_TRACE_DEBUG_HEADER
 
 router = APIRouter(prefix="/conversation", tags=["Conversation"])
 
 
+def _debug_timing_allowed(request: Request, user_id: Optional[UUID]) -> bool:
+    """Whether to honour X-Debug-Timing (authenticated admins only)."""
+    if not user_id or not request.headers.get(TURN_TRACE_DEBUG_HEADER):
+        return False
+    jwt_payload = getattr(request.state, "jwt_payload", None)
+    return is_admin_email(jwt_payload.get("email") if jwt_payload else None)
+
+
 @router.post("/{character_id}/send", response_model=Message)
 async def send_message(
     character_id: UUID,
@@ -151,9 +161,14 @@ async def send_message_stream(
     - Requires X-Guest-Session-Id header
     - Limited to 5 messages per session
     - Only works with Episode 0
+
+    For admins, an X-Debug-Timing header ends the stream with a server_timing
+    event breaking down where the turn spent its time. The header is ignored
+    for everyone else.
     """
     # Extract guest_session_id from headers (if present)
     guest_session_id = request.headers.get("X-Guest-Session-Id")
+    debug_timing = _debug_timing_allowed(request, user_id)
 
     # Require either user_id OR guest_session_id
     if not user_id and not guest_session_id:
@@ -232,6 +247,7 @@ async def send_message_stream(
                 content=data.content,
                 episode_template_id=data.episode_template_id,
                 guest_session_id=guest_session_id,
+                debug_timing=debug_timing,
             ):
                 yield f"data: {chunk}\n\n"
             yield "data: [DONE]\n\n"
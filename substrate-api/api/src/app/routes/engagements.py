@@ -12,6 +12,7 @@ from app.models.engagement import (
     EngagementUpdate,
     EngagementWithCharacter,
 )
+from app.services.memory_layers import MemoryLayerCache
 
 router = APIRouter(prefix="/engagements", tags=["Engagements"])
 
@@ -189,6 +190,7 @@ async def reset_relationship(
     await db.fetch_one(
         reset_engagement_query, {"user_id": str(user_id), "character_id": str(character_id)}
     )
+    MemoryLayerCache.get_instance().invalidate_user(user_id)
 
     return {"status": "reset", "character_id": str(character_id)}
 
@@ -14,6 +14,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel
 
 from app.deps import get_db
+from app.services.series_graph import SeriesGraphCache
 from app.services.storage import StorageService
 
 
@@ -360,6 +361,7 @@ async def create_episode_template(
         "sort_order": max_sort["next_sort"],
     })
 
+    SeriesGraphCache.get_instance().invalidate(row["series_id"])
     return EpisodeTemplate(**dict(row))
 
 
@@ -447,6 +449,7 @@ async def update_episode_template(
             detail="Episode template not found"
         )
 
+    SeriesGraphCache.get_instance().invalidate_template(template_id, row["series_id"])
     return EpisodeTemplate(**dict(row))
 
 
@@ -476,6 +479,7 @@ async def activate_episode_template(
             detail="Episode template not found"
         )
 
+    SeriesGraphCache.get_instance().invalidate_template(template_id, row["series_id"])
     return EpisodeTemplate(**dict(row))
 
 
@@ -1,6 +1,14 @@
 """Health check endpoints."""
 from fastapi import APIRouter, Depends
 from app.deps import get_db
+from app.services.episode_plan import EpisodePlanCache
+from app.services.extraction_gate import extraction_gate_stats
+from app.services.http_pool import OutboundHTTP
+from app.services.memory_layers import MemoryLayerCache
+from app.services.llm import structured_output_stats
+from app.services.llm_resilience import circuit_breaker_states
+from app.services.series_graph import SeriesGraphCache
+from app.services.visual_speculation import SpeculativeVisuals
 
 router = APIRouter()
 
@@ -22,6 +30,51 @@ async def health_db():
         return {"status": "unhealthy", "database": "disconnected", "error": str(e)}
 
 
+@router.get("/health/llm")
+async def health_llm():
+    """LLM diagnostics: circuit breakers and structured-output parse failure rates."""
+    return {
+        "circuits": circuit_breaker_states(),
+        "structured_output": structured_output_stats.snapshot(),
+    }
+
+
+@router.get("/health/extraction")
+async def health_extraction():
+    """Memory/hook extraction gate: skip rate and LLM calls saved since process start."""
+    return extraction_gate_stats.snapshot()
+
+
+@router.get("/health/memory-layers")
+async def health_memory_layers():
+    """Per-layer memory cache size and hit rate for this process."""
+    return MemoryLayerCache.get_instance().stats()
+
+
+@router.get("/health/episode-plans")
+async def health_episode_plans():
+    """Compiled episode plan cache size and hit rate for this process."""
+    return EpisodePlanCache.get_instance().stats()
+
+
+@router.get("/health/series-graphs")
+async def health_series_graphs():
+    """Series navigation graph cache size and hit rate for this process."""
+    return SeriesGraphCache.get_instance().stats()
+
+
+@router.get("/health/visual-speculation")
+async def health_visual_speculation():
+    """Speculative Director visuals: pending, committed and wasted since process start."""
+    return SpeculativeVisuals.get_instance().stats()
+
+
+@router.get("/health/http")
+async def health_http():
+    """Outbound connection pool settings and per-host connection metrics."""
+    return OutboundHTTP.get_instance().metrics()
+
+
 @router.get("/health/tables")
 async def health_tables():
     """Check that core tables exist."""
@@ -8,6 +8,8 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from app.deps import get_db
 from app.dependencies import get_current_user_id
 from app.models.hook import Hook, HookCreate, HookType
+from app.services.hook_scheduler import READY_HOOKS_QUERY
+from app.services.memory_layers import HOOKS_LAYER, MemoryLayerCache
 
 router = APIRouter(prefix="/hooks", tags=["Hooks"])
 
@@ -54,18 +56,8 @@ async def get_pending_hooks(
     limit: int = Query(5, ge=1, le=20),
     db=Depends(get_db),
 ):
-    """Get pending hooks for a character conversation."""
-    query = """
-        SELECT * FROM hooks
-        WHERE user_id = :user_id
-            AND character_id = :character_id
-            AND is_active = TRUE
-            AND triggered_at IS NULL
-            AND (trigger_after IS NULL OR trigger_after <= NOW())
-            AND (trigger_before IS NULL OR trigger_before >= NOW())
-        ORDER BY priority DESC, trigger_after ASC NULLS LAST
-        LIMIT :limit
-    """
+    """Get pending hooks for a character conversation (the scheduler's ready set)."""
+    query = READY_HOOKS_QUERY.format(table="hooks")
 
     rows = await db.fetch_all(query, {"user_id": str(user_id), "character_id": str(character_id), "limit": limit})
     return [Hook(**dict(row)) for row in rows]
@@ -103,6 +95,7 @@ async def create_hook(
             "trigger_before": data.trigger_before,
         },
     )
+    MemoryLayerCache.get_instance().invalidate_hooks(user_id, data.character_id)
 
     return Hook(**dict(row))
 
@@ -127,6 +120,7 @@ async def mark_hook_triggered(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Hook not found",
         )
+    MemoryLayerCache.get_instance().invalidate_hooks(user_id, row["character_id"])
 
     return Hook(**dict(row))
 
@@ -150,3 +144,4 @@ async def delete_hook(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Hook not found",
         )
+    MemoryLayerCache.get_instance().invalidate_user(user_id, layers=(HOOKS_LAYER,))
@@ -2,11 +2,15 @@
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 
 from app.deps import get_db
 from app.dependencies import get_current_user_id
 from app.models.memory import MemoryEvent, MemoryEventCreate, MemoryType
+from app.models.memory_transfer import MemoryImportReport
+from app.services.memory_layers import MEMORY_LAYERS, MemoryLayerCache
+from app.services.memory_transfer import EXPORT_KINDS, MemoryExporter, MemoryImporter
 
 router = APIRouter(prefix="/memory", tags=["Memory"])
 
@@ -92,6 +96,60 @@ async def get_relevant_memories(
     return [MemoryEvent(**dict(row)) for row in rows]
 
 
+def export_response(
+    db,
+    user_id: UUID,
+    series_id: Optional[UUID],
+    character_id: Optional[UUID],
+    include: Optional[List[str]],
+    include_inactive: bool,
+) -> StreamingResponse:
+    """NDJSON export as a streamed download (shared with the admin route)."""
+    kinds = include or list(EXPORT_KINDS)
+    unknown = [k for k in kinds if k not in EXPORT_KINDS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown include values: {unknown}. Supported: {list(EXPORT_KINDS)}",
+        )
+    lines = MemoryExporter(db).stream(
+        user_id,
+        series_id=series_id,
+        character_id=character_id,
+        include=kinds,
+        include_inactive=include_inactive,
+    )
+    return StreamingResponse(
+        lines,
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="memories-{user_id}.ndjson"'},
+    )
+
+
+@router.get("/export")
+async def export_memories(
+    user_id: UUID = Depends(get_current_user_id),
+    series_id: Optional[UUID] = Query(None, description="Only memories from this series"),
+    character_id: Optional[UUID] = Query(None),
+    include: Optional[List[str]] = Query(None, description="memories, hooks, engagements (default: all)"),
+    include_inactive: bool = Query(False),
+    db=Depends(get_db),
+):
+    """Stream the current user's memories, hooks and relationship dynamics as NDJSON."""
+    return export_response(db, user_id, series_id, character_id, include, include_inactive)
+
+
+@router.post("/import", response_model=MemoryImportReport)
+async def import_memories(
+    request: Request,
+    user_id: UUID = Depends(get_current_user_id),
+    dry_run: bool = Query(False, description="Validate only; write nothing"),
+    db=Depends(get_db),
+):
+    """Bulk import NDJSON in the export format (body streamed, inserted in batches)."""
+    return await MemoryImporter(db).run(user_id, request.stream(), dry_run=dry_run)
+
+
 @router.post("", response_model=MemoryEvent, status_code=status.HTTP_201_CREATED)
 async def create_memory(
     data: MemoryEventCreate,
@@ -104,10 +162,10 @@ async def create_memory(
     query = """
         INSERT INTO memory_events (
             user_id, character_id, episode_id, type, category,
-            content, summary, emotional_valence, importance_score
+            content, summary, emotional_valence, importance_score, base_importance
         )
         VALUES (:user_id, :character_id, :episode_id, :type, :category,
-                :content, :summary, :emotional_valence, :importance_score)
+                :content, :summary, :emotional_valence, :importance_score, :importance_score)
         RETURNING *
     """
 
@@ -125,8 +183,10 @@ async def create_memory(
             "importance_score": data.importance_score,
         },
     )
+    memory = MemoryEvent(**dict(row))
+    MemoryLayerCache.get_instance().invalidate_memories([memory])
 
-    return MemoryEvent(**dict(row))
+    return memory
 
 
 @router.delete("/{memory_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -148,6 +208,7 @@ async def delete_memory(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Memory not found",
         )
+    MemoryLayerCache.get_instance().invalidate_user(user_id, layers=MEMORY_LAYERS)
 
 
 @router.post("/{memory_id}/reference", response_model=MemoryEvent)
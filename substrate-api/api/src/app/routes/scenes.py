@@ -23,6 +23,12 @@ from app.services.storage import StorageService
 from app.services.usage import UsageService
 from app.services.credits import CreditsService, InsufficientSparksError
 from app.services.content_image_generation import ALL_EPISODE_BACKGROUNDS
+from app.services.scene_reservations import (
+    IN_FLIGHT,
+    MANUAL_TRIGGER,
+    NOT_FOUND,
+    SceneGenerationReservations,
+)
 
 log = logging.getLogger(__name__)
 
@@ -143,7 +149,38 @@ async def generate_scene(
     - "t2i": Text-to-image (1 spark) - always uses full prompt description
     - "kontext": Character reference (3 sparks) - uses anchor image for consistency
     - None: Auto-detect based on anchor availability
+
+    Only one user-triggered generation runs per episode at a time; a second
+    request while one is in flight gets 409 instead of paying for another image.
     """
+    reservations = SceneGenerationReservations(db)
+    reservation = await reservations.reserve(data.episode_id, MANUAL_TRIGGER, user_id=user_id)
+
+    if reservation.status == NOT_FOUND:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Episode not found",
+        )
+    if reservation.status == IN_FLIGHT:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "error": "generation_in_progress",
+                "message": "A scene is already being generated for this episode",
+            },
+        )
+
+    succeeded = False
+    try:
+        response = await _generate_scene(data, user_id, db)
+        succeeded = True
+        return response
+    finally:
+        await reservations.release(reservation, succeeded)
+
+
+async def _generate_scene(data: SceneGenerateRequest, user_id: UUID, db) -> SceneGenerateResponse:
+    """Body of generate_scene, run while holding the episode's manual lease."""
     credits_service = CreditsService.get_instance()
 
     # Determine spark cost based on requested mode (may be adjusted later if mode is auto)
@@ -26,6 +26,7 @@ from app.models.series import (
     RESOLUTION_MODES,
     VULNERABILITY_TIMINGS,
 )
+from app.services.series_graph import get_series_graph
 from app.services.storage import StorageService
 
 
@@ -699,14 +700,8 @@ async def get_series_progress(
         raise HTTPException(status_code=401, detail="Authentication required")
 
     # Get all episode templates for this series (exclude free chat templates)
-    episodes_query = """
-        SELECT id FROM episode_templates
-        WHERE series_id = :series_id
-        AND (is_free_chat IS NULL OR is_free_chat = FALSE)
-        ORDER BY sort_order, episode_number
-    """
-    episode_rows = await db.fetch_all(episodes_query, {"series_id": str(series_id)})
-    episode_ids = [str(row["id"]) for row in episode_rows]
+    graph = await get_series_graph(db, series_id)
+    episode_ids = [node.id for node in graph.episodes()]
 
     if not episode_ids:
         return SeriesProgressResponse(series_id=str(series_id), progress=[])
@@ -898,41 +893,33 @@ async def get_series_user_context(
     episodes_in_progress = sum(1 for s in episode_statuses.values() if s == "in_progress")
 
     # Get episode templates to find current/next episode (exclude free chat templates)
-    episodes_query = """
-        SELECT id, episode_number, title, situation
-        FROM episode_templates
-        WHERE series_id = :series_id
-        AND status = 'active'
-        AND (is_free_chat IS NULL OR is_free_chat = FALSE)
-        ORDER BY sort_order, episode_number
-    """
-    episode_rows = await db.fetch_all(episodes_query, {"series_id": series_id_str})
+    graph = await get_series_graph(db, series_id_str)
+    episodes = graph.episodes(active_only=True)
 
     # Find current episode - use most recently played episode if available
     current_episode = None
 
     # First try: use the most recently played episode
     if most_recent_episode_id:
-        for row in episode_rows:
-            if str(row["id"]) == most_recent_episode_id:
-                ep_status = episode_statuses.get(most_recent_episode_id, "in_progress")
-                current_episode = CurrentEpisodeInfo(
-                    episode_id=most_recent_episode_id,
-                    episode_number=row["episode_number"],
-                    title=row["title"],
-                    situation=row["situation"],
-                    status=ep_status,
-                )
-                break
+        node = graph.get(most_recent_episode_id)
+        if node and node.is_active and not node.is_free_chat:
+            ep_status = episode_statuses.get(most_recent_episode_id, "in_progress")
+            current_episode = CurrentEpisodeInfo(
+                episode_id=most_recent_episode_id,
+                episode_number=node.episode_number,
+                title=node.title,
+                situation=node.situation,
+                status=ep_status,
+            )
 
     # Fallback: first episode if user hasn't started any
-    if not current_episode and episode_rows:
-        first_ep = episode_rows[0]
+    if not current_episode and episodes:
+        first_ep = episodes[0]
         current_episode = CurrentEpisodeInfo(
-            episode_id=str(first_ep["id"]),
-            episode_number=first_ep["episode_number"],
-            title=first_ep["title"],
-            situation=first_ep["situation"],
+            episode_id=first_ep.id,
+            episode_number=first_ep.episode_number,
+            title=first_ep.title,
+            situation=first_ep.situation,
             status="not_started",
         )
 
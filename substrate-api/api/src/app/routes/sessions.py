@@ -643,6 +643,8 @@ async def reveal_prop(
 
 import json as json_lib
 
+from app.services.director_state import DirectorStatePatch
+
 
 class ChoiceRequest(BaseModel):
     """Request to record a user's choice at a choice point."""
@@ -677,7 +679,7 @@ async def record_choice(
     """
     # Get session with template info
     session_query = """
-        SELECT s.id, s.user_id, s.episode_template_id, s.director_state,
+        SELECT s.id, s.user_id, s.episode_template_id,
                et.choice_points
         FROM sessions s
         LEFT JOIN episode_templates et ON et.id = s.episode_template_id
@@ -730,49 +732,27 @@ async def record_choice(
         )
 
     # Update director_state
-    director_state_raw = session["director_state"]
-    if isinstance(director_state_raw, str):
-        director_state = json_lib.loads(director_state_raw)
-    elif director_state_raw is None:
-        director_state = {}
-    else:
-        director_state = dict(director_state_raw)
-
-    # Initialize tracking structures if needed
-    if "choices_made" not in director_state:
-        director_state["choices_made"] = []
-    if "triggered_choices" not in director_state:
-        director_state["triggered_choices"] = []
-    if "flags" not in director_state:
-        director_state["flags"] = {}
+    patch = DirectorStatePatch()
 
     # Record the choice
-    director_state["choices_made"].append({
+    patch.append("choices_made", {
         "choice_point_id": data.choice_point_id,
         "selected": data.selected_option_id,
         "timestamp": datetime.utcnow().isoformat(),
     })
 
     # Mark as triggered (prevent re-triggering)
-    if data.choice_point_id not in director_state["triggered_choices"]:
-        director_state["triggered_choices"].append(data.choice_point_id)
+    patch.add_unique("triggered_choices", data.choice_point_id)
 
     # Set flag if specified
     flag_set = None
     if selected_choice.get("sets_flag"):
         flag_set = selected_choice["sets_flag"]
-        director_state["flags"][flag_set] = True
+        patch.merge("flags", {flag_set: True})
 
-    # Save updated director_state
-    update_query = """
-        UPDATE sessions
-        SET director_state = :director_state
-        WHERE id = :session_id
-    """
-    await db.execute(update_query, {
-        "session_id": str(session_id),
-        "director_state": json_lib.dumps(director_state),
-    })
+    # Save only the changed paths (migration 074) so a concurrent Director
+    # update of the same session isn't overwritten
+    await patch.apply(db, session_id)
 
     return ChoiceResponse(
         status="recorded",
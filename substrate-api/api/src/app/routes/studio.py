@@ -29,6 +29,7 @@ from app.services.conversation_ignition import (
     get_archetype_rules,
 )
 from app.services.avatar_generation import get_avatar_generation_service
+from app.services.series_graph import SeriesGraphCache
 from app.services.storage import StorageService
 
 router = APIRouter(prefix="/studio", tags=["Studio"])
@@ -853,19 +854,22 @@ async def apply_opening_beat(
     })
 
     # Update episode_template with opening beat and starter_prompts (EP-01 Episode-First Pivot)
-    await db.execute("""
+    template_rows = await db.fetch_all("""
         UPDATE episode_templates
         SET situation = :situation,
             opening_line = :opening_line,
             starter_prompts = :starter_prompts,
             updated_at = NOW()
         WHERE character_id = :character_id AND is_default = TRUE
+        RETURNING id, series_id
     """, {
         "character_id": str(character_id),
         "situation": opening_situation,
         "opening_line": opening_line,
         "starter_prompts": [opening_line],  # Opening line is the primary starter prompt
     })
+    for template_row in template_rows:
+        SeriesGraphCache.get_instance().invalidate_template(template_row["id"], template_row["series_id"])
 
     return Character(**dict(row))
 
@@ -1914,6 +1918,7 @@ async def update_episode_template(
     """
 
     row = await db.fetch_one(query, values)
+    SeriesGraphCache.get_instance().invalidate_template(template_id, existing["series_id"])
 
     r = dict(row)  # Convert Record to dict for .get() access
     return EpisodeTemplateResponse(
@@ -1978,6 +1983,7 @@ async def delete_episode_template(
         "DELETE FROM episode_templates WHERE id = :id",
         {"id": str(template_id)}
     )
+    SeriesGraphCache.get_instance().invalidate_template(template_id)
 
 
 # =============================================================================
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Director Guidance Benchmark
+
+Times DirectorGuidance.to_prompt_section() rendering:
+1. uncached: guidance_sections() cache cleared before every render, so the
+   doctrine lookup and line building run every turn (the legacy cost)
+2. cached: pre-rendered doctrine sections, as in production
+
+Output equality with the legacy renderer is covered by
+tests/test_director_guidance.py (every genre, pacing, energy, anchor and beat
+urgency combination); this script only measures.
+
+Usage:
+    cd substrate-api/api/src
+    python -m app.scripts.benchmark_director_guidance
+    python -m app.scripts.benchmark_director_guidance --turns 200000 --rounds 5
+"""
+
+import argparse
+import random
+import time
+from typing import List, Optional
+
+from app.services.director import (
+    GENRE_DOCTRINES,
+    PACING_PHASES,
+    BeatDirective,
+    DirectorGuidance,
+    guidance_sections,
+)
+
+
+def sample_guidance(rng: random.Random, turns: int) -> List[DirectorGuidance]:
+    """Random guidance across genres, pacing, energy, anchors and beats."""
+    beats: List[Optional[BeatDirective]] = [None, None, None]
+    for urgency in ("suggested", "required", "overdue"):
+        beats.append(BeatDirective(beat_id="b1", instruction="Ask about the salary.", urgency=urgency,
+                                   context="This beat was due by turn 5. Deliver it now."))
+
+    cases = []
+    for _ in range(turns):
+        genre = rng.choice(list(GENRE_DOCTRINES))
+        cases.append(DirectorGuidance(
+            pacing=rng.choice(PACING_PHASES),
+            physical_anchor=rng.choice((None, "The rooftop bar, rain on the glass")),
+            genre=genre,
+            energy_level=rng.choice(list(GENRE_DOCTRINES[genre]["energy_descriptions"])),
+            beat_directive=rng.choice(beats),
+        ))
+    return cases
+
+
+def render_uncached(guidance: DirectorGuidance) -> str:
+    guidance_sections.cache_clear()
+    return guidance.to_prompt_section()
+
+
+def benchmark(args) -> None:
+    turns = sample_guidance(random.Random(args.seed), args.turns)
+
+    timings = {"uncached": [], "cached": []}
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        for guidance in turns:
+            render_uncached(guidance)
+        timings["uncached"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for guidance in turns:
+            guidance.to_prompt_section()
+        timings["cached"].append(time.perf_counter() - start)
+
+    uncached_us = min(timings["uncached"]) / args.turns * 1e6
+    cached_us = min(timings["cached"]) / args.turns * 1e6
+    print("=== Director Guidance Benchmark ===")
+    print(f"turns: {args.turns}   rounds: {args.rounds} (best reported)\n")
+    print(f"{'renderer':<10} {'µs/turn':>10}")
+    print(f"{'uncached':<10} {uncached_us:>10.2f}")
+    print(f"{'cached':<10} {cached_us:>10.2f}")
+    print(f"\nspeedup: {uncached_us / cached_us:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark pre-rendered Director guidance sections")
+    parser.add_argument("--turns", type=int, default=100000, help="Guidance renders per round")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds per renderer (best is reported)")
+    parser.add_argument("--seed", type=int, default=7)
+    benchmark(parser.parse_args())
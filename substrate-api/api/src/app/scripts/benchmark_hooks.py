@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Hook Read Path Benchmark
+
+Compares the per-turn hook read before and after the scheduler (migration 071):
+1. legacy: filter every hook for the user/character on each turn
+2. ready:  read the scheduler's ready set via idx_hooks_ready, plus the due
+           but unpromoted hooks via idx_hooks_due
+
+Runs against DATABASE_URL on a TEMP copy of the hooks table (same columns and
+indexes, no foreign keys), so nothing touches real data. Seeds --hooks hooks
+per user across --characters characters with a realistic mix: scheduled in
+the future, due, already triggered, expired and open-ended. Then:
+
+- times the legacy query (p50/p95 over --iterations reads)
+- times the ready read before any promotion (every due hook unpromoted,
+  the worst case for its second branch)
+- times one scheduler pass (retire + promote), then the ready read again
+- moves --due-fraction of the scheduled hooks into the past, as happens
+  between scheduler runs, and times the ready read a third time
+- checks the ready read returns the same hooks as the legacy read in each
+  state; with --explain, prints the plan for each state
+
+Usage:
+    cd substrate-api/api/src
+    python -m app.scripts.benchmark_hooks
+    python -m app.scripts.benchmark_hooks --hooks 50000 --users 3 --explain
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from app.deps import close_db, get_db
+from app.services.hook_scheduler import READY_HOOKS_QUERY, HookScheduler, HookSchedulerConfig
+
+TABLE = "bench_hooks"
+
+# get_active_hooks before the scheduler
+LEGACY_ACTIVE_HOOKS_QUERY = """
+    SELECT * FROM {table}
+    WHERE user_id = :user_id
+        AND character_id = :character_id
+        AND is_active = TRUE
+        AND triggered_at IS NULL
+        AND (trigger_after IS NULL OR trigger_after <= NOW())
+        AND (trigger_before IS NULL OR trigger_before >= NOW())
+    ORDER BY priority DESC, trigger_after ASC NULLS LAST
+    LIMIT :limit
+"""
+
+# Mix by k: 40% scheduled in the future, 30% due, 15% already triggered,
+# 10% expired, 5% open-ended (no trigger_after; ready on insert in production)
+SEED_QUERY = """
+    INSERT INTO {table} (
+        user_id, character_id, type, priority, content,
+        trigger_after, trigger_before, triggered_at, is_active, ready_at
+    )
+    SELECT
+        CAST(:user_id AS uuid),
+        (CAST(:character_ids AS uuid[]))[1 + (g % :n_characters)],
+        'follow_up',
+        1 + (random() * 4)::int,
+        'Benchmark hook ' || g,
+        CASE
+            WHEN k < 0.40 THEN NOW() + random() * INTERVAL '30 days'
+            WHEN k < 0.70 THEN NOW() - random() * INTERVAL '30 days'
+            WHEN k < 0.85 THEN NOW() - random() * INTERVAL '60 days'
+            WHEN k < 0.95 THEN NOW() - random() * INTERVAL '60 days'
+            ELSE NULL
+        END,
+        CASE
+            WHEN k >= 0.85 AND k < 0.95 THEN NOW() - random() * INTERVAL '5 days'
+            WHEN k < 0.70 THEN NOW() + INTERVAL '60 days'
+            ELSE NULL
+        END,
+        CASE WHEN k >= 0.70 AND k < 0.85 THEN NOW() - random() * INTERVAL '5 days' END,
+        TRUE,
+        CASE WHEN k >= 0.95 THEN NOW() END
+    FROM (SELECT g, random() AS k FROM generate_series(1, :n_hooks) AS g) s
+"""
+
+
+# Scheduled hooks that come due between scheduler runs (cron is every 15
+# minutes); the temp table has no trigger, so they stay unpromoted
+COME_DUE_QUERY = """
+    UPDATE {table}
+    SET trigger_after = NOW() - random() * INTERVAL '15 minutes'
+    WHERE ready_at IS NULL
+        AND is_active = TRUE
+        AND triggered_at IS NULL
+        AND trigger_after > NOW()
+        AND random() < :fraction
+"""
+
+
+async def time_reads(conn, query: str, scopes, iterations: int, limit: int):
+    timings = []
+    for i in range(iterations):
+        user_id, character_id = scopes[i % len(scopes)]
+        started = time.perf_counter()
+        await conn.fetch_all(query, {"user_id": user_id, "character_id": character_id, "limit": limit})
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+async def explain(conn, query: str, user_id: str, character_id: str, limit: int) -> str:
+    rows = await conn.fetch_all(
+        "EXPLAIN (ANALYZE, BUFFERS, COSTS OFF) " + query,
+        {"user_id": user_id, "character_id": character_id, "limit": limit},
+    )
+    return "\n".join("    " + row["QUERY PLAN"] for row in rows)
+
+
+async def count_mismatches(conn, legacy_sql: str, ready_sql: str, scopes) -> int:
+    """User/character pairs where the ready read and the legacy read differ."""
+    mismatches = 0
+    for user_id, character_id in scopes:
+        params = {"user_id": user_id, "character_id": character_id, "limit": 1_000_000}
+        legacy_ids = {row["id"] for row in await conn.fetch_all(legacy_sql, params)}
+        ready_ids = {row["id"] for row in await conn.fetch_all(ready_sql, params)}
+        mismatches += legacy_ids != ready_ids
+    return mismatches
+
+
+async def main(args: argparse.Namespace) -> None:
+    db = await get_db()
+    try:
+        async with db.connection() as conn:
+            await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+            await conn.execute(f"CREATE TEMP TABLE {TABLE} (LIKE hooks INCLUDING DEFAULTS INCLUDING INDEXES)")
+
+            scopes = []
+            started = time.perf_counter()
+            for _ in range(args.users):
+                user_id = str(uuid.uuid4())
+                character_ids = [str(uuid.uuid4()) for _ in range(args.characters)]
+                scopes.extend((user_id, c) for c in character_ids)
+                await conn.execute(SEED_QUERY.format(table=TABLE), {
+                    "user_id": user_id,
+                    "character_ids": character_ids,
+                    "n_characters": args.characters,
+                    "n_hooks": args.hooks,
+                })
+            await conn.execute(f"ANALYZE {TABLE}")
+            print(f"Seeded {args.users * args.hooks:,} hooks ({args.hooks:,} per user, "
+                  f"{args.characters} characters each) in {time.perf_counter() - started:.1f}s\n")
+
+            legacy_sql = LEGACY_ACTIVE_HOOKS_QUERY.format(table=TABLE)
+            ready_sql = READY_HOOKS_QUERY.format(table=TABLE)
+
+            legacy_p50, legacy_p95 = await time_reads(conn, legacy_sql, scopes, args.iterations, args.limit)
+            print(f"legacy read:             p50 {legacy_p50:7.2f}ms   p95 {legacy_p95:7.2f}ms")
+            if args.explain:
+                user_id, character_id = scopes[0]
+                print("\nlegacy plan:\n" + await explain(conn, legacy_sql, user_id, character_id, args.limit) + "\n")
+
+            async def measure_ready(state: str) -> float:
+                p50, p95 = await time_reads(conn, ready_sql, scopes, args.iterations, args.limit)
+                mismatches = await count_mismatches(conn, legacy_sql, ready_sql, scopes)
+                print(f"ready read ({state + '):':<13}p50 {p50:7.2f}ms   p95 {p95:7.2f}ms   "
+                      f"{'✓' if not mismatches else '❌'} matches legacy for "
+                      f"{len(scopes) - mismatches}/{len(scopes)} user/character pairs")
+                if args.explain:
+                    user_id, character_id = scopes[0]
+                    print(f"\nready plan ({state}):\n"
+                          + await explain(conn, ready_sql, user_id, character_id, args.limit) + "\n")
+                return p50
+
+            await measure_ready("unpromoted")
+
+            scheduler = HookScheduler(conn, HookSchedulerConfig(batch_size=args.batch_size), table=TABLE)
+            report = await scheduler.run()
+            print(f"scheduler run:           {report.duration_ms:7.0f}ms   "
+                  f"(retired {report.retired:,}, promoted {report.promoted:,})")
+            await conn.execute(f"ANALYZE {TABLE}")
+            promoted_p50 = await measure_ready("promoted")
+
+            await conn.execute(COME_DUE_QUERY.format(table=TABLE), {"fraction": args.due_fraction})
+            await conn.execute(f"ANALYZE {TABLE}")
+            between_p50 = await measure_ready("between runs")
+
+            print(f"speedup:                 p50 {legacy_p50 / promoted_p50:.1f}x promoted, "
+                  f"{legacy_p50 / between_p50:.1f}x between runs")
+
+            await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the hook read path")
+    parser.add_argument("--hooks", type=int, default=20_000, help="Hooks per user (default: 20000)")
+    parser.add_argument("--users", type=int, default=2, help="Users to seed (default: 2)")
+    parser.add_argument("--characters", type=int, default=4, help="Characters per user (default: 4)")
+    parser.add_argument("--iterations", type=int, default=200, help="Timed reads per query")
+    parser.add_argument("--limit", type=int, default=5, help="Hooks per read (chat path uses 5)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Scheduler batch size")
+    parser.add_argument("--due-fraction", type=float, default=0.05,
+                        help="Share of scheduled hooks that come due after the scheduler pass (default: 0.05)")
+    parser.add_argument("--explain", action="store_true", help="Print EXPLAIN ANALYZE for each read")
+    asyncio.run(main(parser.parse_args()))
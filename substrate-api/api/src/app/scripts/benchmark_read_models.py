@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Read Model Benchmark
+
+Compares how the rows one conversation turn reads are turned into objects:
+1. legacy: SELECT * rows validated into the full Pydantic models
+   (Character, Engagement, Session, MemoryEvent, Hook)
+2. slim:   narrow projections; the character and engagement into the
+   CharacterPromptView/EngagementView read models, sessions, memories and
+   hooks validated into the same Pydantic models as before
+
+Rows are synthetic and shaped like asyncpg's: jsonb as JSON text, numeric as
+Decimal, and for the legacy path the columns the models never read (the
+memory embedding, hook ready_at/retired_at, ...) are included as SELECT *
+returns them. Both paths are checked to produce the same values before
+timing. Reports CPU time per turn and bytes allocated per turn (tracemalloc).
+
+Not measured here: the smaller result sets on the wire and in asyncpg's
+decoder (chiefly the 1536-dim embedding per memory row), which need a
+database to observe.
+
+Usage:
+    cd substrate-api/api/src
+    python -m app.scripts.benchmark_read_models
+    python -m app.scripts.benchmark_read_models --memories 50 --hooks 10 --turns 20000
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Callable, Dict, List
+
+from app.models.character import CHARACTER_PROMPT_COLUMNS, Character, CharacterPromptView
+from app.models.engagement import ENGAGEMENT_VIEW_COLUMNS, Engagement, EngagementView
+from app.models.hook import HOOK_COLUMNS, Hook
+from app.models.memory import MEMORY_EVENT_COLUMNS, MemoryEvent, MemoryType
+from app.models.session import Session
+
+Row = Dict[str, Any]
+
+
+# =============================================================================
+# Synthetic rows
+# =============================================================================
+
+def _now(rng: random.Random) -> datetime:
+    return datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=rng.randint(0, 10**7))
+
+
+def character_row(rng: random.Random) -> Row:
+    return {
+        "id": uuid.uuid4(),
+        "name": "Mira",
+        "slug": "mira",
+        "archetype": "childhood_friend",
+        "world_id": uuid.uuid4(),
+        "avatar_url": "https://cdn.example.com/avatars/mira.png",
+        "baseline_personality": json.dumps({"traits": ["warm", "teasing", "stubborn"], "openness": 0.7}),
+        "tone_style": json.dumps({"formality": "casual", "emoji_usage": "rare"}),
+        "speech_patterns": json.dumps({"greetings": ["hey you", "there you are"], "fillers": ["mm", "I mean"]}),
+        "backstory": "Grew up next door; left for the city three years ago. " * 20,
+        "likes": json.dumps(["rain", "night walks", "old films"]),
+        "dislikes": json.dumps(["being rushed", "liars"]),
+        "system_prompt": "You are Mira. " + "Stay in character and keep replies grounded. " * 60,
+        "boundaries": json.dumps({"nsfw_allowed": False, "flirting_level": "playful", "relationship_max_stage": "intimate"}),
+        "status": "active",
+        "is_active": True,
+        "is_premium": False,
+        "sort_order": 0,
+        "created_by": None,
+        "is_user_created": False,
+        "is_public": True,
+        "appearance_prompt": "young woman, short dark hair, rain jacket, soft smile",
+        "style_preset": "manhwa",
+        "categories": json.dumps(["romance", "slice_of_life"]),
+        "content_rating": "sfw",
+        "created_at": _now(rng),
+        "updated_at": _now(rng),
+    }
+
+
+def engagement_row(rng: random.Random, character_id: uuid.UUID) -> Row:
+    return {
+        "id": uuid.uuid4(),
+        "user_id": uuid.uuid4(),
+        "character_id": character_id,
+        "total_sessions": 12,
+        "total_messages": 340,
+        "dynamic": json.dumps({"tone": "warm", "tension_level": 40, "recent_beats": ["confession", "argument"]}),
+        "milestones": json.dumps(["first_meeting", "first_secret"]),
+        "first_met_at": _now(rng),
+        "last_interaction_at": _now(rng),
+        "nickname": None,
+        "engagement_notes": None,
+        "metadata": json.dumps({}),
+        "is_favorite": True,
+        "is_archived": False,
+        "created_at": _now(rng),
+        "updated_at": _now(rng),
+    }
+
+
+def session_row(rng: random.Random, character_id: uuid.UUID) -> Row:
+    return {
+        "id": uuid.uuid4(),
+        "user_id": uuid.uuid4(),
+        "character_id": character_id,
+        "engagement_id": uuid.uuid4(),
+        "episode_template_id": uuid.uuid4(),
+        "series_id": uuid.uuid4(),
+        "role_id": None,
+        "episode_number": 3,
+        "title": "After the Rain",
+        "scene": "A bus shelter at midnight",
+        "started_at": _now(rng),
+        "ended_at": None,
+        "summary": None,
+        "emotional_tags": json.dumps(["longing", "nervous"]),
+        "key_events": json.dumps([]),
+        "message_count": 24,
+        "user_message_count": 12,
+        "is_active": True,
+        "session_state": "active",
+        "resolution_type": None,
+        "fade_metadata": json.dumps({}),
+        "metadata": json.dumps({"source": "web"}),
+        "turn_count": 12,
+        "director_state": json.dumps({"beats": ["arrival", "tension"], "props_revealed": [1, 2], "last_visual_turn": 9}),
+        "completion_trigger": None,
+        "entry_paid": True,
+        "generations_used": 1,
+        "manual_generations": 0,
+        "created_at": _now(rng),
+        # Columns the model doesn't read
+        "guest_session_id": None,
+        "guest_ip_hash": None,
+        "guest_created_at": None,
+    }
+
+
+def memory_row(rng: random.Random, i: int) -> Row:
+    return {
+        "id": uuid.uuid4(),
+        "user_id": uuid.uuid4(),
+        "character_id": uuid.uuid4(),
+        "episode_id": uuid.uuid4(),
+        "series_id": uuid.uuid4(),
+        "type": rng.choice([t.value for t in MemoryType]),
+        "category": rng.choice([None, "personal", "work"]),
+        "content": json.dumps({"detail": f"memory {i}", "subject": "user", "evidence": "said so directly"}),
+        "summary": f"User mentioned detail number {i} about their week",
+        "emotional_valence": rng.randint(-2, 2),
+        "importance_score": Decimal(f"{rng.randint(10, 99) / 100:.2f}"),
+        "last_referenced_at": _now(rng),
+        "reference_count": rng.randint(0, 6),
+        "expires_at": None,
+        "is_active": True,
+        "created_at": _now(rng),
+        # What SELECT * also returns
+        "embedding": "[" + ",".join(f"{rng.uniform(-1, 1):.6f}" for _ in range(1536)) + "]",
+        "embedding_model": "text-embedding-3-small",
+        "base_importance": Decimal("0.50"),
+        "merged_into": None,
+        "consolidated_at": None,
+        "rescored_at": None,
+    }
+
+
+def hook_row(rng: random.Random, i: int) -> Row:
+    return {
+        "id": uuid.uuid4(),
+        "user_id": uuid.uuid4(),
+        "character_id": uuid.uuid4(),
+        "episode_id": None,
+        "type": rng.choice(["reminder", "follow_up", "milestone"]),
+        "priority": rng.randint(1, 5),
+        "content": f"Ask how thing {i} went",
+        "context": "They were nervous about it",
+        "suggested_opener": "So... how did it go?",
+        "trigger_after": _now(rng),
+        "trigger_before": None,
+        "triggered_at": None,
+        "is_active": True,
+        "metadata": json.dumps({"source": "extraction"}),
+        "created_at": _now(rng),
+        "ready_at": _now(rng),
+        "retired_at": None,
+    }
+
+
+def _project(row: Row, columns: str) -> Row:
+    return {name: row[name] for name in columns.split(", ")}
+
+
+def build_turns(count: int, memories: int, hooks: int, seed: int) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    turns = []
+    for _ in range(count):
+        character = character_row(rng)
+        turn = {
+            "character": character,
+            "engagement": engagement_row(rng, character["id"]),
+            "session": session_row(rng, character["id"]),
+            "memories": [memory_row(rng, i) for i in range(memories)],
+            "hooks": [hook_row(rng, i) for i in range(hooks)],
+        }
+        # What the slim path's queries return
+        turn["slim"] = {
+            "character": _project(character, CHARACTER_PROMPT_COLUMNS),
+            "engagement": _project(turn["engagement"], ENGAGEMENT_VIEW_COLUMNS),
+            "session": turn["session"],  # sessions keep SELECT *
+            "memories": [_project(r, MEMORY_EVENT_COLUMNS) for r in turn["memories"]],
+            "hooks": [_project(r, HOOK_COLUMNS) for r in turn["hooks"]],
+        }
+        turns.append(turn)
+    return turns
+
+
+# =============================================================================
+# The two paths
+# =============================================================================
+
+def legacy_turn(turn: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "character": Character(**dict(turn["character"])),
+        "engagement": Engagement(**dict(turn["engagement"])),
+        "session": Session(**dict(turn["session"])),
+        "memories": [MemoryEvent(**dict(r)) for r in turn["memories"]],
+        "hooks": [Hook(**dict(r)) for r in turn["hooks"]],
+    }
+
+
+def slim_turn(turn: Dict[str, Any]) -> Dict[str, Any]:
+    rows = turn["slim"]
+    return {
+        "character": CharacterPromptView.from_row(rows["character"]),
+        "engagement": EngagementView.from_row(rows["engagement"]),
+        "session": Session(**dict(rows["session"])),
+        "memories": [MemoryEvent(**dict(r)) for r in rows["memories"]],
+        "hooks": [Hook(**dict(r)) for r in rows["hooks"]],
+    }
+
+
+def check_equal(turns: List[Dict[str, Any]]) -> None:
+    for turn in turns:
+        legacy, slim = legacy_turn(turn), slim_turn(turn)
+        for name in ("id", "name", "system_prompt", "boundaries"):
+            assert getattr(legacy["character"], name) == getattr(slim["character"], name), name
+        assert legacy["engagement"].total_sessions == slim["engagement"].total_sessions
+        assert legacy["engagement"].first_met_at == slim["engagement"].first_met_at
+        assert legacy["session"].model_dump() == slim["session"].model_dump()
+        for kind in ("memories", "hooks"):
+            assert [m.model_dump() for m in legacy[kind]] == [m.model_dump() for m in slim[kind]], kind
+
+
+def measure(fn: Callable[[Dict[str, Any]], Any], turns: List[Dict[str, Any]], rounds: int) -> Dict[str, float]:
+    per_round = []
+    for _ in range(rounds):
+        start = time.process_time()
+        for turn in turns:
+            fn(turn)
+        per_round.append((time.process_time() - start) / len(turns) * 1e6)
+
+    tracemalloc.start()
+    sample = turns[: min(len(turns), 200)]
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    kept = [fn(turn) for turn in sample]
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return {
+        "us_per_turn_p50": statistics.median(per_round),
+        "us_per_turn_min": min(per_round),
+        "retained_bytes_per_turn": (after - before) / len(sample),
+        "peak_bytes_per_turn": (peak - before) / len(sample),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark conversation read models")
+    parser.add_argument("--turns", type=int, default=2000, help="Synthetic turns per round")
+    parser.add_argument("--memories", type=int, default=30, help="Memory rows per turn")
+    parser.add_argument("--hooks", type=int, default=5, help="Hook rows per turn")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    turns = build_turns(args.turns, args.memories, args.hooks, args.seed)
+    check_equal(turns[:50])
+    print(f"OK: both paths agree ({args.memories} memories, {args.hooks} hooks per turn)\n")
+
+    results = {"legacy": measure(legacy_turn, turns, args.rounds), "slim": measure(slim_turn, turns, args.rounds)}
+    print(f"{'path':<8} {'cpu us/turn p50':>16} {'min':>10} {'retained B/turn':>16} {'peak B/turn':>12}")
+    for name, r in results.items():
+        print(
+            f"{name:<8} {r['us_per_turn_p50']:>16.1f} {r['us_per_turn_min']:>10.1f} "
+            f"{r['retained_bytes_per_turn']:>16.0f} {r['peak_bytes_per_turn']:>12.0f}"
+        )
+    speedup = results["legacy"]["us_per_turn_p50"] / results["slim"]["us_per_turn_p50"]
+    print(f"\nslim is {speedup:.2f}x faster per turn (object construction only)")
+
+
+if __name__ == "__main__":
+    main()
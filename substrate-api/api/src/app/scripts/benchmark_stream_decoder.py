@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Stream Decoder Benchmark
+
+Feeds recorded provider streams through:
+1. legacy: httpx-style aiter_lines() + json.loads per event (the previous client code)
+2. shared: app.services.stream_decoder (byte-level framing, marker pre-filter, orjson if installed)
+
+and checks both produce identical text before timing them. Streams are
+replayed in network-sized chunks, many at once, to approximate hundreds of
+concurrent chats.
+
+Recordings are raw response bodies named <provider>*.sse / <provider>*.ndjson
+(provider: openai, anthropic, gemini, ollama). Without --recordings, synthetic
+recordings in each provider's wire format are generated (--save-recordings
+writes them out so they can be inspected or replaced with real captures).
+
+Usage:
+    cd substrate-api/api/src
+    python -m app.scripts.benchmark_stream_decoder
+    python -m app.scripts.benchmark_stream_decoder --tokens 400 --concurrency 500
+    python -m app.scripts.benchmark_stream_decoder --recordings ./recordings
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from httpx._decoders import LineDecoder, TextDecoder
+
+from app.services.stream_decoder import (
+    ANTHROPIC_MARKERS,
+    JSON_BACKEND,
+    NDJSONDecoder,
+    SSEDecoder,
+    StreamUsage,
+    extract_gemini_delta,
+    extract_ollama_delta,
+    extract_openai_delta,
+    iter_deltas,
+    make_anthropic_extractor,
+)
+
+WORDS = (
+    "she leans against the railing, watching you with a half smile. \"You came back.\" "
+    "The rain has softened to a mist; somewhere below, a door slams. é ✨ \\ \"quoted\""
+).split(" ")
+
+
+# =============================================================================
+# Synthetic recordings (provider wire formats)
+# =============================================================================
+
+def _tokens(count: int, rng: random.Random) -> List[str]:
+    return [rng.choice(WORDS) + " " for _ in range(count)]
+
+
+def record_openai(count: int, rng: random.Random) -> bytes:
+    out = []
+    for token in _tokens(count, rng):
+        event = {
+            "id": "chatcmpl-abc123", "object": "chat.completion.chunk", "created": 1700000000,
+            "model": "gpt-4o-mini", "system_fingerprint": "fp_0000",
+            "choices": [{"index": 0, "delta": {"content": token}, "logprobs": None, "finish_reason": None}],
+        }
+        out.append(f"data: {json.dumps(event)}\n\n")
+    out.append("data: " + json.dumps({
+        "id": "chatcmpl-abc123", "object": "chat.completion.chunk", "choices": [],
+        "usage": {"prompt_tokens": 812, "completion_tokens": count, "total_tokens": 812 + count},
+    }) + "\n\n")
+    out.append("data: [DONE]\n\n")
+    return "".join(out).encode()
+
+
+def record_anthropic(count: int, rng: random.Random) -> bytes:
+    out = [
+        "event: message_start\ndata: " + json.dumps({"type": "message_start", "message": {
+            "id": "msg_1", "type": "message", "role": "assistant", "model": "claude",
+            "content": [], "usage": {"input_tokens": 812, "output_tokens": 1}}}) + "\n\n",
+        "event: content_block_start\ndata: " + json.dumps({
+            "type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}) + "\n\n",
+    ]
+    for i, token in enumerate(_tokens(count, rng)):
+        out.append("event: content_block_delta\ndata: " + json.dumps({
+            "type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": token}}) + "\n\n")
+        if i % 20 == 0:
+            out.append("event: ping\ndata: {\"type\": \"ping\"}\n\n")
+    out.append("event: content_block_stop\ndata: {\"type\": \"content_block_stop\", \"index\": 0}\n\n")
+    out.append("event: message_delta\ndata: " + json.dumps({
+        "type": "message_delta", "delta": {"stop_reason": "end_turn"}, "usage": {"output_tokens": count}}) + "\n\n")
+    out.append("event: message_stop\ndata: {\"type\": \"message_stop\"}\n\n")
+    return "".join(out).encode()
+
+
+def record_gemini(count: int, rng: random.Random) -> bytes:
+    out = []
+    tokens = _tokens(count, rng)
+    # Gemini sends a few tokens per chunk
+    for i in range(0, len(tokens), 4):
+        event = {
+            "candidates": [{"content": {"parts": [{"text": "".join(tokens[i:i + 4])}], "role": "model"}, "index": 0}],
+            "usageMetadata": {"promptTokenCount": 812, "candidatesTokenCount": min(i + 4, count), "totalTokenCount": 812 + i},
+            "modelVersion": "gemini-3-flash-preview",
+        }
+        out.append(f"data: {json.dumps(event)}\r\n\r\n")
+    return "".join(out).encode()
+
+
+def record_ollama(count: int, rng: random.Random) -> bytes:
+    out = []
+    for token in _tokens(count, rng):
+        out.append(json.dumps({
+            "model": "llama3", "created_at": "2024-01-01T00:00:00Z",
+            "message": {"role": "assistant", "content": token}, "done": False}) + "\n")
+    out.append(json.dumps({
+        "model": "llama3", "created_at": "2024-01-01T00:00:00Z", "message": {"role": "assistant", "content": ""},
+        "done": True, "prompt_eval_count": 812, "eval_count": count}) + "\n")
+    return "".join(out).encode()
+
+
+RECORDERS = {
+    "openai": (record_openai, "sse"),
+    "anthropic": (record_anthropic, "sse"),
+    "gemini": (record_gemini, "sse"),
+    "ollama": (record_ollama, "ndjson"),
+}
+
+
+# =============================================================================
+# Decoders under test
+# =============================================================================
+
+async def _replay(body: bytes, chunk_sizes: List[int]) -> AsyncIterator[bytes]:
+    """Replay a recorded body in network-sized chunks."""
+    pos = 0
+    for size in chunk_sizes:
+        if pos >= len(body):
+            break
+        yield body[pos:pos + size]
+        pos += size
+    if pos < len(body):
+        yield body[pos:]
+
+
+async def _aiter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Same decoding path as httpx Response.aiter_lines()."""
+    text_decoder = TextDecoder("utf-8")
+    line_decoder = LineDecoder()
+    async for chunk in chunks:
+        for line in line_decoder.decode(text_decoder.decode(chunk)):
+            yield line
+    for line in line_decoder.decode(text_decoder.flush()):
+        yield line
+    for line in line_decoder.flush():
+        yield line
+
+
+async def legacy(provider: str, chunks: AsyncIterator[bytes]) -> str:
+    """The per-client aiter_lines + json.loads loops this benchmark replaces."""
+    out = []
+    async for line in _aiter_lines(chunks):
+        if provider == "ollama":
+            if line:
+                try:
+                    data = json.loads(line)
+                    content = data.get("message", {}).get("content", "")
+                    if content:
+                        out.append(content)
+                except json.JSONDecodeError:
+                    continue
+            continue
+        if not line.startswith("data: "):
+            continue
+        data = line[6:]
+        if data == "[DONE]":
+            break
+        try:
+            chunk = json.loads(data)
+        except json.JSONDecodeError:
+            continue
+        if provider == "openai":
+            if chunk.get("choices"):
+                content = chunk["choices"][0].get("delta", {}).get("content", "")
+                if content:
+                    out.append(content)
+        elif provider == "anthropic":
+            if chunk["type"] == "content_block_delta":
+                out.append(chunk["delta"].get("text", ""))
+        elif provider == "gemini":
+            if "candidates" in chunk and len(chunk["candidates"]) > 0:
+                candidate = chunk["candidates"][0]
+                if "content" in candidate and "parts" in candidate["content"]:
+                    text = candidate["content"]["parts"][0].get("text", "")
+                    if text:
+                        out.append(text)
+    return "".join(out)
+
+
+async def shared(provider: str, chunks: AsyncIterator[bytes], usage: Optional[StreamUsage] = None) -> str:
+    """app.services.stream_decoder, as wired into the provider clients."""
+    if provider == "openai":
+        stream = iter_deltas(chunks, SSEDecoder(), extract_openai_delta, usage)
+    elif provider == "anthropic":
+        stream = iter_deltas(chunks, SSEDecoder(), make_anthropic_extractor("text"), usage, markers=ANTHROPIC_MARKERS)
+    elif provider == "gemini":
+        stream = iter_deltas(chunks, SSEDecoder(), extract_gemini_delta, usage)
+    else:
+        stream = iter_deltas(chunks, NDJSONDecoder(), extract_ollama_delta, usage)
+    return "".join([text async for text in stream])
+
+
+# =============================================================================
+# Harness
+# =============================================================================
+
+def load_recordings(directory: Optional[str], tokens: int, seed: int) -> Dict[str, List[bytes]]:
+    rng = random.Random(seed)
+    if not directory:
+        return {name: [recorder(tokens, rng)] for name, (recorder, _) in RECORDERS.items()}
+
+    recordings: Dict[str, List[bytes]] = {}
+    for path in sorted(Path(directory).iterdir()):
+        provider = next((name for name in RECORDERS if path.name.startswith(name)), None)
+        if provider and path.suffix in (".sse", ".ndjson"):
+            recordings.setdefault(provider, []).append(path.read_bytes())
+    if not recordings:
+        raise SystemExit(f"No <provider>*.sse / *.ndjson recordings found in {directory}")
+    return recordings
+
+
+def save_recordings(recordings: Dict[str, List[bytes]], directory: str) -> None:
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    for provider, bodies in recordings.items():
+        suffix = RECORDERS[provider][1]
+        for i, body in enumerate(bodies):
+            (Path(directory) / f"{provider}_{i}.{suffix}").write_bytes(body)
+    print(f"Saved recordings to {directory}")
+
+
+async def run_concurrent(
+    fn: Callable,
+    provider: str,
+    bodies: List[bytes],
+    chunk_plans: List[List[int]],
+    concurrency: int,
+) -> Tuple[float, List[str]]:
+    start = time.perf_counter()
+    results = await asyncio.gather(*[
+        fn(provider, _replay(bodies[i % len(bodies)], chunk_plans[i % len(chunk_plans)]))
+        for i in range(concurrency)
+    ])
+    return time.perf_counter() - start, results
+
+
+async def benchmark(args) -> None:
+    recordings = load_recordings(args.recordings, args.tokens, args.seed)
+    if args.save_recordings:
+        save_recordings(recordings, args.save_recordings)
+
+    rng = random.Random(args.seed)
+    chunk_plans = [[rng.randint(64, 1500) for _ in range(4096)] for _ in range(16)]
+
+    print("=== Stream Decoder Benchmark ===")
+    print(f"JSON backend: {JSON_BACKEND}   concurrency: {args.concurrency}   rounds: {args.rounds}\n")
+    print(f"{'provider':<10} {'bytes':>8} {'legacy ms':>10} {'shared ms':>10} {'speedup':>8}  usage")
+
+    for provider, bodies in recordings.items():
+        # Correctness first: identical text on every recording
+        for body in bodies:
+            expected = await legacy(provider, _replay(body, chunk_plans[0]))
+            usage = StreamUsage()
+            got = await shared(provider, _replay(body, chunk_plans[0]), usage)
+            if got != expected:
+                raise SystemExit(f"❌ {provider}: decoded text differs from legacy path")
+
+        legacy_times, shared_times = [], []
+        for _ in range(args.rounds):
+            elapsed, _ = await run_concurrent(legacy, provider, bodies, chunk_plans, args.concurrency)
+            legacy_times.append(elapsed)
+            elapsed, _ = await run_concurrent(shared, provider, bodies, chunk_plans, args.concurrency)
+            shared_times.append(elapsed)
+
+        legacy_ms = min(legacy_times) * 1000
+        shared_ms = min(shared_times) * 1000
+        print(
+            f"{provider:<10} {sum(map(len, bodies)) // len(bodies):>8} {legacy_ms:>10.1f} {shared_ms:>10.1f} "
+            f"{legacy_ms / shared_ms:>7.2f}x  in={usage.tokens_input} out={usage.tokens_output}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the shared LLM stream decoder")
+    parser.add_argument("--recordings", help="Directory of recorded <provider>*.sse/.ndjson bodies")
+    parser.add_argument("--save-recordings", help="Write the recordings used to this directory")
+    parser.add_argument("--tokens", type=int, default=300, help="Tokens per synthetic stream")
+    parser.add_argument("--concurrency", type=int, default=200, help="Concurrent streams per round")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds per decoder (best is reported)")
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(benchmark(parser.parse_args()))
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Memory Consolidation Check
+
+Runs the consolidation clustering (MemoryConsolidationService.cluster) on a
+fixed set of memories with the configured embedder (MEMORY_EMBEDDER) and
+threshold, without touching the database, and checks that:
+
+1. paraphrases of one fact merge (the examples from the service docstring)
+2. different facts that share most of their words stay apart
+
+Exits non-zero if any expectation fails, so a threshold or embedder change
+can be checked before the nightly cron runs with it.
+
+Usage:
+    cd substrate-api/api/src
+    python -m app.scripts.check_memory_consolidation
+    MEMORY_CONSOLIDATION_THRESHOLD=0.7 python -m app.scripts.check_memory_consolidation
+"""
+
+import asyncio
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.models.memory import MemoryEvent
+from app.services.memory_consolidation import MemoryConsolidationService
+
+# Each group should merge into one memory; no two groups should merge
+GROUPS = [
+    ["Has a cat named Luna", "Has a cat called Luna", "Their cat is Luna"],
+    ["Works as a nurse at the city hospital", "Works as a nurse at city hospital"],
+    ["Their sister Emma lives in Boston", "Sister Emma lives in Boston"],
+    ["Has a cat named Milo"],
+    ["Has a dog named Max"],
+    ["Luna the cat is sick"],
+    ["Their brother Jack lives in Boston"],
+    ["Mother lives in Seoul"],
+    ["Father lives in Seoul"],
+    ["Loves hiking on weekends"],
+    ["Hates hiking on weekends"],
+]
+
+
+async def main() -> int:
+    service = MemoryConsolidationService(db=None)
+    embedder = service.semantic_index.embedder
+    now = datetime.now(timezone.utc)
+
+    memories = []
+    expected = []
+    for g, group in enumerate(GROUPS):
+        for summary in group:
+            memories.append(MemoryEvent(
+                id=uuid.uuid4(),
+                user_id=uuid.uuid4(),
+                type="fact",
+                summary=summary,
+                content={},
+                importance_score=0.5,
+                created_at=now - timedelta(minutes=len(memories)),
+            ))
+            expected.append(g)
+
+    # Stored vectors, as the semantic index writes them
+    vectors = await embedder.embed([m.summary for m in memories])
+    clusters = await service.cluster(memories, vectors)
+
+    print("=== Memory Consolidation Check ===\n")
+    print(f"Embedder: {embedder.model}   threshold: {service.threshold}\n")
+
+    merged_with = {i: set(c) for c in clusters for i in c}
+    failures = 0
+    for g, group in enumerate(GROUPS):
+        members = {i for i, e in enumerate(expected) if e == g}
+        together = merged_with.get(min(members), {min(members)})
+        ok = together == members
+        failures += not ok
+        label = " / ".join(f'"{s}"' for s in group)
+        if ok:
+            print(f"✓ {label}")
+        else:
+            strays = [f'"{memories[i].summary}"' for i in sorted(together - members)]
+            missed = [f'"{memories[i].summary}"' for i in sorted(members - together)]
+            print(f"❌ {label}")
+            if missed:
+                print(f"   not merged: {', '.join(missed)}")
+            if strays:
+                print(f"   wrongly merged with: {', '.join(strays)}")
+
+    print(f"\n{len(GROUPS) - failures}/{len(GROUPS)} groups as expected")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
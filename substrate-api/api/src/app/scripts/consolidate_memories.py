@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Memory Consolidation Job
+
+Merges near-duplicate memories per (user, series). Merged originals are
+kept unless a retention window is set (--purge-days or
+MEMORY_CONSOLIDATION_PURGE_DAYS), in which case older ones are hard deleted.
+See app/services/memory_consolidation.py.
+
+Intended to run periodically (Render cron: fantazy-memory-consolidation).
+--since-hours limits the pass to scopes that gained memories recently; the
+cron uses a window slightly longer than its interval so no scope is missed.
+
+Usage:
+    cd substrate-api/api/src
+    python -m app.scripts.consolidate_memories --dry-run
+    python -m app.scripts.consolidate_memories --since-hours 26
+    python -m app.scripts.consolidate_memories --user-id <uuid> --series-id <uuid>
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+from uuid import UUID
+
+from app.deps import close_db, get_db
+from app.services.memory_consolidation import ConsolidationConfig, MemoryConsolidationService
+from app.services.memory_index import MemoryScope
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+
+async def main(args: argparse.Namespace) -> None:
+    config = ConsolidationConfig.from_env()
+    if args.threshold is not None:
+        config.threshold = args.threshold
+    if args.purge_days is not None:
+        config.purge_after_days = args.purge_days
+
+    db = await get_db()
+    try:
+        service = MemoryConsolidationService(db, config)
+        if args.user_id and args.series_id:
+            scope = MemoryScope(user_id=UUID(args.user_id), character_id=None, series_id=UUID(args.series_id))
+            report = await service.consolidate_scope(scope, dry_run=args.dry_run)
+        else:
+            report = await service.consolidate(since_hours=args.since_hours, dry_run=args.dry_run)
+    finally:
+        await close_db()
+
+    prefix = "[dry run] " if args.dry_run else ""
+    print(f"{prefix}Threshold: {service.threshold}")
+    print(f"{prefix}Scopes: {report.scopes}, memories scanned: {report.memories_scanned}")
+    print(f"{prefix}Clusters merged: {report.clusters_merged} "
+          f"({report.rows_deactivated} deactivated, {report.rows_created} created)")
+    print(f"{prefix}Purged: {report.rows_purged}")
+    print(f"{prefix}Rows reclaimed: {report.rows_reclaimed}")
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge near-duplicate memories")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be merged without writing")
+    parser.add_argument("--since-hours", type=float, help="Only scopes with memories created in this window")
+    parser.add_argument("--user-id", help="Consolidate a single scope (with --series-id)")
+    parser.add_argument("--series-id", help="Consolidate a single scope (with --user-id)")
+    parser.add_argument("--threshold", type=float,
+                        help="Cosine similarity to merge at (default: env, else 0.8 hashing / 0.85 provider)")
+    parser.add_argument("--purge-days", type=int,
+                        help="Hard delete merged originals older than this (default: env, else never)")
+    parser.add_argument("--json", action="store_true", help="Also print the report as JSON")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Memory Working Set Maintenance
+
+Working sets (memory_working_sets, migration 069) are maintained by triggers
+on memory_events. This script rebuilds them and verifies that reading from
+them returns exactly what the live ranking over all memories returns.
+
+Commands:
+- rebuild: Recompute every working set (or one scope) and drop orphans
+- check:   Compare working-set reads against the live ranking per scope;
+           --repair rebuilds any scope that is missing or stale
+
+Exits non-zero when check finds problems (and --repair was not given).
+
+Usage:
+    cd substrate-api/api/src
+    python -m app.scripts.memory_working_set rebuild
+    python -m app.scripts.memory_working_set rebuild --user-id <uuid> --series-id <uuid>
+    python -m app.scripts.memory_working_set check --sample 500
+    python -m app.scripts.memory_working_set check --repair
+"""
+
+import argparse
+import asyncio
+import sys
+from uuid import UUID
+
+from app.deps import close_db, get_db
+from app.services.memory_working_set import MemoryWorkingSetService
+
+
+async def rebuild(service: MemoryWorkingSetService, args: argparse.Namespace) -> int:
+    if args.user_id and args.series_id:
+        size = await service.rebuild_scope(UUID(args.user_id), UUID(args.series_id))
+        print(f"Rebuilt working set: {size} memories")
+        return 0
+
+    result = await service.rebuild_all()
+    print(f"Rebuilt {result['scopes']} working sets ({result['memories']} memories), "
+          f"deleted {result['orphans_deleted']} orphans")
+    return 0
+
+
+async def check(service: MemoryWorkingSetService, args: argparse.Namespace) -> int:
+    report = await service.check(limit=args.limit, sample=args.sample, repair=args.repair)
+
+    print(f"Scopes checked: {report.scopes_checked}")
+    print(f"Missing working sets: {len(report.missing)}")
+    print(f"Mismatched working sets: {len(report.mismatched)}")
+    print(f"Orphaned working sets: {report.orphaned}")
+    for user_id, series_id in (report.missing + report.mismatched)[:20]:
+        print(f"   - user {user_id} / series {series_id}")
+    if args.repair:
+        print(f"Repaired: {report.repaired}")
+
+    if report.ok:
+        print("✓ Working sets consistent")
+        return 0
+    return 0 if args.repair else 1
+
+
+async def main(args: argparse.Namespace) -> int:
+    db = await get_db()
+    try:
+        service = MemoryWorkingSetService(db)
+        if args.command == "rebuild":
+            return await rebuild(service, args)
+        return await check(service, args)
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild or verify memory working sets")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rebuild_parser = subparsers.add_parser("rebuild", help="Recompute working sets")
+    rebuild_parser.add_argument("--user-id", help="Rebuild a single scope (with --series-id)")
+    rebuild_parser.add_argument("--series-id", help="Rebuild a single scope (with --user-id)")
+
+    check_parser = subparsers.add_parser("check", help="Compare working sets with the live ranking")
+    check_parser.add_argument("--limit", type=int, default=20, help="Ranking limit to compare (default: 20)")
+    check_parser.add_argument("--sample", type=int, help="Check this many random scopes")
+    check_parser.add_argument("--repair", action="store_true", help="Rebuild missing or stale scopes")
+
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Director Replay
+
+Replays recorded sessions through the Director (pre-guidance, objective and
+beat checks, process_exchange) against a simulated LLM with configurable
+latency, without network access, and reports per-turn LLM calls, simulated
+latency, event timelines and director_state diffs. Use it to compare the
+cost and outcomes of a Director change before shipping it.
+
+Fixture format (JSON):
+    {"sessions": [{
+        "id": "...",
+        "character": {"name": "Mina"},
+        "template": {"title": "...", "situation": "...", "genre": "romantic_tension",
+                     "turn_budget": 10, "user_objective": "...", "success_condition": "semantic:...",
+                     "beats": [...], "choice_points": [...]},
+        "messages": [{"role": "user", "content": "..."}, {"role": "assistant", "content": "..."}]
+    }]}
+
+--record reads sessions from the database (DATABASE_URL) and writes them in
+this format; replays always run offline.
+
+Usage:
+    cd substrate-api/api/src
+    python -m app.scripts.replay_director --fixture sessions.json
+    python -m app.scripts.replay_director --fixture sessions.json --timeline --json report.json
+    python -m app.scripts.replay_director --fixture sessions.json \\
+        --latency evaluate_exchange=lognormal:600,0.3 --latency memory.extract_memories=const:1200 \\
+        --yes-rate 0.5 --gate-off
+    python -m app.scripts.replay_director --record sessions.json --session-id <uuid> --session-id <uuid>
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+
+from app.services.director_replay import (
+    DirectorReplay,
+    LatencyModel,
+    SimulatedLLM,
+    load_fixture,
+    load_sessions_from_db,
+)
+from app.services.extraction_gate import ExtractionGateConfig
+
+
+def print_timeline(report) -> None:
+    for session in report.sessions:
+        print(f"\n=== Session {session.session_id} ===")
+        print(f"{'turn':>4} {'calls':>5} {'inline ms':>10} {'bg ms':>8}  events / state changes")
+        for turn in session.turns:
+            events = ", ".join(
+                e["type"] + "(" + ",".join(f"{k}={v}" for k, v in e.items() if k not in ("type", "t_ms")) + ")"
+                for e in turn.events
+            )
+            print(f"{turn.turn:>4} {sum(turn.llm_calls.values()):>5} {turn.inline_ms:>10.1f} {turn.background_ms:>8.1f}  {events}")
+            for change in turn.state_diff:
+                if change["path"].startswith(("last_evaluation", "visual_decisions")):
+                    continue
+                print(f"{'':>31}{change['path']}: {json.dumps(change['before'])} -> {json.dumps(change['after'])}")
+
+
+async def record(args) -> None:
+    from app.deps import close_db, get_db
+
+    db = await get_db()
+    try:
+        sessions = await load_sessions_from_db(db, args.session_id)
+    finally:
+        await close_db()
+    Path(args.record).write_text(json.dumps({"sessions": sessions}, indent=2, default=str))
+    print(f"Recorded {len(sessions)} session(s) to {args.record}")
+
+
+async def replay(args) -> None:
+    latency = {}
+    for spec in args.latency:
+        kind, _, model = spec.partition("=")
+        latency[kind] = LatencyModel.parse(model)
+
+    gate_config = ExtractionGateConfig.from_env()
+    if args.gate_off:
+        gate_config.enabled = False
+
+    harness = DirectorReplay(
+        llm_factory=lambda: SimulatedLLM(latency=latency, yes_rate=args.yes_rate, seed=args.seed),
+        gate_config=gate_config,
+    )
+    report = await harness.run(load_fixture(args.fixture))
+
+    if args.timeline:
+        print_timeline(report)
+
+    print("\n=== Director Replay Summary ===")
+    print(json.dumps(report.summary(), indent=2))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report.to_dict(), indent=2, default=str))
+        print(f"\nFull report written to {args.json}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded sessions through the Director offline")
+    parser.add_argument("--fixture", help="Fixture file with recorded sessions")
+    parser.add_argument("--record", help="Read --session-id sessions from the database into this fixture file")
+    parser.add_argument("--session-id", action="append", default=[], help="Session to record (repeatable)")
+    parser.add_argument("--latency", action="append", default=[],
+                        help="Per call kind latency, e.g. beat_check=normal:400,80 (repeatable)")
+    parser.add_argument("--yes-rate", type=float, default=0.3,
+                        help="Probability semantic objective/beat checks answer YES")
+    parser.add_argument("--gate-off", action="store_true", help="Disable the extraction gate")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--timeline", action="store_true", help="Print per-turn events and state changes")
+    parser.add_argument("--json", help="Write the full report to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.record:
+        if not args.session_id:
+            parser.error("--record needs at least one --session-id")
+        asyncio.run(record(args))
+    elif args.fixture:
+        asyncio.run(replay(args))
+    else:
+        parser.print_help()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
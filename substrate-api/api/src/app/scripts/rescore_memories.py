@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Memory Re-scoring Job
+
+Re-derives importance_score for active memories from their extraction-time
+score, age, references and emotional valence. See
+app/services/memory_rescoring.py.
+
+Intended to run nightly (Render cron: fantazy-memory-rescoring). The score is
+a pure function of the row, so re-running is safe.
+
+Usage:
+    cd substrate-api/api/src
+    python -m app.scripts.rescore_memories --dry-run
+    python -m app.scripts.rescore_memories
+    python -m app.scripts.rescore_memories --user-id <uuid> --half-life-days 14
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+
+from app.deps import close_db, get_db
+from app.services.memory_rescoring import MemoryRescoringService, RescoringConfig
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+
+async def main(args: argparse.Namespace) -> None:
+    config = RescoringConfig.from_env()
+    if args.half_life_days is not None:
+        config.half_life_days = args.half_life_days
+    if args.users_per_chunk is not None:
+        config.users_per_chunk = args.users_per_chunk
+
+    db = await get_db()
+    try:
+        report = await MemoryRescoringService(db, config).run(user_id=args.user_id, dry_run=args.dry_run)
+    finally:
+        await close_db()
+
+    prefix = "[dry run] " if args.dry_run else ""
+    print(f"{prefix}Users: {report.users}, memories scanned: {report.memories_scanned}")
+    print(f"{prefix}Updated: {report.memories_updated} ({report.raised} raised, {report.lowered} lowered)")
+    print(f"{prefix}Duration: {report.duration_ms:.0f}ms")
+    if report.errors:
+        print(f"{prefix}Errors: {len(report.errors)}")
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-score memory importance")
+    parser.add_argument("--dry-run", action="store_true", help="Compute scores without writing")
+    parser.add_argument("--user-id", help="Re-score a single user's memories")
+    parser.add_argument("--half-life-days", type=float, help="Decay half-life (default: env or 30)")
+    parser.add_argument("--users-per-chunk", type=int, help="Users loaded per batch (default: env or 200)")
+    parser.add_argument("--json", action="store_true", help="Also print the report as JSON")
+    asyncio.run(main(parser.parse_args()))
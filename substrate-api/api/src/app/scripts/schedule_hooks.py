@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Hook Scheduler Job
+
+Retires expired hooks and promotes due hooks into the ready set read by the
+chat path. See app/services/hook_scheduler.py.
+
+Intended to run periodically (Render cron: fantazy-hook-scheduler). Hook
+windows are day-granular, so a run every 15 minutes is plenty.
+
+Usage:
+    cd substrate-api/api/src
+    python -m app.scripts.schedule_hooks
+"""
+
+import asyncio
+import logging
+
+from app.deps import close_db, get_db
+from app.services.hook_scheduler import HookScheduler
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+
+async def main() -> None:
+    db = await get_db()
+    try:
+        report = await HookScheduler(db).run()
+    finally:
+        await close_db()
+
+    print(f"Retired: {report.retired}")
+    print(f"Promoted: {report.promoted}")
+    print(f"Duration: {report.duration_ms:.0f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -4,20 +4,28 @@ import asyncio
 import json
 import logging
 import re
+import time
 from typing import Any, AsyncIterator, Dict, List, Optional
 from uuid import UUID
 
-from app.models.character import Character
+from app.models.character import CHARACTER_PROMPT_COLUMNS, CharacterPromptView
 from app.models.session import Session
 from app.models.message import Message, MessageRole, ConversationContext, MemorySummary, HookSummary, PropSummary
-from app.models.engagement import Engagement
+from app.models.engagement import ENGAGEMENT_SUMMARY_COLUMNS, ENGAGEMENT_VIEW_COLUMNS, EngagementView
 from app.models.episode_template import EpisodeTemplate, VisualMode
 from app.services.llm import LLMService
+from app.services.stream_decoder import StreamUsage
 from app.services.memory import MemoryService
 from app.services.usage import UsageService
 from app.services.rate_limiter import MessageRateLimiter, RateLimitExceededError
+from app.services.visual_speculation import SpeculativeVisuals
 from app.services.director import DirectorService
-from app.services.scene import SceneService
+from app.services.director_state import DirectorStatePatch
+from app.services.episode_plan import EpisodePlan, compile_flag_context, get_episode_plan
+from app.services.series_graph import get_series_graph
+from app.services.scene import PreparedVisual, SceneService
+from app.services.scene_reservations import BUDGET_EXHAUSTED, SceneGenerationReservations, director_trigger
+from app.services.turn_trace import BACKGROUND, TurnTrace
 
 log = logging.getLogger(__name__)
 
@@ -36,6 +44,8 @@ class ConversationService:
         self.rate_limiter = MessageRateLimiter.get_instance()
         self.director_service = DirectorService(db)
         self.scene_service = SceneService(db)
+        self.scene_reservations = SceneGenerationReservations(db)
+        self.visual_speculation = SpeculativeVisuals.get_instance()
 
     async def send_message(
         self,
@@ -95,9 +105,12 @@ class ConversationService:
 
         # Get episode template if session has one (for Director integration)
         episode_template = await self._get_episode_template(episode.episode_template_id)
+        episode_plan = get_episode_plan(episode_template) if episode_template else None
 
         # Build context
-        context = await self.get_context(user_id, character_id, episode.id)
+        context = await self.get_context(
+            user_id, character_id, episode.id, query_text=content, episode_plan=episode_plan
+        )
 
         # Save user message
         user_message = await self._save_message(
@@ -140,6 +153,7 @@ class ConversationService:
                 "UPDATE hooks SET triggered_at = NOW() WHERE id = ANY(:hook_ids)",
                 {"hook_ids": hook_ids},
             )
+            self.memory_service.layers.invalidate_hooks(user_id, character_id)
 
         # Record message for rate limiting (skip for guests)
         if user_id:
@@ -175,6 +189,7 @@ class ConversationService:
         content: str,
         episode_template_id: Optional[UUID] = None,
         guest_session_id: Optional[str] = None,
+        debug_timing: bool = False,
     ) -> AsyncIterator[str]:
         """Send a message and stream the response.
 
@@ -187,8 +202,14 @@ class ConversationService:
         Per DIRECTOR_ARCHITECTURE.md, Director runs for ALL episodes:
         - Open episodes: turn counting, memory, hooks, beat tracking
         - Bounded episodes: all of the above + completion detection + evaluation
+
+        Each phase is timed in a TurnTrace (sampled into turn_traces); with
+        debug_timing the inline timings end the stream as a server_timing event.
         """
+        trace = TurnTrace.start(debug=debug_timing)
+
         # Check rate limit (skip for guest sessions)
+        stop = trace.timer("rate_limit")
         if user_id:
             subscription_status = await self._get_user_subscription_status(user_id)
             rate_check = await self.rate_limiter.check_rate_limit(user_id, subscription_status)
@@ -200,8 +221,10 @@ class ConversationService:
                     cooldown_seconds=rate_check.cooldown_seconds,
                     remaining=rate_check.remaining,
                 )
+        stop()
 
         # Get episode (either find existing guest session or create for authenticated user)
+        stop = trace.timer("episode")
         if guest_session_id:
             # For guests, find the existing session by guest_session_id
             episode_query = """
@@ -221,28 +244,37 @@ class ConversationService:
             episode = await self.get_or_create_episode(
                 user_id, character_id, episode_template_id=episode_template_id
             )
+        stop()
+        trace.session_id = str(episode.id)
+        trace.meta["turn"] = episode.turn_count + 1
 
         # Get episode template if session has one (for Director integration)
-        episode_template = await self._get_episode_template(episode.episode_template_id)
+        with trace.span("template"):
+            episode_template = await self._get_episode_template(episode.episode_template_id)
+            episode_plan = get_episode_plan(episode_template) if episode_template else None
 
         # Build context
-        context = await self.get_context(user_id, character_id, episode.id)
+        with trace.span("context"):
+            context = await self.get_context(
+                user_id, character_id, episode.id, query_text=content, episode_plan=episode_plan
+            )
 
         # Save user message
-        await self._save_message(
-            episode_id=episode.id,
-            role=MessageRole.USER,
-            content=content,
-        )
-
-        # Track message for analytics (skip for guests - no user_id)
-        if user_id:
-            await self.usage_service.increment_message_count(
-                user_id=str(user_id),
-                character_id=str(character_id),
-                episode_id=str(episode.id),
+        with trace.span("save_user"):
+            await self._save_message(
+                episode_id=episode.id,
+                role=MessageRole.USER,
+                content=content,
             )
 
+            # Track message for analytics (skip for guests - no user_id)
+            if user_id:
+                await self.usage_service.increment_message_count(
+                    user_id=str(user_id),
+                    character_id=str(character_id),
+                    episode_id=str(episode.id),
+                )
+
         # Add user message to context
         context.messages.append({"role": "user", "content": content})
 
@@ -251,26 +283,18 @@ class ConversationService:
         # =====================================================================
         # ADR-001: Genre doctrine is injected here by Director, not baked into
         # character system_prompt. Genre comes from episode_template/series.
+        stop = trace.timer("pre_guidance")
         if episode_template:
             try:
                 # Get character's energy level for genre-specific guidance
                 char_boundaries = context.character_boundaries or {}
                 energy_level = char_boundaries.get("flirting_level", "playful")
 
-                # ADR-009: Get beats and director_state for beat directive injection
-                beats = getattr(episode_template, 'beats', [])
+                # ADR-009: Get director_state for beat directive injection
                 director_state = episode.director_state or {}
                 beat_states = director_state.get("beats", {})
                 flags = director_state.get("flags", {})
 
-                # Convert Beat objects to dicts if needed
-                beats_dicts = []
-                for beat in beats:
-                    if hasattr(beat, "model_dump"):
-                        beats_dicts.append(beat.model_dump())
-                    elif isinstance(beat, dict):
-                        beats_dicts.append(beat)
-
                 # Director Protocol v2.2 + ADR-009: Deterministic pre-guidance with beat directives
                 # Motivation (objective/obstacle/tactic) now comes from Episode upstream
                 guidance = self.director_service.generate_pre_guidance(
@@ -279,7 +303,7 @@ class ConversationService:
                     turn_count=episode.turn_count,
                     turn_budget=getattr(episode_template, 'turn_budget', None),
                     energy_level=energy_level,
-                    beats=beats_dicts if beats_dicts else None,
+                    plan=episode_plan,
                     beat_states=beat_states,
                     flags=flags,
                 )
@@ -289,23 +313,35 @@ class ConversationService:
                 log.debug(f"Director pre-guidance: pacing={guidance.pacing}, genre={guidance.genre}{beat_info}")
             except Exception as e:
                 log.warning(f"Director pre-guidance failed: {e}")
+        stop()
 
         # Generate streaming response (with Director guidance in context)
         formatted_messages = context.to_messages()
         full_response = []
+        usage = StreamUsage()
+        stream_start = time.time()
 
-        async for chunk in self.llm.generate_stream(formatted_messages):
-            full_response.append(chunk)
-            yield json.dumps({"type": "chunk", "content": chunk})
+        with trace.span("stream"):
+            async for chunk in self.llm.generate_stream(formatted_messages, usage=usage):
+                if not full_response:
+                    trace.mark("ttft")
+                full_response.append(chunk)
+                yield json.dumps({"type": "chunk", "content": chunk})
 
         response_content = "".join(full_response)
+        model_used = usage.model or self.llm.model
+        trace.meta.update(model=model_used, tokens_input=usage.tokens_input, tokens_output=usage.tokens_output)
 
-        # Save assistant message
+        # Save assistant message (token counts reported at the end of the stream)
+        stop = trace.timer("save_assistant")
         await self._save_message(
             episode_id=episode.id,
             role=MessageRole.ASSISTANT,
             content=response_content,
-            model_used=self.llm.model,
+            model_used=model_used,
+            tokens_input=usage.tokens_input,
+            tokens_output=usage.tokens_output,
+            latency_ms=int((time.time() - stream_start) * 1000),
         )
 
         # Mark hooks as triggered (batch into single query for efficiency)
@@ -316,10 +352,12 @@ class ConversationService:
                 "UPDATE hooks SET triggered_at = NOW() WHERE id = ANY(:hook_ids)",
                 {"hook_ids": hook_ids},
             )
+            self.memory_service.layers.invalidate_hooks(user_id, character_id)
 
         # Record message for rate limiting (skip for guests)
         if user_id:
             await self.rate_limiter.record_message(user_id)
+        stop()
 
         # Check if we should suggest scene generation
         # (frontend can show a "visualize" prompt)
@@ -340,6 +378,7 @@ class ConversationService:
 
         # Build next_suggestion payload if we're suggesting next episode
         next_suggestion = None
+        stop = trace.timer("next_suggestion")
         if suggest_next and episode_template and episode_template.series_id:
             # Look up next episode in series
             next_ep = await self._get_next_episode_in_series(
@@ -353,6 +392,7 @@ class ConversationService:
                     "slug": next_ep["slug"],
                     "episode_number": next_ep["episode_number"],
                 }
+        stop()
 
         # Build done event - sent IMMEDIATELY for fast perceived response
         done_event = {
@@ -371,6 +411,7 @@ class ConversationService:
             },
         }
 
+        trace.mark("done")
         yield json.dumps(done_event)
 
         # v2.8: Emit next_episode_suggestion event if turn budget reached
@@ -385,6 +426,7 @@ class ConversationService:
 
         # ADR-005 v2: Director-owned prop revelation detection
         # Director detects when character naturally mentions props (semantic, not turn-based)
+        stop = trace.timer("props")
         if episode_template:
             try:
                 revealed_props = await self.director_service.detect_prop_revelations(
@@ -403,19 +445,18 @@ class ConversationService:
                     yield json.dumps(prop_event)
             except Exception as e:
                 log.warning(f"Prop revelation detection failed: {e}")
+        stop()
 
         # =====================================================================
         # ADR-008: USER OBJECTIVES EVALUATION
         # =====================================================================
         if episode_template and user_id:
             user_objective = getattr(episode_template, 'user_objective', None)
-            success_condition = getattr(episode_template, 'success_condition', None)
-            failure_condition = getattr(episode_template, 'failure_condition', 'turn_budget_exceeded')
-            choice_points = getattr(episode_template, 'choice_points', [])
             on_success = getattr(episode_template, 'on_success', {})
             on_failure = getattr(episode_template, 'on_failure', {})
 
             if user_objective:
+                stop = trace.timer("objective")
                 try:
                     # Get current director_state for flags and objective status
                     director_state = dict(episode.director_state) if episode.director_state else {}
@@ -429,7 +470,7 @@ class ConversationService:
                         full_messages = context.messages + [{"role": "assistant", "content": response_content}]
                         obj_eval = await self.director_service.evaluate_objective(
                             objective=user_objective,
-                            success_condition=success_condition,
+                            success_condition=episode_plan.success_condition,
                             messages=full_messages,
                             character_response=response_content,
                             turn_count=next_turn_count,
@@ -453,16 +494,23 @@ class ConversationService:
                                 if on_success.get("suggest_episode"):
                                     completed_event["suggest_episode"] = on_success["suggest_episode"]
 
-                            # Update director_state
+                            # Update director_state (patch only the keys changed here)
                             objectives_state["status"] = "completed"
                             objectives_state["completed_at_turn"] = next_turn_count
                             director_state["objectives"] = objectives_state
                             director_state["flags"] = flags
-                            await self._update_session_director_state(episode.id, director_state)
+                            patch = DirectorStatePatch().merge("objectives", {
+                                "status": "completed",
+                                "completed_at_turn": next_turn_count,
+                            })
+                            if on_success and on_success.get("set_flag"):
+                                patch.merge("flags", {on_success["set_flag"]: True})
+                            await self._update_session_director_state(episode.id, patch)
 
                         # Check for failure condition
                         elif self.director_service.check_failure_condition(
-                            failure_condition, next_turn_count, turn_budget
+                            episode_plan.failure_condition, next_turn_count, turn_budget,
+                            current_flags=flags, character_response=response_content,
                         ):
                             failed_event = {
                                 "type": "objective_failed",
@@ -478,30 +526,28 @@ class ConversationService:
                                 if on_failure.get("suggest_episode"):
                                     failed_event["suggest_episode"] = on_failure["suggest_episode"]
 
-                            # Update director_state
+                            # Update director_state (patch only the keys changed here)
                             objectives_state["status"] = "failed"
                             director_state["objectives"] = objectives_state
                             director_state["flags"] = flags
-                            await self._update_session_director_state(episode.id, director_state)
+                            patch = DirectorStatePatch().merge("objectives", {"status": "failed"})
+                            if on_failure and on_failure.get("set_flag"):
+                                patch.merge("flags", {on_failure["set_flag"]: True})
+                            await self._update_session_director_state(episode.id, patch)
+
+                    stop()
 
                     # Check for choice point triggers
-                    if choice_points:
+                    stop = trace.timer("choice_points")
+                    if episode_plan.has_choice_points:
                         completed_objectives = []
                         if objectives_state.get("status") == "completed":
                             completed_objectives.append("primary")  # Main objective ID
 
                         triggered_choices = director_state.get("triggered_choices", [])
 
-                        # Convert choice_points to list of dicts if they're ChoicePoint objects
-                        choice_points_dicts = []
-                        for cp in choice_points:
-                            if hasattr(cp, 'model_dump'):
-                                choice_points_dicts.append(cp.model_dump())
-                            elif isinstance(cp, dict):
-                                choice_points_dicts.append(cp)
-
                         triggered_cp = self.director_service.check_choice_point_trigger(
-                            choice_points=choice_points_dicts,
+                            plan=episode_plan,
                             turn_count=next_turn_count,
                             completed_objectives=completed_objectives,
                             triggered_choice_ids=triggered_choices,
@@ -520,39 +566,29 @@ class ConversationService:
                     # =========================================================
                     # ADR-009: BEAT-TRIGGERED CHOICES
                     # =========================================================
-                    # Check if any beats with choice_points have been delivered
-                    beats = getattr(episode_template, 'beats', [])
-                    if beats:
+                    # Check if any beats with choice_points have been delivered.
+                    # The plan only returns beats with a choice point whose
+                    # window (target_turn - 1 onwards) has opened.
+                    stop()
+                    stop = trace.timer("beats")
+                    choice_beats = episode_plan.choice_beats_open_at(next_turn_count)
+                    if choice_beats:
                         beat_states = director_state.get("beats", {})
                         full_messages = context.messages + [{"role": "assistant", "content": response_content}]
 
-                        for beat in beats:
-                            beat_id = beat.id if hasattr(beat, 'id') else beat.get("id", "")
-                            beat_dict = beat.model_dump() if hasattr(beat, 'model_dump') else beat
+                        for beat in choice_beats:
+                            beat_id = beat.id
 
                             # Get beat state
                             beat_state = beat_states.get(beat_id, {"status": "pending"})
 
-                            # Skip beats that are already completed or don't have choice points
+                            # Skip beats that are already completed
                             if beat_state.get("status") in ("detected", "completed"):
                                 continue
 
-                            beat_choice_point = beat_dict.get("choice_point")
-                            if not beat_choice_point:
-                                continue
-
-                            # Check if beat was instructed this turn (has directive)
-                            # Only detect if we gave the character a directive to deliver this beat
-                            target_turn = beat_dict.get("target_turn", 999)
-                            deadline_turn = beat_dict.get("deadline_turn", target_turn + 2)
-
-                            # Only check beats that are at or past their target turn
-                            if next_turn_count < target_turn - 1:
-                                continue
-
                             # Detect if beat was delivered in response
                             beat_detected = await self.director_service.detect_beat_completion(
-                                beat=beat_dict,
+                                beat=beat,
                                 character_response=response_content,
                                 messages=full_messages,
                             )
@@ -567,11 +603,14 @@ class ConversationService:
                                     "choice_pending": True,
                                 }
                                 director_state["beats"] = beat_states
-                                await self._update_session_director_state(episode.id, director_state)
+                                await self._update_session_director_state(
+                                    episode.id,
+                                    DirectorStatePatch().set(("beats", beat_id), beat_states[beat_id]),
+                                )
 
                                 # Get triggered choice point from beat
                                 triggered_cp = self.director_service.check_beat_choice_point(
-                                    beat=beat_dict,
+                                    beat=beat,
                                     character_response=response_content,
                                 )
 
@@ -592,6 +631,7 @@ class ConversationService:
 
                 except Exception as e:
                     log.warning(f"Objective/beat evaluation failed: {e}")
+                stop()
 
         # =====================================================================
         # DIRECTOR PHASE 2: Post-Evaluation (BACKGROUND - fire-and-forget)
@@ -611,36 +651,55 @@ class ConversationService:
                     character_id=character_id,
                     user_id=user_id,
                     character_name=context.character_name,
+                    trace=trace,
                 )
             )
+        else:
+            await trace.save(self.db)
+
+        if trace.debug:
+            yield json.dumps(trace.trailer_event())
 
     async def get_context(
         self,
         user_id: Optional[UUID],
         character_id: UUID,
         episode_id: Optional[UUID] = None,
+        query_text: Optional[str] = None,
+        episode_plan: Optional[EpisodePlan] = None,
     ) -> ConversationContext:
         """Build conversation context for LLM.
 
         Supports both authenticated users and guest sessions (user_id = None).
         For guests, engagement/memories/hooks are skipped.
+
+        query_text is the incoming user message; when given, memories are
+        ranked by relevance to it as well as importance and recency.
+
+        episode_plan, when it is the session template's compiled plan, supplies
+        the indexed flag_context_rules instead of parsing them again.
         """
-        # Get character
-        char_query = "SELECT * FROM characters WHERE id = :character_id"
+        # Get character (only the columns the prompt uses)
+        char_query = f"SELECT {CHARACTER_PROMPT_COLUMNS} FROM characters WHERE id = :character_id"
         char_row = await self.db.fetch_one(char_query, {"character_id": str(character_id)})
         if not char_row:
             raise ValueError(f"Character {character_id} not found")
-        character = Character(**dict(char_row))
+        character = CharacterPromptView.from_row(char_row)
 
         # Get engagement (skip for guests - no user_id)
+        # The relationship state the Director last wrote is cached by
+        # update_relationship_dynamic; when fresh, dynamic/milestones aren't re-read
         engagement = None
+        cached_relationship = None
         if user_id:
-            eng_query = """
-                SELECT * FROM engagements
+            cached_relationship = self.memory_service.layers.get_relationship(user_id, character_id)
+            eng_columns = ENGAGEMENT_SUMMARY_COLUMNS if cached_relationship else ENGAGEMENT_VIEW_COLUMNS
+            eng_query = f"""
+                SELECT {eng_columns} FROM engagements
                 WHERE user_id = :user_id AND character_id = :character_id
             """
             eng_row = await self.db.fetch_one(eng_query, {"user_id": str(user_id), "character_id": str(character_id)})
-            engagement = Engagement(**dict(eng_row)) if eng_row else None
+            engagement = EngagementView.from_row(eng_row) if eng_row else None
         relationship = engagement  # Backwards compatibility alias
 
         # Get series_id from session for memory retrieval
@@ -687,11 +746,20 @@ class ConversationService:
                 for row in reversed(msg_rows)
             ]
 
-        # Get relevant memories (skip for guests - no user_id)
+        # Get relevant memories and active hooks (skip for guests - no user_id)
+        # Resolved through the cached memory layers: session, series, character,
+        # user-global facts, plus the hooks ready set (see memory_layers)
         memory_summaries = []
+        hook_summaries = []
         if user_id:
-            memories = await self.memory_service.get_relevant_memories(
-                user_id, character_id, limit=10, series_id=series_id
+            resolved = await self.memory_service.resolve_context(
+                user_id,
+                character_id,
+                series_id=series_id,
+                session_id=episode_id,
+                query_text=query_text,
+                memory_limit=10,
+                hook_limit=5,
             )
             memory_summaries = [
                 MemorySummary(
@@ -700,15 +768,8 @@ class ConversationService:
                     summary=m.summary,
                     importance_score=float(m.importance_score),
                 )
-                for m in memories
+                for m in resolved.memories
             ]
-
-        # Get active hooks (skip for guests - no user_id)
-        hook_summaries = []
-        if user_id:
-            hooks = await self.memory_service.get_active_hooks(
-                user_id, character_id, limit=5
-            )
             hook_summaries = [
                 HookSummary(
                     id=h.id,
@@ -716,7 +777,7 @@ class ConversationService:
                     content=h.content,
                     suggested_opener=h.suggested_opener,
                 )
-                for h in hooks
+                for h in resolved.hooks
             ]
 
         # Calculate time since first met
@@ -747,12 +808,13 @@ class ConversationService:
         # Get relationship dynamic (skip for guests - no user_id)
         relationship_dynamic = {}
         relationship_milestones = []
-        if user_id:
-            relationship_dynamic_data = await self.memory_service.get_relationship_dynamic(
-                user_id, character_id
+        # Reuses the cached state or the engagement row fetched above
+        if engagement:
+            relationship_dynamic_data = cached_relationship or self.memory_service.relationship_dynamic_from_row(
+                engagement.dynamic, engagement.milestones
             )
-            relationship_dynamic = relationship_dynamic_data.get("dynamic", {}) if relationship_dynamic_data else {}
-            relationship_milestones = relationship_dynamic_data.get("milestones", []) if relationship_dynamic_data else []
+            relationship_dynamic = relationship_dynamic_data["dynamic"]
+            relationship_milestones = relationship_dynamic_data["milestones"]
 
         # Get episode dynamics from episode_template (per EPISODE_DYNAMICS_CANON.md)
         episode_situation = None  # Physical setting/scenario - CRITICAL for grounding
@@ -804,8 +866,11 @@ class ConversationService:
 
                     # ADR-008: Flag-based context injection (soft branching)
                     # Get flags from session's director_state and inject matching context
-                    flag_context_rules_raw = template_row["flag_context_rules"]
-                    if flag_context_rules_raw:
+                    if episode_plan is not None and episode_plan.template_id == str(template_id):
+                        flag_context = episode_plan.flag_context
+                    else:
+                        flag_context = compile_flag_context(template_row["flag_context_rules"])
+                    if flag_context:
                         # Get session's director_state to access flags
                         director_state_query = "SELECT director_state FROM sessions WHERE id = :episode_id"
                         director_state_row = await self.db.fetch_one(director_state_query, {"episode_id": str(episode_id)})
@@ -820,23 +885,10 @@ class ConversationService:
 
                             flags = director_state.get("flags", {})
 
-                            # Parse flag_context_rules
-                            if isinstance(flag_context_rules_raw, str):
-                                try:
-                                    flag_context_rules = json.loads(flag_context_rules_raw)
-                                except (json.JSONDecodeError, TypeError):
-                                    flag_context_rules = []
-                            else:
-                                flag_context_rules = flag_context_rules_raw or []
-
-                            # Inject context for matching flags
-                            injected_contexts = []
-                            for rule in flag_context_rules:
-                                flag_name = rule.get("if_flag", "")
-                                inject_text = rule.get("inject", "")
-                                if flag_name and flags.get(flag_name) and inject_text:
-                                    injected_contexts.append(inject_text)
-                                    log.debug(f"Flag context injected: {flag_name} -> {inject_text[:50]}...")
+                            # Inject context for matching flags (authored rule order)
+                            injected_contexts = flag_context.inject_for(flags)
+                            if injected_contexts:
+                                log.debug(f"Flag context injected for {len(injected_contexts)} rule(s)")
 
                             # Append injected context to episode_situation
                             if injected_contexts:
@@ -1373,6 +1425,56 @@ class ConversationService:
         milestones = [2, 6, 12, 22, 32, 42]
         return message_count in milestones
 
+    async def _auto_scene_style(self, character_id: UUID) -> Dict[str, Any]:
+        """Resolve appearance and style prompts for Director auto-gen."""
+        # Fetch character appearance data (user-created or from avatar kit)
+        # For canonical characters, avatar_kit.style_prompt has richer style info
+        char_query = """
+            SELECT
+                c.appearance_prompt,
+                c.style_preset,
+                c.is_user_created,
+                c.active_avatar_kit_id,
+                COALESCE(c.appearance_prompt, ak.appearance_prompt) as resolved_appearance,
+                ak.style_prompt as ak_style_prompt,
+                ak.negative_prompt
+            FROM characters c
+            LEFT JOIN avatar_kits ak ON ak.id = c.active_avatar_kit_id
+            WHERE c.id = :character_id
+        """
+        char_row = await self.db.fetch_one(char_query, {"character_id": str(character_id)})
+
+        # Resolve style_prompt with proper fallback chain:
+        # 1. For canonical characters: prefer avatar_kit.style_prompt (richer style info)
+        # 2. For user-created characters: map style_preset to style_prompt
+        # 3. Default: manhwa style
+        style_preset = char_row["style_preset"] if char_row else None
+        is_user_created = char_row["is_user_created"] if char_row else False
+        ak_style_prompt = char_row["ak_style_prompt"] if char_row else None
+
+        style_prompt_map = {
+            "anime": "anime style, vibrant colors, expressive features",
+            "cinematic": "cinematic style, realistic lighting, dramatic composition",
+            "manhwa": "manhwa style, soft colors, elegant features",
+        }
+
+        if not is_user_created and ak_style_prompt:
+            # Canonical character: use avatar_kit's rich style prompt
+            style_prompt = ak_style_prompt
+        elif style_preset in style_prompt_map:
+            # User-created character or canonical without ak style: use preset mapping
+            style_prompt = style_prompt_map[style_preset]
+        else:
+            # Default fallback
+            style_prompt = "manhwa style, soft colors, elegant features"
+
+        return {
+            "appearance_prompt": char_row["resolved_appearance"] if char_row else None,
+            "style_prompt": style_prompt,
+            "negative_prompt": char_row["negative_prompt"] if char_row else None,
+            "avatar_kit_id": char_row["active_avatar_kit_id"] if char_row else None,
+        }
+
     async def _generate_auto_scene(
         self,
         episode_id: UUID,
@@ -1382,7 +1484,9 @@ class ConversationService:
         scene_setting: str,
         visual_hint: str,
         visual_type: str = "character",
-    ):
+        turn: Optional[int] = None,
+        generation_budget: Optional[int] = None,
+    ) -> bool:
         """Generate a scene image automatically (Director-triggered).
 
         Routes to appropriate generation pipeline based on visual_type:
@@ -1390,84 +1494,122 @@ class ConversationService:
         - object: Close-up of item (no character)
         - atmosphere: Setting/mood shot (no character)
 
+        A generation_budget slot is reserved up front together with a lease on
+        this turn's trigger (scene_reservations), so concurrent runs for the
+        session can't overshoot the budget or generate the same turn twice;
+        the slot is refunded if generation fails.
+
+        If the previous turn pre-generated this turn's visual (see
+        visual_speculation), that image is saved instead of generating anew.
+
         This runs as a background task and won't block the stream.
+        Returns True if an image was added to the episode.
         """
+        reservation = await self.scene_reservations.reserve(
+            episode_id,
+            director_trigger(turn) if turn is not None else "director",
+            budget=generation_budget,
+        )
+        if not reservation.ok:
+            if reservation.status == BUDGET_EXHAUSTED:
+                self.visual_speculation.discard(episode_id)
+            return False
+
+        result = None
         try:
-            # Fetch character appearance data (user-created or from avatar kit)
-            # For canonical characters, avatar_kit.style_prompt has richer style info
-            char_query = """
-                SELECT
-                    c.appearance_prompt,
-                    c.style_preset,
-                    c.is_user_created,
-                    c.active_avatar_kit_id,
-                    COALESCE(c.appearance_prompt, ak.appearance_prompt) as resolved_appearance,
-                    ak.style_prompt as ak_style_prompt,
-                    ak.negative_prompt
-                FROM characters c
-                LEFT JOIN avatar_kits ak ON ak.id = c.active_avatar_kit_id
-                WHERE c.id = :character_id
-            """
-            char_row = await self.db.fetch_one(char_query, {"character_id": str(character_id)})
-
-            # Resolve style_prompt with proper fallback chain:
-            # 1. For canonical characters: prefer avatar_kit.style_prompt (richer style info)
-            # 2. For user-created characters: map style_preset to style_prompt
-            # 3. Default: manhwa style
-            style_preset = char_row["style_preset"] if char_row else None
-            is_user_created = char_row["is_user_created"] if char_row else False
-            ak_style_prompt = char_row["ak_style_prompt"] if char_row else None
-
-            style_prompt_map = {
-                "anime": "anime style, vibrant colors, expressive features",
-                "cinematic": "cinematic style, realistic lighting, dramatic composition",
-                "manhwa": "manhwa style, soft colors, elegant features",
-            }
+            prepared = None
+            if turn is not None:
+                prepared = await self.visual_speculation.take(episode_id, turn, visual_type)
+
+            if prepared:
+                result = await self.scene_service.save_prepared_visual(
+                    prepared,
+                    episode_id=episode_id,
+                    user_id=user_id,
+                    character_id=character_id,
+                )
+            else:
+                style = await self._auto_scene_style(character_id)
+                result = await self.scene_service.generate_director_visual(
+                    visual_type=visual_type,
+                    episode_id=episode_id,
+                    user_id=user_id,
+                    character_id=character_id,
+                    character_name=character_name,
+                    scene_setting=scene_setting,
+                    visual_hint=visual_hint,
+                    appearance_prompt=style["appearance_prompt"],
+                    style_prompt=style["style_prompt"],
+                    negative_prompt=style["negative_prompt"],
+                    avatar_kit_id=style["avatar_kit_id"],
+                    anchor_image=None,  # T2I only for auto-gen
+                )
 
-            if not is_user_created and ak_style_prompt:
-                # Canonical character: use avatar_kit's rich style prompt
-                style_prompt = ak_style_prompt
-            elif style_preset in style_prompt_map:
-                # User-created character or canonical without ak style: use preset mapping
-                style_prompt = style_prompt_map[style_preset]
+            if result:
+                log.info(f"Auto-generated {visual_type} scene for episode {episode_id}: {result.get('image_id')}")
             else:
-                # Default fallback
-                style_prompt = "manhwa style, soft colors, elegant features"
+                log.warning(f"Auto-scene generation returned no result for episode {episode_id}")
+
+        except Exception as e:
+            log.error(f"Auto-scene generation failed for episode {episode_id}: {e}")
 
-            appearance_prompt = char_row["resolved_appearance"] if char_row else None
-            negative_prompt = char_row["negative_prompt"] if char_row else None
+        finally:
+            # Keeps the reserved generations_used slot on success, refunds it otherwise
+            await self.scene_reservations.release(reservation, succeeded=bool(result))
 
-            result = await self.scene_service.generate_director_visual(
+        return bool(result)
+
+    async def _prepare_speculative_scene(
+        self,
+        episode_id: UUID,
+        character_id: UUID,
+        scene_setting: str,
+        visual_hint: str,
+        visual_type: str,
+    ) -> Optional[PreparedVisual]:
+        """Generate (but don't save) the next trigger turn's visual."""
+        try:
+            style = await self._auto_scene_style(character_id)
+            return await self.scene_service.prepare_director_visual(
                 visual_type=visual_type,
                 episode_id=episode_id,
-                user_id=user_id,
-                character_id=character_id,
-                character_name=character_name,
                 scene_setting=scene_setting,
                 visual_hint=visual_hint,
-                appearance_prompt=appearance_prompt,
-                style_prompt=style_prompt,
-                negative_prompt=negative_prompt,
-                avatar_kit_id=char_row["active_avatar_kit_id"] if char_row else None,
-                anchor_image=None,  # T2I only for auto-gen
+                appearance_prompt=style["appearance_prompt"],
+                style_prompt=style["style_prompt"],
             )
+        except Exception as e:
+            log.warning(f"Speculative scene generation failed for episode {episode_id}: {e}")
+            return None
 
-            if result:
-                # Increment generations_used counter
-                await self.db.execute(
-                    """
-                    UPDATE sessions
-                    SET generations_used = generations_used + 1
-                    WHERE id = :episode_id
-                    """,
-                    {"episode_id": str(episode_id)},
-                )
-                log.info(f"Auto-generated {visual_type} scene for episode {episode_id}: {result.get('image_id')}")
-            else:
-                log.warning(f"Auto-scene generation returned no result for episode {episode_id}")
+    async def _auto_scene_allowed(
+        self,
+        user_id: UUID,
+        episode_template: Optional[EpisodeTemplate],
+        generations_used: int,
+    ) -> bool:
+        """Whether Director auto-gen may run: enabled, premium user, budget left."""
+        if not ENABLE_AUTO_SCENE_GENERATION:
+            return False
 
-        except Exception as e:
-            log.error(f"Auto-scene generation failed for episode {episode_id}: {e}")
+        # Check subscription tier (premium only for auto-gen)
+        user_row = await self.db.fetch_one(
+            "SELECT subscription_status FROM users WHERE id = :user_id",
+            {"user_id": str(user_id)}
+        )
+        is_premium = user_row and user_row["subscription_status"] == "premium"
+        if not is_premium:
+            log.debug(f"Background auto-gen skipped: user {user_id} not premium")
+            return False
+
+        # Check budget not exhausted (pre-check; reserve_scene_generation enforces it)
+        visual_mode = getattr(episode_template, 'visual_mode', 'none') if episode_template else 'none'
+        generation_budget = getattr(episode_template, 'generation_budget', 0) if episode_template else 0
+        if visual_mode not in ("cinematic", "minimal") or generations_used >= generation_budget:
+            log.debug(f"Background auto-gen skipped: budget exhausted or visual_mode={visual_mode}")
+            return False
+
+        return True
 
     async def _run_director_phase2_background(
         self,
@@ -1477,6 +1619,7 @@ class ConversationService:
         character_id: UUID,
         user_id: UUID,
         character_name: str,
+        trace: Optional[TurnTrace] = None,
     ):
         """Run Director Phase 2 processing in background (fire-and-forget).
 
@@ -1484,57 +1627,75 @@ class ConversationService:
         Handles: memory/hook extraction, beat classification, visual triggers.
 
         This background task reduces response finalization delay by 800ms-2.5s.
+        Phases are added to the turn's trace, which is saved when this ends.
         """
+        trace = trace or TurnTrace()
         try:
             # Refresh session to get latest turn_count and director_state
-            refreshed_session = await self._get_session(episode_id)
+            with trace.span("refresh_session", phase=BACKGROUND):
+                refreshed_session = await self._get_session(episode_id)
             if not refreshed_session:
                 log.warning(f"Background Director: session {episode_id} not found")
                 return
 
             # Director processes ALL episodes (open + bounded)
-            director_output = await self.director_service.process_exchange(
-                session=refreshed_session,
-                episode_template=episode_template,
-                messages=full_messages,
-                character_id=character_id,
-                user_id=user_id,
-            )
+            with trace.span("director", phase=BACKGROUND):
+                director_output = await self.director_service.process_exchange(
+                    session=refreshed_session,
+                    episode_template=episode_template,
+                    messages=full_messages,
+                    character_id=character_id,
+                    user_id=user_id,
+                    trace=trace,
+                )
 
             # Handle visual generation if triggered
+            generations_used = refreshed_session.generations_used
             if director_output.actions and director_output.actions.visual_type not in ("none", "instruction"):
                 actions = director_output.actions
 
                 # Auto-generate scene image if conditions met
-                if ENABLE_AUTO_SCENE_GENERATION:
-                    # Check subscription tier (premium only for auto-gen)
-                    user_row = await self.db.fetch_one(
-                        "SELECT subscription_status FROM users WHERE id = :user_id",
-                        {"user_id": str(user_id)}
+                if await self._auto_scene_allowed(user_id, episode_template, generations_used):
+                    # Run scene generation (already async, but we await here since we're in background)
+                    stop = trace.timer("auto_scene", phase=BACKGROUND)
+                    generated = await self._generate_auto_scene(
+                        episode_id=episode_id,
+                        user_id=user_id,
+                        character_id=character_id,
+                        character_name=character_name,
+                        scene_setting=episode_template.situation if episode_template else "",
+                        visual_hint=actions.visual_hint or "the current moment",
+                        visual_type=actions.visual_type,
+                        turn=director_output.turn_count,
+                        generation_budget=getattr(episode_template, 'generation_budget', 0) if episode_template else 0,
                     )
-                    is_premium = user_row and user_row["subscription_status"] == "premium"
-
-                    if is_premium:
-                        # Check budget not exhausted
-                        visual_mode = getattr(episode_template, 'visual_mode', 'none') if episode_template else 'none'
-                        generation_budget = getattr(episode_template, 'generation_budget', 0) if episode_template else 0
-
-                        if visual_mode in ("cinematic", "minimal") and refreshed_session.generations_used < generation_budget:
-                            # Run scene generation (already async, but we await here since we're in background)
-                            await self._generate_auto_scene(
-                                episode_id=episode_id,
-                                user_id=user_id,
-                                character_id=character_id,
-                                character_name=character_name,
-                                scene_setting=episode_template.situation if episode_template else "",
-                                visual_hint=actions.visual_hint or "the current moment",
-                                visual_type=actions.visual_type,
-                            )
-                            log.info(f"Background auto-gen: {actions.visual_type} (session {refreshed_session.id})")
-                        else:
-                            log.debug(f"Background auto-gen skipped: budget exhausted or visual_mode={visual_mode}")
-                    else:
-                        log.debug(f"Background auto-gen skipped: user {user_id} not premium")
+                    stop()
+                    if generated:
+                        generations_used += 1
+                    log.info(f"Background auto-gen: {actions.visual_type} (session {refreshed_session.id})")
+            else:
+                self.visual_speculation.discard(episode_id)
+
+            # Next turn is a trigger point: start its visual now so it is
+            # ready to commit when that turn lands
+            if (
+                director_output.next_visual_trigger
+                and self.visual_speculation.enabled
+                and await self._auto_scene_allowed(user_id, episode_template, generations_used)
+            ):
+                visual_hint = (director_output.evaluation or {}).get("visual_hint") or "the current moment"
+                self.visual_speculation.start(
+                    episode_id,
+                    target_turn=director_output.turn_count + 1,
+                    visual_type="character",  # decide_actions always triggers cinematic inserts
+                    prepare=lambda: self._prepare_speculative_scene(
+                        episode_id=episode_id,
+                        character_id=character_id,
+                        scene_setting=episode_template.situation if episode_template else "",
+                        visual_hint=visual_hint,
+                        visual_type="character",
+                    ),
+                )
 
             # Log completion for debugging
             log.info(
@@ -1546,6 +1707,9 @@ class ConversationService:
             # Log but don't raise - this is fire-and-forget
             log.error(f"Background Director Phase 2 failed for episode {episode_id}: {e}")
 
+        finally:
+            await trace.save(self.db)
+
     # NOTE: _process_exchange() removed - Director now owns memory/hook extraction (v2.3)
 
     async def _get_next_episode_in_series(
@@ -1558,18 +1722,16 @@ class ConversationService:
         v2.8: Used for next_episode_suggestion event payload.
         Returns the next episode template if it exists.
         """
-        query = """
-            SELECT id, title, slug, episode_number
-            FROM episode_templates
-            WHERE series_id = :series_id
-            AND episode_number = :next_number
-            AND status = 'active'
-        """
-        row = await self.db.fetch_one(query, {
-            "series_id": str(series_id),
-            "next_number": current_episode_number + 1,
-        })
-        return dict(row) if row else None
+        graph = await get_series_graph(self.db, series_id)
+        node = graph.with_number(current_episode_number + 1)
+        if not node:
+            return None
+        return {
+            "id": node.id,
+            "title": node.title,
+            "slug": node.slug,
+            "episode_number": node.episode_number,
+        }
 
     # NOTE: _check_automatic_prop_reveals() removed in ADR-005 v2.
     # Prop revelation is now Director-owned via detect_prop_revelations().
@@ -1689,16 +1851,15 @@ class ConversationService:
     async def _update_session_director_state(
         self,
         session_id: UUID,
-        director_state: Dict[str, Any],
+        patch: DirectorStatePatch,
     ):
         """Update the director_state for a session (ADR-008).
 
-        Used to persist objective status, flags, and choice tracking.
+        Used to persist objective status, flags, and choice tracking. Only the
+        patched paths are written, so the Director's background update of the
+        same session can't be clobbered (migration 074).
         """
-        await self.db.execute(
-            "UPDATE sessions SET director_state = :director_state WHERE id = :session_id",
-            {"director_state": json.dumps(director_state), "session_id": str(session_id)}
-        )
+        await patch.apply(self.db, session_id)
 
     async def _get_or_create_free_chat_template(
         self,
@@ -203,6 +203,18 @@ def get_archetype_rules(archetype: str) -> ArchetypeIgnitionRules:
     return ARCHETYPE_RULES.get(archetype, ARCHETYPE_RULES["comforting"])
 
 
+# Schema for native structured output (see LLMService.generate_json)
+IGNITION_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "opening_situation": {"type": "string"},
+        "opening_line": {"type": "string"},
+        "starter_prompts": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["opening_situation", "opening_line", "starter_prompts"],
+}
+
+
 def _parse_llm_json(content: str) -> Dict[str, Any]:
     """Parse JSON from LLM output with fallbacks for common issues.
 
@@ -641,28 +653,22 @@ async def generate_opening_beat(
 
     for attempt in range(max_retries + 1):
         try:
-            response = await llm.generate(
-                messages=[
-                    {"role": "system", "content": "You are a creative writing assistant that generates character openings in JSON format."},
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.8,
-                max_tokens=800,
-            )
-
-            # Parse JSON response
-            content = response.content.strip()
-            # Handle markdown code blocks
-            if content.startswith("```"):
-                lines = content.split("\n")
-                # Remove first and last line (```json and ```)
-                content = "\n".join(lines[1:-1] if lines[-1].strip() == "```" else lines[1:])
-
             try:
-                result = _parse_llm_json(content)
+                response = await llm.generate_json(
+                    messages=[
+                        {"role": "system", "content": "You are a creative writing assistant that generates character openings in JSON format."},
+                        {"role": "user", "content": prompt},
+                    ],
+                    json_schema=IGNITION_RESPONSE_SCHEMA,
+                    call_site="ignition.generate_opening_beat",
+                    temperature=0.8,
+                    max_tokens=800,
+                    parse=_parse_llm_json,
+                )
             except json.JSONDecodeError as e:
                 log.warning(f"Failed to parse ignition JSON (attempt {attempt + 1}): {e}")
                 continue
+            result = response.parsed
 
             opening_situation = result.get("opening_situation", "")
             opening_line = result.get("opening_line", "")
@@ -772,22 +778,19 @@ async def regenerate_opening_beat(
     )
 
     try:
-        response = await llm.generate(
+        # Native structured output, with lenient parsing for the prompt fallback
+        response = await llm.generate_json(
             messages=[
                 {"role": "system", "content": "You are a creative writing assistant that generates character openings in JSON format."},
                 {"role": "user", "content": prompt},
             ],
+            json_schema=IGNITION_RESPONSE_SCHEMA,
+            call_site="ignition.regenerate_opening_beat",
             temperature=0.9,  # Slightly higher for variety
             max_tokens=800,
+            parse=_parse_llm_json,
         )
-
-        content = response.content.strip()
-        if content.startswith("```"):
-            lines = content.split("\n")
-            content = "\n".join(lines[1:-1] if lines[-1].strip() == "```" else lines[1:])
-
-        # Try to parse JSON, with fallback for common LLM issues
-        result = _parse_llm_json(content)
+        result = response.parsed
 
         opening_situation = result.get("opening_situation", "")
         opening_line = result.get("opening_line", "")
@@ -14,7 +14,8 @@ import json
 import logging
 import re
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 from uuid import UUID
 
 from app.models.episode_template import EpisodeTemplate, VisualMode
@@ -27,7 +28,21 @@ from app.models.evaluation import (
     ROMANTIC_TROPES,
     generate_share_id,
 )
+from app.services.director_state import DirectorStatePatch, cap_raw_response
+from app.services.episode_plan import (
+    CompiledBeat,
+    CompiledCondition,
+    ConditionFacts,
+    EpisodePlan,
+    evaluate_condition,
+    parse_condition,
+    resolve_condition,
+)
+from app.services.extraction_gate import ExtractionGate
 from app.services.llm import LLMService
+from app.services.memory import BEAT_CLASSIFICATION_GUIDE
+from app.services.series_graph import get_series_graph
+from app.services.turn_trace import BACKGROUND, TurnTrace
 
 log = logging.getLogger(__name__)
 
@@ -351,6 +366,56 @@ GENRE_DOCTRINES = {
     },
 }
 
+# =============================================================================
+# PRE-RENDERED GUIDANCE SECTIONS
+#
+# The doctrine parts of DirectorGuidance.to_prompt_section() depend only on
+# (genre, pacing, energy_level), so they're rendered once - warmed at import
+# for every known combination - and per-turn rendering is a cached lookup
+# plus the anchor/beat lines.
+# =============================================================================
+
+PACING_PHASES = ("establish", "develop", "escalate", "peak", "resolve")
+
+GUIDANCE_RULE = "═══════════════════════════════════════════════════════════════"
+BEAT_RULE = "─────────────────────────────────────────────────────────────────"
+
+BEAT_URGENCY_LABELS = {
+    "suggested": "OPPORTUNITY",
+    "required": "THIS TURN",
+    "overdue": "MUST HAPPEN NOW",
+}
+
+
+@lru_cache(maxsize=4096)
+def guidance_sections(genre: str, pacing: str, energy_level: str) -> Tuple[str, str, str]:
+    """(header, pacing/energy, closing) prompt sections for a doctrine."""
+    doctrine = GENRE_DOCTRINES.get(genre, GENRE_DOCTRINES["romantic_tension"])
+
+    header = "\n".join([GUIDANCE_RULE, f"DIRECTOR: {doctrine['name']}", GUIDANCE_RULE])
+
+    pacing_lines = ["", f"Pacing: {pacing.upper()}"]
+    energy_desc = doctrine["energy_descriptions"].get(
+        energy_level,
+        doctrine["energy_descriptions"].get("playful", "")
+    )
+    if energy_desc:
+        pacing_lines.append(f"Energy: {energy_desc}")
+
+    closing = f"\nRemember: {doctrine['closing']}"
+    return header, "\n".join(pacing_lines), closing
+
+
+def _warm_guidance_sections() -> None:
+    for genre, doctrine in GENRE_DOCTRINES.items():
+        for pacing in PACING_PHASES:
+            for energy_level in doctrine["energy_descriptions"]:
+                guidance_sections(genre, pacing, energy_level)
+
+
+_warm_guidance_sections()
+
+
 # Genre-specific tension patterns for pre-guidance
 GENRE_BEATS = {
     "romantic_tension": {
@@ -481,54 +546,41 @@ class DirectorGuidance:
         Director Protocol v2.2: Minimal runtime direction.
         Genre conventions and scene motivation come from upstream (Episode/Genre).
         Director only provides pacing and physical grounding.
+
+        Doctrine sections come pre-rendered from guidance_sections(); only the
+        physical anchor and beat directive are formatted per turn.
         """
-        doctrine = GENRE_DOCTRINES.get(self.genre, GENRE_DOCTRINES["romantic_tension"])
+        header, pacing_energy, closing = guidance_sections(self.genre, self.pacing, self.energy_level)
 
-        lines = [
-            "═══════════════════════════════════════════════════════════════",
-            f"DIRECTOR: {doctrine['name']}",
-            "═══════════════════════════════════════════════════════════════",
-        ]
+        parts = [header]
 
         # SCENE - Physical grounding
         if self.physical_anchor:
-            lines.append("")
-            lines.append(f"Ground in: {self.physical_anchor}")
+            parts.append(f"\nGround in: {self.physical_anchor}")
 
         # PACING + ENERGY
-        lines.append("")
-        lines.append(f"Pacing: {self.pacing.upper()}")
-
-        energy_desc = doctrine["energy_descriptions"].get(
-            self.energy_level,
-            doctrine["energy_descriptions"].get("playful", "")
-        )
-        if energy_desc:
-            lines.append(f"Energy: {energy_desc}")
+        parts.append(pacing_energy)
 
         # ADR-009: Beat directive (if any)
         if self.beat_directive:
-            urgency_labels = {
-                "suggested": "OPPORTUNITY",
-                "required": "THIS TURN",
-                "overdue": "MUST HAPPEN NOW",
-            }
-            urgency_label = urgency_labels.get(self.beat_directive.urgency, "OPPORTUNITY")
-
-            lines.append("")
-            lines.append("─────────────────────────────────────────────────────────────────")
-            lines.append(f"BEAT [{urgency_label}]: {self.beat_directive.instruction}")
-            lines.append("─────────────────────────────────────────────────────────────────")
+            urgency_label = BEAT_URGENCY_LABELS.get(self.beat_directive.urgency, "OPPORTUNITY")
+
+            lines = [
+                "",
+                BEAT_RULE,
+                f"BEAT [{urgency_label}]: {self.beat_directive.instruction}",
+                BEAT_RULE,
+            ]
             if self.beat_directive.context:
                 lines.append(self.beat_directive.context)
             lines.append("")
             lines.append("Work this into your response naturally. Don't force it—find the organic moment.")
+            parts.append("\n".join(lines))
 
         # Genre reminder (conventions internalized from rehearsal)
-        lines.append("")
-        lines.append(f"Remember: {doctrine['closing']}")
+        parts.append(closing)
 
-        return "\n".join(lines)
+        return "\n".join(parts)
 
 
 @dataclass
@@ -604,6 +656,10 @@ class DirectorOutput:
     # Deterministic actions
     actions: Optional[DirectorActions] = None
 
+    # Trigger reason if the next turn will fire a visual (lets the caller
+    # pre-generate it, see visual_speculation); None otherwise
+    next_visual_trigger: Optional[str] = None
+
     # Memory/Hook extraction (Director Protocol v2.3)
     extracted_memories: List[Any] = field(default_factory=list)  # List[ExtractedMemory]
     beat_data: Optional[Dict[str, Any]] = None
@@ -648,6 +704,7 @@ class DirectorService:
         # Director owns memory/hook extraction (Director Protocol v2.3)
         from app.services.memory import MemoryService
         self.memory_service = MemoryService(db)
+        self.extraction_gate = ExtractionGate.get_instance()
 
     # =========================================================================
     # PHASE 1: PRE-GUIDANCE (before character response)
@@ -695,7 +752,7 @@ class DirectorService:
         turn_count: int,
         turn_budget: Optional[int] = None,
         energy_level: str = "playful",
-        beats: Optional[List[Dict[str, Any]]] = None,
+        plan: Optional[EpisodePlan] = None,
         beat_states: Optional[Dict[str, Dict[str, Any]]] = None,
         flags: Optional[Dict[str, bool]] = None,
     ) -> DirectorGuidance:
@@ -715,7 +772,8 @@ class DirectorService:
         authored into EpisodeTemplate upstream, not generated per-turn.
 
         ADR-009: If there are pending beats approaching their target/deadline,
-        the Director injects a beat_directive to instruct the character.
+        the Director injects a beat_directive to instruct the character. Beats
+        come from the template's compiled EpisodePlan.
 
         Theatrical Analogy: The director gave notes during rehearsal (Episode setup).
         During the performance (chat), the stage manager calls pacing and beat cues.
@@ -733,9 +791,9 @@ class DirectorService:
 
         # 4. ADR-009: Check for beats that need delivery
         beat_directive = None
-        if beats:
+        if plan and plan.has_beats:
             beat_directive = self._get_pending_beat_directive(
-                beats=beats,
+                beats=plan.beats_open_at(turn_count),
                 turn_count=turn_count,
                 beat_states=beat_states or {},
                 flags=flags or {},
@@ -751,13 +809,14 @@ class DirectorService:
 
     def _get_pending_beat_directive(
         self,
-        beats: List[Dict[str, Any]],
+        beats: Sequence[CompiledBeat],
         turn_count: int,
         beat_states: Dict[str, Dict[str, Any]],
         flags: Dict[str, bool],
     ) -> Optional[BeatDirective]:
         """Find the most urgent pending beat and return a directive (ADR-009).
 
+        `beats` are the plan's beats already open at this turn, in plan order.
         Checks beats in order of urgency:
         1. Overdue beats (past deadline)
         2. Required beats (at or past target turn)
@@ -766,7 +825,7 @@ class DirectorService:
         Returns None if no beats need attention this turn.
         """
         for beat in beats:
-            beat_id = beat.get("id", "")
+            beat_id = beat.id
             beat_state = beat_states.get(beat_id, {})
 
             # Skip beats that are already detected or completed
@@ -775,19 +834,19 @@ class DirectorService:
                 continue
 
             # Skip beats with unmet dependencies
-            requires_beat = beat.get("requires_beat")
+            requires_beat = beat.requires_beat
             if requires_beat:
                 dep_state = beat_states.get(requires_beat, {})
                 if dep_state.get("status") not in ("detected", "completed"):
                     continue
 
-            requires_flag = beat.get("requires_flag")
+            requires_flag = beat.requires_flag
             if requires_flag and not flags.get(requires_flag):
                 continue
 
-            target_turn = beat.get("target_turn", 999)
-            deadline_turn = beat.get("deadline_turn", target_turn + 2)
-            instruction = beat.get("character_instruction", "")
+            target_turn = beat.target_turn
+            deadline_turn = beat.deadline_turn
+            instruction = beat.character_instruction
 
             # Determine urgency
             if turn_count > deadline_turn:
@@ -833,6 +892,10 @@ class DirectorService:
 
         Uses LLM to understand the meaning and emotional state of the conversation,
         then extracts minimal structured signals for deterministic action.
+
+        The same call classifies the relationship beat of the last exchange
+        ("beat" in the result, None if unparseable), so turns the extraction
+        gate skips still get their beat without another LLM call.
         """
         # Format recent messages (last 3 exchanges = 6 messages)
         recent = messages[-6:] if len(messages) > 6 else messages
@@ -863,9 +926,14 @@ Provide two things:
    - CLOSING: approaching natural ending
    - DONE: story complete
 
+3. BEAT: Classify the narrative beat of the most recent exchange.
+{BEAT_CLASSIFICATION_GUIDE}
 Format:
 VISUAL: <one sentence description>
-STATUS: going/closing/done"""
+STATUS: going/closing/done
+BEAT: <type>
+TENSION: <tension_change>
+MILESTONE: <milestone or none>"""
 
         try:
             response = await self.llm.generate([
@@ -881,6 +949,7 @@ STATUS: going/closing/done"""
                 "visual_type": "none",
                 "visual_hint": None,
                 "status": "going",
+                "beat": None,
             }
 
     def _parse_evaluation(self, response: str) -> Dict[str, Any]:
@@ -911,6 +980,21 @@ STATUS: going/closing/done"""
             "visual_hint": visual_hint or "the current moment",
             "status": status_signal,
             "parse_method": parse_method,
+            "beat": self._parse_beat(response),
+        }
+
+    def _parse_beat(self, response: str) -> Optional[Dict[str, Any]]:
+        """BEAT/TENSION/MILESTONE lines as a beat dict (None without a BEAT line)."""
+        beat_match = re.search(r'BEAT:\s*([a-z_]+)', response, re.IGNORECASE)
+        if not beat_match:
+            return None
+        tension_match = re.search(r'TENSION:\s*([+-]?\d+)', response, re.IGNORECASE)
+        milestone_match = re.search(r'MILESTONE:\s*([a-z_]+)', response, re.IGNORECASE)
+        milestone = milestone_match.group(1).lower() if milestone_match else None
+        return {
+            "type": beat_match.group(1).lower(),
+            "tension_change": max(-15, min(15, int(tension_match.group(1)))) if tension_match else 0,
+            "milestone": None if milestone in (None, "none", "null") else milestone,
         }
 
     def _should_generate_visual_deterministic(
@@ -1038,11 +1122,15 @@ STATUS: going/closing/done"""
         character_id: UUID,
         user_id: UUID,
         structured_response: Optional[Dict[str, Any]] = None,
+        trace: Optional[TurnTrace] = None,
     ) -> DirectorOutput:
         """Process exchange with semantic evaluation.
 
         This is the unified entry point for Director processing.
+        Phases are recorded as background spans on trace, when given.
         """
+        trace = trace or TurnTrace()
+
         # 1. Increment turn count
         new_turn_count = session.turn_count + 1
 
@@ -1053,13 +1141,14 @@ STATUS: going/closing/done"""
         # 3. Semantic evaluation
         # Unified Template Model: episode_template now always exists (free chat uses is_free_chat templates)
         # For free chat templates (is_free_chat=True), we still run full evaluation but with open-ended settings
-        evaluation = await self.evaluate_exchange(
-            messages=messages,
-            character_name=character_name,
-            genre=getattr(episode_template, 'genre', 'romance') if episode_template else 'romance',
-            situation=episode_template.situation if episode_template else "",
-            dramatic_question=episode_template.dramatic_question if episode_template else "",
-        )
+        with trace.span("evaluate_exchange", phase=BACKGROUND):
+            evaluation = await self.evaluate_exchange(
+                messages=messages,
+                character_name=character_name,
+                genre=getattr(episode_template, 'genre', 'romance') if episode_template else 'romance',
+                situation=episode_template.situation if episode_template else "",
+                dramatic_question=episode_template.dramatic_question if episode_template else "",
+            )
 
         # 3.5. Fetch user preferences for visual_mode override
         user_preferences = await self._get_user_preferences(user_id)
@@ -1075,21 +1164,19 @@ STATUS: going/closing/done"""
         suggestion_trigger = "turn_limit" if suggest_next else None
 
         # 7. Update session state (with observability v2.4)
-        director_state = dict(session.director_state) if session.director_state else {}
-
-        # Initialize visual_decisions history if needed
-        if "visual_decisions" not in director_state:
-            director_state["visual_decisions"] = []
+        # Only the keys the Director owns are patched; objective/beat/choice
+        # keys written inline by send_message_stream are left untouched.
+        patch = DirectorStatePatch()
 
         # Capture last evaluation with observability fields
-        director_state["last_evaluation"] = {
+        patch.set("last_evaluation", {
             "status": evaluation.get("status"),
             "visual_type": evaluation.get("visual_type"),
             "visual_hint": evaluation.get("visual_hint"),
             "turn": new_turn_count,
-            "raw_response": evaluation.get("raw_response", ""),  # NEW: Full LLM output
+            "raw_response": cap_raw_response(evaluation.get("raw_response")),  # LLM output (capped)
             "parse_method": evaluation.get("parse_method", "unknown"),  # NEW: How we got visual_type
-        }
+        })
 
         # Log visual decision to history (keep last 10)
         # v2.4: Capture deterministic trigger reason with user preference resolution
@@ -1101,93 +1188,144 @@ STATUS: going/closing/done"""
             user_preferences
         )
 
+        turn_budget = getattr(episode_template, 'turn_budget', None) if episode_template else None
+        generation_budget = getattr(episode_template, 'generation_budget', 0) if episode_template else 0
+        generations_used = getattr(session, 'generations_used', 0)
         should_gen, trigger_reason = self._should_generate_visual_deterministic(
             turn_count=new_turn_count,
-            turn_budget=getattr(episode_template, 'turn_budget', None) if episode_template else None,
+            turn_budget=turn_budget,
             visual_mode=resolved_visual_mode,  # Use resolved visual_mode
-            generations_used=getattr(session, 'generations_used', 0),
-            generation_budget=getattr(episode_template, 'generation_budget', 0) if episode_template else 0,
+            generations_used=generations_used,
+            generation_budget=generation_budget,
         )
         decision_reason = trigger_reason
 
+        # Triggers are deterministic, so the next turn's is known now
+        # (assuming this turn's visual, if any, gets generated)
+        next_should_gen, next_trigger_reason = self._should_generate_visual_deterministic(
+            turn_count=new_turn_count + 1,
+            turn_budget=turn_budget,
+            visual_mode=resolved_visual_mode,
+            generations_used=generations_used + (1 if should_gen else 0),
+            generation_budget=generation_budget,
+        )
+
         visual_decision = {
             "turn": new_turn_count,
             "triggered": actions.visual_type not in ("none", None),
             "reason": decision_reason,  # v2.4: Deterministic reason
             "visual_hint_preview": (actions.visual_hint[:50] + "...") if actions.visual_hint and len(actions.visual_hint) > 50 else actions.visual_hint,
         }
-        director_state["visual_decisions"].append(visual_decision)
-        director_state["visual_decisions"] = director_state["visual_decisions"][-10:]  # Keep last 10
+        patch.append("visual_decisions", visual_decision, keep=10)  # Keep last 10
 
-        await self._update_session_director_state(
-            session_id=session.id,
+        # 7.5. Extraction gate: skip memory/hook LLM calls for low-value exchanges
+        # Existing memories double as the novelty reference and the dedup list
+        existing_memories = []
+        stop = trace.timer("existing_memories", phase=BACKGROUND)
+        try:
+            existing_memories = await self.memory_service.get_relevant_memories(
+                user_id, character_id, limit=20,
+                series_id=session.series_id  # Series-aware retrieval
+            )
+        except Exception as e:
+            log.error(f"Director failed to load memories for extraction: {e}")
+        stop()
+        extraction = self.extraction_gate.decide(
+            messages=messages,
             turn_count=new_turn_count,
-            director_state=director_state,
-            suggest_next=suggest_next,
-            suggestion_trigger=suggestion_trigger,
+            director_state=session.director_state,
+            existing_memories=existing_memories,
         )
+        if not extraction.extract_memories:
+            # An extracting turn records its state once extraction succeeded
+            patch.set("extraction", extraction.state())
+
+        with trace.span("director_state", phase=BACKGROUND):
+            await self._update_session_director_state(
+                session_id=session.id,
+                turn_count=new_turn_count,
+                patch=patch,
+                suggest_next=suggest_next,
+                suggestion_trigger=suggestion_trigger,
+            )
 
         # 8. Memory & Hook Extraction (Director Protocol v2.3)
         # Director now owns all post-exchange processing
         extracted_memories = []
         extracted_hooks = []
-        beat_data = None
-
-        try:
-            # Get existing memories for deduplication (series-scoped)
-            existing_memories = await self.memory_service.get_relevant_memories(
-                user_id, character_id, limit=20,
-                series_id=session.series_id  # Series-aware retrieval
-            )
+        # Every turn's beat comes from evaluate_exchange; a successful
+        # extraction's own beat (structured output) takes precedence
+        beat_data = evaluation.get("beat")
 
+        stop = trace.timer("extraction", phase=BACKGROUND)
+        if extraction.extract_memories:
             # Extract memories and beat classification (single LLM call)
-            extracted_memories, beat_data = await self.memory_service.extract_memories(
-                user_id=user_id,
-                character_id=character_id,
-                episode_id=session.id,
-                messages=messages,
-                existing_memories=existing_memories,
-            )
+            try:
+                extracted_memories, extracted_beat = await self.memory_service.extract_memories(
+                    user_id=user_id,
+                    character_id=character_id,
+                    episode_id=session.id,
+                    messages=messages,
+                    existing_memories=existing_memories,
+                    window=extraction.window,
+                )
+                beat_data = extracted_beat or beat_data
+                extraction_state = extraction.state()
+            except Exception as e:
+                log.error(f"Director memory extraction failed: {e}")
+                extraction_state = extraction.failed_state()
+            try:
+                await self._save_extraction_state(session.id, extraction_state)
+            except Exception as e:
+                log.error(f"Director failed to save extraction state: {e}")
 
+        try:
             # Save memories with explicit series_id (series-scoped storage)
             if extracted_memories:
-                await self.memory_service.save_memories(
+                saved_memories = await self.memory_service.save_memories_batch(
                     user_id=user_id,
                     character_id=character_id,
                     episode_id=session.id,
                     memories=extracted_memories,
                     series_id=session.series_id,  # Explicit series scoping
                 )
-                log.info(f"Director saved {len(extracted_memories)} memories (series_id={session.series_id})")
+                log.info(f"Director saved {len(saved_memories)} memories (series_id={session.series_id})")
 
             # Extract and save hooks (character-scoped, cross-series by design)
-            extracted_hooks = await self.memory_service.extract_hooks(messages)
+            if extraction.extract_hooks:
+                extracted_hooks = await self.memory_service.extract_hooks(messages, window=extraction.window)
             if extracted_hooks:
-                await self.memory_service.save_hooks(
+                saved_hooks = await self.memory_service.save_hooks_batch(
                     user_id=user_id,
                     character_id=character_id,
                     episode_id=session.id,
                     hooks=extracted_hooks,
                 )
-                log.info(f"Director saved {len(extracted_hooks)} hooks")
+                log.info(f"Director saved {len(saved_hooks)} hooks")
 
             # Update relationship dynamic with beat classification
             if beat_data:
-                await self.memory_service.update_relationship_dynamic(
+                relationship_state = await self.memory_service.update_relationship_dynamic(
                     user_id=user_id,
                     character_id=character_id,
                     beat_type=beat_data.get("type", "neutral"),
                     tension_change=int(beat_data.get("tension_change", 0)),
                     milestone=beat_data.get("milestone"),
                 )
-                log.info(f"Director updated dynamic: beat={beat_data.get('type')}")
+                if relationship_state:
+                    log.info(
+                        f"Director updated dynamic: beat={beat_data.get('type')}, "
+                        f"tone={relationship_state['dynamic'].get('tone')}"
+                    )
 
         except Exception as e:
             log.error(f"Director memory/hook extraction failed: {e}")
             # Don't fail the entire exchange if memory extraction fails
+        stop()
 
         # 8.5. ADR-005 v2: Prop revelation detection (Director-owned)
         revealed_props = []
+        stop = trace.timer("props", phase=BACKGROUND)
         if episode_template and messages:
             try:
                 # Get the last assistant message
@@ -1203,6 +1341,7 @@ STATUS: going/closing/done"""
             except Exception as e:
                 log.error(f"Director prop detection failed: {e}")
                 # Don't fail the entire exchange if prop detection fails
+        stop()
 
         # 9. Build output
         return DirectorOutput(
@@ -1211,6 +1350,7 @@ STATUS: going/closing/done"""
             suggestion_trigger=suggestion_trigger,
             evaluation=evaluation,
             actions=actions,
+            next_visual_trigger=next_trigger_reason if next_should_gen else None,
             extracted_memories=extracted_memories,
             extracted_hooks=extracted_hooks,
             beat_data=beat_data,
@@ -1345,7 +1485,7 @@ STATUS: going/closing/done"""
     async def evaluate_objective(
         self,
         objective: str,
-        success_condition: str,
+        success_condition: Union[str, CompiledCondition, None],
         messages: List[Dict[str, str]],
         character_response: str,
         turn_count: int,
@@ -1359,43 +1499,38 @@ STATUS: going/closing/done"""
         - keyword:<words> - Keyword detection (e.g., "keyword:love,care,feelings")
         - turn:<N> - Turn-based (e.g., "turn:7" = survive 7 turns)
         - flag:<name> - Flag-based (e.g., "flag:trust_established")
+        combined with AND / OR (e.g., "flag:trust_established AND semantic:she_opens_up").
 
+        Accepts the raw string or the plan's pre-parsed CompiledCondition.
+        The LLM is called only for semantic terms the other terms leave undecided.
         Returns ObjectiveEvaluation with status and any flags to set.
         """
-        if not objective or not success_condition:
+        condition = parse_condition(success_condition)
+        if not objective or condition.kind == "none":
             return ObjectiveEvaluation(status="pending")
 
-        # Parse condition type
-        if success_condition.startswith("semantic:"):
-            criteria = success_condition.replace("semantic:", "")
-            return await self._semantic_objective_check(objective, criteria, messages, character_response, turn_count)
-
-        elif success_condition.startswith("keyword:"):
-            keywords = success_condition.replace("keyword:", "").split(",")
-            return self._keyword_objective_check(keywords, character_response, turn_count)
-
-        elif success_condition.startswith("turn:"):
-            threshold = int(success_condition.replace("turn:", ""))
-            if turn_count >= threshold:
-                return ObjectiveEvaluation(status="completed", completed_at_turn=turn_count)
-            return ObjectiveEvaluation(status="in_progress")
+        facts = ConditionFacts(
+            turn_count=turn_count,
+            turn_budget=turn_budget,
+            flags=current_flags or {},
+            response=character_response,
+        )
 
-        elif success_condition.startswith("flag:"):
-            flag_name = success_condition.replace("flag:", "")
-            if current_flags.get(flag_name):
-                return ObjectiveEvaluation(status="completed", completed_at_turn=turn_count)
-            return ObjectiveEvaluation(status="in_progress")
+        async def judge(criteria: str) -> bool:
+            return await self._semantic_criteria_met(objective, criteria, messages, character_response)
 
+        if await resolve_condition(condition, facts, judge):
+            log.info(f"Objective completed: {objective[:50]}... (condition: {condition.raw})")
+            return ObjectiveEvaluation(status="completed", completed_at_turn=turn_count)
         return ObjectiveEvaluation(status="in_progress")
 
-    async def _semantic_objective_check(
+    async def _semantic_criteria_met(
         self,
         objective: str,
         criteria: str,
         messages: List[Dict[str, str]],
         character_response: str,
-        turn_count: int,
-    ) -> ObjectiveEvaluation:
+    ) -> bool:
         """Use LLM to evaluate if semantic criteria is met."""
         # Format recent messages for context
         recent = messages[-6:] if len(messages) > 6 else messages
@@ -1427,54 +1562,39 @@ Respond with ONE word only: YES or NO"""
             )
 
             result = response.content.strip().upper()
-            if "YES" in result:
-                log.info(f"Objective completed: {objective[:50]}... (criteria: {criteria})")
-                return ObjectiveEvaluation(status="completed", completed_at_turn=turn_count)
-            else:
-                return ObjectiveEvaluation(status="in_progress")
+            return "YES" in result
 
         except Exception as e:
             log.error(f"Semantic objective check failed: {e}")
-            return ObjectiveEvaluation(status="in_progress")
-
-    def _keyword_objective_check(
-        self,
-        keywords: List[str],
-        character_response: str,
-        turn_count: int,
-    ) -> ObjectiveEvaluation:
-        """Check if any keywords appear in the character's response."""
-        response_lower = character_response.lower()
-        for keyword in keywords:
-            if keyword.strip().lower() in response_lower:
-                log.info(f"Objective completed via keyword: {keyword}")
-                return ObjectiveEvaluation(status="completed", completed_at_turn=turn_count)
-        return ObjectiveEvaluation(status="in_progress")
+            return False
 
     def check_failure_condition(
         self,
-        failure_condition: str,
+        failure_condition: Union[str, CompiledCondition, None],
         turn_count: int,
         turn_budget: Optional[int],
+        current_flags: Optional[Dict[str, Any]] = None,
+        character_response: str = "",
     ) -> bool:
-        """Check if failure condition is met."""
-        if not failure_condition:
-            return False
-
-        if failure_condition == "turn_budget_exceeded":
-            # Fail if we've exceeded turn budget without completing objective
-            if turn_budget and turn_budget > 0 and turn_count > turn_budget:
-                return True
-        elif failure_condition.startswith("turn:"):
-            threshold = int(failure_condition.replace("turn:", ""))
-            if turn_count > threshold:
-                return True
+        """Check if failure condition is met.
 
-        return False
+        turn_budget_exceeded fails once the turn budget is exceeded, turn:<N>
+        once turn N has passed. Never calls the LLM: semantic terms count as
+        not met.
+        """
+        condition = parse_condition(failure_condition)
+        facts = ConditionFacts(
+            turn_count=turn_count,
+            turn_budget=turn_budget,
+            flags=current_flags or {},
+            response=character_response,
+            failure=True,
+        )
+        return evaluate_condition(condition, facts) is True
 
     def check_choice_point_trigger(
         self,
-        choice_points: List[Dict[str, Any]],
+        plan: EpisodePlan,
         turn_count: int,
         completed_objectives: List[str],
         triggered_choice_ids: List[str],
@@ -1485,47 +1605,22 @@ Respond with ONE word only: YES or NO"""
         - turn:<N> - At specific turn number
         - after_objective:<id> - After an objective is completed
 
+        The plan indexes choice points by trigger turn and objective id, so
+        only the matching ones are looked at; the first in authored order wins.
         Returns TriggeredChoicePoint if a choice should be shown.
         """
-        if not choice_points:
+        if not plan.has_choice_points:
             return None
 
-        for cp in choice_points:
-            cp_id = cp.get("id", "")
-
+        for cp in plan.choice_point_candidates(turn_count, completed_objectives):
             # Skip already triggered choices
-            if cp_id in triggered_choice_ids:
+            if cp.id in triggered_choice_ids:
                 continue
-
-            trigger = cp.get("trigger", "")
-
-            # Turn-based trigger
-            if trigger.startswith("turn:"):
-                target_turn = int(trigger.replace("turn:", ""))
-                if turn_count == target_turn:
-                    choices = [
-                        {"id": c.get("id", ""), "label": c.get("label", "")}
-                        for c in cp.get("choices", [])
-                    ]
-                    return TriggeredChoicePoint(
-                        id=cp_id,
-                        prompt=cp.get("prompt", ""),
-                        choices=choices,
-                    )
-
-            # Objective-based trigger
-            elif trigger.startswith("after_objective:"):
-                obj_id = trigger.replace("after_objective:", "")
-                if obj_id in completed_objectives:
-                    choices = [
-                        {"id": c.get("id", ""), "label": c.get("label", "")}
-                        for c in cp.get("choices", [])
-                    ]
-                    return TriggeredChoicePoint(
-                        id=cp_id,
-                        prompt=cp.get("prompt", ""),
-                        choices=choices,
-                    )
+            return TriggeredChoicePoint(
+                id=cp.id,
+                prompt=cp.prompt,
+                choices=cp.choice_dicts(),
+            )
 
         return None
 
@@ -1535,7 +1630,7 @@ Respond with ONE word only: YES or NO"""
 
     async def detect_beat_completion(
         self,
-        beat: Dict[str, Any],
+        beat: CompiledBeat,
         character_response: str,
         messages: List[Dict[str, str]],
     ) -> bool:
@@ -1548,9 +1643,9 @@ Respond with ONE word only: YES or NO"""
 
         Returns True if beat was detected in the response.
         """
-        detection_type = beat.get("detection_type", "semantic")
-        detection_criteria = beat.get("detection_criteria", "")
-        beat_id = beat.get("id", "unknown")
+        detection_type = beat.detection_type
+        detection_criteria = beat.detection_criteria
+        beat_id = beat.id or "unknown"
 
         if detection_type == "automatic":
             # Character was instructed; assume delivered
@@ -1558,9 +1653,8 @@ Respond with ONE word only: YES or NO"""
             return True
 
         elif detection_type == "keyword":
-            keywords = [k.strip().lower() for k in detection_criteria.split(",") if k.strip()]
             response_lower = character_response.lower()
-            for keyword in keywords:
+            for keyword in beat.keywords:
                 if keyword in response_lower:
                     log.info(f"Beat {beat_id} detected via keyword: {keyword}")
                     return True
@@ -1568,7 +1662,7 @@ Respond with ONE word only: YES or NO"""
 
         elif detection_type == "semantic":
             return await self._semantic_beat_check(
-                beat_description=beat.get("description", ""),
+                beat_description=beat.description,
                 criteria=detection_criteria,
                 character_response=character_response,
                 messages=messages,
@@ -1626,7 +1720,7 @@ Answer with ONE word only: YES or NO"""
 
     def check_beat_choice_point(
         self,
-        beat: Dict[str, Any],
+        beat: CompiledBeat,
         character_response: str,
     ) -> Optional[TriggeredChoicePoint]:
         """Check if a beat has an associated choice point to trigger (ADR-009).
@@ -1636,28 +1730,16 @@ Answer with ONE word only: YES or NO"""
 
         Returns None if the beat has no choice_point.
         """
-        choice_point = beat.get("choice_point")
+        choice_point = beat.choice_point
         if not choice_point:
             return None
 
-        # Extract choice_point data
-        cp_id = choice_point.get("id", beat.get("id", ""))
-        prompt = choice_point.get("prompt", "")
-        choices_raw = choice_point.get("choices", [])
-
-        choices = []
-        for c in choices_raw:
-            if hasattr(c, "model_dump"):
-                choices.append({"id": c.id, "label": c.label})
-            elif isinstance(c, dict):
-                choices.append({"id": c.get("id", ""), "label": c.get("label", "")})
-
         return TriggeredChoicePoint(
-            id=cp_id,
-            prompt=prompt,
-            choices=choices,
+            id=choice_point.id,
+            prompt=choice_point.prompt,
+            choices=choice_point.choice_dicts(),
             mode="message_replacement",  # ADR-009: Choices replace message input
-            beat_id=beat.get("id"),
+            beat_id=beat.id,
             context={
                 "character_said": character_response[-500:] if len(character_response) > 500 else character_response,
             },
@@ -1725,18 +1807,11 @@ Answer with ONE word only: YES or NO"""
             log.debug(f"User override: episode_default, respecting episode visual_mode={episode_visual_mode}")
             return episode_visual_mode
 
-    async def _update_director_state(self, session_id: UUID, director_state: Dict[str, Any]):
-        """Update just the director_state field."""
-        await self.db.execute(
-            "UPDATE sessions SET director_state = :director_state WHERE id = :session_id",
-            {"director_state": json.dumps(director_state), "session_id": str(session_id)}
-        )
-
     async def _update_session_director_state(
         self,
         session_id: UUID,
         turn_count: int,
-        director_state: Dict[str, Any],
+        patch: DirectorStatePatch,
         suggest_next: bool,
         suggestion_trigger: Optional[str],
     ):
@@ -1746,24 +1821,21 @@ Answer with ONE word only: YES or NO"""
         The trigger is recorded for analytics/debugging but doesn't change session_state.
         Sessions stay 'active' indefinitely - users have full control.
         See EPISODE_STATUS_MODEL.md for rationale.
+
+        director_state is patched (migration 074), not rewritten.
         """
-        updates = {
-            "turn_count": turn_count,
-            "director_state": json.dumps(director_state),
-        }
+        updates = {"turn_count": turn_count}
 
         # v2.6: Record suggestion_trigger for analytics (stored in completion_trigger column for now)
         # This is just metadata - doesn't affect session_state or gate anything
         if suggest_next and suggestion_trigger:
             updates["completion_trigger"] = suggestion_trigger  # Column name unchanged for migration simplicity
 
-        set_clause = ", ".join(f"{k} = :{k}" for k in updates.keys())
-        updates["session_id"] = str(session_id)
+        await patch.apply(self.db, session_id, **updates)
 
-        await self.db.execute(
-            f"UPDATE sessions SET {set_clause} WHERE id = :session_id",
-            updates
-        )
+    async def _save_extraction_state(self, session_id: UUID, state: Dict[str, Any]):
+        """Record the extraction gate's state after an extracting turn."""
+        await DirectorStatePatch().set("extraction", state).apply(self.db, session_id)
 
     async def suggest_next_episode(
         self,
@@ -1775,38 +1847,19 @@ Answer with ONE word only: YES or NO"""
             return None
 
         # Get next episode in series order
-        row = await self.db.fetch_one(
-            """
-            SELECT
-                et.id,
-                et.title,
-                et.slug,
-                et.episode_number,
-                et.situation,
-                et.character_id
-            FROM episode_templates et
-            WHERE et.series_id = :series_id
-            AND et.episode_number > :current_episode
-            AND et.status = 'active'
-            ORDER BY et.episode_number
-            LIMIT 1
-            """,
-            {
-                "series_id": str(session.series_id),
-                "current_episode": session.episode_number if hasattr(session, 'episode_number') else 0,
-            }
-        )
+        graph = await get_series_graph(self.db, session.series_id)
+        node = graph.next_after(session.episode_number if hasattr(session, 'episode_number') else 0)
 
-        if not row:
+        if not node:
             return None
 
         return {
-            "episode_id": str(row["id"]),
-            "title": row["title"],
-            "slug": row["slug"],
-            "episode_number": row["episode_number"],
-            "situation": row["situation"],
-            "character_id": str(row["character_id"]) if row["character_id"] else None,
+            "episode_id": node.id,
+            "title": node.title,
+            "slug": node.slug,
+            "episode_number": node.episode_number,
+            "situation": node.situation,
+            "character_id": node.character_id,
         }
 
     # =========================================================================
@@ -0,0 +1,726 @@
+"""Offline Director replay: drive recorded sessions through the Director.
+
+Measuring how a Director change affects LLM call count, latency or outcomes
+used to need live traffic. The replay harness runs recorded sessions
+(template + messages) turn by turn through the same Director entry points
+the chat path uses, with no database and no network:
+
+    1. generate_pre_guidance          (beat directive for the turn)
+    2. evaluate_objective / check_failure_condition / check_choice_point_trigger /
+       detect_beat_completion         (inline, as in send_message_stream)
+    3. process_exchange               (background: evaluation, extraction gate,
+                                       memory/hook extraction, relationship beat)
+
+LLM calls go to SimulatedLLM, which answers each call kind with a pluggable
+responder and charges a latency sampled from a configurable distribution to a
+simulated clock (nothing sleeps). Database access is replaced by in-memory
+state: director_state patches are applied with DirectorStatePatch.apply_to,
+memories/hooks/relationship dynamic live in ReplayMemoryService. Props are
+not replayed.
+
+For every turn the report has LLM calls per kind, simulated inline and
+background latency, an event timeline and the director_state diff.
+
+Sessions come from a fixture file (see load_fixture) or the database
+(load_sessions_from_db). Run: python -m app.scripts.replay_director
+"""
+
+import copy
+import json
+import logging
+import math
+import random
+import re
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from app.models.episode_template import EpisodeTemplate
+from app.models.hook import ExtractedHook
+from app.models.memory import ExtractedMemory, MemoryEvent
+from app.models.session import Session
+from app.services.director import DirectorService
+from app.services.director_state import DirectorStatePatch
+from app.services.episode_plan import build_plan
+from app.services.extraction_gate import ExtractionGate, ExtractionGateConfig
+from app.services.llm import LLMResponse
+from app.services.memory import MemoryService
+
+log = logging.getLogger(__name__)
+
+# Call kinds, as classified from the prompt (generate) or call_site (extract_json)
+EVALUATE_EXCHANGE = "evaluate_exchange"
+OBJECTIVE_CHECK = "objective_check"
+BEAT_CHECK = "beat_check"
+EXTRACT_MEMORIES = "memory.extract_memories"
+EXTRACT_HOOKS = "memory.extract_hooks"
+OTHER = "other"
+
+_PROMPT_MARKERS = (
+    ("You are a story director", EVALUATE_EXCHANGE),
+    ("Evaluate whether the user's objective", OBJECTIVE_CHECK),
+    ("accomplish this narrative beat", BEAT_CHECK),
+)
+
+DEFAULT_LATENCY = {
+    EVALUATE_EXCHANGE: "lognormal:900,0.35",
+    OBJECTIVE_CHECK: "lognormal:450,0.3",
+    BEAT_CHECK: "lognormal:450,0.3",
+    EXTRACT_MEMORIES: "lognormal:1600,0.4",
+    EXTRACT_HOOKS: "lognormal:1100,0.4",
+    OTHER: "const:500",
+}
+
+_TIME_WORDS = re.compile(r"\b(tomorrow|tonight|next week|interview|exam|date|trip)\b", re.IGNORECASE)
+
+
+# =============================================================================
+# Simulated LLM
+# =============================================================================
+
+@dataclass
+class LatencyModel:
+    """Latency distribution in milliseconds.
+
+    Specs: "const:<ms>", "uniform:<lo>,<hi>", "normal:<mean>,<sd>",
+    "lognormal:<median>,<sigma>".
+    """
+
+    kind: str = "const"
+    a: float = 0.0
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        kind, _, params = spec.partition(":")
+        values = [float(v) for v in params.split(",") if v.strip()]
+        if kind not in ("const", "uniform", "normal", "lognormal") or not values:
+            raise ValueError(f"Invalid latency spec: {spec!r}")
+        return cls(kind=kind, a=values[0], b=values[1] if len(values) > 1 else 0.0)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            value = rng.uniform(self.a, self.b)
+        elif self.kind == "normal":
+            value = rng.gauss(self.a, self.b)
+        elif self.kind == "lognormal":
+            value = self.a * math.exp(rng.gauss(0.0, self.b))
+        else:
+            value = self.a
+        return max(0.0, value)
+
+
+@dataclass
+class LLMCall:
+    kind: str
+    latency_ms: float
+    started_at_ms: float
+
+
+Responder = Callable[[str, random.Random], Any]
+
+
+def respond_evaluation(prompt: str, rng: random.Random) -> str:
+    replies = [line[len("ASSISTANT: "):] for line in prompt.splitlines() if line.startswith("ASSISTANT: ")]
+    hint = (replies[-1].split(".")[0][:80] if replies else "") or "the current moment"
+    beat = respond_beat(prompt, rng)
+    return (
+        f"The moment holds.\nVISUAL: {hint}\nSTATUS: going\n"
+        f"BEAT: {beat['type']}\nTENSION: {beat['tension_change']}\nMILESTONE: none"
+    )
+
+
+def make_yes_no(yes_rate: float) -> Responder:
+    def respond(prompt: str, rng: random.Random) -> str:
+        return "YES" if rng.random() < yes_rate else "NO"
+    return respond
+
+
+def respond_memories(prompt: str, rng: random.Random) -> Dict[str, Any]:
+    user_lines = [line[len("User: "):] for line in prompt.splitlines() if line.startswith("User: ")]
+    memories = []
+    if user_lines and len(user_lines[-1].split()) >= 6:
+        memories.append({
+            "type": "fact",
+            "summary": user_lines[-1][:120],
+            "importance_score": round(rng.uniform(0.3, 0.9), 2),
+            "emotional_valence": rng.choice([-1, 0, 0, 1]),
+        })
+    return {"memories": memories, "beat": respond_beat(prompt, rng)}
+
+
+def respond_beat(prompt: str, rng: random.Random) -> Dict[str, Any]:
+    beat = rng.choice(["playful", "flirty", "tense", "vulnerable", "neutral"])
+    return {"type": beat, "tension_change": rng.randint(-5, 8), "milestone": None}
+
+
+def respond_hooks(prompt: str, rng: random.Random) -> List[Dict[str, Any]]:
+    match = _TIME_WORDS.search(prompt.rsplit("CONVERSATION", 1)[-1])
+    if not match:
+        return []
+    return [{
+        "type": "follow_up",
+        "content": f"Ask how the {match.group(1).lower()} went",
+        "suggested_opener": None,
+        "days_until_trigger": 1,
+        "priority": 2,
+    }]
+
+
+class SimulatedLLM:
+    """LLMService stand-in: canned responses, simulated latency, no network.
+
+    responders maps a call kind to fn(prompt, rng) returning the response text
+    (generate) or parsed JSON (extract_json). latency maps a call kind to a
+    LatencyModel. Every call advances clock_ms by its sampled latency.
+    """
+
+    def __init__(
+        self,
+        responders: Optional[Dict[str, Responder]] = None,
+        latency: Optional[Dict[str, LatencyModel]] = None,
+        yes_rate: float = 0.3,
+        seed: int = 7,
+    ):
+        self.responders: Dict[str, Responder] = {
+            EVALUATE_EXCHANGE: respond_evaluation,
+            OBJECTIVE_CHECK: make_yes_no(yes_rate),
+            BEAT_CHECK: make_yes_no(yes_rate),
+            EXTRACT_MEMORIES: respond_memories,
+            EXTRACT_HOOKS: respond_hooks,
+            OTHER: lambda prompt, rng: "",
+        }
+        self.responders.update(responders or {})
+        self.latency = {kind: LatencyModel.parse(spec) for kind, spec in DEFAULT_LATENCY.items()}
+        self.latency.update(latency or {})
+        self.rng = random.Random(seed)
+        self.calls: List[LLMCall] = []
+        self.clock_ms = 0.0
+
+    def _call(self, kind: str, prompt: str) -> Any:
+        model = self.latency.get(kind, self.latency[OTHER])
+        latency_ms = model.sample(self.rng)
+        self.calls.append(LLMCall(kind=kind, latency_ms=latency_ms, started_at_ms=self.clock_ms))
+        self.clock_ms += latency_ms
+        return self.responders.get(kind, self.responders[OTHER])(prompt, self.rng)
+
+    async def generate(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> LLMResponse:
+        prompt = "\n".join(m.get("content", "") for m in messages)
+        kind = next((k for marker, k in _PROMPT_MARKERS if marker in prompt), OTHER)
+        content = self._call(kind, prompt)
+        return LLMResponse(content=content, model="simulated", latency_ms=int(self.calls[-1].latency_ms))
+
+    async def extract_json(
+        self,
+        prompt: str,
+        schema_description: str,
+        json_schema: Optional[Dict[str, Any]] = None,
+        call_site: str = "extract_json",
+    ) -> Any:
+        return self._call(call_site if call_site in self.responders else OTHER, prompt)
+
+
+# =============================================================================
+# In-memory stand-ins for the database-backed services
+# =============================================================================
+
+class ReplayMemoryService(MemoryService):
+    """MemoryService with extraction intact and storage kept in memory."""
+
+    def __init__(self, llm: SimulatedLLM):
+        self.db = None
+        self.llm = llm
+        self.memories: List[MemoryEvent] = []
+        self.hooks: List[ExtractedHook] = []
+        self.dynamic: Dict[str, Any] = {"tone": "intrigued", "tension_level": 45, "recent_beats": []}
+        self.milestones: List[str] = []
+
+    async def get_relevant_memories(
+        self,
+        user_id: uuid.UUID,
+        character_id: uuid.UUID,
+        limit: int = 10,
+        series_id: Optional[uuid.UUID] = None,
+        query_text: Optional[str] = None,
+    ) -> List[MemoryEvent]:
+        ranked = sorted(self.memories, key=lambda m: (m.importance_score, m.created_at), reverse=True)
+        return ranked[:limit]
+
+    async def save_memories_batch(
+        self,
+        user_id: uuid.UUID,
+        character_id: uuid.UUID,
+        episode_id: uuid.UUID,
+        memories: List[ExtractedMemory],
+        series_id: Optional[uuid.UUID] = None,
+    ) -> List[MemoryEvent]:
+        saved = [
+            MemoryEvent(
+                id=uuid.uuid4(),
+                user_id=user_id,
+                character_id=character_id,
+                episode_id=episode_id,
+                series_id=series_id,
+                type=m.type,
+                category=m.category,
+                content=m.content,
+                summary=m.summary,
+                emotional_valence=m.emotional_valence,
+                importance_score=m.importance_score,
+                created_at=datetime.now(timezone.utc),
+            )
+            for m in memories
+        ]
+        self.memories.extend(saved)
+        return saved
+
+    async def save_hooks_batch(
+        self,
+        user_id: uuid.UUID,
+        character_id: uuid.UUID,
+        episode_id: uuid.UUID,
+        hooks: List[ExtractedHook],
+    ) -> List[ExtractedHook]:
+        self.hooks.extend(hooks)
+        return list(hooks)
+
+    async def update_relationship_dynamic(
+        self,
+        user_id: uuid.UUID,
+        character_id: uuid.UUID,
+        beat_type: str,
+        tension_change: int,
+        milestone: Optional[str],
+    ) -> Optional[Dict]:
+        recent = (self.dynamic["recent_beats"] + [beat_type])[-10:]
+        tension = max(0, min(100, int(self.dynamic["tension_level"]) + tension_change))
+        self.dynamic = {"tone": self._derive_tone(recent, tension), "tension_level": tension, "recent_beats": recent}
+        if milestone and milestone not in self.milestones:
+            self.milestones.append(milestone)
+        return {"dynamic": dict(self.dynamic), "milestones": list(self.milestones)}
+
+
+class ReplayDirector(DirectorService):
+    """DirectorService whose database reads/writes hit the replay's state."""
+
+    def __init__(
+        self,
+        llm: SimulatedLLM,
+        memory_service: ReplayMemoryService,
+        character_name: str,
+        user_preferences: Dict[str, Any],
+        gate_config: Optional[ExtractionGateConfig] = None,
+    ):
+        self.db = None
+        self.llm = llm
+        self.memory_service = memory_service
+        self.extraction_gate = ExtractionGate(gate_config)
+        self.character_name = character_name
+        self.user_preferences = user_preferences
+        self.state: Dict[str, Any] = {}
+        self.turn_count = 0
+
+    async def _get_character(self, character_id: uuid.UUID) -> Optional[Dict[str, Any]]:
+        return {"name": self.character_name, "archetype": None}
+
+    async def _get_user_preferences(self, user_id: uuid.UUID) -> Dict[str, Any]:
+        return self.user_preferences
+
+    async def _update_session_director_state(
+        self,
+        session_id: uuid.UUID,
+        turn_count: int,
+        patch: DirectorStatePatch,
+        suggest_next: bool,
+        suggestion_trigger: Optional[str],
+    ):
+        self.state = patch.apply_to(self.state)
+        self.turn_count = turn_count
+
+    async def _save_extraction_state(self, session_id: uuid.UUID, state: Dict[str, Any]):
+        self.state = DirectorStatePatch().set("extraction", state).apply_to(self.state)
+
+    async def detect_prop_revelations(self, *args, **kwargs) -> List[Dict[str, Any]]:
+        return []
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+@dataclass
+class ReplaySession:
+    """A recorded session: template, messages and starting state."""
+
+    id: str
+    template: EpisodeTemplate
+    messages: List[Dict[str, str]]
+    character_name: str = "Character"
+    user_preferences: Dict[str, Any] = field(default_factory=dict)
+    director_state: Dict[str, Any] = field(default_factory=dict)
+    turn_count: int = 0
+    generations_used: int = 0
+
+
+def _template(data: Dict[str, Any]) -> EpisodeTemplate:
+    now = datetime.now(timezone.utc)
+    defaults = {
+        "id": str(uuid.uuid4()),
+        "title": "Replay",
+        "slug": "replay",
+        "situation": "",
+        "opening_line": "",
+        "created_at": now,
+        "updated_at": now,
+    }
+    return EpisodeTemplate(**{
+        k: v for k, v in {**defaults, **data}.items()
+        if k in EpisodeTemplate.model_fields
+    })
+
+
+def session_from_dict(data: Dict[str, Any]) -> ReplaySession:
+    return ReplaySession(
+        id=str(data.get("id") or uuid.uuid4()),
+        template=_template(data.get("template") or {}),
+        messages=[
+            {"role": m["role"], "content": m["content"]}
+            for m in data.get("messages", [])
+            if m.get("role") in ("user", "assistant")
+        ],
+        character_name=(data.get("character") or {}).get("name", "Character"),
+        user_preferences=data.get("user_preferences") or {},
+        director_state=data.get("director_state") or {},
+        turn_count=int(data.get("turn_count") or 0),
+        generations_used=int(data.get("generations_used") or 0),
+    )
+
+
+def load_fixture(path: str) -> List[ReplaySession]:
+    """Load {"sessions": [{"id", "template", "character", "messages", ...}]}."""
+    with open(path) as f:
+        data = json.load(f)
+    return [session_from_dict(s) for s in data.get("sessions", [])]
+
+
+async def load_sessions_from_db(db, session_ids: Sequence[str]) -> List[Dict[str, Any]]:
+    """Read sessions as fixture dicts (replayed from turn 0 with empty state)."""
+    sessions = []
+    for session_id in session_ids:
+        row = await db.fetch_one(
+            """
+            SELECT s.id, s.user_id, c.name AS character_name, u.preferences,
+                   row_to_json(et.*) AS template
+            FROM sessions s
+            JOIN characters c ON c.id = s.character_id
+            LEFT JOIN users u ON u.id = s.user_id
+            LEFT JOIN episode_templates et ON et.id = s.episode_template_id
+            WHERE s.id = :session_id
+            """,
+            {"session_id": str(session_id)},
+        )
+        if not row:
+            log.warning(f"Replay: session {session_id} not found")
+            continue
+        messages = await db.fetch_all(
+            """
+            SELECT role, content FROM messages
+            WHERE episode_id = :session_id
+            ORDER BY created_at
+            """,
+            {"session_id": str(session_id)},
+        )
+        template = row["template"]
+        preferences = row["preferences"]
+        sessions.append({
+            "id": str(row["id"]),
+            "template": json.loads(template) if isinstance(template, str) else (template or {}),
+            "character": {"name": row["character_name"]},
+            "user_preferences": json.loads(preferences) if isinstance(preferences, str) else (preferences or {}),
+            "messages": [{"role": m["role"], "content": m["content"]} for m in messages],
+        })
+    return sessions
+
+
+# =============================================================================
+# Replay
+# =============================================================================
+
+def state_diff(before: Any, after: Any, path: str = "") -> List[Dict[str, Any]]:
+    """Changed paths between two director_state documents (lists compared whole)."""
+    if isinstance(before, dict) and isinstance(after, dict):
+        changes = []
+        for key in sorted(set(before) | set(after), key=str):
+            sub = f"{path}.{key}" if path else str(key)
+            if key not in after:
+                changes.append({"path": sub, "before": before[key], "after": None})
+            elif key not in before:
+                changes.append({"path": sub, "before": None, "after": after[key]})
+            else:
+                changes.extend(state_diff(before[key], after[key], sub))
+        return changes
+    if before != after:
+        return [{"path": path, "before": before, "after": after}]
+    return []
+
+
+@dataclass
+class TurnReport:
+    turn: int
+    llm_calls: Dict[str, int]
+    inline_ms: float
+    background_ms: float
+    events: List[Dict[str, Any]]
+    state_diff: List[Dict[str, Any]]
+
+
+@dataclass
+class SessionReport:
+    session_id: str
+    turns: List[TurnReport] = field(default_factory=list)
+    memories: int = 0
+    hooks: int = 0
+
+
+def _percentile(values: Sequence[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+@dataclass
+class ReplayReport:
+    sessions: List[SessionReport] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        turns = [t for s in self.sessions for t in s.turns]
+        calls: Dict[str, int] = {}
+        events: Dict[str, int] = {}
+        for t in turns:
+            for kind, n in t.llm_calls.items():
+                calls[kind] = calls.get(kind, 0) + n
+            for e in t.events:
+                events[e["type"]] = events.get(e["type"], 0) + 1
+        inline = [t.inline_ms for t in turns]
+        background = [t.background_ms for t in turns]
+        return {
+            "sessions": len(self.sessions),
+            "turns": len(turns),
+            "llm_calls": sum(calls.values()),
+            "llm_calls_per_turn": round(sum(calls.values()) / len(turns), 3) if turns else 0.0,
+            "llm_calls_by_kind": dict(sorted(calls.items())),
+            "inline_ms": {"p50": round(_percentile(inline, 50), 1), "p95": round(_percentile(inline, 95), 1)},
+            "background_ms": {"p50": round(_percentile(background, 50), 1), "p95": round(_percentile(background, 95), 1)},
+            "events": dict(sorted(events.items())),
+            "memories": sum(s.memories for s in self.sessions),
+            "hooks": sum(s.hooks for s in self.sessions),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"summary": self.summary(), "sessions": [asdict(s) for s in self.sessions]}
+
+
+class DirectorReplay:
+    """Replays sessions through the Director against a SimulatedLLM."""
+
+    def __init__(
+        self,
+        llm_factory: Callable[[], SimulatedLLM] = SimulatedLLM,
+        gate_config: Optional[ExtractionGateConfig] = None,
+    ):
+        self.llm_factory = llm_factory
+        self.gate_config = gate_config
+
+    async def run(self, sessions: Sequence[ReplaySession]) -> ReplayReport:
+        report = ReplayReport()
+        for session in sessions:
+            report.sessions.append(await self.replay_session(session))
+        return report
+
+    async def replay_session(self, recorded: ReplaySession) -> SessionReport:
+        llm = self.llm_factory()
+        memory = ReplayMemoryService(llm)
+        director = ReplayDirector(llm, memory, recorded.character_name, recorded.user_preferences, self.gate_config)
+        director.state = copy.deepcopy(recorded.director_state)
+        director.turn_count = recorded.turn_count
+
+        template = recorded.template
+        plan = build_plan(
+            beats=template.beats,
+            choice_points=template.choice_points,
+            success_condition=template.success_condition,
+            failure_condition=template.failure_condition,
+            turn_budget=template.turn_budget,
+            template_id=str(template.id),
+            flag_context_rules=template.flag_context_rules,
+        )
+        session_id = uuid.UUID(recorded.id) if _is_uuid(recorded.id) else uuid.uuid4()
+        user_id = uuid.uuid4()
+        character_id = uuid.uuid4()
+
+        generations_used = recorded.generations_used
+        report = SessionReport(session_id=recorded.id)
+        history: List[Dict[str, str]] = []
+        for user_msg, assistant_msg in _exchanges(recorded.messages):
+            before = copy.deepcopy(director.state)
+            calls_before = len(llm.calls)
+            events: List[Dict[str, Any]] = []
+
+            def emit(event_type: str, events: List[Dict[str, Any]] = events, **data: Any) -> None:
+                events.append({"type": event_type, "t_ms": round(llm.clock_ms, 1), **data})
+
+            # 1. Pre-guidance (before the character LLM)
+            guidance = director.generate_pre_guidance(
+                genre=template.genre,
+                situation=template.situation or "",
+                turn_count=director.turn_count,
+                turn_budget=template.turn_budget,
+                plan=plan,
+                beat_states=director.state.get("beats", {}),
+                flags=director.state.get("flags", {}),
+            )
+            if guidance.beat_directive:
+                emit("beat_directive", beat_id=guidance.beat_directive.beat_id, urgency=guidance.beat_directive.urgency)
+
+            history = history + [user_msg, assistant_msg]
+            next_turn = director.turn_count + 1
+
+            # 2. Inline objective/choice/beat checks
+            inline_start = llm.clock_ms
+            await self._inline_checks(director, template, plan, history, assistant_msg["content"], next_turn, emit)
+            inline_ms = llm.clock_ms - inline_start
+
+            # 3. Background Director processing
+            background_start = llm.clock_ms
+            session = Session(
+                id=session_id,
+                user_id=user_id,
+                character_id=character_id,
+                episode_template_id=template.id,
+                episode_number=template.episode_number,
+                started_at=datetime.now(timezone.utc),
+                created_at=datetime.now(timezone.utc),
+                turn_count=director.turn_count,
+                director_state=copy.deepcopy(director.state),
+                generations_used=generations_used,
+            )
+            output = await director.process_exchange(
+                session=session,
+                episode_template=template,
+                messages=history,
+                character_id=character_id,
+                user_id=user_id,
+            )
+            background_ms = llm.clock_ms - background_start
+
+            extraction = director.state.get("extraction", {})
+            emit("extraction", reason=extraction.get("last_reason"),
+                 memories=len(output.extracted_memories), hooks=len(output.extracted_hooks))
+            if output.actions.visual_type not in ("none", None):
+                # The chat path's auto-scene spends one generation from the budget
+                generations_used += 1
+                emit("visual", hint=output.actions.visual_hint)
+            if output.suggest_next:
+                emit("suggest_next", trigger=output.suggestion_trigger)
+
+            calls: Dict[str, int] = {}
+            for call in llm.calls[calls_before:]:
+                calls[call.kind] = calls.get(call.kind, 0) + 1
+            report.turns.append(TurnReport(
+                turn=director.turn_count,
+                llm_calls=calls,
+                inline_ms=round(inline_ms, 1),
+                background_ms=round(background_ms, 1),
+                events=events,
+                state_diff=state_diff(before, director.state),
+            ))
+
+        report.memories = len(memory.memories)
+        report.hooks = len(memory.hooks)
+        return report
+
+    async def _inline_checks(self, director, template, plan, history, response, next_turn, emit) -> None:
+        """Objective, choice point and beat checks as send_message_stream runs them."""
+        if not template.user_objective:
+            return
+
+        state = director.state
+        objectives_state = state.get("objectives", {})
+        if objectives_state.get("status") not in ("completed", "failed"):
+            evaluation = await director.evaluate_objective(
+                objective=template.user_objective,
+                success_condition=plan.success_condition,
+                messages=history,
+                character_response=response,
+                turn_count=next_turn,
+                turn_budget=template.turn_budget,
+                current_flags=state.get("flags", {}),
+            )
+            patch = DirectorStatePatch()
+            if evaluation.status == "completed":
+                emit("objective_completed", turn=next_turn)
+                patch.merge("objectives", {"status": "completed", "completed_at_turn": next_turn})
+                if template.on_success.get("set_flag"):
+                    patch.merge("flags", {template.on_success["set_flag"]: True})
+            elif director.check_failure_condition(
+                plan.failure_condition, next_turn, template.turn_budget,
+                current_flags=state.get("flags", {}), character_response=response,
+            ):
+                emit("objective_failed", turn=next_turn)
+                patch.merge("objectives", {"status": "failed"})
+                if template.on_failure.get("set_flag"):
+                    patch.merge("flags", {template.on_failure["set_flag"]: True})
+            state = director.state = patch.apply_to(state)
+
+        if plan.has_choice_points:
+            completed = ["primary"] if state.get("objectives", {}).get("status") == "completed" else []
+            triggered = director.check_choice_point_trigger(
+                plan=plan,
+                turn_count=next_turn,
+                completed_objectives=completed,
+                triggered_choice_ids=state.get("triggered_choices", []),
+            )
+            if triggered:
+                emit("choice_point", id=triggered.id, mode=triggered.mode)
+
+        beat_states = state.get("beats", {})
+        for beat in plan.choice_beats_open_at(next_turn):
+            if beat_states.get(beat.id, {}).get("status") in ("detected", "completed"):
+                continue
+            if await director.detect_beat_completion(beat=beat, character_response=response, messages=history):
+                emit("beat_detected", beat_id=beat.id)
+                director.state = DirectorStatePatch().set(("beats", beat.id), {
+                    "status": "detected",
+                    "detected_at_turn": next_turn,
+                    "choice_pending": True,
+                }).apply_to(director.state)
+                triggered = director.check_beat_choice_point(beat=beat, character_response=response)
+                if triggered:
+                    emit("choice_point", id=triggered.id, mode=triggered.mode, beat_id=beat.id)
+                break
+
+
+def _exchanges(messages: Sequence[Dict[str, str]]):
+    """(user, assistant) pairs; unpaired messages are skipped."""
+    pending_user = None
+    for message in messages:
+        if message["role"] == "user":
+            pending_user = message
+        elif pending_user is not None:
+            yield pending_user, message
+            pending_user = None
+
+
+def _is_uuid(value: str) -> bool:
+    try:
+        uuid.UUID(value)
+        return True
+    except ValueError:
+        return False
@@ -0,0 +1,136 @@
+"""Partial updates for sessions.director_state.
+
+Writers used to read director_state, change a few keys and write the whole
+document back. The inline (send_message_stream objectives/beats, choice
+endpoint) and background (Director process_exchange) writers for a session
+could interleave and clobber each other's keys, and every write re-sent the
+visual_decisions history and the last evaluation's raw LLM output.
+
+A DirectorStatePatch records only the changed paths and is applied in SQL by
+director_state_patch (migration 074) against the row's current value:
+
+    patch = DirectorStatePatch()
+    patch.set(("beats", beat_id), {"status": "detected"})
+    patch.merge("flags", {"trust": True})
+    patch.append("visual_decisions", decision, keep=10)
+    await patch.apply(db, session_id)
+
+patch.apply_to(state) mirrors the same operations on an in-memory dict, so a
+caller that keeps using its copy of director_state stays consistent.
+
+Environment variables:
+- DIRECTOR_RAW_RESPONSE_MAX_CHARS: Max characters of LLM output kept in
+  director_state.last_evaluation.raw_response (default: 1000)
+"""
+
+import copy
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+log = logging.getLogger(__name__)
+
+RAW_RESPONSE_MAX_CHARS = int(os.getenv("DIRECTOR_RAW_RESPONSE_MAX_CHARS", 1000))
+
+Path = Union[str, Sequence[str]]
+
+
+def cap_raw_response(text: Optional[str], limit: int = RAW_RESPONSE_MAX_CHARS) -> str:
+    """Truncate LLM output stored for observability."""
+    if not text:
+        return ""
+    if len(text) <= limit:
+        return text
+    return text[:limit] + f"... [{len(text) - limit} chars truncated]"
+
+
+def _path(path: Path) -> Tuple[str, ...]:
+    if isinstance(path, str):
+        return (path,)
+    return tuple(str(p) for p in path)
+
+
+class DirectorStatePatch:
+    """Path operations on director_state, applied atomically in one UPDATE."""
+
+    def __init__(self):
+        self.ops: List[Dict[str, Any]] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.ops)
+
+    def set(self, path: Path, value: Any) -> "DirectorStatePatch":
+        """Replace the value at path."""
+        self.ops.append({"op": "set", "path": list(_path(path)), "value": value})
+        return self
+
+    def merge(self, path: Path, value: Dict[str, Any]) -> "DirectorStatePatch":
+        """Shallow-merge keys into the object at path."""
+        self.ops.append({"op": "merge", "path": list(_path(path)), "value": value})
+        return self
+
+    def append(self, path: Path, value: Any, keep: Optional[int] = None) -> "DirectorStatePatch":
+        """Append to the array at path, keeping only the last `keep` items."""
+        op = {"op": "append", "path": list(_path(path)), "value": value}
+        if keep is not None:
+            op["keep"] = keep
+        self.ops.append(op)
+        return self
+
+    def add_unique(self, path: Path, value: Any) -> "DirectorStatePatch":
+        """Append a scalar to the array at path unless already present."""
+        self.ops.append({"op": "add_unique", "path": list(_path(path)), "value": value})
+        return self
+
+    def to_json(self) -> str:
+        return json.dumps(self.ops)
+
+    def apply_to(self, state: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Apply the operations to a copy of state (same semantics as the SQL)."""
+        result = copy.deepcopy(state) if isinstance(state, dict) else {}
+        for op in self.ops:
+            *parents, leaf = op["path"]
+            target = result
+            for key in parents:
+                if not isinstance(target.get(key), dict):
+                    target[key] = {}
+                target = target[key]
+
+            current = target.get(leaf)
+            value = copy.deepcopy(op["value"])
+            if op["op"] == "set":
+                target[leaf] = value
+            elif op["op"] == "merge":
+                target[leaf] = {**(current if isinstance(current, dict) else {}), **value}
+            elif op["op"] == "append":
+                items = (current if isinstance(current, list) else []) + [value]
+                keep = op.get("keep")
+                target[leaf] = items[-keep:] if keep is not None and len(items) > keep else items
+            elif op["op"] == "add_unique":
+                items = current if isinstance(current, list) else []
+                target[leaf] = items if value in items else items + [value]
+        return result
+
+    async def apply(self, db, session_id: Any, **columns: Any) -> None:
+        """UPDATE sessions with this patch, plus any plain column assignments."""
+        if not self.ops and not columns:
+            return
+
+        assignments = [f"{column} = :{column}" for column in columns]
+        if self.ops:
+            assignments.insert(
+                0,
+                "director_state = director_state_patch(director_state, CAST(:director_state_ops AS jsonb))",
+            )
+
+        values = dict(columns)
+        values["session_id"] = str(session_id)
+        if self.ops:
+            values["director_state_ops"] = self.to_json()
+
+        await db.execute(
+            f"UPDATE sessions SET {', '.join(assignments)} WHERE id = :session_id",
+            values,
+        )
+        log.debug(f"director_state patch for session {session_id}: {len(self.ops)} ops")
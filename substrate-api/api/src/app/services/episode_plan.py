@@ -0,0 +1,556 @@
+"""Compiled episode plans for the Director (ADR-008/ADR-009).
+
+Every streamed turn used to re-walk the template's beats and choice points:
+model_dump() each one, re-derive deadlines, re-split keyword criteria and
+re-parse the success/failure condition strings - twice per turn (pre-guidance
+and post-evaluation). None of that changes between turns, only between
+template edits.
+
+An EpisodePlan is the template's Director-facing structure compiled once per
+template version (id + updated_at) and shared read-only by every session
+playing it:
+
+- beats in dependency (requires_beat) order, each with its deadline and
+  detection keywords precomputed
+- turn-indexed tables of the beats open at each turn (directive candidates
+  and beat choice-point candidates), so a turn lookup is one index
+- choice points indexed by trigger turn and by after_objective id
+- success/failure conditions parsed into CompiledCondition
+- flag_context_rules indexed by flag (FlagContextIndex)
+
+Plans hold no session state; beat_states/flags/triggered choices stay in
+session.director_state and are passed in per call.
+
+Condition language (success_condition / failure_condition):
+
+    term        semantic:<criteria> | keyword:<a,b,...> | turn:<N> | flag:<name>
+                | turn_budget_exceeded
+    expression  term [AND term ...] [OR term [AND term ...] ...]
+
+AND binds tighter than OR; the operators are upper case with spaces around
+them. A string whose parts don't all start with a known term is one term, so
+existing criteria are never split. A flag: or turn: term whose value still
+contains an operator word ("flag:a AND", "flag:a and flag:b") is malformed:
+it is logged and compiles to "unknown" (never met) rather than to a flag
+named "a AND". Keyword lists are trimmed and lower-cased at parse time. evaluate_condition() decides everything
+but semantic terms; resolve_condition() asks the LLM only for semantic terms
+whose answer still decides the result.
+
+Environment variables:
+- EPISODE_PLAN_CACHE_SIZE: Compiled plans kept per process (default: 512)
+"""
+
+import json
+import logging
+import os
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from app.models.episode_template import EpisodeTemplate
+
+log = logging.getLogger(__name__)
+
+# Beats without a target turn never open (matches the old .get("target_turn", 999))
+UNSCHEDULED_TURN = 999
+
+# Beats open one turn before their target (directive "suggested")
+OPEN_TURNS_BEFORE_TARGET = 1
+
+# Default gap between target_turn and deadline_turn when a beat omits it
+DEFAULT_DEADLINE_GAP = 2
+
+
+TERM_KINDS = ("semantic", "keyword", "turn", "flag")
+
+_OR = re.compile(r"\s+OR\s+")
+_AND = re.compile(r"\s+AND\s+")
+
+# An operator word left inside a flag:/turn: value (dangling or lower case)
+_STRAY_OPERATOR = re.compile(r"(?:^|\s)(?:AND|OR)(?:\s|$)", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class CompiledCondition:
+    """A parsed success/failure condition.
+
+    kind is "semantic" | "keyword" | "turn" | "flag" | "turn_budget_exceeded",
+    "all" / "any" for AND / OR groups (terms), or "none" for an empty
+    condition and "unknown" for one that didn't parse.
+    """
+
+    kind: str
+    raw: str = ""
+    value: str = ""
+    keywords: Tuple[str, ...] = ()
+    turn: Optional[int] = None
+    terms: Tuple["CompiledCondition", ...] = ()
+    has_semantic: bool = False  # evaluating it may need an LLM call
+
+
+def _is_term(raw: str) -> bool:
+    raw = raw.strip()
+    return raw == "turn_budget_exceeded" or raw.partition(":")[0] in TERM_KINDS
+
+
+def _group(kind: str, raw: str, terms: Sequence[CompiledCondition]) -> CompiledCondition:
+    # Decidable terms first, so semantic terms are reached last
+    ordered = sorted(terms, key=lambda t: t.has_semantic)
+    return CompiledCondition(
+        kind=kind,
+        raw=raw,
+        terms=tuple(ordered),
+        has_semantic=any(t.has_semantic for t in ordered),
+    )
+
+
+@lru_cache(maxsize=1024)
+def _parse_condition(raw: str) -> CompiledCondition:
+    if not raw:
+        return CompiledCondition(kind="none")
+
+    alternatives = _OR.split(raw)
+    conjunctions = [_AND.split(a) for a in alternatives]
+    if len(alternatives) > 1 or len(conjunctions[0]) > 1:
+        if all(_is_term(t) for terms in conjunctions for t in terms):
+            groups = [
+                _group("all", a, [_parse_term(t.strip()) for t in terms]) if len(terms) > 1 else _parse_term(a.strip())
+                for a, terms in zip(alternatives, conjunctions, strict=True)
+            ]
+            return groups[0] if len(groups) == 1 else _group("any", raw, groups)
+
+    return _parse_term(raw)
+
+
+def _parse_term(raw: str) -> CompiledCondition:
+    if raw == "turn_budget_exceeded":
+        return CompiledCondition(kind="turn_budget_exceeded", raw=raw)
+
+    kind, sep, value = raw.partition(":")
+    if not sep or kind not in TERM_KINDS:
+        log.warning(f"Unrecognised episode condition: {raw!r}")
+        return CompiledCondition(kind="unknown", raw=raw)
+
+    if kind in ("flag", "turn") and _STRAY_OPERATOR.search(value):
+        log.warning(
+            f"Malformed episode condition {raw!r}: operators must be upper case "
+            f"AND/OR with a term on each side"
+        )
+        return CompiledCondition(kind="unknown", raw=raw)
+
+    if kind == "keyword":
+        keywords = tuple(k.strip().lower() for k in value.split(",") if k.strip())
+        return CompiledCondition(kind=kind, raw=raw, value=value, keywords=keywords)
+    if kind == "turn":
+        try:
+            return CompiledCondition(kind=kind, raw=raw, value=value, turn=int(value))
+        except ValueError:
+            log.warning(f"Invalid turn condition: {raw!r}")
+            return CompiledCondition(kind="unknown", raw=raw)
+    return CompiledCondition(kind=kind, raw=raw, value=value, has_semantic=kind == "semantic")
+
+
+def parse_condition(condition: Union[str, CompiledCondition, None]) -> CompiledCondition:
+    """Parse a condition expression (see the module docstring)."""
+    if isinstance(condition, CompiledCondition):
+        return condition
+    return _parse_condition(condition or "")
+
+
+@dataclass(frozen=True)
+class ConditionFacts:
+    """What a condition is evaluated against on one turn."""
+
+    turn_count: int
+    turn_budget: Optional[int] = None
+    flags: Mapping[str, Any] = field(default_factory=dict)
+    response: str = ""
+    # Failure conditions read turn:<N> as "past turn N" rather than "reached turn N"
+    failure: bool = False
+
+
+def evaluate_condition(condition: CompiledCondition, facts: ConditionFacts) -> Optional[bool]:
+    """Evaluate without any LLM call.
+
+    Returns None when the result depends on a semantic term; "none" and
+    "unknown" conditions are never met.
+    """
+    kind = condition.kind
+    if kind in ("all", "any"):
+        decisive = kind == "any"  # a True decides OR, a False decides AND
+        result: Optional[bool] = not decisive
+        for term in condition.terms:
+            value = evaluate_condition(term, facts)
+            if value is decisive:
+                return decisive
+            if value is None:
+                result = None
+        return result
+    if kind == "semantic":
+        return None
+    if kind == "turn":
+        return facts.turn_count > condition.turn if facts.failure else facts.turn_count >= condition.turn
+    if kind == "flag":
+        return bool(facts.flags.get(condition.value))
+    if kind == "keyword":
+        response_lower = facts.response.lower()
+        return any(keyword in response_lower for keyword in condition.keywords)
+    if kind == "turn_budget_exceeded":
+        return bool(facts.turn_budget and facts.turn_budget > 0 and facts.turn_count > facts.turn_budget)
+    return False
+
+
+async def resolve_condition(
+    condition: CompiledCondition,
+    facts: ConditionFacts,
+    judge: Callable[[str], Awaitable[bool]],
+) -> bool:
+    """Evaluate fully, calling judge(criteria) only for semantic terms that decide the result.
+
+    Each distinct criteria string is judged at most once per call.
+    """
+    verdicts: Dict[str, bool] = {}
+
+    async def resolve(c: CompiledCondition) -> bool:
+        known = evaluate_condition(c, facts)
+        if known is not None:
+            return known
+        if c.kind == "semantic":
+            if c.value not in verdicts:
+                verdicts[c.value] = await judge(c.value)
+            return verdicts[c.value]
+        if c.kind == "all":
+            for term in c.terms:
+                if not await resolve(term):
+                    return False
+            return True
+        for term in c.terms:
+            if await resolve(term):
+                return True
+        return False
+
+    return await resolve(condition)
+
+
+@dataclass(frozen=True)
+class FlagContextIndex:
+    """flag_context_rules indexed by flag; injections keep their authored order."""
+
+    injects: Tuple[str, ...] = ()
+    by_flag: Dict[str, Tuple[int, ...]] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(self.injects)
+
+    def inject_for(self, flags: Mapping[str, Any]) -> List[str]:
+        """Context to inject for the set (truthy) flags."""
+        if not flags or not self.by_flag:
+            return []
+        positions = sorted(
+            i
+            for flag, value in flags.items() if value
+            for i in self.by_flag.get(flag, ())
+        )
+        return [self.injects[i] for i in positions]
+
+
+def compile_flag_context(rules: Any) -> FlagContextIndex:
+    """Index flag_context_rules (JSON text, dicts or FlagContextRule models)."""
+    if isinstance(rules, str):
+        try:
+            rules = json.loads(rules)
+        except (json.JSONDecodeError, TypeError):
+            rules = []
+    injects: List[str] = []
+    by_flag: Dict[str, List[int]] = {}
+    for rule in rules or []:
+        flag_name = _field(rule, "if_flag", "") or ""
+        inject_text = _field(rule, "inject", "") or ""
+        if flag_name and inject_text:
+            by_flag.setdefault(flag_name, []).append(len(injects))
+            injects.append(inject_text)
+    return FlagContextIndex(
+        injects=tuple(injects),
+        by_flag={flag: tuple(positions) for flag, positions in by_flag.items()},
+    )
+
+
+@dataclass(frozen=True)
+class CompiledChoicePoint:
+    """A choice point with its trigger parsed and choices flattened."""
+
+    id: str
+    prompt: str
+    choices: Tuple[Tuple[str, str], ...]  # (id, label)
+    trigger: str = ""
+    trigger_turn: Optional[int] = None
+    trigger_objective: Optional[str] = None
+    index: int = 0  # position in template.choice_points (first match wins)
+
+    def choice_dicts(self) -> List[Dict[str, str]]:
+        return [{"id": choice_id, "label": label} for choice_id, label in self.choices]
+
+
+@dataclass(frozen=True)
+class CompiledBeat:
+    """A beat with everything the Director reads per turn precomputed."""
+
+    id: str
+    description: str
+    character_instruction: str
+    target_turn: int
+    deadline_turn: int
+    detection_type: str = "semantic"
+    detection_criteria: str = ""
+    keywords: Tuple[str, ...] = ()  # lowercased detection keywords
+    choice_point: Optional[CompiledChoicePoint] = None
+    requires_beat: Optional[str] = None
+    requires_flag: Optional[str] = None
+
+    @property
+    def opens_at_turn(self) -> int:
+        return self.target_turn - OPEN_TURNS_BEFORE_TARGET
+
+
+def _field(obj: Any, name: str, default: Any = None) -> Any:
+    """Read a field from a pydantic model or a plain dict."""
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+def compile_choice_point(choice_point: Any, index: int = 0, default_id: str = "") -> CompiledChoicePoint:
+    trigger = _field(choice_point, "trigger", "") or ""
+    trigger_turn = None
+    trigger_objective = None
+    if trigger.startswith("turn:"):
+        try:
+            trigger_turn = int(trigger[len("turn:"):])
+        except ValueError:
+            log.warning(f"Invalid choice point trigger: {trigger!r}")
+    elif trigger.startswith("after_objective:"):
+        trigger_objective = trigger[len("after_objective:"):]
+
+    return CompiledChoicePoint(
+        id=_field(choice_point, "id", default_id) or default_id,
+        prompt=_field(choice_point, "prompt", "") or "",
+        choices=tuple(
+            (_field(c, "id", "") or "", _field(c, "label", "") or "")
+            for c in _field(choice_point, "choices", None) or []
+        ),
+        trigger=trigger,
+        trigger_turn=trigger_turn,
+        trigger_objective=trigger_objective,
+        index=index,
+    )
+
+
+def compile_beat(beat: Any) -> CompiledBeat:
+    beat_id = _field(beat, "id", "") or ""
+    target_turn = _field(beat, "target_turn", UNSCHEDULED_TURN)
+    deadline_turn = _field(beat, "deadline_turn", None)
+    if deadline_turn is None:
+        deadline_turn = target_turn + DEFAULT_DEADLINE_GAP
+    detection_criteria = _field(beat, "detection_criteria", "") or ""
+    choice_point = _field(beat, "choice_point", None)
+
+    return CompiledBeat(
+        id=beat_id,
+        description=_field(beat, "description", "") or "",
+        character_instruction=_field(beat, "character_instruction", "") or "",
+        target_turn=target_turn,
+        deadline_turn=deadline_turn,
+        detection_type=_field(beat, "detection_type", "semantic") or "semantic",
+        detection_criteria=detection_criteria,
+        keywords=tuple(k.strip().lower() for k in detection_criteria.split(",") if k.strip()),
+        choice_point=compile_choice_point(choice_point, default_id=beat_id) if choice_point else None,
+        requires_beat=_field(beat, "requires_beat", None),
+        requires_flag=_field(beat, "requires_flag", None),
+    )
+
+
+def order_beats(beats: Sequence[CompiledBeat]) -> Tuple[CompiledBeat, ...]:
+    """Authored order, except a beat never precedes the beat it requires.
+
+    Stable Kahn's sort: among beats whose dependency is placed, the earliest
+    authored goes first. Beats whose dependency is missing or cyclic can
+    never become eligible; they keep their relative order at the end.
+    """
+    placed: set = set()
+    ordered: List[CompiledBeat] = []
+    remaining = list(beats)
+    while True:
+        ready = next(
+            (b for b in remaining if not b.requires_beat or b.requires_beat in placed),
+            None,
+        )
+        if ready is None:
+            break
+        ordered.append(ready)
+        placed.add(ready.id)
+        remaining.remove(ready)
+    if remaining:
+        log.warning(f"Beats with unresolvable dependencies: {[b.id for b in remaining]}")
+    return tuple(ordered + remaining)
+
+
+@dataclass(frozen=True)
+class EpisodePlan:
+    """Immutable, Director-facing compilation of one EpisodeTemplate version."""
+
+    template_id: Optional[str]
+    version: Optional[str]
+    beats: Tuple[CompiledBeat, ...] = ()
+    choice_points: Tuple[CompiledChoicePoint, ...] = ()
+    success_condition: CompiledCondition = CompiledCondition(kind="none")
+    failure_condition: CompiledCondition = CompiledCondition(kind="none")
+    turn_budget: Optional[int] = None
+    # open_beats[t]: beats open at turn t (target_turn - 1 <= t), in plan order.
+    # Turns past the end of the table use the last entry.
+    open_beats: Tuple[Tuple[CompiledBeat, ...], ...] = ((),)
+    open_choice_beats: Tuple[Tuple[CompiledBeat, ...], ...] = ((),)
+    choice_points_by_turn: Dict[int, Tuple[CompiledChoicePoint, ...]] = field(default_factory=dict)
+    choice_points_by_objective: Dict[str, Tuple[CompiledChoicePoint, ...]] = field(default_factory=dict)
+    flag_context: FlagContextIndex = FlagContextIndex()
+
+    @property
+    def has_beats(self) -> bool:
+        return bool(self.beats)
+
+    @property
+    def has_choice_points(self) -> bool:
+        return bool(self.choice_points)
+
+    def beats_open_at(self, turn: int) -> Tuple[CompiledBeat, ...]:
+        """Beats whose directive window has opened by `turn`."""
+        return _at_turn(self.open_beats, turn)
+
+    def choice_beats_open_at(self, turn: int) -> Tuple[CompiledBeat, ...]:
+        """Beats with a choice point that may be detected at `turn`."""
+        return _at_turn(self.open_choice_beats, turn)
+
+    def choice_point_candidates(
+        self,
+        turn: int,
+        completed_objectives: Iterable[str],
+    ) -> List[CompiledChoicePoint]:
+        """Choice points whose trigger matches, in authored order."""
+        candidates = list(self.choice_points_by_turn.get(turn, ()))
+        for objective_id in completed_objectives:
+            candidates.extend(self.choice_points_by_objective.get(objective_id, ()))
+        candidates.sort(key=lambda cp: cp.index)
+        return candidates
+
+
+def _at_turn(table: Tuple[Tuple[CompiledBeat, ...], ...], turn: int) -> Tuple[CompiledBeat, ...]:
+    if turn < 0:
+        return ()
+    return table[min(turn, len(table) - 1)]
+
+
+def _turn_table(beats: Sequence[CompiledBeat]) -> Tuple[Tuple[CompiledBeat, ...], ...]:
+    """table[t] = beats with opens_at_turn <= t, for t up to the last opening turn."""
+    if not beats:
+        return ((),)
+    last = max(0, max(b.opens_at_turn for b in beats))
+    return tuple(tuple(b for b in beats if b.opens_at_turn <= t) for t in range(last + 1))
+
+
+def build_plan(
+    beats: Sequence[Any] = (),
+    choice_points: Sequence[Any] = (),
+    success_condition: Optional[str] = None,
+    failure_condition: Optional[str] = None,
+    turn_budget: Optional[int] = None,
+    template_id: Optional[str] = None,
+    version: Optional[str] = None,
+    flag_context_rules: Any = (),
+) -> EpisodePlan:
+    """Compile beats/choice points/flag context rules (models or dicts) into an EpisodePlan."""
+    compiled_beats = order_beats([compile_beat(b) for b in beats])
+    compiled_cps = tuple(compile_choice_point(cp, index=i) for i, cp in enumerate(choice_points))
+
+    by_turn: Dict[int, List[CompiledChoicePoint]] = {}
+    by_objective: Dict[str, List[CompiledChoicePoint]] = {}
+    for cp in compiled_cps:
+        if cp.trigger_turn is not None:
+            by_turn.setdefault(cp.trigger_turn, []).append(cp)
+        elif cp.trigger_objective is not None:
+            by_objective.setdefault(cp.trigger_objective, []).append(cp)
+
+    return EpisodePlan(
+        template_id=template_id,
+        version=version,
+        beats=compiled_beats,
+        choice_points=compiled_cps,
+        success_condition=parse_condition(success_condition),
+        failure_condition=parse_condition(failure_condition),
+        turn_budget=turn_budget,
+        open_beats=_turn_table(compiled_beats),
+        open_choice_beats=_turn_table([b for b in compiled_beats if b.choice_point]),
+        choice_points_by_turn={turn: tuple(cps) for turn, cps in by_turn.items()},
+        choice_points_by_objective={obj: tuple(cps) for obj, cps in by_objective.items()},
+        flag_context=compile_flag_context(flag_context_rules),
+    )
+
+
+class EpisodePlanCache:
+    """LRU of compiled plans keyed by (template id, updated_at)."""
+
+    _instance: Optional["EpisodePlanCache"] = None
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or int(os.getenv("EPISODE_PLAN_CACHE_SIZE", 512))
+        self._plans: "OrderedDict[Tuple[str, str], EpisodePlan]" = OrderedDict()
+        self.hits = 0
+        self.compiles = 0
+
+    @classmethod
+    def get_instance(cls) -> "EpisodePlanCache":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def get(self, template: EpisodeTemplate) -> EpisodePlan:
+        key = (str(template.id), template.updated_at.isoformat() if template.updated_at else "")
+        plan = self._plans.get(key)
+        if plan is not None:
+            self._plans.move_to_end(key)
+            self.hits += 1
+            return plan
+
+        plan = build_plan(
+            beats=template.beats or [],
+            choice_points=template.choice_points or [],
+            success_condition=template.success_condition,
+            failure_condition=template.failure_condition,
+            turn_budget=template.turn_budget,
+            template_id=key[0],
+            version=key[1],
+            flag_context_rules=template.flag_context_rules or [],
+        )
+        self.compiles += 1
+        # A new version supersedes older plans of the same template
+        for stale in [k for k in self._plans if k[0] == key[0]]:
+            del self._plans[stale]
+        self._plans[key] = plan
+        while len(self._plans) > self.max_entries:
+            self._plans.popitem(last=False)
+        return plan
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.compiles
+        return {
+            "plans": len(self._plans),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "compiles": self.compiles,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def get_episode_plan(template: EpisodeTemplate) -> EpisodePlan:
+    """Compiled plan for the template's current version (cached)."""
+    return EpisodePlanCache.get_instance().get(template)
@@ -0,0 +1,244 @@
+"""Extraction gate: decide which exchanges are worth memory/hook extraction.
+
+Director Phase 2 (process_exchange) used to run extract_memories and
+extract_hooks - two LLM calls - after every exchange, including one-word
+replies and pure banter. The gate is a cheap pre-filter (no LLM, no network)
+that runs first:
+
+1. first turn of a session           -> extract (introductions)
+2. disclosure cue in the user turn   -> extract ("my sister", "birthday", ...)
+3. N turns skipped in a row          -> extract over a batched window covering
+                                        every skipped turn ("cadence")
+4. short user turn                   -> skip
+5. user turn close to a memory we
+   already have (hashing embedder)   -> skip ("redundant")
+6. otherwise                         -> extract ("novel")
+
+Hook extraction additionally needs a time/plan cue ("tomorrow", "interview",
+"next week") in the window, since hooks are follow-ups on future events.
+
+The relationship beat used to come only from the memory extraction call.
+Every turn's beat now also comes from the Director's evaluate_exchange call,
+which runs on every turn anyway, so short emotional turns keep their tension
+changes and milestones at no extra LLM call, and a batched extraction
+classifies only its last exchange rather than collapsing the window into one
+beat.
+
+Skipped turns are counted in session.director_state["extraction"], so the
+cadence fallback survives across requests. After an extracting turn the
+count is reset only once extraction succeeded; a failed extraction keeps the
+window pending. Decisions are recorded in extraction_gate_stats
+(GET /health/extraction) with skip rate and LLM calls saved.
+
+Environment variables:
+- MEMORY_EXTRACTION_GATE: "false" to extract after every exchange (default: true)
+- MEMORY_EXTRACTION_EVERY_N_TURNS: Max consecutive skipped turns (default: 4)
+- MEMORY_EXTRACTION_MIN_WORDS: Shorter user turns are skipped (default: 4)
+- MEMORY_EXTRACTION_NOVELTY_THRESHOLD: Similarity to an existing memory at
+  which a turn counts as redundant (default: 0.8)
+- MEMORY_EXTRACTION_MAX_WINDOW: Max messages sent to a batched extraction (default: 12)
+"""
+
+import logging
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from app.models.memory import MemoryEvent
+from app.services.memory_index import HashingEmbedder
+
+log = logging.getLogger(__name__)
+
+# Extraction reads the last 3 exchanges when not batching
+DEFAULT_WINDOW = 6
+
+# Personal disclosures worth a memory even in a short turn
+DISCLOSURE_CUES = re.compile(
+    r"\b("
+    r"my name|call me|i'm from|i live|i work|my job|my boss|my (?:mom|mum|dad|mother|father|parents|"
+    r"sister|brother|wife|husband|boyfriend|girlfriend|partner|friend|kid|son|daughter|dog|cat)|"
+    r"birthday|anniversary|remember|allergic|afraid of|scared of|favou?rite|i (?:love|hate)|"
+    r"diagnosed|promoted|fired|moving|broke up|pregnant|graduat\w*"
+    r")\b",
+    re.IGNORECASE,
+)
+
+# Future events a hook can follow up on
+TIME_CUES = re.compile(
+    r"\b("
+    r"tomorrow|tonight|later today|this (?:weekend|week|evening)|next (?:week|month|year|time)|"
+    r"monday|tuesday|wednesday|thursday|friday|saturday|sunday|"
+    r"interview|exam|test|appointment|deadline|date|trip|flight|meeting|party|wedding|"
+    r"going to|gonna|planning|plan to|can't wait|soon"
+    r")\b",
+    re.IGNORECASE,
+)
+
+_WORDS = re.compile(r"[a-z0-9']+", re.IGNORECASE)
+
+
+@dataclass
+class ExtractionGateConfig:
+    """Settings for the extraction pre-filter."""
+
+    enabled: bool = True
+    every_n_turns: int = 4
+    min_words: int = 4
+    novelty_threshold: float = 0.8
+    max_window: int = 12
+
+    @classmethod
+    def from_env(cls) -> "ExtractionGateConfig":
+        return cls(
+            enabled=os.getenv("MEMORY_EXTRACTION_GATE", "true").lower() == "true",
+            every_n_turns=int(os.getenv("MEMORY_EXTRACTION_EVERY_N_TURNS", 4)),
+            min_words=int(os.getenv("MEMORY_EXTRACTION_MIN_WORDS", 4)),
+            novelty_threshold=float(os.getenv("MEMORY_EXTRACTION_NOVELTY_THRESHOLD", 0.8)),
+            max_window=int(os.getenv("MEMORY_EXTRACTION_MAX_WINDOW", 12)),
+        )
+
+
+@dataclass
+class ExtractionDecision:
+    """Whether to run extraction for this exchange, and over which window."""
+
+    extract_memories: bool
+    extract_hooks: bool
+    reason: str
+    window: int = DEFAULT_WINDOW
+    pending_turns: int = 0  # skipped turns carried forward after this one
+    pending_before: int = 0  # skipped turns this one inherited
+
+    def state(self) -> Dict[str, Any]:
+        """Entry for session.director_state["extraction"]."""
+        return {"pending_turns": self.pending_turns, "last_reason": self.reason}
+
+    def failed_state(self) -> Dict[str, Any]:
+        """Entry when extraction failed: this turn stays pending with the rest."""
+        return {"pending_turns": self.pending_before + 1, "last_reason": "extraction_failed"}
+
+
+class ExtractionGateStats:
+    """Per-reason decision counts and LLM calls saved since process start."""
+
+    def __init__(self):
+        self._reasons: Dict[str, int] = {}
+        self.turns = 0
+        self.memory_calls = 0
+        self.hook_calls = 0
+
+    def record(self, decision: ExtractionDecision) -> None:
+        self.turns += 1
+        self._reasons[decision.reason] = self._reasons.get(decision.reason, 0) + 1
+        self.memory_calls += int(decision.extract_memories)
+        self.hook_calls += int(decision.extract_hooks)
+
+    def snapshot(self) -> Dict[str, Any]:
+        skipped = self.turns - self.memory_calls
+        baseline = 2 * self.turns
+        llm_calls = self.memory_calls + self.hook_calls
+        return {
+            "turns": self.turns,
+            "extracted": self.memory_calls,
+            "skipped": skipped,
+            "skip_rate": round(skipped / self.turns, 4) if self.turns else 0.0,
+            "hook_calls": self.hook_calls,
+            "llm_calls": llm_calls,
+            "llm_calls_saved": baseline - llm_calls,
+            "llm_calls_per_turn": round(llm_calls / self.turns, 3) if self.turns else 0.0,
+            "reasons": dict(sorted(self._reasons.items())),
+        }
+
+
+extraction_gate_stats = ExtractionGateStats()
+
+
+class ExtractionGate:
+    """Cheap pre-filter in front of memory/hook extraction."""
+
+    _instance: Optional["ExtractionGate"] = None
+
+    def __init__(self, config: Optional[ExtractionGateConfig] = None):
+        self.config = config or ExtractionGateConfig.from_env()
+        self.embedder = HashingEmbedder()
+
+    @classmethod
+    def get_instance(cls) -> "ExtractionGate":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def decide(
+        self,
+        messages: Sequence[Dict[str, str]],
+        turn_count: int,
+        director_state: Optional[Dict[str, Any]],
+        existing_memories: Sequence[MemoryEvent],
+    ) -> ExtractionDecision:
+        """Decide for the exchange ending at messages[-1] and record the outcome."""
+        decision = self._decide(messages, turn_count, director_state, existing_memories)
+        extraction_gate_stats.record(decision)
+        log.debug(f"Extraction gate: turn={turn_count} {decision}")
+        return decision
+
+    def _decide(
+        self,
+        messages: Sequence[Dict[str, str]],
+        turn_count: int,
+        director_state: Optional[Dict[str, Any]],
+        existing_memories: Sequence[MemoryEvent],
+    ) -> ExtractionDecision:
+        if not self.config.enabled:
+            return ExtractionDecision(True, True, "gate_disabled")
+
+        pending = int(((director_state or {}).get("extraction") or {}).get("pending_turns", 0))
+        user_text = _last_user_message(messages)
+
+        if turn_count <= 1:
+            return self._extract("first_turn", messages, pending)
+        if DISCLOSURE_CUES.search(user_text):
+            return self._extract("disclosure", messages, pending)
+        if pending + 1 >= self.config.every_n_turns:
+            return self._extract("cadence", messages, pending)
+        if len(_WORDS.findall(user_text)) < self.config.min_words:
+            return ExtractionDecision(False, False, "short", pending_turns=pending + 1, pending_before=pending)
+        if self._max_similarity(user_text, existing_memories) >= self.config.novelty_threshold:
+            return ExtractionDecision(False, False, "redundant", pending_turns=pending + 1, pending_before=pending)
+        return self._extract("novel", messages, pending)
+
+    def _extract(self, reason: str, messages: Sequence[Dict[str, str]], pending: int) -> ExtractionDecision:
+        """Extract over the current exchange plus every skipped one (capped)."""
+        window = min(self.config.max_window, max(DEFAULT_WINDOW, 2 * (pending + 1)))
+        window_user_text = " ".join(
+            m.get("content", "") for m in messages[-window:] if m.get("role") == "user"
+        )
+        return ExtractionDecision(
+            extract_memories=True,
+            extract_hooks=bool(TIME_CUES.search(window_user_text)),
+            reason=reason,
+            window=window,
+            pending_before=pending,
+        )
+
+    def _max_similarity(self, text: str, memories: Sequence[MemoryEvent]) -> float:
+        summaries = [m.summary for m in memories if m.summary]
+        if not summaries or not text:
+            return 0.0
+        query = self.embedder.embed_one(text)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return 1.0  # nothing but stopwords
+        matrix = np.stack([self.embedder.embed_one(s) for s in summaries])
+        norms = np.linalg.norm(matrix, axis=1)
+        norms[norms == 0] = 1.0
+        return float(np.max(matrix @ query / (norms * norm)))
+
+
+def _last_user_message(messages: Sequence[Dict[str, str]]) -> str:
+    for message in reversed(messages):
+        if message.get("role") == "user":
+            return message.get("content") or ""
+    return ""
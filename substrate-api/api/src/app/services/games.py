@@ -165,6 +165,7 @@ class GamesService:
             user_id=user_id,
             character_id=session.character_id,
             episode_id=session_id,
+            query_text=content,
         )
 
         # Save user message
@@ -244,6 +245,7 @@ class GamesService:
             user_id=user_id,
             character_id=session.character_id,
             episode_id=session_id,
+            query_text=content,
         )
 
         # Save user message
@@ -254,21 +256,23 @@ class GamesService:
         )
         context.messages.append({"role": "user", "content": content})
 
-        # Generate response (plain text, not structured JSON)
-        # The Flirt Test characters use prose format with *actions* inline
+        # Generate structured response, streaming action/dialogue as they arrive.
+        # Rendered as *action* "dialogue" (render_structured_response), same
+        # prose shape the Flirt Test characters use; mood/tension_shift arrive
+        # with the final event.
         formatted_messages = context.to_messages()
-        response = await self.llm.generate(
+        display_content = ""
+        structured_response: Dict[str, Any] = {}
+        async for event in self.llm.generate_structured_stream(
             messages=formatted_messages,
-            max_tokens=500,  # Enough for 2-3 sentences + actions
-        )
-
-        display_content = response.content.strip()
-        structured_response = {"dialogue": display_content, "mood": "engaged"}
-
-        # Stream the display content in chunks
-        for i in range(0, len(display_content), 10):
-            chunk = display_content[i:i+10]
-            yield json.dumps({"type": "chunk", "content": chunk})
+            max_tokens=600,  # 2-3 sentences + actions, plus JSON overhead
+            call_site="games.send_message_stream",
+        ):
+            if event.type == "chunk":
+                yield json.dumps({"type": "chunk", "content": event.content})
+            elif event.type == "complete":
+                display_content = event.content.strip()
+                structured_response = event.structured or {}
 
         # Save message
         await self.conversation_service._save_message(
@@ -309,6 +313,7 @@ class GamesService:
                 "turn_count": director_output.turn_count,
                 "turns_remaining": turns_remaining,
                 "mood": structured_response.get("mood"),
+                "tension_shift": structured_response.get("tension_shift"),
             })
 
         yield json.dumps({"type": "done"})
@@ -0,0 +1,168 @@
+"""Due-hook scheduling.
+
+Hooks ("ask how the interview went") are written with an optional
+trigger_after/trigger_before window. Rather than filtering every hook on each
+chat turn, a periodic job moves hooks through a small lifecycle (migration 071):
+
+- promote_due(): scheduled hooks whose trigger_after has passed get ready_at
+  and enter the ready set (hooks already due on insert are ready immediately)
+- retire_expired(): untriggered hooks past trigger_before are deactivated
+
+The chat path (READY_HOOKS_QUERY) reads the ready set, served in priority
+order straight from the partial index idx_hooks_ready, plus any scheduled
+hooks that came due since the last run, so promotion never delays a hook.
+
+Both job steps run in batches so a backlog never holds long row locks.
+
+Run: python -m app.scripts.schedule_hooks
+Benchmark: python -m app.scripts.benchmark_hooks
+"""
+
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional
+
+from app.models.hook import HOOK_COLUMNS
+
+log = logging.getLogger(__name__)
+
+# Queries take the table name so the benchmark can run them on a scratch copy
+
+# Ready set (idx_hooks_ready) plus hooks that came due since the last
+# scheduler run and haven't been promoted yet (idx_hooks_due), so a
+# hook surfaces as soon as trigger_after passes rather than on the next run
+READY_HOOKS_QUERY = f"""
+    SELECT {HOOK_COLUMNS} FROM (
+        (
+            SELECT {HOOK_COLUMNS} FROM {{table}}
+            WHERE user_id = :user_id
+                AND character_id = :character_id
+                AND ready_at IS NOT NULL
+                AND is_active = TRUE
+                AND triggered_at IS NULL
+                AND (trigger_before IS NULL OR trigger_before >= NOW())
+            ORDER BY priority DESC, trigger_after ASC NULLS LAST
+            LIMIT :limit
+        )
+        UNION ALL
+        (
+            SELECT {HOOK_COLUMNS} FROM {{table}}
+            WHERE ready_at IS NULL
+                AND is_active = TRUE
+                AND triggered_at IS NULL
+                AND trigger_after <= NOW()
+                AND user_id = :user_id
+                AND character_id = :character_id
+                AND (trigger_before IS NULL OR trigger_before >= NOW())
+        )
+    ) hooks_due
+    ORDER BY priority DESC, trigger_after ASC NULLS LAST
+    LIMIT :limit
+"""
+
+PROMOTE_DUE_QUERY = """
+    WITH due AS (
+        SELECT id FROM {table}
+        WHERE ready_at IS NULL
+            AND is_active = TRUE
+            AND triggered_at IS NULL
+            AND trigger_after <= NOW()
+        ORDER BY trigger_after
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE {table} h
+    SET ready_at = NOW()
+    FROM due
+    WHERE h.id = due.id
+    RETURNING h.id
+"""
+
+RETIRE_EXPIRED_QUERY = """
+    WITH expired AS (
+        SELECT id FROM {table}
+        WHERE trigger_before IS NOT NULL
+            AND is_active = TRUE
+            AND triggered_at IS NULL
+            AND trigger_before < NOW()
+        ORDER BY trigger_before
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE {table} h
+    SET is_active = FALSE, retired_at = NOW()
+    FROM expired
+    WHERE h.id = expired.id
+    RETURNING h.id
+"""
+
+
+@dataclass
+class HookSchedulerConfig:
+    """Settings for the hook scheduler job."""
+
+    batch_size: int = 5000
+    max_batches: int = 100
+
+    @classmethod
+    def from_env(cls) -> "HookSchedulerConfig":
+        return cls(
+            batch_size=int(os.getenv("HOOK_SCHEDULER_BATCH_SIZE", 5000)),
+            max_batches=int(os.getenv("HOOK_SCHEDULER_MAX_BATCHES", 100)),
+        )
+
+
+@dataclass
+class HookSchedulerReport:
+    """Outcome of one scheduler run."""
+
+    promoted: int = 0
+    retired: int = 0
+    duration_ms: float = 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        data = asdict(self)
+        data["duration_ms"] = round(self.duration_ms, 1)
+        return data
+
+
+class HookScheduler:
+    """Promotes due hooks into the ready set and retires expired ones."""
+
+    def __init__(self, db, config: Optional[HookSchedulerConfig] = None, table: str = "hooks"):
+        self.db = db
+        self.config = config or HookSchedulerConfig.from_env()
+        self.table = table
+
+    async def promote_due(self) -> int:
+        """Move every due scheduled hook into the ready set. Returns count."""
+        return await self._drain(PROMOTE_DUE_QUERY)
+
+    async def retire_expired(self) -> int:
+        """Deactivate every untriggered hook past trigger_before. Returns count."""
+        return await self._drain(RETIRE_EXPIRED_QUERY)
+
+    async def run(self) -> HookSchedulerReport:
+        """One scheduler pass: retire first so expired hooks are never promoted."""
+        started = time.perf_counter()
+        report = HookSchedulerReport()
+        report.retired = await self.retire_expired()
+        report.promoted = await self.promote_due()
+        report.duration_ms = (time.perf_counter() - started) * 1000
+        log.info(f"Hook scheduler: {report.to_dict()}")
+        return report
+
+    async def _drain(self, query: str) -> int:
+        """Run a batched UPDATE until a batch comes back short."""
+        total = 0
+        sql = query.format(table=self.table)
+        for _ in range(self.config.max_batches):
+            rows = await self.db.fetch_all(sql, {"batch_size": self.config.batch_size})
+            total += len(rows)
+            if len(rows) < self.config.batch_size:
+                break
+        else:
+            log.warning(f"Hook scheduler stopped after {self.config.max_batches} batches; backlog remains")
+        return total
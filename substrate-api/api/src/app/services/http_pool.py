@@ -0,0 +1,298 @@
+"""Shared outbound HTTP layer for provider clients.
+
+LLM, image and storage clients all talk to a handful of hosts (Gemini,
+Replicate, Supabase, ...). Instead of each client owning a default
+httpx.AsyncClient, clients share a connection pool per purpose with explicit
+limits and keep-alive, optional HTTP/2, and per-host metrics. Connections to
+configured providers are opened during app startup (warmup) so the first
+requests after a deploy don't pay TCP + TLS setup.
+
+Pools are split by purpose so one kind of traffic can't starve another
+(a burst of image polling never leaves an LLM stream waiting on PoolTimeout):
+- llm: chat/structured generation and embeddings. Streams hold a connection
+  for the whole response (often 10-30s), so this pool is sized for the
+  number of concurrent turns per worker plus background calls (Director,
+  memory extraction, hedged requests).
+- image: Replicate/Gemini predictions, status polling and image downloads.
+  Requests are short; concurrency is bounded by scene generation leases.
+- storage: Supabase storage uploads and signed URLs.
+
+Environment variables:
+- HTTP_MAX_CONNECTIONS_LLM: Max open connections in the llm pool (default: 100)
+- HTTP_MAX_CONNECTIONS_IMAGE: Max open connections in the image pool (default: 20)
+- HTTP_MAX_CONNECTIONS_STORAGE: Max open connections in the storage pool (default: 20)
+- HTTP_MAX_KEEPALIVE: Max idle keep-alive connections per pool (default: 20)
+- HTTP_KEEPALIVE_EXPIRY: Seconds an idle connection is kept (default: 60)
+- HTTP_CONNECT_TIMEOUT: Connect timeout in seconds (default: 10)
+- HTTP_HTTP2: "true" to negotiate HTTP/2 (requires the h2 package; default: false)
+- HTTP_WARMUP: "false" to skip startup warmup (default: true)
+- HTTP_WARMUP_URLS: Extra comma-separated URLs to pre-connect (llm pool)
+- HTTP_WARMUP_CONNECTIONS: Connections to open per host on warmup (default: 2)
+- HTTP_WARMUP_TIMEOUT: Overall warmup budget in seconds (default: 5)
+
+Usage:
+    client = get_http_client(POOL_IMAGE, timeout=60.0)   # shares the pool; aclose() is safe
+    await OutboundHTTP.get_instance().warmup({POOL_IMAGE: ["https://api.replicate.com"]})
+    OutboundHTTP.get_instance().metrics()
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+log = logging.getLogger(__name__)
+
+POOL_LLM = "llm"
+POOL_IMAGE = "image"
+POOL_STORAGE = "storage"
+
+# Max open connections per pool (see module docstring for the sizing)
+DEFAULT_MAX_CONNECTIONS = {POOL_LLM: 100, POOL_IMAGE: 20, POOL_STORAGE: 20}
+
+
+@dataclass
+class HTTPPoolConfig:
+    """Connection pool settings for outbound requests."""
+
+    max_connections: Dict[str, int] = field(default_factory=lambda: dict(DEFAULT_MAX_CONNECTIONS))
+    max_keepalive: int = 20
+    keepalive_expiry: float = 60.0
+    connect_timeout: float = 10.0
+    http2: bool = False
+    warmup: bool = True
+    warmup_urls: tuple = ()
+    warmup_connections: int = 2
+    warmup_timeout: float = 5.0
+
+    @classmethod
+    def from_env(cls) -> "HTTPPoolConfig":
+        return cls(
+            max_connections={
+                pool: int(os.getenv(f"HTTP_MAX_CONNECTIONS_{pool.upper()}", default))
+                for pool, default in DEFAULT_MAX_CONNECTIONS.items()
+            },
+            max_keepalive=int(os.getenv("HTTP_MAX_KEEPALIVE", 20)),
+            keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 60)),
+            connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", 10)),
+            http2=os.getenv("HTTP_HTTP2", "false").lower() == "true",
+            warmup=os.getenv("HTTP_WARMUP", "true").lower() != "false",
+            warmup_urls=tuple(u.strip() for u in os.getenv("HTTP_WARMUP_URLS", "").split(",") if u.strip()),
+            warmup_connections=max(1, int(os.getenv("HTTP_WARMUP_CONNECTIONS", 2))),
+            warmup_timeout=float(os.getenv("HTTP_WARMUP_TIMEOUT", 5)),
+        )
+
+
+@dataclass
+class HostStats:
+    """Per-host request and connection counters."""
+
+    requests: int = 0
+    errors: int = 0
+    new_connections: int = 0
+    connect_ms_total: float = 0.0
+    response_ms_total: float = 0.0  # Time to response headers
+
+    def snapshot(self) -> Dict[str, float]:
+        data = asdict(self)
+        data["reused_connections"] = max(0, self.requests - self.new_connections)
+        data["avg_connect_ms"] = round(self.connect_ms_total / self.new_connections, 1) if self.new_connections else None
+        data["avg_response_ms"] = round(self.response_ms_total / self.requests, 1) if self.requests else None
+        data["connect_ms_total"] = round(self.connect_ms_total, 1)
+        data["response_ms_total"] = round(self.response_ms_total, 1)
+        return data
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """Wraps a pooled transport: records per-host metrics, ignores aclose().
+
+    Clients built on a shared pool may be closed by their owners; the pools
+    themselves are only closed by OutboundHTTP.aclose() at shutdown.
+    """
+
+    def __init__(self, transport: httpx.AsyncHTTPTransport, stats: Dict[str, HostStats]):
+        self._transport = transport
+        self._stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        stats = self._stats.setdefault(host, HostStats())
+        connect_started: Optional[float] = None
+        connect_ms = 0.0
+        upstream_trace = request.extensions.get("trace")
+
+        # httpcore trace hook: connect_tcp only fires when a new connection is opened
+        async def trace(event_name: str, info: dict) -> None:
+            nonlocal connect_started, connect_ms
+            if event_name == "connection.connect_tcp.started":
+                connect_started = time.perf_counter()
+                stats.new_connections += 1
+            elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+                if connect_started is not None:
+                    connect_ms = (time.perf_counter() - connect_started) * 1000
+            if upstream_trace is not None:
+                await upstream_trace(event_name, info)
+
+        request.extensions = {**request.extensions, "trace": trace}
+        started = time.perf_counter()
+        stats.requests += 1
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.connect_ms_total += connect_ms
+        stats.response_ms_total += (time.perf_counter() - started) * 1000
+        return response
+
+    async def aclose(self) -> None:
+        pass
+
+
+class OutboundHTTP:
+    """Process-wide outbound connection pools, one per purpose."""
+
+    _instance: Optional["OutboundHTTP"] = None
+
+    def __init__(self, config: Optional[HTTPPoolConfig] = None):
+        self.config = config or HTTPPoolConfig.from_env()
+        http2 = self.config.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                log.warning("HTTP_HTTP2=true but the h2 package is not installed; using HTTP/1.1")
+                http2 = False
+
+        self._pools: Dict[str, httpx.AsyncHTTPTransport] = {}
+        self._stats: Dict[str, Dict[str, HostStats]] = {}
+        self.transports: Dict[str, _SharedTransport] = {}
+        for pool, max_connections in self.config.max_connections.items():
+            self._pools[pool] = httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=min(self.config.max_keepalive, max_connections),
+                    keepalive_expiry=self.config.keepalive_expiry,
+                ),
+                http2=http2,
+            )
+            self._stats[pool] = {}
+            self.transports[pool] = _SharedTransport(self._pools[pool], self._stats[pool])
+        self.http2 = http2
+
+    @classmethod
+    def get_instance(cls) -> "OutboundHTTP":
+        """Get singleton instance."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def client(self, pool: str, timeout: float) -> httpx.AsyncClient:
+        """An AsyncClient on the given pool with its own default timeout."""
+        if pool not in self.transports:
+            raise ValueError(f"Unknown HTTP pool: {pool}. Configured: {list(self.transports)}")
+        return httpx.AsyncClient(
+            transport=self.transports[pool],
+            timeout=httpx.Timeout(timeout, connect=min(timeout, self.config.connect_timeout)),
+        )
+
+    async def warmup(self, targets: Dict[str, Iterable[Optional[str]]]) -> Dict[str, bool]:
+        """Pre-open connections to each distinct origin (TCP + TLS) in its pool.
+
+        targets maps a pool to the URLs its clients will call; HTTP_WARMUP_URLS
+        are added to the llm pool. Sends lightweight HEAD requests to the
+        origin root; any HTTP response (even 404/405) means the connection is
+        established and pooled. Bounded by warmup_timeout overall and never
+        raises. Results are keyed "pool:origin".
+        """
+        targets = {pool: list(urls) for pool, urls in targets.items() if pool in self.transports}
+        targets.setdefault(POOL_LLM, []).extend(self.config.warmup_urls)
+        origins = sorted({
+            (pool, f"{parts.scheme}://{parts.netloc}")
+            for pool, urls in targets.items()
+            for parts in (urlsplit(u) for u in urls if u)
+            if parts.scheme in ("http", "https") and parts.netloc
+        })
+        if not self.config.warmup or not origins:
+            return {}
+
+        per_host = 1 if self.http2 else self.config.warmup_connections
+        clients = {pool: self.client(pool, timeout=self.config.warmup_timeout) for pool, _ in origins}
+        results: Dict[str, bool] = {}
+
+        async def connect(pool: str, origin: str) -> None:
+            responses = await asyncio.gather(
+                *[clients[pool].head(origin + "/") for _ in range(per_host)],
+                return_exceptions=True,
+            )
+            results[f"{pool}:{origin}"] = any(isinstance(r, httpx.Response) for r in responses)
+
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*[connect(pool, origin) for pool, origin in origins]),
+                timeout=self.config.warmup_timeout,
+            )
+        except asyncio.TimeoutError:
+            log.warning(f"HTTP warmup exceeded {self.config.warmup_timeout}s")
+        finally:
+            for client in clients.values():
+                await client.aclose()
+
+        keys = [f"{pool}:{origin}" for pool, origin in origins]
+        warmed = [k for k in keys if results.get(k)]
+        log.info(
+            f"HTTP warmup: {len(warmed)}/{len(keys)} origins connected in "
+            f"{(time.perf_counter() - started) * 1000:.0f}ms ({', '.join(warmed) or 'none'})"
+        )
+        return {key: results.get(key, False) for key in keys}
+
+    def metrics(self) -> Dict[str, object]:
+        """Pool settings plus per-pool, per-host request/connection counters."""
+        return {
+            "http2": self.http2,
+            "max_keepalive": self.config.max_keepalive,
+            "keepalive_expiry": self.config.keepalive_expiry,
+            "pools": {
+                pool: {
+                    "max_connections": self.config.max_connections[pool],
+                    "hosts": {host: stats.snapshot() for host, stats in sorted(self._stats[pool].items())},
+                }
+                for pool in self._pools
+            },
+        }
+
+    async def aclose(self) -> None:
+        for pool in self._pools.values():
+            await pool.aclose()
+
+
+def get_http_client(pool: str, timeout: float) -> httpx.AsyncClient:
+    """Get an AsyncClient backed by the shared outbound pool for a purpose."""
+    return OutboundHTTP.get_instance().client(pool, timeout)
+
+
+def warmup_targets() -> Dict[str, List[str]]:
+    """Base URLs of the configured default providers, by pool."""
+    from app.services.image import ImageService
+    from app.services.llm import LLMService
+    from app.services.llm_resilience import get_resilience_config
+    from app.services.storage import StorageService
+
+    llm_services = [LLMService.get_instance()]
+    resilience = get_resilience_config()
+    if resilience.hedging_enabled:
+        llm_services.append(LLMService.get_client(resilience.hedge_provider, resilience.hedge_model))
+
+    targets = {
+        POOL_LLM: [getattr(service._client, "base_url", None) for service in llm_services],
+        POOL_IMAGE: [getattr(ImageService.get_instance()._client, "base_url", None)],
+        POOL_STORAGE: [StorageService.get_instance().supabase_url],
+    }
+    return {pool: [u for u in urls if u] for pool, urls in targets.items()}
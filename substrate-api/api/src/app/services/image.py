@@ -37,7 +37,7 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Any, ClassVar, Dict, List, Optional
 
-import httpx
+from app.services.http_pool import POOL_IMAGE, get_http_client
 
 log = logging.getLogger(__name__)
 
@@ -86,7 +86,7 @@ class BaseImageClient(ABC):
 
     def __init__(self, config: ImageConfig):
         self.config = config
-        self.client = httpx.AsyncClient(timeout=config.timeout)
+        self.client = get_http_client(POOL_IMAGE, timeout=config.timeout)
 
     async def close(self):
         await self.client.aclose()
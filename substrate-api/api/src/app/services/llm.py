@@ -10,6 +10,13 @@ Supported providers:
 - openrouter: OpenRouter (access to many models via single API)
 - ollama: Local Ollama instance (self-hosted)
 
+Structured output:
+    generate_json() / extract_json() / generate_structured() use provider-native
+    structured output when a JSON schema is given (OpenAI response_format
+    json_schema, Gemini responseSchema, Anthropic forced tool-use, Ollama format).
+    The prompt-and-parse path remains as fallback. Parse outcomes are tracked
+    per call site in structured_output_stats.
+
 Environment variables (credentials only):
 - GOOGLE_API_KEY: Google AI API key
 - OPENAI_API_KEY: OpenAI API key
@@ -34,14 +41,30 @@ Usage:
 import json
 import logging
 import os
+import re
 import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, AsyncIterator, Dict, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
 
 import httpx
 
+from app.services.http_pool import POOL_LLM, get_http_client
+from app.services.llm_resilience import StreamTarget, get_resilience_config, resilient_stream
+from app.services.stream_decoder import (
+    ANTHROPIC_MARKERS,
+    NDJSONDecoder,
+    SSEDecoder,
+    StreamUsage,
+    extract_gemini_delta,
+    extract_ollama_delta,
+    extract_openai_delta,
+    iter_deltas,
+    make_anthropic_extractor,
+)
+from app.services.structured_stream import StructuredResponseRenderer, StructuredStreamEvent
+
 log = logging.getLogger(__name__)
 
 
@@ -75,6 +98,16 @@ CHARACTER_RESPONSE_SCHEMA = {
     "required": ["dialogue", "mood", "tension_shift"]
 }
 
+# Same schema with action before dialogue, so a streamed response can be
+# rendered in display order (*action* "dialogue") as it arrives
+CHARACTER_STREAM_SCHEMA = {
+    **CHARACTER_RESPONSE_SCHEMA,
+    "properties": {
+        key: CHARACTER_RESPONSE_SCHEMA["properties"][key]
+        for key in ("action", "dialogue", "internal", "mood", "tension_shift")
+    },
+}
+
 
 def render_structured_response(structured: Dict[str, Any]) -> str:
     """Convert structured character output to display format.
@@ -101,6 +134,119 @@ def render_structured_response(structured: Dict[str, Any]) -> str:
     return " ".join(parts) if parts else structured.get("dialogue", "")
 
 
+class StructuredOutputStats:
+    """Per-call-site parse outcomes for structured LLM output.
+
+    Modes:
+    - native: provider-enforced schema (response_format / responseSchema / tool-use)
+    - prompt: JSON requested in the prompt, parsed from free text
+    """
+
+    def __init__(self):
+        # {call_site: {"native_ok": n, "native_failed": n, "prompt_ok": n, "prompt_failed": n}}
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def record(self, call_site: str, mode: str, ok: bool) -> None:
+        counts = self._counts.setdefault(
+            call_site,
+            {"native_ok": 0, "native_failed": 0, "prompt_ok": 0, "prompt_failed": 0},
+        )
+        counts[f"{mode}_{'ok' if ok else 'failed'}"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Counts plus parse-failure rate per call site."""
+        result = {}
+        for call_site, counts in self._counts.items():
+            attempts = sum(counts.values())
+            failed = counts["native_failed"] + counts["prompt_failed"]
+            result[call_site] = {
+                **counts,
+                "parse_failure_rate": round(failed / attempts, 4) if attempts else 0.0,
+            }
+        return result
+
+    def reset(self) -> None:
+        self._counts.clear()
+
+
+structured_output_stats = StructuredOutputStats()
+
+
+def strip_code_fence(content: str) -> str:
+    """Strip a ```json ... ``` markdown fence from LLM output, if present."""
+    content = content.strip()
+    if content.startswith("```"):
+        lines = content.split("\n")
+        content = "\n".join(lines[1:-1] if lines[-1].strip() == "```" else lines[1:])
+    return content
+
+
+def salvage_structured_response(content: str) -> Dict[str, Any]:
+    """Best-effort structured response from unparseable JSON output."""
+    # Try to extract dialogue from partial JSON
+    dialogue = content
+    dialogue_match = re.search(r'"dialogue":\s*"([^"]*)', content)
+    if dialogue_match:
+        dialogue = dialogue_match.group(1)
+    else:
+        # Strip JSON artifacts if present
+        if content.startswith("{"):
+            dialogue = content.lstrip("{").strip()
+            # Try to find meaningful text
+            if "dialogue" in dialogue.lower():
+                dialogue = re.sub(r'["\{\}:\[\],]', '', dialogue)
+                dialogue = dialogue.replace("dialogue", "").strip()
+    # Return a fallback structure
+    return {
+        "dialogue": dialogue,
+        "action": None,
+        "internal": None,
+        "mood": "neutral",
+        "tension_shift": 0,
+    }
+
+
+async def _prepend(first: Optional[str], rest: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Re-attach an already-consumed first chunk to its stream."""
+    if first is not None:
+        yield first
+    async for chunk in rest:
+        yield chunk
+
+
+# Gemini responseSchema is an OpenAPI subset: upper-case types, `nullable`
+# instead of type unions, and no additionalProperties/$schema.
+_GEMINI_SCHEMA_KEYS = {
+    "type", "format", "description", "nullable", "enum", "properties", "required",
+    "items", "minItems", "maxItems", "minimum", "maximum", "anyOf", "propertyOrdering",
+}
+
+
+def to_gemini_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a JSON schema to Gemini's responseSchema dialect."""
+    converted: Dict[str, Any] = {}
+    for key, value in schema.items():
+        if key not in _GEMINI_SCHEMA_KEYS:
+            continue
+        if key == "type":
+            types = value if isinstance(value, list) else [value]
+            non_null = [t for t in types if t != "null"]
+            converted["type"] = (non_null[0] if non_null else "string").upper()
+            if len(non_null) < len(types):
+                converted["nullable"] = True
+        elif key == "properties":
+            converted["properties"] = {name: to_gemini_schema(sub) for name, sub in value.items()}
+            # Gemini otherwise orders properties alphabetically
+            converted.setdefault("propertyOrdering", list(value))
+        elif key == "items":
+            converted["items"] = to_gemini_schema(value)
+        elif key == "anyOf":
+            converted["anyOf"] = [to_gemini_schema(sub) for sub in value]
+        else:
+            converted[key] = value
+    return converted
+
+
 class LLMProvider(str, Enum):
     """Supported LLM providers."""
 
@@ -121,6 +267,7 @@ class LLMResponse:
     tokens_output: Optional[int] = None
     latency_ms: Optional[int] = None
     raw_response: Optional[Dict[str, Any]] = None
+    parsed: Optional[Any] = None  # Set by LLMService.generate_json()
 
 
 @dataclass
@@ -137,11 +284,20 @@ class LLMConfig:
 
 
 class BaseLLMClient(ABC):
-    """Base class for LLM clients."""
+    """Base class for LLM clients.
+
+    Clients with native structured output set supports_native_json and
+    implement generate_json(messages, schema, ...) -> LLMResponse and
+    generate_json_stream(messages, schema, ...) -> AsyncIterator[str], which
+    constrain the response to a JSON schema (object root). LLMService falls
+    back to prompt-and-parse for clients without it.
+    """
+
+    supports_native_json: bool = False
 
     def __init__(self, config: LLMConfig):
         self.config = config
-        self.client = httpx.AsyncClient(timeout=config.timeout)
+        self.client = get_http_client(POOL_LLM, timeout=config.timeout)
 
     async def close(self):
         await self.client.aclose()
@@ -162,6 +318,7 @@ class BaseLLMClient(ABC):
         messages: List[Dict[str, str]],
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
+        usage: Optional[StreamUsage] = None,
     ) -> AsyncIterator[str]:
         """Generate a streaming response from the LLM."""
         pass
@@ -170,6 +327,8 @@ class BaseLLMClient(ABC):
 class OpenAIClient(BaseLLMClient):
     """OpenAI API client."""
 
+    supports_native_json = True
+
     def __init__(self, config: LLMConfig):
         super().__init__(config)
         self.base_url = config.base_url or "https://api.openai.com/v1"
@@ -217,6 +376,7 @@ class OpenAIClient(BaseLLMClient):
         messages: List[Dict[str, str]],
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
+        usage: Optional[StreamUsage] = None,
     ) -> AsyncIterator[str]:
         payload = {
             "model": self.config.model,
@@ -224,8 +384,39 @@ class OpenAIClient(BaseLLMClient):
             "temperature": temperature or self.config.temperature,
             "max_tokens": max_tokens or self.config.max_tokens,
             "stream": True,
+            "stream_options": {"include_usage": True},
         }
 
+        async for content in self._stream_chat(payload, usage):
+            yield content
+
+    async def generate_json_stream(
+        self,
+        messages: List[Dict[str, str]],
+        schema: Dict[str, Any],
+        schema_name: str = "response",
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        usage: Optional[StreamUsage] = None,
+    ) -> AsyncIterator[str]:
+        payload = {
+            "model": self.config.model,
+            "messages": messages,
+            "temperature": temperature or self.config.temperature,
+            "max_tokens": max_tokens or self.config.max_tokens,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {"name": schema_name, "schema": schema, "strict": False},
+            },
+        }
+
+        async for content in self._stream_chat(payload, usage):
+            yield content
+
+    async def _stream_chat(self, payload: Dict[str, Any], usage: Optional[StreamUsage]) -> AsyncIterator[str]:
+        """POST a streaming chat completion and yield content deltas."""
         async with self.client.stream(
             "POST",
             f"{self.base_url}/chat/completions",
@@ -233,23 +424,55 @@ class OpenAIClient(BaseLLMClient):
             json=payload,
         ) as response:
             response.raise_for_status()
-            async for line in response.aiter_lines():
-                if line.startswith("data: "):
-                    data = line[6:]
-                    if data == "[DONE]":
-                        break
-                    try:
-                        chunk = json.loads(data)
-                        content = chunk["choices"][0].get("delta", {}).get("content", "")
-                        if content:
-                            yield content
-                    except json.JSONDecodeError:
-                        continue
+            async for content in iter_deltas(
+                response.aiter_bytes(), SSEDecoder(), extract_openai_delta, usage
+            ):
+                yield content
+
+    async def generate_json(
+        self,
+        messages: List[Dict[str, str]],
+        schema: Dict[str, Any],
+        schema_name: str = "response",
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> LLMResponse:
+        start_time = time.time()
+
+        payload = {
+            "model": self.config.model,
+            "messages": messages,
+            "temperature": temperature or self.config.temperature,
+            "max_tokens": max_tokens or self.config.max_tokens,
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {"name": schema_name, "schema": schema, "strict": False},
+            },
+        }
+
+        response = await self.client.post(
+            f"{self.base_url}/chat/completions",
+            headers=self.headers,
+            json=payload,
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        return LLMResponse(
+            content=data["choices"][0]["message"]["content"] or "",
+            model=data.get("model", self.config.model),
+            tokens_input=data.get("usage", {}).get("prompt_tokens"),
+            tokens_output=data.get("usage", {}).get("completion_tokens"),
+            latency_ms=int((time.time() - start_time) * 1000),
+            raw_response=data,
+        )
 
 
 class AnthropicClient(BaseLLMClient):
     """Anthropic API client."""
 
+    supports_native_json = True
+
     def __init__(self, config: LLMConfig):
         super().__init__(config)
         self.base_url = config.base_url or "https://api.anthropic.com/v1"
@@ -309,6 +532,7 @@ class AnthropicClient(BaseLLMClient):
         messages: List[Dict[str, str]],
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
+        usage: Optional[StreamUsage] = None,
     ) -> AsyncIterator[str]:
         # Extract system message
         system_content = ""
@@ -329,6 +553,53 @@ class AnthropicClient(BaseLLMClient):
         if system_content:
             payload["system"] = system_content
 
+        async for text in self._stream_messages(payload, "text", usage):
+            yield text
+
+    async def generate_json_stream(
+        self,
+        messages: List[Dict[str, str]],
+        schema: Dict[str, Any],
+        schema_name: str = "response",
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        usage: Optional[StreamUsage] = None,
+    ) -> AsyncIterator[str]:
+        """Stream a forced tool call's input JSON (input_json_delta events)."""
+        system_content = ""
+        chat_messages = []
+        for msg in messages:
+            if msg["role"] == "system":
+                system_content = msg["content"]
+            else:
+                chat_messages.append(msg)
+
+        payload = {
+            "model": self.config.model,
+            "messages": chat_messages,
+            "max_tokens": max_tokens or self.config.max_tokens,
+            "temperature": temperature or self.config.temperature,
+            "stream": True,
+            "tools": [{
+                "name": schema_name,
+                "description": "Record the response in the required structure.",
+                "input_schema": schema,
+            }],
+            "tool_choice": {"type": "tool", "name": schema_name},
+        }
+        if system_content:
+            payload["system"] = system_content
+
+        async for partial_json in self._stream_messages(payload, "partial_json", usage):
+            yield partial_json
+
+    async def _stream_messages(
+        self,
+        payload: Dict[str, Any],
+        delta_field: str,
+        usage: Optional[StreamUsage],
+    ) -> AsyncIterator[str]:
+        """POST a streaming messages request and yield content_block_delta fields."""
         async with self.client.stream(
             "POST",
             f"{self.base_url}/messages",
@@ -336,14 +607,70 @@ class AnthropicClient(BaseLLMClient):
             json=payload,
         ) as response:
             response.raise_for_status()
-            async for line in response.aiter_lines():
-                if line.startswith("data: "):
-                    try:
-                        data = json.loads(line[6:])
-                        if data["type"] == "content_block_delta":
-                            yield data["delta"].get("text", "")
-                    except json.JSONDecodeError:
-                        continue
+            async for delta in iter_deltas(
+                response.aiter_bytes(),
+                SSEDecoder(),
+                make_anthropic_extractor(delta_field),
+                usage,
+                markers=ANTHROPIC_MARKERS,
+            ):
+                yield delta
+
+    async def generate_json(
+        self,
+        messages: List[Dict[str, str]],
+        schema: Dict[str, Any],
+        schema_name: str = "response",
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> LLMResponse:
+        """Structured output via a forced tool call whose input_schema is the schema."""
+        start_time = time.time()
+
+        system_content = ""
+        chat_messages = []
+        for msg in messages:
+            if msg["role"] == "system":
+                system_content = msg["content"]
+            else:
+                chat_messages.append(msg)
+
+        payload = {
+            "model": self.config.model,
+            "messages": chat_messages,
+            "max_tokens": max_tokens or self.config.max_tokens,
+            "temperature": temperature or self.config.temperature,
+            "tools": [{
+                "name": schema_name,
+                "description": "Record the response in the required structure.",
+                "input_schema": schema,
+            }],
+            "tool_choice": {"type": "tool", "name": schema_name},
+        }
+        if system_content:
+            payload["system"] = system_content
+
+        response = await self.client.post(
+            f"{self.base_url}/messages",
+            headers=self.headers,
+            json=payload,
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        tool_input = next(
+            (block["input"] for block in data.get("content", []) if block.get("type") == "tool_use"),
+            None,
+        )
+
+        return LLMResponse(
+            content=json.dumps(tool_input) if tool_input is not None else "",
+            model=data.get("model", self.config.model),
+            tokens_input=data.get("usage", {}).get("input_tokens"),
+            tokens_output=data.get("usage", {}).get("output_tokens"),
+            latency_ms=int((time.time() - start_time) * 1000),
+            raw_response=data,
+        )
 
 
 class OpenRouterClient(OpenAIClient):
@@ -363,6 +690,8 @@ class OpenRouterClient(OpenAIClient):
 class OllamaClient(BaseLLMClient):
     """Ollama local client."""
 
+    supports_native_json = True
+
     def __init__(self, config: LLMConfig):
         super().__init__(config)
         self.base_url = config.base_url or "http://localhost:11434"
@@ -408,37 +737,100 @@ class OllamaClient(BaseLLMClient):
         messages: List[Dict[str, str]],
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
+        usage: Optional[StreamUsage] = None,
+    ) -> AsyncIterator[str]:
+        payload = {
+            "model": self.config.model,
+            "messages": messages,
+            "stream": True,
+            "options": {
+                "temperature": temperature or self.config.temperature,
+                "num_predict": max_tokens or self.config.max_tokens,
+            },
+        }
+
+        async for content in self._stream_chat(payload, usage):
+            yield content
+
+    async def generate_json_stream(
+        self,
+        messages: List[Dict[str, str]],
+        schema: Dict[str, Any],
+        schema_name: str = "response",
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        usage: Optional[StreamUsage] = None,
     ) -> AsyncIterator[str]:
         payload = {
             "model": self.config.model,
             "messages": messages,
             "stream": True,
+            "format": schema,
             "options": {
                 "temperature": temperature or self.config.temperature,
                 "num_predict": max_tokens or self.config.max_tokens,
             },
         }
 
+        async for content in self._stream_chat(payload, usage):
+            yield content
+
+    async def _stream_chat(self, payload: Dict[str, Any], usage: Optional[StreamUsage]) -> AsyncIterator[str]:
+        """POST a streaming chat request and yield NDJSON content deltas."""
         async with self.client.stream(
             "POST",
             f"{self.base_url}/api/chat",
             json=payload,
         ) as response:
             response.raise_for_status()
-            async for line in response.aiter_lines():
-                if line:
-                    try:
-                        data = json.loads(line)
-                        content = data.get("message", {}).get("content", "")
-                        if content:
-                            yield content
-                    except json.JSONDecodeError:
-                        continue
+            async for content in iter_deltas(
+                response.aiter_bytes(), NDJSONDecoder(), extract_ollama_delta, usage
+            ):
+                yield content
+
+    async def generate_json(
+        self,
+        messages: List[Dict[str, str]],
+        schema: Dict[str, Any],
+        schema_name: str = "response",
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> LLMResponse:
+        start_time = time.time()
+
+        payload = {
+            "model": self.config.model,
+            "messages": messages,
+            "stream": False,
+            "format": schema,
+            "options": {
+                "temperature": temperature or self.config.temperature,
+                "num_predict": max_tokens or self.config.max_tokens,
+            },
+        }
+
+        response = await self.client.post(
+            f"{self.base_url}/api/chat",
+            json=payload,
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        return LLMResponse(
+            content=data["message"]["content"],
+            model=data.get("model", self.config.model),
+            tokens_input=data.get("prompt_eval_count"),
+            tokens_output=data.get("eval_count"),
+            latency_ms=int((time.time() - start_time) * 1000),
+            raw_response=data,
+        )
 
 
 class GeminiClient(BaseLLMClient):
     """Google Gemini API client."""
 
+    supports_native_json = True
+
     def __init__(self, config: LLMConfig):
         super().__init__(config)
         self.base_url = config.base_url or "https://generativelanguage.googleapis.com/v1beta"
@@ -507,6 +899,7 @@ class GeminiClient(BaseLLMClient):
         messages: List[Dict[str, str]],
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
+        usage: Optional[StreamUsage] = None,
     ) -> AsyncIterator[str]:
         # Convert messages to Gemini format
         contents = []
@@ -531,22 +924,112 @@ class GeminiClient(BaseLLMClient):
         if system_instruction:
             payload["systemInstruction"] = {"parts": [{"text": system_instruction}]}
 
+        async for text in self._stream_content(payload, usage):
+            yield text
+
+    async def generate_json_stream(
+        self,
+        messages: List[Dict[str, str]],
+        schema: Dict[str, Any],
+        schema_name: str = "response",
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        usage: Optional[StreamUsage] = None,
+    ) -> AsyncIterator[str]:
+        contents = []
+        system_instruction = None
+
+        for msg in messages:
+            if msg["role"] == "system":
+                system_instruction = msg["content"]
+            elif msg["role"] == "user":
+                contents.append({"role": "user", "parts": [{"text": msg["content"]}]})
+            elif msg["role"] == "assistant":
+                contents.append({"role": "model", "parts": [{"text": msg["content"]}]})
+
+        payload = {
+            "contents": contents,
+            "generationConfig": {
+                "temperature": temperature or self.config.temperature,
+                "maxOutputTokens": max_tokens or self.config.max_tokens,
+                "responseMimeType": "application/json",
+                "responseSchema": to_gemini_schema(schema),
+            },
+        }
+
+        if system_instruction:
+            payload["systemInstruction"] = {"parts": [{"text": system_instruction}]}
+
+        async for text in self._stream_content(payload, usage):
+            yield text
+
+    async def _stream_content(self, payload: Dict[str, Any], usage: Optional[StreamUsage]) -> AsyncIterator[str]:
+        """POST to streamGenerateContent (SSE) and yield text parts."""
         url = f"{self.base_url}/models/{self.config.model}:streamGenerateContent?alt=sse&key={self.api_key}"
 
         async with self.client.stream("POST", url, json=payload) as response:
             response.raise_for_status()
-            async for line in response.aiter_lines():
-                if line.startswith("data: "):
-                    try:
-                        data = json.loads(line[6:])
-                        if "candidates" in data and len(data["candidates"]) > 0:
-                            candidate = data["candidates"][0]
-                            if "content" in candidate and "parts" in candidate["content"]:
-                                text = candidate["content"]["parts"][0].get("text", "")
-                                if text:
-                                    yield text
-                    except json.JSONDecodeError:
-                        continue
+            async for text in iter_deltas(
+                response.aiter_bytes(), SSEDecoder(), extract_gemini_delta, usage
+            ):
+                yield text
+
+    async def generate_json(
+        self,
+        messages: List[Dict[str, str]],
+        schema: Dict[str, Any],
+        schema_name: str = "response",
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> LLMResponse:
+        start_time = time.time()
+
+        contents = []
+        system_instruction = None
+
+        for msg in messages:
+            if msg["role"] == "system":
+                system_instruction = msg["content"]
+            elif msg["role"] == "user":
+                contents.append({"role": "user", "parts": [{"text": msg["content"]}]})
+            elif msg["role"] == "assistant":
+                contents.append({"role": "model", "parts": [{"text": msg["content"]}]})
+
+        payload = {
+            "contents": contents,
+            "generationConfig": {
+                "temperature": temperature or self.config.temperature,
+                "maxOutputTokens": max_tokens or self.config.max_tokens,
+                "responseMimeType": "application/json",
+                "responseSchema": to_gemini_schema(schema),
+            },
+        }
+
+        if system_instruction:
+            payload["systemInstruction"] = {"parts": [{"text": system_instruction}]}
+
+        url = f"{self.base_url}/models/{self.config.model}:generateContent?key={self.api_key}"
+
+        response = await self.client.post(url, json=payload)
+        response.raise_for_status()
+        data = response.json()
+
+        content = ""
+        if "candidates" in data and len(data["candidates"]) > 0:
+            candidate = data["candidates"][0]
+            if "content" in candidate and "parts" in candidate["content"]:
+                content = "".join(part.get("text", "") for part in candidate["content"]["parts"])
+
+        usage = data.get("usageMetadata", {})
+
+        return LLMResponse(
+            content=content,
+            model=self.config.model,
+            tokens_input=usage.get("promptTokenCount"),
+            tokens_output=usage.get("candidatesTokenCount"),
+            latency_ms=int((time.time() - start_time) * 1000),
+            raw_response=data,
+        )
 
 
 class LLMService:
@@ -685,23 +1168,157 @@ class LLMService:
         messages: List[Dict[str, str]],
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
+        usage: Optional[StreamUsage] = None,
     ) -> AsyncIterator[str]:
-        """Generate a streaming response."""
-        async for chunk in self._client.generate_stream(
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
+        """Generate a streaming response.
+
+        Retries transient failures before the first token, fails fast while the
+        provider's circuit is open, and hedges to LLM_HEDGE_PROVIDER/MODEL when
+        time-to-first-token is unusually slow. See llm_resilience.py.
+
+        If usage is given, usage.model is set to the model that served the
+        stream, and the provider-reported token counts are filled in once the
+        stream has finished.
+        """
+        def target(service: "LLMService") -> StreamTarget:
+            return StreamTarget(
+                provider=service.provider.value,
+                model=service.model,
+                factory=lambda: service._client.generate_stream(
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    usage=usage,
+                ),
+            )
+
+        def served_by(winner: StreamTarget) -> None:
+            if usage is not None:
+                usage.model = winner.model
+
+        async for chunk in resilient_stream(
+            target(self), hedge=self._hedge_target(target), on_target=served_by
         ):
             yield chunk
 
+    def _hedge_target(self, target) -> Optional[StreamTarget]:
+        """Build the hedge stream target, if hedging is configured and distinct from self."""
+        config = get_resilience_config()
+        if not config.hedging_enabled:
+            return None
+        if (config.hedge_provider.lower(), config.hedge_model) == (self.provider.value, self.model):
+            return None
+        try:
+            return target(LLMService.get_client(config.hedge_provider, config.hedge_model))
+        except ValueError as e:
+            log.warning(f"LLM hedge target unavailable: {e}")
+            return None
+
+    async def generate_json(
+        self,
+        messages: List[Dict[str, str]],
+        json_schema: Optional[Dict[str, Any]] = None,
+        call_site: str = "generate_json",
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        parse: Callable[[str], Any] = json.loads,
+    ) -> LLMResponse:
+        """Generate JSON output, preferring the provider's native structured output.
+
+        With a json_schema, the provider is asked to enforce it. If the provider
+        has no native mode, rejects the schema, or returns unparseable output,
+        falls back to a plain generation parsed from free text (callers are
+        expected to ask for JSON in the prompt).
+
+        Args:
+            messages: Conversation messages (should describe the JSON to produce)
+            json_schema: JSON schema for native structured output (optional)
+            call_site: Label for parse-failure tracking
+            temperature: Generation temperature
+            max_tokens: Max output tokens
+            parse: Parser for the free-text fallback (e.g. a lenient parser)
+
+        Returns:
+            LLMResponse with .parsed set to the decoded JSON
+
+        Raises:
+            json.JSONDecodeError: If the fallback output can't be parsed either
+        """
+        if json_schema is not None:
+            response = await self._generate_native_json(
+                messages, json_schema, call_site, temperature, max_tokens
+            )
+            if response is not None:
+                return response
+
+        response = await self.generate(messages, temperature=temperature, max_tokens=max_tokens)
+        try:
+            response.parsed = parse(strip_code_fence(response.content))
+        except (json.JSONDecodeError, ValueError):
+            structured_output_stats.record(call_site, "prompt", ok=False)
+            raise
+        structured_output_stats.record(call_site, "prompt", ok=True)
+        return response
+
+    async def _generate_native_json(
+        self,
+        messages: List[Dict[str, str]],
+        json_schema: Dict[str, Any],
+        call_site: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+    ) -> Optional[LLMResponse]:
+        """Try native structured output. Returns None when the caller should fall back."""
+        if not self._client.supports_native_json:
+            return None
+
+        # Native modes want an object at the root; wrap arrays/scalars and unwrap after
+        wrapped = json_schema.get("type") != "object"
+        schema = (
+            {"type": "object", "properties": {"result": json_schema}, "required": ["result"]}
+            if wrapped else json_schema
+        )
+
+        try:
+            response = await self._client.generate_json(
+                messages,
+                schema,
+                schema_name=call_site.replace(".", "_"),
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 400:
+                raise
+            # Model/endpoint doesn't accept this schema - fall back to prompting
+            log.warning(f"Native structured output rejected for {call_site} ({self.provider.value}): {e}")
+            structured_output_stats.record(call_site, "native", ok=False)
+            return None
+
+        try:
+            parsed = json.loads(response.content)
+            if wrapped:
+                parsed = parsed["result"]
+        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            log.warning(f"Native structured output unparseable for {call_site}: {e}")
+            structured_output_stats.record(call_site, "native", ok=False)
+            return None
+
+        structured_output_stats.record(call_site, "native", ok=True)
+        response.parsed = parsed
+        return response
+
     async def extract_json(
         self,
         prompt: str,
         schema_description: str,
-    ) -> Dict[str, Any]:
+        json_schema: Optional[Dict[str, Any]] = None,
+        call_site: str = "extract_json",
+    ) -> Any:
         """Generate structured JSON output.
 
-        Uses a system prompt to encourage JSON output.
+        Uses native structured output when json_schema is given; the system
+        prompt (with schema_description) also drives the prompt-and-parse fallback.
         """
         messages = [
             {
@@ -715,37 +1332,137 @@ Respond ONLY with the JSON, no additional text.""",
             {"role": "user", "content": prompt},
         ]
 
-        response = await self.generate(messages, temperature=0.3)
-
-        # Try to parse JSON from response
-        content = response.content.strip()
-        # Handle markdown code blocks
-        if content.startswith("```"):
-            lines = content.split("\n")
-            content = "\n".join(lines[1:-1])
-
-        return json.loads(content)
+        response = await self.generate_json(
+            messages,
+            json_schema=json_schema,
+            call_site=call_site,
+            temperature=0.3,
+        )
+        return response.parsed
 
     async def generate_structured(
         self,
         messages: List[Dict[str, str]],
         response_schema: Dict[str, Any],
         temperature: Optional[float] = None,
+        call_site: str = "generate_structured",
     ) -> Dict[str, Any]:
         """Generate a structured JSON response following a schema.
 
         This is used for character responses in bounded episodes where we need
         structured output (dialogue, action, mood, tension_shift).
 
+        Native structured output is tried first; the prompt-and-parse path
+        (with its dialogue-salvaging fallback) is used when that isn't available.
+
         Args:
             messages: Conversation messages (system + history)
             response_schema: JSON schema for the response
             temperature: Generation temperature
+            call_site: Label for parse-failure tracking
 
         Returns:
             Parsed JSON response matching the schema
         """
-        # Add structured output instructions to system message
+        native = await self._generate_native_json(
+            messages, response_schema, call_site, temperature, None
+        )
+        if native is not None and isinstance(native.parsed, dict):
+            return native.parsed
+
+        structured_messages = self._structured_messages(messages, response_schema)
+        response = await self.generate(structured_messages, temperature=temperature)
+
+        # Parse JSON from response (handles markdown code blocks)
+        content = strip_code_fence(response.content)
+
+        try:
+            result = json.loads(content)
+            structured_output_stats.record(call_site, "prompt", ok=True)
+            return result
+        except json.JSONDecodeError as e:
+            structured_output_stats.record(call_site, "prompt", ok=False)
+            log.error(f"Failed to parse structured response: {e}\nContent: {content}")
+            return salvage_structured_response(content)
+
+    async def generate_structured_stream(
+        self,
+        messages: List[Dict[str, str]],
+        response_schema: Dict[str, Any] = CHARACTER_STREAM_SCHEMA,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        call_site: str = "generate_structured_stream",
+    ) -> AsyncIterator[StructuredStreamEvent]:
+        """Stream a structured character response.
+
+        action/dialogue are parsed out of the token stream as they arrive and
+        yielded as "chunk" events (display text, render_structured_response
+        shape). A final "complete" event carries the full structured response
+        (mood, tension_shift, ...) and the canonical rendered content.
+
+        Native structured streaming is used where available, falling back to
+        prompt-and-parse streaming before the first token.
+        """
+        renderer = StructuredResponseRenderer()
+        stream = None
+        mode = "prompt"
+
+        if self._client.supports_native_json:
+            native = resilient_stream(StreamTarget(
+                provider=self.provider.value,
+                model=self.model,
+                factory=lambda: self._client.generate_json_stream(
+                    messages,
+                    response_schema,
+                    schema_name=call_site.replace(".", "_"),
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                ),
+            ))
+            try:
+                stream = _prepend(await native.__anext__(), native)
+                mode = "native"
+            except StopAsyncIteration:
+                stream = _prepend(None, native)
+                mode = "native"
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code != 400:
+                    raise
+                log.warning(f"Native structured streaming rejected for {call_site} ({self.provider.value}): {e}")
+
+        if stream is None:
+            stream = self.generate_stream(
+                self._structured_messages(messages, response_schema),
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+
+        async for chunk in stream:
+            text = renderer.feed(chunk)
+            if text:
+                yield StructuredStreamEvent(type="chunk", content=text)
+
+        try:
+            structured = renderer.parser.result()
+            structured_output_stats.record(call_site, mode, ok=True)
+        except json.JSONDecodeError as e:
+            structured_output_stats.record(call_site, mode, ok=False)
+            content = strip_code_fence(renderer.parser.text)
+            log.error(f"Failed to parse streamed structured response: {e}\nContent: {content}")
+            structured = salvage_structured_response(content)
+
+        rendered = render_structured_response(structured)
+        if not renderer.emitted and rendered:
+            # Nothing was streamable (e.g. model ignored the JSON format)
+            yield StructuredStreamEvent(type="chunk", content=rendered)
+        yield StructuredStreamEvent(type="complete", content=rendered, structured=structured)
+
+    @staticmethod
+    def _structured_messages(
+        messages: List[Dict[str, str]],
+        response_schema: Dict[str, Any],
+    ) -> List[Dict[str, str]]:
+        """Add structured output instructions to the system message (prompt-and-parse path)."""
         system_msg = messages[0] if messages and messages[0]["role"] == "system" else None
         other_msgs = messages[1:] if system_msg else messages
 
@@ -760,8 +1477,8 @@ You MUST respond with valid JSON matching this schema:
 
 Example response format:
 {{
-    "dialogue": "Your character's spoken words",
     "action": "Physical action or expression (can be null)",
+    "dialogue": "Your character's spoken words",
     "internal": "Character's internal thought (can be null, not shown to user)",
     "mood": "Current emotional state (e.g., intrigued, playful, guarded)",
     "tension_shift": 0.1  // -1.0 to 1.0, how this exchange affects romantic tension
@@ -769,49 +1486,11 @@ Example response format:
 
 Respond ONLY with the JSON, no additional text or markdown."""
 
-        structured_messages = [
+        return [
             {"role": "system", "content": structured_system},
             *other_msgs,
         ]
 
-        response = await self.generate(structured_messages, temperature=temperature)
-
-        # Parse JSON from response
-        content = response.content.strip()
-
-        # Handle markdown code blocks
-        if content.startswith("```"):
-            lines = content.split("\n")
-            # Remove first and last lines (```json and ```)
-            content = "\n".join(lines[1:-1])
-
-        try:
-            return json.loads(content)
-        except json.JSONDecodeError as e:
-            log.error(f"Failed to parse structured response: {e}\nContent: {content}")
-            # Try to extract dialogue from partial JSON
-            dialogue = content
-            import re
-            dialogue_match = re.search(r'"dialogue":\s*"([^"]*)', content)
-            if dialogue_match:
-                dialogue = dialogue_match.group(1)
-            else:
-                # Strip JSON artifacts if present
-                if content.startswith("{"):
-                    dialogue = content.lstrip("{").strip()
-                    # Try to find meaningful text
-                    if "dialogue" in dialogue.lower():
-                        dialogue = re.sub(r'["\{\}:\[\],]', '', dialogue)
-                        dialogue = dialogue.replace("dialogue", "").strip()
-            # Return a fallback structure
-            return {
-                "dialogue": dialogue,
-                "action": None,
-                "internal": None,
-                "mood": "neutral",
-                "tension_shift": 0,
-            }
-
     async def close(self):
         """Close the client."""
         if self._client:
@@ -0,0 +1,395 @@
+"""Resilience layer for streaming LLM calls.
+
+Wraps a provider client's generate_stream() with:
+- Retry with jittered exponential backoff, only BEFORE the first token.
+  Once text has reached the user we can't transparently restart a stream.
+- Per-provider circuit breaker that fails fast after sustained errors.
+- Optional hedged request to a secondary provider/model when time-to-first-
+  token (TTFT) exceeds a percentile of recent TTFTs. Whichever stream yields
+  its first token first wins; the other is cancelled.
+
+Environment variables:
+- LLM_STREAM_MAX_ATTEMPTS: Attempts before first token (default: 3)
+- LLM_STREAM_BACKOFF_BASE: Base backoff in seconds (default: 0.25)
+- LLM_STREAM_BACKOFF_MAX: Max backoff in seconds (default: 4.0)
+- LLM_CIRCUIT_FAILURE_THRESHOLD: Consecutive failures that open the circuit (default: 5)
+- LLM_CIRCUIT_RESET_SECONDS: Seconds the circuit stays open before a probe (default: 30)
+- LLM_HEDGE_PROVIDER / LLM_HEDGE_MODEL: Secondary target (hedging disabled if unset)
+- LLM_HEDGE_PERCENTILE: TTFT percentile that triggers the hedge (default: 95)
+- LLM_HEDGE_MIN_SAMPLES: TTFT samples needed before hedging kicks in (default: 20)
+
+Usage:
+    async for chunk in resilient_stream(
+        primary=StreamTarget("google", "gemini-3-flash-preview", factory),
+        hedge=StreamTarget("openai", "gpt-4o-mini", hedge_factory),
+    ):
+        ...
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Deque, Dict, Optional, Set, Tuple
+
+import httpx
+
+log = logging.getLogger(__name__)
+
+# Status codes worth retrying: timeouts, rate limiting, and server-side errors
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised when a provider's circuit breaker is open."""
+
+    def __init__(self, provider: str, retry_in: float):
+        super().__init__(f"Circuit open for LLM provider '{provider}' (retry in {retry_in:.1f}s)")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    """Whether an error is transient (worth a retry and counted by the breaker)."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status in RETRYABLE_STATUS_CODES or status >= 500
+    # Covers connect/read/write timeouts, connection resets, protocol errors
+    return isinstance(exc, httpx.TransportError)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        log.warning(f"Invalid {name}={os.getenv(name)!r}, using {default}")
+        return default
+
+
+@dataclass
+class ResilienceConfig:
+    """Settings for the streaming resilience layer."""
+
+    max_attempts: int = 3
+    backoff_base: float = 0.25
+    backoff_max: float = 4.0
+    failure_threshold: int = 5
+    reset_seconds: float = 30.0
+    hedge_provider: Optional[str] = None
+    hedge_model: Optional[str] = None
+    hedge_percentile: float = 95.0
+    hedge_min_samples: int = 20
+
+    @classmethod
+    def from_env(cls) -> "ResilienceConfig":
+        return cls(
+            max_attempts=max(1, int(_env_float("LLM_STREAM_MAX_ATTEMPTS", 3))),
+            backoff_base=_env_float("LLM_STREAM_BACKOFF_BASE", 0.25),
+            backoff_max=_env_float("LLM_STREAM_BACKOFF_MAX", 4.0),
+            failure_threshold=max(1, int(_env_float("LLM_CIRCUIT_FAILURE_THRESHOLD", 5))),
+            reset_seconds=_env_float("LLM_CIRCUIT_RESET_SECONDS", 30.0),
+            hedge_provider=os.getenv("LLM_HEDGE_PROVIDER") or None,
+            hedge_model=os.getenv("LLM_HEDGE_MODEL") or None,
+            hedge_percentile=_env_float("LLM_HEDGE_PERCENTILE", 95.0),
+            hedge_min_samples=max(1, int(_env_float("LLM_HEDGE_MIN_SAMPLES", 20))),
+        )
+
+    @property
+    def hedging_enabled(self) -> bool:
+        return bool(self.hedge_provider and self.hedge_model)
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (0-based) attempt."""
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+
+_config: Optional[ResilienceConfig] = None
+
+
+def get_resilience_config() -> ResilienceConfig:
+    """Get the process-wide resilience config (read from env once)."""
+    global _config
+    if _config is None:
+        _config = ResilienceConfig.from_env()
+    return _config
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one provider.
+
+    CLOSED: requests flow; transient failures are counted.
+    OPEN: requests fail fast until reset_seconds elapse.
+    HALF_OPEN: a single probe request is let through; success closes the
+    circuit, failure re-opens it. A probe that is cancelled, or that has
+    been outstanding longer than reset_seconds, no longer holds the slot.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started_at = 0.0
+
+    def before_request(self) -> bool:
+        """Raise CircuitOpenError if the request must not be sent.
+
+        Returns True if the request is the HALF_OPEN probe.
+        """
+        if self.state == self.CLOSED:
+            return False
+
+        now = time.monotonic()
+        elapsed = now - self.opened_at
+        if self.state == self.OPEN and elapsed >= self.reset_seconds:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight and now - self._probe_started_at >= self.reset_seconds:
+                log.warning(f"Circuit probe for {self.name} timed out; allowing another")
+                self._probe_in_flight = False
+            if not self._probe_in_flight:
+                self._probe_in_flight = True
+                self._probe_started_at = now
+                return True
+
+        raise CircuitOpenError(self.name, max(0.0, self.reset_seconds - elapsed))
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            log.info(f"Circuit closed for {self.name}")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                log.warning(f"Circuit opened for {self.name} after {self.failures} failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Free the HALF_OPEN probe slot without judging the provider (probe cancelled)."""
+        self._probe_in_flight = False
+
+
+class TTFTTracker:
+    """Rolling window of time-to-first-token samples for one provider/model."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float, min_samples: int = 1) -> Optional[float]:
+        """Nearest-rank percentile, or None until min_samples are collected."""
+        if len(self._samples) < min_samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+        return ordered[rank]
+
+
+# Process-wide registries (keyed by provider, and by provider:model for TTFT)
+_breakers: Dict[str, CircuitBreaker] = {}
+_ttft: Dict[str, TTFTTracker] = {}
+
+
+def get_circuit_breaker(provider: str) -> CircuitBreaker:
+    """Get (or create) the circuit breaker for a provider."""
+    if provider not in _breakers:
+        config = get_resilience_config()
+        _breakers[provider] = CircuitBreaker(
+            provider,
+            failure_threshold=config.failure_threshold,
+            reset_seconds=config.reset_seconds,
+        )
+    return _breakers[provider]
+
+
+def circuit_breaker_states() -> Dict[str, Dict[str, object]]:
+    """Snapshot of all circuit breakers, for health/diagnostics endpoints."""
+    return {
+        name: {"state": breaker.state, "failures": breaker.failures}
+        for name, breaker in _breakers.items()
+    }
+
+
+def get_ttft_tracker(key: str) -> TTFTTracker:
+    """Get (or create) the TTFT tracker for a provider:model key."""
+    if key not in _ttft:
+        _ttft[key] = TTFTTracker()
+    return _ttft[key]
+
+
+@dataclass
+class StreamTarget:
+    """A provider/model plus a factory that opens a fresh stream to it."""
+
+    provider: str
+    model: str
+    factory: Callable[[], AsyncIterator[str]]
+
+    @property
+    def key(self) -> str:
+        return f"{self.provider}:{self.model}"
+
+
+async def _aclose(stream: Optional[AsyncIterator[str]]) -> None:
+    aclose = getattr(stream, "aclose", None)
+    if aclose is not None:
+        try:
+            await aclose()
+        except Exception as e:
+            log.debug(f"Error closing LLM stream: {e}")
+
+
+_Opened = Tuple[StreamTarget, Optional[str], AsyncIterator[str]]
+
+
+async def _open_stream(target: StreamTarget, config: ResilienceConfig) -> _Opened:
+    """Open a stream and wait for its first chunk, retrying transient errors.
+
+    Returns (target, first_chunk, stream). first_chunk is None for an empty stream.
+    """
+    breaker = get_circuit_breaker(target.provider)
+    last_error: Optional[BaseException] = None
+
+    for attempt in range(config.max_attempts):
+        probe = breaker.before_request()
+        stream = target.factory()
+        started = time.monotonic()
+        try:
+            first = await stream.__anext__()
+        except StopAsyncIteration:
+            breaker.record_success()
+            return target, None, stream
+        except asyncio.CancelledError:
+            if probe:
+                breaker.release_probe()
+            await _aclose(stream)
+            raise
+        except Exception as e:
+            await _aclose(stream)
+            if not is_retryable_error(e):
+                # Not the provider's health, except that a failed probe must
+                # still settle the circuit
+                if probe:
+                    breaker.record_failure()
+                raise
+            breaker.record_failure()
+            last_error = e
+            if attempt + 1 < config.max_attempts:
+                delay = config.backoff(attempt)
+                log.warning(
+                    f"LLM stream to {target.key} failed before first token "
+                    f"(attempt {attempt + 1}/{config.max_attempts}): {e!r}; retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+            continue
+
+        breaker.record_success()
+        get_ttft_tracker(target.key).record(time.monotonic() - started)
+        return target, first, stream
+
+    assert last_error is not None
+    raise last_error
+
+
+async def _first_successful(tasks: Set["asyncio.Task[_Opened]"], primary: "asyncio.Task[_Opened]") -> _Opened:
+    """Return the first task result that succeeded, cancelling the rest."""
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            winners = [t for t in done if not t.cancelled() and t.exception() is None]
+            if winners:
+                winner = primary if primary in winners else winners[0]
+                for loser in winners:
+                    if loser is not winner:
+                        await _aclose(loser.result()[2])
+                return winner.result()
+        # Everyone failed: surface the primary's error
+        raise primary.exception() or next(iter(tasks)).exception()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def resilient_stream(
+    primary: StreamTarget,
+    hedge: Optional[StreamTarget] = None,
+    config: Optional[ResilienceConfig] = None,
+    on_target: Optional[Callable[[StreamTarget], None]] = None,
+) -> AsyncIterator[str]:
+    """Stream from primary with retries, circuit breaking, and optional hedging.
+
+    With a hedge target:
+    - If the primary's TTFT exceeds the configured percentile of recent
+      TTFTs, the hedge is started and the two race for the first token.
+    - If the primary fails outright before its first token (retries
+      exhausted, or circuit open), the hedge is used as failover.
+
+    on_target, if given, is called with the target that won before its
+    first chunk is yielded.
+    """
+    config = config or get_resilience_config()
+
+    primary_task = asyncio.create_task(_open_stream(primary, config))
+    tasks = {primary_task}
+    stream: Optional[AsyncIterator[str]] = None
+
+    try:
+        if hedge is None:
+            target, first, stream = await primary_task
+        else:
+            hedge_after = get_ttft_tracker(primary.key).percentile(
+                config.hedge_percentile, config.hedge_min_samples
+            )
+            await asyncio.wait({primary_task}, timeout=hedge_after)
+
+            if primary_task.done() and primary_task.exception() is None:
+                target, first, stream = primary_task.result()
+            else:
+                reason = "failed" if primary_task.done() else f"TTFT > {hedge_after:.2f}s"
+                log.info(f"Hedging LLM stream {primary.key} -> {hedge.key} ({reason})")
+                tasks.add(asyncio.create_task(_open_stream(hedge, config)))
+                target, first, stream = await _first_successful(tasks, primary_task)
+
+        if on_target is not None:
+            on_target(target)
+        if first is not None:
+            yield first
+
+        try:
+            async for chunk in stream:
+                yield chunk
+        except Exception as e:
+            # Tokens already reached the caller; count it, but don't retry
+            if is_retryable_error(e):
+                get_circuit_breaker(target.provider).record_failure()
+            raise
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await _aclose(stream)
+
@@ -1,16 +1,52 @@
 """Memory extraction and retrieval service."""
 
+import asyncio
 import json
 import logging
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 from uuid import UUID
 
-from app.models.memory import ExtractedMemory, MemoryType, MemoryEvent
-from app.models.hook import ExtractedHook, HookType
+from app.models.memory import MEMORY_EVENT_COLUMNS, ExtractedMemory, MemoryType, MemoryEvent
+from app.models.hook import ExtractedHook, Hook, HookType
+from app.services.hook_scheduler import READY_HOOKS_QUERY
 from app.services.llm import LLMService
+from app.services.memory_index import MemoryScope, SemanticMemoryIndex, to_pgvector
+from app.services.memory_layers import (
+    CHARACTER_LAYER,
+    HOOKS_LAYER,
+    SERIES_LAYER,
+    SESSION_LAYER,
+    USER_LAYER,
+    MemoryLayerCache,
+    merge_layers,
+)
+from app.services.memory_working_set import MemoryWorkingSetService
 
 log = logging.getLogger(__name__)
 
+BEAT_CLASSIFICATION_GUIDE = """IMPORTANT: This is a ROMANTIC TENSION experience. Tension and desire are the goal, not comfort.
+
+beat_classification:
+  type: playful | flirty | tense | vulnerable | supportive | conflict | comfort | charged | longing | neutral
+  tension_change: integer from -15 to +15
+    - POSITIVE tension changes (+5 to +15): flirty exchanges, "almost" moments, jealousy, vulnerability, conflict, charged silences
+    - NEGATIVE tension changes (-5 to -15): resolved conflicts, excessive comfort, breaking romantic frame
+    - Note: Some tension is GOOD - don't reduce tension just because things are "nice"
+
+  milestone: null OR one of:
+    - "first_spark" (first moment of clear romantic/sexual tension)
+    - "almost_moment" (interrupted intimacy, held back kiss, lingering touch)
+    - "jealousy_triggered" (one party showed jealousy or possessiveness)
+    - "boundary_pushed" (someone crossed a line, broke a rule)
+    - "vulnerability_shared" (someone revealed something risky)
+    - "desire_expressed" (explicit attraction acknowledged)
+    - "first_touch" (first meaningful physical contact)
+    - "conflict_unresolved" (tension left hanging, not fixed)
+    - "inside_joke_created" (shared humor reference established)
+    - "deep_confession" (profound personal revelation)
+"""
+
 MEMORY_EXTRACTION_PROMPT = """Analyze this conversation exchange and extract any important information to remember about the user.
 
 CONVERSATION:
@@ -39,29 +75,10 @@ Only extract NEW information. Skip things that are:
 EXISTING MEMORIES:
 {existing_memories}
 
-Additionally, classify this exchange's narrative beat.
-
-IMPORTANT: This is a ROMANTIC TENSION experience. Tension and desire are the goal, not comfort.
-
-beat_classification:
-  type: playful | flirty | tense | vulnerable | supportive | conflict | comfort | charged | longing | neutral
-  tension_change: integer from -15 to +15
-    - POSITIVE tension changes (+5 to +15): flirty exchanges, "almost" moments, jealousy, vulnerability, conflict, charged silences
-    - NEGATIVE tension changes (-5 to -15): resolved conflicts, excessive comfort, breaking romantic frame
-    - Note: Some tension is GOOD - don't reduce tension just because things are "nice"
-
-  milestone: null OR one of:
-    - "first_spark" (first moment of clear romantic/sexual tension)
-    - "almost_moment" (interrupted intimacy, held back kiss, lingering touch)
-    - "jealousy_triggered" (one party showed jealousy or possessiveness)
-    - "boundary_pushed" (someone crossed a line, broke a rule)
-    - "vulnerability_shared" (someone revealed something risky)
-    - "desire_expressed" (explicit attraction acknowledged)
-    - "first_touch" (first meaningful physical contact)
-    - "conflict_unresolved" (tension left hanging, not fixed)
-    - "inside_joke_created" (shared humor reference established)
-    - "deep_confession" (profound personal revelation)
+Additionally, classify the narrative beat of the most recent exchange (the last
+user message and the character's reply).
 
+{beat_guide}
 Respond with JSON:
 {{
     "memories": [...],
@@ -112,6 +129,97 @@ Respond with JSON:
 }}
 """
 
+# JSON schemas for native structured output (schema_description strings above
+# remain the prompt-and-parse fallback)
+BEAT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "type": {"type": "string"},
+        "tension_change": {"type": "integer"},
+        "milestone": {"type": ["string", "null"]},
+    },
+    "required": ["type", "tension_change"],
+}
+
+MEMORY_EXTRACTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "memories": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "type": {"type": "string", "enum": [t.value for t in MemoryType]},
+                    "summary": {"type": "string"},
+                    "importance_score": {"type": "number"},
+                    "emotional_valence": {"type": "integer"},
+                    "category": {"type": ["string", "null"]},
+                },
+                "required": ["type", "summary", "importance_score", "emotional_valence"],
+            },
+        },
+        "beat": BEAT_SCHEMA,
+    },
+    "required": ["memories", "beat"],
+}
+
+HOOK_EXTRACTION_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "type": {"type": "string", "enum": [t.value for t in HookType]},
+            "content": {"type": "string"},
+            "suggested_opener": {"type": ["string", "null"]},
+            "days_until_trigger": {"type": ["integer", "null"]},
+            "priority": {"type": "integer"},
+        },
+        "required": ["type", "content", "priority"],
+    },
+}
+
+SUMMARY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "emotional_tags": {"type": "array", "items": {"type": "string"}},
+        "key_events": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["summary", "emotional_tags", "key_events"],
+}
+
+
+# Genre 01: Higher baseline tension (45 instead of 30), "intrigued" instead of "warm"
+DEFAULT_RELATIONSHIP_DYNAMIC = {"tone": "intrigued", "tension_level": 45, "recent_beats": []}
+
+# Tone from tension and the dominant recent beat (Genre 01: romance-focused).
+# First rule with tension > above and the dominant beat in beats (None = any
+# beat) wins. Evaluated by _derive_tone and, in SQL, apply_relationship_beat.
+RELATIONSHIP_TONE_RULES = [
+    {"above": 75, "beats": ["conflict", "tense"], "tone": "heated"},
+    {"above": 75, "beats": ["flirty", "vulnerable"], "tone": "electric"},
+    {"above": 75, "beats": None, "tone": "intense"},
+    {"above": 55, "beats": ["flirty"], "tone": "charged"},
+    {"above": 55, "beats": ["vulnerable"], "tone": "intimate"},
+    {"above": 55, "beats": ["tense"], "tone": "simmering"},
+    {"above": 55, "beats": None, "tone": "magnetic"},
+    {"above": 40, "beats": ["playful"], "tone": "teasing"},
+    {"above": 40, "beats": ["flirty"], "tone": "flirty"},
+    {"above": 40, "beats": ["vulnerable"], "tone": "tender"},
+    {"above": 40, "beats": None, "tone": "intrigued"},
+    # Even at low tension, avoid pure comfort: "softened", not "comfortable"
+    {"above": -1, "beats": ["comfort", "supportive"], "tone": "softened"},
+    {"above": -1, "beats": ["playful"], "tone": "light"},
+    {"above": -1, "beats": None, "tone": "curious"},
+]
+
+@dataclass
+class ResolvedMemoryContext:
+    """Memories and hooks for one conversation turn (MemoryService.resolve_context)."""
+
+    memories: List[MemoryEvent] = field(default_factory=list)
+    hooks: List[Hook] = field(default_factory=list)
+
 
 class MemoryService:
     """Service for memory extraction and retrieval."""
@@ -119,6 +227,9 @@ class MemoryService:
     def __init__(self, db):
         self.db = db
         self.llm = LLMService.get_instance()
+        self.semantic_index = SemanticMemoryIndex.get_instance()
+        self.working_sets = MemoryWorkingSetService(db)
+        self.layers = MemoryLayerCache.get_instance()
 
     async def extract_memories(
         self,
@@ -127,17 +238,28 @@ class MemoryService:
         episode_id: UUID,
         messages: List[Dict[str, str]],
         existing_memories: List[MemoryEvent],
+        window: int = 6,
     ) -> tuple[List[ExtractedMemory], Optional[Dict]]:
         """Extract memories and beat classification from a conversation exchange.
 
+        window is the number of trailing messages shown to the LLM (last 3
+        exchanges by default; larger when the extraction gate batched
+        skipped turns).
+
+        The beat covers the most recent exchange only; turns the gate skipped
+        get theirs from the Director's evaluate_exchange call.
+
         Returns:
             tuple: (list of ExtractedMemory, beat classification dict or None)
+
+        Raises if the LLM call fails, so the caller can keep the window
+        pending and retry it on a later turn.
         """
         if len(messages) < 2:
             return [], None
 
         # Format conversation
-        conversation = self._format_conversation(messages[-6:])  # Last 3 exchanges
+        conversation = self._format_conversation(messages[-window:])
 
         # Format existing memories
         existing_text = "\n".join(
@@ -147,12 +269,12 @@ class MemoryService:
         prompt = MEMORY_EXTRACTION_PROMPT.format(
             conversation=conversation,
             existing_memories=existing_text,
+            beat_guide=BEAT_CLASSIFICATION_GUIDE,
         )
 
-        try:
-            result = await self.llm.extract_json(
-                prompt=prompt,
-                schema_description="""{
+        result = await self.llm.extract_json(
+            prompt=prompt,
+            schema_description="""{
     "memories": [
         {
             "type": "fact|preference|event|goal|relationship|emotion",
@@ -168,47 +290,46 @@ class MemoryService:
         "milestone": "string or null"
     }
 }""",
-            )
-
-            memories = []
-            beat_data = None
+            json_schema=MEMORY_EXTRACTION_SCHEMA,
+            call_site="memory.extract_memories",
+        )
 
-            # Handle both old format (array) and new format (object with memories and beat)
-            memory_items = result.get("memories", []) if isinstance(result, dict) else result
-            beat_data = result.get("beat") if isinstance(result, dict) else None
+        memories = []
+        beat_data = None
 
-            for item in memory_items:
-                try:
-                    # Handle LLM returning uppercase types
-                    memory_type = item["type"].lower() if isinstance(item.get("type"), str) else item["type"]
-                    memory = ExtractedMemory(
-                        type=MemoryType(memory_type),
-                        summary=item["summary"],
-                        content={"raw": item.get("summary")},
-                        importance_score=float(item.get("importance_score", 0.5)),
-                        emotional_valence=int(item.get("emotional_valence", 0)),
-                        category=item.get("category"),
-                    )
-                    memories.append(memory)
-                except (KeyError, ValueError) as e:
-                    log.warning(f"Failed to parse memory: {e}")
-                    continue
+        # Handle both old format (array) and new format (object with memories and beat)
+        memory_items = result.get("memories", []) if isinstance(result, dict) else result
+        beat_data = result.get("beat") if isinstance(result, dict) else None
 
-            return memories, beat_data
+        for item in memory_items:
+            try:
+                # Handle LLM returning uppercase types
+                memory_type = item["type"].lower() if isinstance(item.get("type"), str) else item["type"]
+                memory = ExtractedMemory(
+                    type=MemoryType(memory_type),
+                    summary=item["summary"],
+                    content={"raw": item.get("summary")},
+                    importance_score=float(item.get("importance_score", 0.5)),
+                    emotional_valence=int(item.get("emotional_valence", 0)),
+                    category=item.get("category"),
+                )
+                memories.append(memory)
+            except (KeyError, ValueError) as e:
+                log.warning(f"Failed to parse memory: {e}")
+                continue
 
-        except Exception as e:
-            log.error(f"Memory extraction failed: {e}")
-            return [], None
+        return memories, beat_data
 
     async def extract_hooks(
         self,
         messages: List[Dict[str, str]],
+        window: int = 6,
     ) -> List[ExtractedHook]:
-        """Extract conversation hooks from an exchange."""
+        """Extract conversation hooks from the last `window` messages."""
         if len(messages) < 2:
             return []
 
-        conversation = self._format_conversation(messages[-6:])
+        conversation = self._format_conversation(messages[-window:])
 
         prompt = HOOK_EXTRACTION_PROMPT.format(conversation=conversation)
 
@@ -224,6 +345,8 @@ class MemoryService:
         "priority": 1-5
     }
 ]""",
+                json_schema=HOOK_EXTRACTION_SCHEMA,
+                call_site="memory.extract_hooks",
             )
 
             hooks = []
@@ -268,6 +391,8 @@ class MemoryService:
     "emotional_tags": ["string"],
     "key_events": ["string"]
 }""",
+                json_schema=SUMMARY_SCHEMA,
+                call_site="memory.episode_summary",
             )
             return result
         except Exception as e:
@@ -288,8 +413,25 @@ class MemoryService:
     ) -> List[MemoryEvent]:
         """Save extracted memories to database.
 
+        Kept for existing callers; delegates to save_memories_batch().
+        """
+        return await self.save_memories_batch(user_id, character_id, episode_id, memories, series_id)
+
+    async def save_memories_batch(
+        self,
+        user_id: UUID,
+        character_id: UUID,
+        episode_id: UUID,
+        memories: List[ExtractedMemory],
+        series_id: Optional[UUID] = None,
+    ) -> List[MemoryEvent]:
+        """Save all memories from an exchange in one INSERT ... SELECT FROM unnest.
+
         Memories are scoped by series_id (preferred) for series-level memory isolation.
         character_id is retained for backwards compatibility and character-centric queries.
+        If series_id isn't given it is resolved from the session inside the same
+        statement. Embeddings (for semantic retrieval) are computed first and
+        written with the rows.
 
         Args:
             user_id: User UUID
@@ -297,45 +439,77 @@ class MemoryService:
             episode_id: Episode/session UUID
             memories: List of extracted memories to save
             series_id: Series UUID for series-scoped memory (preferred scope)
+
+        Returns:
+            Saved MemoryEvents, in input order
         """
-        saved = []
-
-        # If series_id not provided, try to get it from the session
-        if not series_id:
-            session_query = "SELECT series_id FROM sessions WHERE id = :episode_id"
-            session_row = await self.db.fetch_one(session_query, {"episode_id": str(episode_id)})
-            if session_row:
-                session_dict = dict(session_row)
-                if session_dict.get("series_id"):
-                    series_id = session_dict["series_id"]
-
-        for memory in memories:
-            query = """
-                INSERT INTO memory_events (
-                    user_id, character_id, episode_id, series_id, type, category,
-                    content, summary, emotional_valence, importance_score
-                )
-                VALUES (:user_id, :character_id, :episode_id, :series_id, :type, :category,
-                        :content, :summary, :emotional_valence, :importance_score)
-                RETURNING *
-            """
-            row = await self.db.fetch_one(
-                query,
-                {
-                    "user_id": str(user_id),
-                    "character_id": str(character_id),
-                    "episode_id": str(episode_id),
-                    "series_id": str(series_id) if series_id else None,
-                    "type": memory.type.value,
-                    "category": memory.category,
-                    "content": json.dumps(memory.content),
-                    "summary": memory.summary,
-                    "emotional_valence": memory.emotional_valence,
-                    "importance_score": memory.importance_score,
-                },
+        if not memories:
+            return []
+
+        # Embedding failure only costs semantic ranking; the memories are still saved
+        vectors = None
+        if self.semantic_index.enabled:
+            try:
+                vectors = await self.semantic_index.embedder.embed([m.summary for m in memories])
+            except Exception as e:
+                log.warning(f"Failed to embed {len(memories)} memories: {e}")
+
+        query = """
+            INSERT INTO memory_events (
+                user_id, character_id, episode_id, series_id, type, category,
+                content, summary, emotional_valence, importance_score, base_importance,
+                embedding, embedding_model
+            )
+            SELECT
+                CAST(:user_id AS uuid),
+                CAST(:character_id AS uuid),
+                CAST(:episode_id AS uuid),
+                COALESCE(
+                    CAST(:series_id AS uuid),
+                    (SELECT series_id FROM sessions WHERE id = CAST(:episode_id AS uuid))
+                ),
+                m.type, m.category, m.content, m.summary, m.emotional_valence, m.importance_score,
+                m.importance_score,
+                CAST(m.embedding AS vector),
+                CASE WHEN m.embedding IS NOT NULL THEN :embedding_model END
+            FROM unnest(
+                CAST(:types AS text[]),
+                CAST(:categories AS text[]),
+                CAST(:contents AS jsonb[]),
+                CAST(:summaries AS text[]),
+                CAST(:valences AS integer[]),
+                CAST(:importances AS float8[]),
+                CAST(:embeddings AS text[])
+            ) WITH ORDINALITY AS m(
+                type, category, content, summary, emotional_valence, importance_score, embedding, ord
             )
-            saved.append(MemoryEvent(**dict(row)))
+            ORDER BY m.ord
+            RETURNING *
+        """
+        rows = await self.db.fetch_all(
+            query,
+            {
+                "user_id": str(user_id),
+                "character_id": str(character_id),
+                "episode_id": str(episode_id),
+                "series_id": str(series_id) if series_id else None,
+                "types": [m.type.value for m in memories],
+                "categories": [m.category for m in memories],
+                "contents": [json.dumps(m.content) for m in memories],
+                "summaries": [m.summary for m in memories],
+                "valences": [m.emotional_valence for m in memories],
+                "importances": [m.importance_score for m in memories],
+                "embeddings": [to_pgvector(v) for v in vectors] if vectors is not None else [None] * len(memories),
+                "embedding_model": self.semantic_index.embedder.model,
+            },
+        )
+        saved = [MemoryEvent(**dict(row)) for row in rows]
 
+        if vectors is not None and rows:
+            scope = MemoryScope(user_id=user_id, character_id=character_id, series_id=rows[0]["series_id"])
+            self.semantic_index.backend.add(scope, saved, vectors)
+
+        self.layers.invalidate_memories(saved)
         return saved
 
     async def save_hooks(
@@ -345,35 +519,68 @@ class MemoryService:
         episode_id: UUID,
         hooks: List[ExtractedHook],
     ):
-        """Save extracted hooks to database."""
-        from datetime import datetime, timedelta
-
-        for hook in hooks:
-            trigger_after = None
-            if hook.days_until_trigger:
-                trigger_after = datetime.utcnow() + timedelta(days=hook.days_until_trigger)
-
-            query = """
-                INSERT INTO hooks (
-                    user_id, character_id, episode_id, type, priority,
-                    content, suggested_opener, trigger_after
-                )
-                VALUES (:user_id, :character_id, :episode_id, :type, :priority,
-                        :content, :suggested_opener, :trigger_after)
-            """
-            await self.db.execute(
-                query,
-                {
-                    "user_id": str(user_id),
-                    "character_id": str(character_id),
-                    "episode_id": str(episode_id),
-                    "type": hook.type.value,
-                    "priority": hook.priority,
-                    "content": hook.content,
-                    "suggested_opener": hook.suggested_opener,
-                    "trigger_after": trigger_after,
-                },
+        """Save extracted hooks to database.
+
+        Kept for existing callers; delegates to save_hooks_batch().
+        """
+        await self.save_hooks_batch(user_id, character_id, episode_id, hooks)
+
+    async def save_hooks_batch(
+        self,
+        user_id: UUID,
+        character_id: UUID,
+        episode_id: UUID,
+        hooks: List[ExtractedHook],
+    ) -> List[Hook]:
+        """Save all hooks from an exchange in one INSERT ... SELECT FROM unnest.
+
+        trigger_after is computed in the database from days_until_trigger.
+
+        Returns:
+            Saved Hooks, in input order
+        """
+        if not hooks:
+            return []
+
+        query = """
+            INSERT INTO hooks (
+                user_id, character_id, episode_id, type, priority,
+                content, suggested_opener, trigger_after
             )
+            SELECT
+                CAST(:user_id AS uuid),
+                CAST(:character_id AS uuid),
+                CAST(:episode_id AS uuid),
+                h.type, h.priority, h.content, h.suggested_opener,
+                CASE WHEN h.days_until_trigger <> 0
+                     THEN NOW() + make_interval(days => h.days_until_trigger)
+                END
+            FROM unnest(
+                CAST(:types AS text[]),
+                CAST(:priorities AS integer[]),
+                CAST(:contents AS text[]),
+                CAST(:openers AS text[]),
+                CAST(:days AS integer[])
+            ) WITH ORDINALITY AS h(type, priority, content, suggested_opener, days_until_trigger, ord)
+            ORDER BY h.ord
+            RETURNING *
+        """
+        rows = await self.db.fetch_all(
+            query,
+            {
+                "user_id": str(user_id),
+                "character_id": str(character_id),
+                "episode_id": str(episode_id),
+                "types": [h.type.value for h in hooks],
+                "priorities": [h.priority for h in hooks],
+                "contents": [h.content for h in hooks],
+                "openers": [h.suggested_opener for h in hooks],
+                "days": [h.days_until_trigger for h in hooks],
+            },
+        )
+        saved = [Hook(**dict(row)) for row in rows]
+        self.layers.invalidate_hooks(user_id, character_id)
+        return saved
 
     async def get_relevant_memories(
         self,
@@ -381,6 +588,7 @@ class MemoryService:
         character_id: UUID,
         limit: int = 10,
         series_id: Optional[UUID] = None,
+        query_text: Optional[str] = None,
     ) -> List[MemoryEvent]:
         """Get memories relevant for a conversation.
 
@@ -390,79 +598,234 @@ class MemoryService:
 
         This supports the series-scoped memory model where memories belong
         to "your story with this series" not "the character."
+
+        With query_text (usually the user's current message), candidates are
+        re-ranked by similarity blended with importance and recency (see
+        memory_index). If that exceeds its time budget or fails, the
+        importance/recency ranking below is returned as-is.
         """
+        ranked = await self._get_ranked_memories(user_id, character_id, limit, series_id)
+        if not query_text or not query_text.strip() or not self.semantic_index.enabled:
+            return ranked
+
+        scope = MemoryScope(user_id=user_id, character_id=character_id, series_id=series_id)
+        try:
+            return await self.semantic_index.rank(self.db, scope, query_text, limit, fallback=ranked)
+        except asyncio.TimeoutError:
+            log.warning("Semantic memory retrieval timed out; using importance ranking")
+        except Exception as e:
+            log.warning(f"Semantic memory retrieval failed; using importance ranking: {e}")
+        return ranked
+
+    async def _get_ranked_memories(
+        self,
+        user_id: UUID,
+        character_id: UUID,
+        limit: int,
+        series_id: Optional[UUID],
+    ) -> List[MemoryEvent]:
+        """Importance/recency ranking, at most 3 memories per type."""
         if series_id:
-            # Series-scoped memory retrieval (preferred)
-            query = """
-                WITH ranked_memories AS (
-                    SELECT *,
-                        ROW_NUMBER() OVER (
-                            PARTITION BY type
-                            ORDER BY
-                                CASE WHEN created_at > NOW() - INTERVAL '7 days' THEN 1 ELSE 0 END DESC,
-                                importance_score DESC,
-                                created_at DESC
-                        ) as rn
-                    FROM memory_events
-                    WHERE user_id = :user_id
-                        AND series_id = :series_id
-                        AND is_active = TRUE
-                )
-                SELECT * FROM ranked_memories
-                WHERE rn <= 3
-                ORDER BY importance_score DESC, created_at DESC
-                LIMIT :limit
-            """
-            rows = await self.db.fetch_all(query, {
-                "user_id": str(user_id),
-                "series_id": str(series_id),
-                "limit": limit,
-            })
+            # Series-scoped memory retrieval (preferred): read the precomputed
+            # working set; compute live if the scope has none yet
+            try:
+                memories = await self.working_sets.get_ranked(user_id, series_id, limit)
+            except Exception as e:
+                log.warning(f"Memory working set read failed; ranking live: {e}")
+                memories = None
+            if memories is None:
+                memories = await self.working_sets.get_ranked_live(user_id, series_id, limit)
+            return memories
+
+        # Legacy character-scoped retrieval (fallback)
+        query = f"""
+            WITH ranked_memories AS (
+                SELECT {MEMORY_EVENT_COLUMNS},
+                    ROW_NUMBER() OVER (
+                        PARTITION BY type
+                        ORDER BY
+                            CASE WHEN created_at > NOW() - INTERVAL '7 days' THEN 1 ELSE 0 END DESC,
+                            importance_score DESC,
+                            created_at DESC
+                    ) as rn
+                FROM memory_events
+                WHERE user_id = :user_id
+                    AND (character_id = :character_id OR character_id IS NULL)
+                    AND is_active = TRUE
+            )
+            SELECT * FROM ranked_memories
+            WHERE rn <= 3
+            ORDER BY importance_score DESC, created_at DESC
+            LIMIT :limit
+        """
+        rows = await self.db.fetch_all(query, {"user_id": str(user_id), "character_id": str(character_id), "limit": limit})
+        return [MemoryEvent(**dict(row)) for row in rows]
+
+    async def resolve_context(
+        self,
+        user_id: UUID,
+        character_id: UUID,
+        series_id: Optional[UUID] = None,
+        session_id: Optional[UUID] = None,
+        query_text: Optional[str] = None,
+        memory_limit: int = 10,
+        hook_limit: int = 5,
+    ) -> "ResolvedMemoryContext":
+        """Memories and hooks for a conversation turn, through the cached layers.
+
+        Layers, most specific first: this session's memories, the series
+        working set (primary), what this character knows from other series,
+        and high-importance user facts (see memory_layers). With no series,
+        the legacy character-scoped ranking is the primary layer.
+
+        query_text re-ranks the primary layer semantically, as in
+        get_relevant_memories(), before the layers are merged, so the shared
+        layers keep their quotas.
+        """
+        uid = str(user_id)
+        cid = str(character_id)
+        sid = str(series_id) if series_id else None
+        limit_key = str(memory_limit)
+        shared_limit = self.layers.config.shared_limit
+
+        layers = []
+        if session_id:
+            layers.append((SESSION_LAYER, await self.layers.get_or_load(
+                SESSION_LAYER, (uid, str(session_id)),
+                lambda: self._load_session_layer(user_id, session_id, shared_limit),
+            )))
+        if series_id:
+            primary = SERIES_LAYER
+            layers.append((SERIES_LAYER, await self.layers.get_or_load(
+                SERIES_LAYER, (uid, sid, limit_key),
+                lambda: self._get_ranked_memories(user_id, character_id, memory_limit, series_id),
+            )))
+            # Cross-series: what this character knows from the user's other series
+            layers.append((CHARACTER_LAYER, await self.layers.get_or_load(
+                CHARACTER_LAYER, (uid, cid, "other_than", sid, limit_key),
+                lambda: self._load_character_layer(user_id, character_id, memory_limit, series_id),
+            )))
         else:
-            # Legacy character-scoped retrieval (fallback)
-            query = """
-                WITH ranked_memories AS (
-                    SELECT *,
-                        ROW_NUMBER() OVER (
-                            PARTITION BY type
-                            ORDER BY
-                                CASE WHEN created_at > NOW() - INTERVAL '7 days' THEN 1 ELSE 0 END DESC,
-                                importance_score DESC,
-                                created_at DESC
-                        ) as rn
-                    FROM memory_events
-                    WHERE user_id = :user_id
-                        AND (character_id = :character_id OR character_id IS NULL)
-                        AND is_active = TRUE
+            # Legacy character scope is the primary layer; cached per character
+            primary = CHARACTER_LAYER
+            layers.append((CHARACTER_LAYER, await self.layers.get_or_load(
+                CHARACTER_LAYER, (uid, cid, "legacy", limit_key),
+                lambda: self._get_ranked_memories(user_id, character_id, memory_limit, None),
+            )))
+        layers.append((USER_LAYER, await self.layers.get_or_load(
+            USER_LAYER, (uid, "other_than", sid or "", limit_key),
+            lambda: self._load_user_layer(user_id, memory_limit, series_id),
+        )))
+
+        if query_text and query_text.strip() and self.semantic_index.enabled:
+            # Only the primary layer is re-ranked; the shared layers keep their
+            # quotas and go through the same dedup in merge_layers
+            scope = MemoryScope(user_id=user_id, character_id=character_id, series_id=series_id)
+            at = next(i for i, (name, _) in enumerate(layers) if name == primary)
+            try:
+                ranked = await self.semantic_index.rank(
+                    self.db, scope, query_text, memory_limit, fallback=layers[at][1],
                 )
-                SELECT * FROM ranked_memories
-                WHERE rn <= 3
-                ORDER BY importance_score DESC, created_at DESC
-                LIMIT :limit
-            """
-            rows = await self.db.fetch_all(query, {"user_id": str(user_id), "character_id": str(character_id), "limit": limit})
+                layers[at] = (primary, ranked)
+            except asyncio.TimeoutError:
+                log.warning("Semantic memory retrieval timed out; using layered ranking")
+            except Exception as e:
+                log.warning(f"Semantic memory retrieval failed; using layered ranking: {e}")
+
+        memories = merge_layers(layers, primary, memory_limit, shared_limit)
+
+        hooks = await self.layers.get_or_load(
+            HOOKS_LAYER, (uid, cid),
+            lambda: self.get_active_hooks(user_id, character_id, limit=hook_limit),
+        )
+        return ResolvedMemoryContext(memories=memories, hooks=hooks[:hook_limit])
+
+    async def _load_session_layer(self, user_id: UUID, session_id: UUID, limit: int) -> List[MemoryEvent]:
+        """Most recent memories extracted in this session."""
+        rows = await self.db.fetch_all(
+            f"""
+            SELECT {MEMORY_EVENT_COLUMNS} FROM memory_events
+            WHERE user_id = :user_id
+                AND episode_id = :session_id
+                AND is_active = TRUE
+            ORDER BY created_at DESC
+            LIMIT :limit
+            """,
+            {"user_id": str(user_id), "session_id": str(session_id), "limit": limit},
+        )
         return [MemoryEvent(**dict(row)) for row in rows]
 
-    async def get_active_hooks(
+    async def _load_character_layer(
         self,
         user_id: UUID,
         character_id: UUID,
-        limit: int = 5,
-    ):
-        """Get active hooks for a conversation."""
-        from app.models.hook import Hook
+        limit: int,
+        exclude_series_id: Optional[UUID] = None,
+    ) -> List[MemoryEvent]:
+        """What this character knows about the user from series other than exclude_series_id.
 
-        query = """
-            SELECT * FROM hooks
+        The series is excluded in SQL, before the limit, so a scope full of
+        important current-series memories can't crowd out the rest.
+        """
+        rows = await self.db.fetch_all(
+            f"""
+            SELECT {MEMORY_EVENT_COLUMNS} FROM memory_events
             WHERE user_id = :user_id
                 AND character_id = :character_id
+                AND (CAST(:series_id AS uuid) IS NULL OR series_id IS DISTINCT FROM CAST(:series_id AS uuid))
                 AND is_active = TRUE
-                AND triggered_at IS NULL
-                AND (trigger_after IS NULL OR trigger_after <= NOW())
-                AND (trigger_before IS NULL OR trigger_before >= NOW())
-            ORDER BY priority DESC, trigger_after ASC NULLS LAST
+            ORDER BY importance_score DESC, created_at DESC
             LIMIT :limit
+            """,
+            {
+                "user_id": str(user_id),
+                "character_id": str(character_id),
+                "series_id": str(exclude_series_id) if exclude_series_id else None,
+                "limit": limit,
+            },
+        )
+        return [MemoryEvent(**dict(row)) for row in rows]
+
+    async def _load_user_layer(
+        self,
+        user_id: UUID,
+        limit: int,
+        exclude_series_id: Optional[UUID] = None,
+    ) -> List[MemoryEvent]:
+        """High-importance facts about the user, learned in any other series."""
+        rows = await self.db.fetch_all(
+            f"""
+            SELECT {MEMORY_EVENT_COLUMNS} FROM memory_events
+            WHERE user_id = :user_id
+                AND type = 'fact'
+                AND importance_score >= :min_importance
+                AND (CAST(:series_id AS uuid) IS NULL OR series_id IS DISTINCT FROM CAST(:series_id AS uuid))
+                AND is_active = TRUE
+            ORDER BY importance_score DESC, created_at DESC
+            LIMIT :limit
+            """,
+            {
+                "user_id": str(user_id),
+                "min_importance": self.layers.config.user_min_importance,
+                "series_id": str(exclude_series_id) if exclude_series_id else None,
+                "limit": limit,
+            },
+        )
+        return [MemoryEvent(**dict(row)) for row in rows]
+
+    async def get_active_hooks(
+        self,
+        user_id: UUID,
+        character_id: UUID,
+        limit: int = 5,
+    ):
+        """Get active hooks for a conversation.
+
+        Reads the ready set maintained by HookScheduler (due, untriggered
+        hooks) in priority order from idx_hooks_ready, plus hooks due but not
+        yet promoted.
         """
+        query = READY_HOOKS_QUERY.format(table="hooks")
         rows = await self.db.fetch_all(query, {"user_id": str(user_id), "character_id": str(character_id), "limit": limit})
         return [Hook(**dict(row)) for row in rows]
 
@@ -485,7 +848,7 @@ class MemoryService:
         beat_type: str,
         tension_change: int,
         milestone: Optional[str],
-    ) -> None:
+    ) -> Optional[Dict]:
         """Update relationship with beat classification results.
 
         Updates the dynamic JSONB column with:
@@ -494,72 +857,52 @@ class MemoryService:
         - recent_beats: last 10 beat types
 
         Also adds milestone if provided and not already recorded.
+
+        Runs as one atomic statement (apply_relationship_beat, migration 070)
+        so concurrent Director tasks can't lose each other's beats.
+
+        Returns:
+            The new state in get_relationship_dynamic() shape, or None if
+            there is no engagement. The state is also cached in the memory
+            layers, where the next get_context picks it up.
         """
-        # Get current engagement dynamic
         row = await self.db.fetch_one(
-            """SELECT id, dynamic, milestones FROM engagements
-               WHERE user_id = :user_id AND character_id = :character_id""",
-            {"user_id": str(user_id), "character_id": str(character_id)},
+            """SELECT new_dynamic, new_milestones, milestone_added
+               FROM apply_relationship_beat(
+                   CAST(:user_id AS uuid), CAST(:character_id AS uuid), :beat_type,
+                   :tension_change, :milestone, CAST(:tone_rules AS jsonb)
+               )""",
+            {
+                "user_id": str(user_id),
+                "character_id": str(character_id),
+                "beat_type": beat_type,
+                "tension_change": tension_change,
+                "milestone": milestone or None,
+                "tone_rules": json.dumps(RELATIONSHIP_TONE_RULES),
+            },
         )
 
         if not row:
             log.warning(f"No engagement found for user={user_id}, character={character_id}")
-            return
-
-        engagement_id = row["id"]
-        # Genre 01: Higher baseline tension (45 instead of 30), "intrigued" instead of "warm"
-        dynamic = row["dynamic"] or {"tone": "intrigued", "tension_level": 45, "recent_beats": []}
-        milestones = row["milestones"] or []
-
-        # Parse dynamic if it's a string (from DB)
-        if isinstance(dynamic, str):
-            try:
-                dynamic = json.loads(dynamic)
-            except json.JSONDecodeError:
-                dynamic = {"tone": "intrigued", "tension_level": 45, "recent_beats": []}
-
-        # Update recent beats (keep last 10)
-        recent_beats = dynamic.get("recent_beats", [])
-        recent_beats.append(beat_type)
-        recent_beats = recent_beats[-10:]
-
-        # Update tension (clamp 0-100)
-        tension = dynamic.get("tension_level", 30) + tension_change
-        tension = max(0, min(100, tension))
-
-        # Derive tone from recent beats
-        tone = self._derive_tone(recent_beats, tension)
+            return None
 
-        # Add milestone if new
-        if milestone and milestone not in milestones:
-            milestones.append(milestone)
+        if row["milestone_added"]:
             log.info(f"New milestone recorded: {milestone}")
 
-        # Build new dynamic
-        new_dynamic = {
-            "tone": tone,
-            "tension_level": tension,
-            "recent_beats": recent_beats,
-        }
-
-        # Save
-        await self.db.execute(
-            """UPDATE engagements
-               SET dynamic = :dynamic, milestones = :milestones, updated_at = NOW()
-               WHERE id = :id""",
-            {
-                "id": str(engagement_id),
-                "dynamic": json.dumps(new_dynamic),
-                "milestones": milestones,
-            },
+        state = self.relationship_dynamic_from_row(row["new_dynamic"], row["new_milestones"])
+        self.layers.set_relationship(user_id, character_id, state)
+        dynamic = state["dynamic"]
+        log.debug(
+            f"Updated engagement dynamic: tone={dynamic['tone']}, tension={dynamic['tension_level']}, "
+            f"beats={len(dynamic['recent_beats'])}"
         )
-
-        log.debug(f"Updated engagement dynamic: tone={tone}, tension={tension}, beats={len(recent_beats)}")
+        return state
 
     def _derive_tone(self, recent_beats: List[str], tension: int) -> str:
         """Derive current tone from recent beats and tension level.
 
         Genre 01 aligned: Romance-focused tones, avoiding "comfortable" default.
+        Same rules apply_relationship_beat evaluates in SQL (RELATIONSHIP_TONE_RULES).
         """
         if not recent_beats:
             return "intrigued"  # Genre 01: Start with intrigue, not warmth
@@ -572,40 +915,25 @@ class MemoryService:
         # Find dominant beat
         dominant = max(beat_counts, key=beat_counts.get)
 
-        # Map beats to tones with tension consideration (Genre 01: romance-focused)
-        if tension > 75:
-            if dominant in ["conflict", "tense"]:
-                return "heated"
-            elif dominant in ["flirty", "vulnerable"]:
-                return "electric"
-            else:
-                return "intense"
-        elif tension > 55:
-            if dominant in ["flirty"]:
-                return "charged"
-            elif dominant in ["vulnerable"]:
-                return "intimate"
-            elif dominant in ["tense"]:
-                return "simmering"
-            else:
-                return "magnetic"
-        elif tension > 40:
-            if dominant in ["playful"]:
-                return "teasing"
-            elif dominant in ["flirty"]:
-                return "flirty"
-            elif dominant in ["vulnerable"]:
-                return "tender"
-            else:
-                return "intrigued"
-        else:
-            # Genre 01: Even at low tension, avoid pure comfort
-            if dominant in ["comfort", "supportive"]:
-                return "softened"  # Not "comfortable" - still implies potential
-            elif dominant in ["playful"]:
-                return "light"
-            else:
-                return "curious"
+        for rule in RELATIONSHIP_TONE_RULES:
+            if tension > rule["above"] and (rule["beats"] is None or dominant in rule["beats"]):
+                return rule["tone"]
+        return "intrigued"
+
+    @staticmethod
+    def relationship_dynamic_from_row(dynamic, milestones) -> Dict:
+        """Normalise engagements.dynamic / milestones column values."""
+        if isinstance(dynamic, str):
+            try:
+                dynamic = json.loads(dynamic)
+            except json.JSONDecodeError:
+                dynamic = None
+
+        return {
+            # Genre 01: Higher baseline tension, romance-focused defaults
+            "dynamic": dynamic or dict(DEFAULT_RELATIONSHIP_DYNAMIC, recent_beats=[]),
+            "milestones": list(milestones or []),
+        }
 
     async def get_relationship_dynamic(
         self,
@@ -622,15 +950,4 @@ class MemoryService:
         if not row:
             return None
 
-        dynamic = row["dynamic"]
-        if isinstance(dynamic, str):
-            try:
-                dynamic = json.loads(dynamic)
-            except json.JSONDecodeError:
-                dynamic = {"tone": "intrigued", "tension_level": 45, "recent_beats": []}
-
-        return {
-            # Genre 01: Higher baseline tension, romance-focused defaults
-            "dynamic": dynamic or {"tone": "intrigued", "tension_level": 45, "recent_beats": []},
-            "milestones": row["milestones"] or [],
-        }
+        return self.relationship_dynamic_from_row(row["dynamic"], row["milestones"])
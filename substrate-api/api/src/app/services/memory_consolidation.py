@@ -0,0 +1,347 @@
+"""Memory consolidation: merge near-duplicate memories per (user, series).
+
+Extraction only avoids duplicates by showing the LLM the top existing
+memories, so over long relationships near-identical facts accumulate
+("Has a cat named Luna", "Has a cat called Luna", "Their cat is Luna").
+Consolidation clusters them and replaces each cluster with one memory:
+
+- summary/content/valence from the cluster leader (most important, then newest)
+- importance_score = max over the cluster
+- created_at = earliest in the cluster (the relationship has known it since then)
+- reference_count summed, last_referenced_at = latest
+- originals deactivated with merged_into pointing at the new row
+
+Clustering uses the semantic memory embedder (memory_index): memories of the
+same type join the first cluster whose leader is at least `threshold` cosine
+similar. Comparing against leaders only (not any member) prevents chains of
+loosely related memories collapsing into one.
+
+The default threshold depends on the embedder. Hashing vectors are bag of
+words, so "named" vs "called" alone costs a paraphrase ~0.4 similarity;
+with the hashing embedder summaries are re-embedded without naming words
+("named", "called", ...) and compared at 0.8, where paraphrases score ~1.0
+and different facts ("cat named Milo") stay below 0.75. Provider embeddings
+are compared as stored, at 0.85.
+
+Merged originals are kept (inactive) for audit and recovery. Purging them is
+opt-in: set MEMORY_CONSOLIDATION_PURGE_DAYS (or --purge-days) to hard delete
+originals merged longer ago than that.
+
+Run: python -m app.scripts.consolidate_memories
+Check: python -m app.scripts.check_memory_consolidation
+"""
+
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from app.models.memory import MemoryEvent
+from app.services.memory_index import (
+    EMBEDDING_DIM,
+    Embedder,
+    HashingEmbedder,
+    MemoryScope,
+    SemanticMemoryIndex,
+    from_pgvector,
+    to_pgvector,
+)
+
+log = logging.getLogger(__name__)
+
+HASHING_THRESHOLD = 0.8
+PROVIDER_THRESHOLD = 0.85
+
+# Dropped from summaries before hashing: they say how a fact was phrased,
+# not what it is ("cat named Luna" / "cat called Luna" / "their cat is Luna")
+_NAMING_WORDS = frozenset("named called name names nicknamed".split())
+
+
+def default_threshold(embedder: Embedder) -> float:
+    """Cosine similarity to merge at for vectors from this embedder."""
+    return HASHING_THRESHOLD if isinstance(embedder, HashingEmbedder) else PROVIDER_THRESHOLD
+
+
+def canonical_summary(summary: str) -> str:
+    """Summary without naming words, for hashing-embedder comparison."""
+    return " ".join(w for w in summary.split() if w.lower().strip(".,;:!?\"'") not in _NAMING_WORDS)
+
+
+@dataclass
+class ConsolidationConfig:
+    """Settings for memory consolidation.
+
+    threshold None uses default_threshold() for the configured embedder;
+    purge_after_days None (the default) never hard deletes merged originals.
+    """
+
+    threshold: Optional[float] = None
+    min_scope_memories: int = 8
+    purge_after_days: Optional[int] = None
+
+    @classmethod
+    def from_env(cls) -> "ConsolidationConfig":
+        threshold = os.getenv("MEMORY_CONSOLIDATION_THRESHOLD")
+        purge_days = os.getenv("MEMORY_CONSOLIDATION_PURGE_DAYS")
+        return cls(
+            threshold=float(threshold) if threshold else None,
+            min_scope_memories=int(os.getenv("MEMORY_CONSOLIDATION_MIN_MEMORIES", 8)),
+            purge_after_days=int(purge_days) if purge_days else None,
+        )
+
+
+@dataclass
+class ConsolidationReport:
+    """Outcome of a consolidation run (one scope or many)."""
+
+    scopes: int = 0
+    memories_scanned: int = 0
+    clusters_merged: int = 0
+    rows_deactivated: int = 0
+    rows_created: int = 0
+    rows_purged: int = 0
+    duration_ms: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def rows_reclaimed(self) -> int:
+        """Net reduction in active memories (plus any purged rows)."""
+        return self.rows_deactivated - self.rows_created + self.rows_purged
+
+    def add(self, other: "ConsolidationReport") -> None:
+        self.scopes += other.scopes
+        self.memories_scanned += other.memories_scanned
+        self.clusters_merged += other.clusters_merged
+        self.rows_deactivated += other.rows_deactivated
+        self.rows_created += other.rows_created
+        self.rows_purged += other.rows_purged
+        self.errors.extend(other.errors)
+
+    def to_dict(self) -> Dict[str, object]:
+        data = asdict(self)
+        data["rows_reclaimed"] = self.rows_reclaimed
+        data["duration_ms"] = round(self.duration_ms, 1)
+        return data
+
+
+def cluster_memories(
+    memories: List[MemoryEvent],
+    vectors: np.ndarray,
+    threshold: float,
+) -> List[List[int]]:
+    """Greedy leader clustering of same-type memories by cosine similarity.
+
+    Memories are visited most important (then newest) first; each joins the
+    first existing cluster of its type whose leader it matches at or above
+    threshold, otherwise it leads a new cluster. Returns clusters of indices
+    (leader first), including singletons.
+    """
+    order = sorted(
+        range(len(memories)),
+        key=lambda i: (-float(memories[i].importance_score), -memories[i].created_at.timestamp()),
+    )
+    clusters: List[List[int]] = []
+    leaders_by_type: Dict[str, List[int]] = {}
+
+    for i in order:
+        memory_type = memories[i].type
+        leaders = leaders_by_type.setdefault(memory_type, [])
+        if leaders:
+            similarities = vectors[[clusters[c][0] for c in leaders]] @ vectors[i]
+            best = int(np.argmax(similarities))
+            if similarities[best] >= threshold:
+                clusters[leaders[best]].append(i)
+                continue
+        leaders.append(len(clusters))
+        clusters.append([i])
+    return clusters
+
+
+class MemoryConsolidationService:
+    """Clusters and merges near-duplicate memories."""
+
+    def __init__(self, db, config: Optional[ConsolidationConfig] = None):
+        self.db = db
+        self.config = config or ConsolidationConfig.from_env()
+        self.semantic_index = SemanticMemoryIndex.get_instance()
+
+    @property
+    def threshold(self) -> float:
+        if self.config.threshold is not None:
+            return self.config.threshold
+        return default_threshold(self.semantic_index.embedder)
+
+    async def cluster(self, memories: List[MemoryEvent], vectors: np.ndarray) -> List[List[int]]:
+        """Clusters of near-duplicates (2+ members, leader first).
+
+        vectors are the stored embeddings; with the hashing embedder the
+        summaries are re-embedded from canonical_summary() instead.
+        """
+        embedder = self.semantic_index.embedder
+        if isinstance(embedder, HashingEmbedder):
+            vectors = await embedder.embed([canonical_summary(m.summary) for m in memories])
+        return [c for c in cluster_memories(memories, vectors, self.threshold) if len(c) > 1]
+
+    async def find_scopes(self, since_hours: Optional[float] = None) -> List[MemoryScope]:
+        """(user, series) scopes with enough active memories to be worth a pass.
+
+        With since_hours, only scopes that gained a memory in that window
+        (nothing new means nothing new to merge since the last run).
+        """
+        having = "COUNT(*) >= :min_memories"
+        params: Dict[str, object] = {"min_memories": self.config.min_scope_memories}
+        if since_hours is not None:
+            having += " AND MAX(created_at) > NOW() - make_interval(secs => :since_seconds)"
+            params["since_seconds"] = since_hours * 3600
+
+        rows = await self.db.fetch_all(
+            f"""
+            SELECT user_id, series_id, MIN(character_id::text) AS character_id
+            FROM memory_events
+            WHERE is_active = TRUE AND series_id IS NOT NULL
+            GROUP BY user_id, series_id
+            HAVING {having}
+            """,
+            params,
+        )
+        return [
+            MemoryScope(user_id=row["user_id"], character_id=row["character_id"], series_id=row["series_id"])
+            for row in rows
+        ]
+
+    async def consolidate_scope(self, scope: MemoryScope, dry_run: bool = False) -> ConsolidationReport:
+        """Merge near-duplicate active memories in one scope."""
+        report = ConsolidationReport(scopes=1)
+        memories, vectors = await self._load_scope(scope)
+        report.memories_scanned = len(memories)
+        if len(memories) < 2:
+            return report
+
+        clusters = await self.cluster(memories, vectors)
+        report.clusters_merged = len(clusters)
+        report.rows_deactivated = sum(len(c) for c in clusters)
+        report.rows_created = len(clusters)
+        if dry_run or not clusters:
+            return report
+
+        async with self.db.transaction():
+            for cluster in clusters:
+                members = [memories[i] for i in cluster]
+                await self._merge(members, vectors[cluster[0]])
+        return report
+
+    async def consolidate(
+        self,
+        since_hours: Optional[float] = None,
+        dry_run: bool = False,
+    ) -> ConsolidationReport:
+        """Consolidate every eligible scope, then purge old merged originals if enabled."""
+        started = time.perf_counter()
+        report = ConsolidationReport()
+        for scope in await self.find_scopes(since_hours):
+            try:
+                report.add(await self.consolidate_scope(scope, dry_run=dry_run))
+            except Exception as e:
+                log.warning(f"Memory consolidation failed for {scope.key}: {e}")
+                report.errors.append(f"{scope.key}: {e}")
+        if self.config.purge_after_days is not None and not dry_run:
+            report.rows_purged = await self.purge_merged(self.config.purge_after_days)
+        report.duration_ms = (time.perf_counter() - started) * 1000
+        log.info(f"Memory consolidation: {report.to_dict()}")
+        return report
+
+    async def purge_merged(self, older_than_days: int) -> int:
+        """Hard delete originals merged more than older_than_days ago."""
+        rows = await self.db.fetch_all(
+            """
+            DELETE FROM memory_events
+            WHERE merged_into IS NOT NULL
+                AND is_active = FALSE
+                AND consolidated_at < NOW() - make_interval(days => :days)
+            RETURNING id
+            """,
+            {"days": older_than_days},
+        )
+        return len(rows)
+
+    async def _load_scope(self, scope: MemoryScope) -> Tuple[List[MemoryEvent], np.ndarray]:
+        """Active memories in scope with their vectors (embedding missing ones)."""
+        embedder = self.semantic_index.embedder
+        where, params = scope.where()
+        rows = await self.db.fetch_all(
+            f"""
+            SELECT *, CASE WHEN embedding_model = :model THEN embedding::text END AS embedding_text
+            FROM memory_events
+            WHERE {where}
+            ORDER BY created_at
+            """,
+            {**params, "model": embedder.model},
+        )
+        memories = [MemoryEvent(**dict(row)) for row in rows]
+        vectors = np.zeros((len(rows), EMBEDDING_DIM), dtype=np.float32)
+        missing = []
+        for i, row in enumerate(rows):
+            if row["embedding_text"]:
+                vectors[i] = from_pgvector(row["embedding_text"])
+            else:
+                missing.append(i)
+        if missing:
+            vectors[missing] = await embedder.embed([memories[i].summary for i in missing])
+        return memories, vectors
+
+    async def _merge(self, members: List[MemoryEvent], leader_vector: np.ndarray) -> UUID:
+        """Insert the merged memory and deactivate the members. Returns the new id."""
+        leader = members[0]
+        referenced = [m.last_referenced_at for m in members if m.last_referenced_at]
+        content = dict(leader.content)
+        content["merged_from"] = [str(m.id) for m in members]
+        content["merged_summaries"] = [m.summary for m in members[1:] if m.summary != leader.summary]
+
+        row = await self.db.fetch_one(
+            """
+            INSERT INTO memory_events (
+                user_id, character_id, episode_id, series_id, type, category,
+                content, summary, emotional_valence, importance_score, base_importance,
+                reference_count, last_referenced_at, created_at,
+                embedding, embedding_model
+            )
+            SELECT user_id, character_id, episode_id, series_id, type, category,
+                   :content, summary, emotional_valence, :importance_score,
+                   (SELECT MAX(COALESCE(base_importance, importance_score))
+                    FROM memory_events WHERE id = ANY(CAST(:member_ids AS uuid[]))),
+                   :reference_count, :last_referenced_at, :created_at,
+                   CAST(:embedding AS vector), :embedding_model
+            FROM memory_events
+            WHERE id = :leader_id
+            RETURNING id
+            """,
+            {
+                "leader_id": str(leader.id),
+                "member_ids": [str(m.id) for m in members],
+                "content": json.dumps(content),
+                "importance_score": max(float(m.importance_score) for m in members),
+                "reference_count": sum(m.reference_count for m in members),
+                "last_referenced_at": max(referenced) if referenced else None,
+                "created_at": min(m.created_at for m in members),
+                "embedding": to_pgvector(leader_vector),
+                "embedding_model": self.semantic_index.embedder.model,
+            },
+        )
+        merged_id = row["id"]
+
+        await self.db.execute(
+            """
+            UPDATE memory_events
+            SET is_active = FALSE,
+                merged_into = :merged_id,
+                consolidated_at = NOW()
+            WHERE id = ANY(CAST(:ids AS uuid[]))
+            """,
+            {"merged_id": str(merged_id), "ids": [str(m.id) for m in members]},
+        )
+        return merged_id
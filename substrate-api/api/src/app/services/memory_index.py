@@ -0,0 +1,572 @@
+"""Semantic memory retrieval: embedders, vector backends and blended ranking.
+
+Memories are embedded when saved (memory_events.embedding, vector(1536)) and
+retrieved by similarity to the current user message, blended with importance
+and recency:
+
+    score = w_sim * similarity + w_imp * importance_score + w_rec * recency
+    recency = 0.5 ** (age_days / half_life_days)
+
+Both the embedder and the vector backend are pluggable:
+
+Embedders (MEMORY_EMBEDDER):
+- "hashing": Deterministic feature-hashing of words and word pairs. No network,
+  same text -> same vector in every process. Lexical only, but good enough for
+  tests and local development.
+- "openai": text-embedding-3-small (OPENAI_API_KEY)
+- "google": gemini-embedding-001 (GOOGLE_API_KEY)
+
+Backends (MEMORY_VECTOR_BACKEND):
+- "pgvector": Nearest neighbours computed in Postgres (embedding <=> query),
+  bounded to the user's series scope and MEMORY_CANDIDATE_LIMIT rows.
+- "inprocess": Per-scope NumPy matrix cached in this process (most recent
+  MEMORY_INDEX_MAX_ROWS memories per scope), searched with one matrix-vector
+  product. Useful when pgvector isn't available or for offline evaluation.
+
+Latency is bounded three ways: the candidate set is capped, the whole semantic
+path runs under MEMORY_SEMANTIC_TIMEOUT_MS, and any timeout or error falls back
+to the importance/recency SQL ranking in MemoryService.
+
+Environment variables:
+- MEMORY_SEMANTIC_RETRIEVAL: "false" to disable (default: true)
+- MEMORY_EMBEDDER: hashing | openai | google (default: hashing)
+- MEMORY_EMBEDDING_MODEL: Override the provider model name
+- MEMORY_VECTOR_BACKEND: pgvector | inprocess (default: pgvector)
+- MEMORY_CANDIDATE_LIMIT: Nearest neighbours considered per query (default: 50)
+- MEMORY_INDEX_MAX_ROWS: Memories held per scope by the in-process index (default: 2000)
+- MEMORY_SEMANTIC_TIMEOUT_MS: Budget for embedding + search (default: 300)
+- MEMORY_WEIGHT_SIMILARITY / MEMORY_WEIGHT_IMPORTANCE / MEMORY_WEIGHT_RECENCY
+  (defaults: 0.6 / 0.25 / 0.15)
+- MEMORY_RECENCY_HALF_LIFE_DAYS: (default: 14)
+- MEMORY_PER_TYPE_LIMIT: Max memories of one type in a result (default: 3)
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from app.models.memory import MEMORY_EVENT_COLUMNS, MemoryEvent
+from app.services.http_pool import POOL_LLM, get_http_client
+
+log = logging.getLogger(__name__)
+
+# Matches memory_events.embedding vector(1536)
+EMBEDDING_DIM = 1536
+
+
+@dataclass
+class SemanticRetrievalConfig:
+    """Settings for semantic memory retrieval."""
+
+    enabled: bool = True
+    embedder: str = "hashing"
+    embedding_model: Optional[str] = None
+    backend: str = "pgvector"
+    candidate_limit: int = 50
+    index_max_rows: int = 2000
+    timeout_ms: float = 300.0
+    weight_similarity: float = 0.6
+    weight_importance: float = 0.25
+    weight_recency: float = 0.15
+    recency_half_life_days: float = 14.0
+    per_type_limit: int = 3
+
+    @classmethod
+    def from_env(cls) -> "SemanticRetrievalConfig":
+        return cls(
+            enabled=os.getenv("MEMORY_SEMANTIC_RETRIEVAL", "true").lower() != "false",
+            embedder=os.getenv("MEMORY_EMBEDDER", "hashing").lower(),
+            embedding_model=os.getenv("MEMORY_EMBEDDING_MODEL") or None,
+            backend=os.getenv("MEMORY_VECTOR_BACKEND", "pgvector").lower(),
+            candidate_limit=int(os.getenv("MEMORY_CANDIDATE_LIMIT", 50)),
+            index_max_rows=int(os.getenv("MEMORY_INDEX_MAX_ROWS", 2000)),
+            timeout_ms=float(os.getenv("MEMORY_SEMANTIC_TIMEOUT_MS", 300)),
+            weight_similarity=float(os.getenv("MEMORY_WEIGHT_SIMILARITY", 0.6)),
+            weight_importance=float(os.getenv("MEMORY_WEIGHT_IMPORTANCE", 0.25)),
+            weight_recency=float(os.getenv("MEMORY_WEIGHT_RECENCY", 0.15)),
+            recency_half_life_days=float(os.getenv("MEMORY_RECENCY_HALF_LIFE_DAYS", 14)),
+            per_type_limit=int(os.getenv("MEMORY_PER_TYPE_LIMIT", 3)),
+        )
+
+
+@dataclass(frozen=True)
+class MemoryScope:
+    """Which memories a query may see: a series, or (legacy) a character."""
+
+    user_id: UUID
+    character_id: UUID
+    series_id: Optional[UUID] = None
+
+    @property
+    def key(self) -> str:
+        if self.series_id:
+            return f"{self.user_id}:series:{self.series_id}"
+        return f"{self.user_id}:character:{self.character_id}"
+
+    def where(self, alias: str = "") -> Tuple[str, Dict[str, str]]:
+        """SQL filter and params selecting active memories in this scope."""
+        p = f"{alias}." if alias else ""
+        params = {"user_id": str(self.user_id)}
+        if self.series_id:
+            clause = f"{p}user_id = :user_id AND {p}series_id = :series_id"
+            params["series_id"] = str(self.series_id)
+        else:
+            clause = f"{p}user_id = :user_id AND ({p}character_id = :character_id OR {p}character_id IS NULL)"
+            params["character_id"] = str(self.character_id)
+        return f"{clause} AND {p}is_active = TRUE", params
+
+
+# =============================================================================
+# Embedders
+# =============================================================================
+
+class Embedder(ABC):
+    """Turns text into L2-normalised float32 vectors of length EMBEDDING_DIM."""
+
+    # Stored alongside each vector; vectors from different models are never compared
+    model: str
+
+    @abstractmethod
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed texts into an (n, EMBEDDING_DIM) float32 array."""
+        pass
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32, copy=False)
+
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+# Common words that would otherwise dominate short memory summaries
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have he her his i in is it its "
+    "me my of on or our she so that the their them they this to was we were "
+    "with you your".split()
+)
+
+
+@lru_cache(maxsize=50_000)
+def _feature_slot(feature: str, dim: int) -> Tuple[int, float]:
+    """Bucket and sign for a feature. blake2b, unlike hash(), is stable across processes."""
+    digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+    return digest % dim, (1.0 if digest >> 63 else -1.0)
+
+
+class HashingEmbedder(Embedder):
+    """Deterministic bag-of-words embedder using signed feature hashing.
+
+    Unigrams (minus stopwords) plus adjacent word pairs, so "sister Emma"
+    matches "Emma" and more strongly "my sister Emma". No vocabulary, no model
+    download, no network.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+        self.model = f"hashing-v1-{dim}"
+
+    def embed_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        words = [w for w in _WORD_PATTERN.findall(text.lower()) if w not in _STOPWORDS]
+        for word in words:
+            slot, sign = _feature_slot(word, self.dim)
+            vector[slot] += sign
+        for first, second in zip(words, words[1:], strict=False):
+            slot, sign = _feature_slot(f"{first} {second}", self.dim)
+            vector[slot] += 0.5 * sign
+        return vector
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return _normalize(np.stack([self.embed_one(text) for text in texts]))
+
+
+class ProviderEmbedder(Embedder):
+    """Embeddings API of a hosted provider, over the shared outbound pool."""
+
+    DEFAULT_MODELS = {
+        "openai": "text-embedding-3-small",
+        "google": "gemini-embedding-001",
+    }
+    API_KEY_ENV_VARS = {
+        "openai": "OPENAI_API_KEY",
+        "google": "GOOGLE_API_KEY",
+    }
+
+    def __init__(self, provider: str, model: Optional[str] = None, timeout: float = 10.0):
+        if provider not in self.DEFAULT_MODELS:
+            raise ValueError(f"Unknown embedding provider: {provider}. Supported: {list(self.DEFAULT_MODELS)}")
+        self.provider = provider
+        self.model = model or self.DEFAULT_MODELS[provider]
+        self.api_key = os.getenv(self.API_KEY_ENV_VARS[provider])
+        if not self.api_key:
+            log.warning(f"No API key found for {provider} embeddings (expected {self.API_KEY_ENV_VARS[provider]})")
+        self.client = get_http_client(POOL_LLM, timeout=timeout)
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+        if self.provider == "openai":
+            vectors = await self._embed_openai(texts)
+        else:
+            vectors = await self._embed_google(texts)
+        return _normalize(np.asarray(vectors, dtype=np.float32))
+
+    async def _embed_openai(self, texts: Sequence[str]) -> List[List[float]]:
+        response = await self.client.post(
+            "https://api.openai.com/v1/embeddings",
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            json={"model": self.model, "input": list(texts), "dimensions": EMBEDDING_DIM},
+        )
+        response.raise_for_status()
+        data = sorted(response.json()["data"], key=lambda item: item["index"])
+        return [item["embedding"] for item in data]
+
+    async def _embed_google(self, texts: Sequence[str]) -> List[List[float]]:
+        model = self.model if self.model.startswith("models/") else f"models/{self.model}"
+        response = await self.client.post(
+            f"https://generativelanguage.googleapis.com/v1beta/{model}:batchEmbedContents",
+            headers={"x-goog-api-key": self.api_key or ""},
+            json={
+                "requests": [
+                    {
+                        "model": model,
+                        "content": {"parts": [{"text": text}]},
+                        "outputDimensionality": EMBEDDING_DIM,
+                    }
+                    for text in texts
+                ]
+            },
+        )
+        response.raise_for_status()
+        return [item["values"] for item in response.json()["embeddings"]]
+
+
+def create_embedder(config: SemanticRetrievalConfig) -> Embedder:
+    if config.embedder == "hashing":
+        return HashingEmbedder()
+    return ProviderEmbedder(config.embedder, config.embedding_model)
+
+
+# =============================================================================
+# Vector backends
+# =============================================================================
+
+def to_pgvector(vector: np.ndarray) -> str:
+    """pgvector text literal, e.g. '[0.1,0.2]'."""
+    return "[" + ",".join(f"{x:.6g}" for x in vector.tolist()) + "]"
+
+
+def from_pgvector(text: str) -> np.ndarray:
+    return np.array(text.strip("[]").split(","), dtype=np.float32)
+
+
+class VectorBackend(ABC):
+    """Nearest-neighbour search over memory embeddings within a scope."""
+
+    name: str
+
+    @abstractmethod
+    async def search(
+        self, db, scope: MemoryScope, query: np.ndarray, model: str, limit: int
+    ) -> List[Tuple[MemoryEvent, float]]:
+        """Return up to limit (memory, cosine similarity) pairs, most similar first."""
+        pass
+
+    @abstractmethod
+    def add(self, scope: MemoryScope, memories: List[MemoryEvent], vectors: np.ndarray) -> None:
+        """Called after new memories are embedded and stored."""
+        pass
+
+
+class PgVectorBackend(VectorBackend):
+    """Cosine distance search in Postgres over the user's scope.
+
+    The scope is materialised before ordering, so the distance sort is an
+    exact scan of the user's rows (idx_memory_events_semantic_scope) and
+    never an ANN index walk filtered after the fact.
+    """
+
+    name = "pgvector"
+
+    async def search(self, db, scope, query, model, limit):
+        where, params = scope.where()
+        rows = await db.fetch_all(
+            f"""
+            WITH scoped AS MATERIALIZED (
+                SELECT {MEMORY_EVENT_COLUMNS}, embedding <=> CAST(:query AS vector) AS distance
+                FROM memory_events
+                WHERE {where}
+                    AND embedding IS NOT NULL
+                    AND embedding_model = :model
+            )
+            SELECT *, 1 - distance AS similarity
+            FROM scoped
+            ORDER BY distance
+            LIMIT :limit
+            """,
+            {**params, "query": to_pgvector(query), "model": model, "limit": limit},
+        )
+        return [(MemoryEvent(**dict(row)), float(row["similarity"])) for row in rows]
+
+    def add(self, scope, memories, vectors):
+        pass  # Vectors are already on the rows
+
+
+@dataclass
+class _ScopeIndex:
+    memories: List[MemoryEvent]
+    matrix: np.ndarray  # (n, dim), rows L2-normalised
+    loaded_at: float
+
+
+class InProcessVectorBackend(VectorBackend):
+    """Per-scope embedding matrices held in memory (LRU over scopes).
+
+    A scope is loaded once from memory_events (most recent max_rows, with
+    stored embeddings; rows without one are embedded on load) and then kept
+    current by add(). Search is an exact dot product over at most max_rows
+    vectors, so cost per query is bounded regardless of table size. Scopes
+    are reloaded after ttl_seconds to pick up changes made by other workers.
+
+    Loads run as their own task, shielded from the caller's timeout: a large
+    scope that misses the retrieval budget still finishes loading and is
+    cached for the next turn, and concurrent searches share one load.
+    """
+
+    name = "inprocess"
+
+    def __init__(self, embedder: Embedder, max_rows: int = 2000, max_scopes: int = 512, ttl_seconds: float = 300.0):
+        self.embedder = embedder
+        self.max_rows = max_rows
+        self.max_scopes = max_scopes
+        self.ttl_seconds = ttl_seconds
+        self._scopes: "OrderedDict[str, _ScopeIndex]" = OrderedDict()
+        self._loading: Dict[str, "asyncio.Task[_ScopeIndex]"] = {}
+
+    def _start_load(self, db, scope: MemoryScope, model: str) -> "asyncio.Task[_ScopeIndex]":
+        task = self._loading.get(scope.key)
+        if task is None:
+            task = asyncio.create_task(self._load(db, scope, model))
+            self._loading[scope.key] = task
+            task.add_done_callback(lambda t, key=scope.key: self._load_done(key, t))
+        return task
+
+    def _load_done(self, key: str, task: "asyncio.Task[_ScopeIndex]") -> None:
+        self._loading.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            log.warning(f"Memory index load failed for {key}: {task.exception()!r}")
+
+    async def _load(self, db, scope: MemoryScope, model: str) -> _ScopeIndex:
+        where, params = scope.where()
+        rows = await db.fetch_all(
+            f"""
+            SELECT {MEMORY_EVENT_COLUMNS}, CASE WHEN embedding_model = :model THEN embedding::text END AS embedding_text
+            FROM memory_events
+            WHERE {where}
+            ORDER BY created_at DESC
+            LIMIT :limit
+            """,
+            {**params, "model": model, "limit": self.max_rows},
+        )
+        memories = [MemoryEvent(**dict(row)) for row in rows]
+        matrix = np.zeros((len(rows), EMBEDDING_DIM), dtype=np.float32)
+        missing = []
+        for i, row in enumerate(rows):
+            if row["embedding_text"]:
+                matrix[i] = from_pgvector(row["embedding_text"])
+            else:
+                missing.append(i)
+        if missing:
+            matrix[missing] = await self.embedder.embed([memories[i].summary for i in missing])
+
+        index = _ScopeIndex(memories=memories, matrix=matrix, loaded_at=time.monotonic())
+        self._scopes[scope.key] = index
+        self._scopes.move_to_end(scope.key)
+        while len(self._scopes) > self.max_scopes:
+            self._scopes.popitem(last=False)
+        return index
+
+    async def search(self, db, scope, query, model, limit):
+        index = self._scopes.get(scope.key)
+        if index is None or time.monotonic() - index.loaded_at > self.ttl_seconds:
+            index = await asyncio.shield(self._start_load(db, scope, model))
+        else:
+            self._scopes.move_to_end(scope.key)
+        if not index.memories:
+            return []
+
+        similarities = index.matrix @ query
+        k = min(limit, len(similarities))
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top])]
+        return [(index.memories[i], float(similarities[i])) for i in top]
+
+    def add(self, scope, memories, vectors):
+        index = self._scopes.get(scope.key)
+        if index is None or not memories:
+            return  # Loaded (with these rows) on next search
+        index.memories = memories + index.memories
+        index.matrix = np.vstack([vectors, index.matrix])
+        if len(index.memories) > self.max_rows:
+            index.memories = index.memories[:self.max_rows]
+            index.matrix = index.matrix[:self.max_rows]
+
+
+def create_backend(config: SemanticRetrievalConfig, embedder: Embedder) -> VectorBackend:
+    if config.backend == "pgvector":
+        return PgVectorBackend()
+    if config.backend == "inprocess":
+        return InProcessVectorBackend(embedder, max_rows=config.index_max_rows)
+    raise ValueError(f"Unknown memory vector backend: {config.backend}. Supported: pgvector, inprocess")
+
+
+# =============================================================================
+# Ranking
+# =============================================================================
+
+def recency_weight(created_at: datetime, half_life_days: float, now: Optional[datetime] = None) -> float:
+    """1.0 for a brand new memory, 0.5 after one half-life, and so on."""
+    now = now or datetime.now(timezone.utc)
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    age_days = max(0.0, (now - created_at).total_seconds() / 86400)
+    return 0.5 ** (age_days / half_life_days) if half_life_days > 0 else 0.0
+
+
+def blend_and_select(
+    candidates: List[Tuple[MemoryEvent, float]],
+    config: SemanticRetrievalConfig,
+    limit: int,
+    now: Optional[datetime] = None,
+) -> List[MemoryEvent]:
+    """Rank (memory, similarity) candidates by blended score.
+
+    Duplicates keep their highest similarity. At most per_type_limit memories
+    of each type are returned, mirroring the SQL ranking's type diversity.
+    """
+    best: Dict[UUID, Tuple[MemoryEvent, float]] = {}
+    for memory, similarity in candidates:
+        if memory.id not in best or similarity > best[memory.id][1]:
+            best[memory.id] = (memory, similarity)
+
+    scored = sorted(
+        (
+            (
+                config.weight_similarity * max(0.0, similarity)
+                + config.weight_importance * float(memory.importance_score)
+                + config.weight_recency * recency_weight(memory.created_at, config.recency_half_life_days, now),
+                memory,
+            )
+            for memory, similarity in best.values()
+        ),
+        key=lambda item: item[0],
+        reverse=True,
+    )
+
+    selected: List[MemoryEvent] = []
+    per_type: Dict[str, int] = {}
+    for _, memory in scored:
+        if per_type.get(memory.type, 0) >= config.per_type_limit:
+            continue
+        per_type[memory.type] = per_type.get(memory.type, 0) + 1
+        selected.append(memory)
+        if len(selected) >= limit:
+            break
+    return selected
+
+
+# =============================================================================
+# Index facade
+# =============================================================================
+
+class SemanticMemoryIndex:
+    """Embeds memories on save and ranks them against a query on retrieval."""
+
+    _instance: Optional["SemanticMemoryIndex"] = None
+
+    def __init__(self, config: Optional[SemanticRetrievalConfig] = None):
+        self.config = config or SemanticRetrievalConfig.from_env()
+        self.embedder = create_embedder(self.config)
+        self.backend = create_backend(self.config, self.embedder)
+
+    @classmethod
+    def get_instance(cls) -> "SemanticMemoryIndex":
+        """Get singleton instance."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.enabled
+
+    async def index_memories(self, db, scope: MemoryScope, memories: List[MemoryEvent]) -> None:
+        """Embed memories and store the vectors on their rows (one UPDATE)."""
+        if not memories:
+            return
+        vectors = await self.embedder.embed([m.summary for m in memories])
+        await db.execute(
+            """
+            UPDATE memory_events AS m
+            SET embedding = CAST(v.embedding AS vector),
+                embedding_model = :model
+            FROM unnest(CAST(:ids AS uuid[]), CAST(:embeddings AS text[])) AS v(id, embedding)
+            WHERE m.id = v.id
+            """,
+            {
+                "ids": [str(m.id) for m in memories],
+                "embeddings": [to_pgvector(v) for v in vectors],
+                "model": self.embedder.model,
+            },
+        )
+        self.backend.add(scope, memories, vectors)
+
+    async def rank(
+        self,
+        db,
+        scope: MemoryScope,
+        query_text: str,
+        limit: int,
+        fallback: Sequence[MemoryEvent] = (),
+    ) -> List[MemoryEvent]:
+        """Top memories for query_text, bounded by the configured timeout.
+
+        fallback memories (e.g. the importance-ranked set) join the candidate
+        pool with similarity 0, so memories saved before embeddings existed
+        can still surface. Raises asyncio.TimeoutError if over budget.
+        """
+        started = time.perf_counter()
+        candidates = await asyncio.wait_for(
+            self._candidates(db, scope, query_text),
+            timeout=self.config.timeout_ms / 1000,
+        )
+        selected = blend_and_select(
+            candidates + [(memory, 0.0) for memory in fallback],
+            self.config,
+            limit,
+        )
+        log.debug(
+            f"Semantic memory retrieval ({self.backend.name}): {len(candidates)} candidates, "
+            f"{len(selected)} selected in {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+        return selected
+
+    async def _candidates(self, db, scope: MemoryScope, query_text: str) -> List[Tuple[MemoryEvent, float]]:
+        query = (await self.embedder.embed([query_text]))[0]
+        return await self.backend.search(db, scope, query, self.embedder.model, self.config.candidate_limit)
@@ -0,0 +1,248 @@
+"""Layered memory resolution for conversation context.
+
+get_context used to run separate, uncached queries for memories (series
+scope, or the legacy character scope), hooks and the relationship dynamic on
+every turn, and a memory learned in one series was invisible in every other.
+Memories are now resolved through layers, most specific first:
+
+    session    memories extracted in this session (what was just said)
+    series     the (user, series) working set - the primary layer
+    character  what this character knows from the user's other series
+    user       high-importance facts about the user, learned with anyone
+
+plus the hooks ready set for (user, character), and the relationship state
+(engagements.dynamic / milestones) as last returned by apply_relationship_beat:
+the Director writes it here after each beat, so the next turn's get_context
+reuses it instead of reading and parsing the JSON columns again.
+
+Each layer has its own in-process cache (LRU + TTL) and is invalidated on its
+own: saving memories drops only the layers the new rows belong to, triggering
+hooks drops only the hooks layer, and so on. Writes from other workers or
+the batch jobs (consolidation, re-scoring, scheduler) are picked up when the
+TTL expires.
+
+merge_layers() combines the layers with one deduplication pass (by id and by
+normalised summary, more specific layers win). session/character/user
+contribute at most a few memories each; the primary layer fills the rest of
+the budget.
+
+Environment variables:
+- MEMORY_LAYERS: "false" to disable caching (layers are still merged; default: true)
+- MEMORY_LAYER_MAX_ENTRIES: Cached scopes per layer (default: 5000)
+- MEMORY_LAYER_TTL_SESSION / _SERIES / _CHARACTER / _USER / _HOOKS / _RELATIONSHIP:
+  Seconds (defaults: 60 / 300 / 300 / 600 / 120 / 60)
+- MEMORY_LAYER_SHARED_LIMIT: Max memories from each of session/character/user (default: 3)
+- MEMORY_LAYER_USER_MIN_IMPORTANCE: Importance a fact needs to be user-global (default: 0.7)
+"""
+
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from app.models.memory import MemoryEvent
+
+SESSION_LAYER = "session"
+SERIES_LAYER = "series"
+CHARACTER_LAYER = "character"
+USER_LAYER = "user"
+HOOKS_LAYER = "hooks"
+RELATIONSHIP_LAYER = "relationship"
+
+MEMORY_LAYERS = (SESSION_LAYER, SERIES_LAYER, CHARACTER_LAYER, USER_LAYER)
+LAYERS = MEMORY_LAYERS + (HOOKS_LAYER, RELATIONSHIP_LAYER)
+
+DEFAULT_TTLS = {
+    SESSION_LAYER: 60.0,
+    SERIES_LAYER: 300.0,
+    CHARACTER_LAYER: 300.0,
+    USER_LAYER: 600.0,
+    HOOKS_LAYER: 120.0,
+    RELATIONSHIP_LAYER: 60.0,
+}
+
+
+@dataclass
+class MemoryLayerConfig:
+    """Settings for layered memory resolution."""
+
+    enabled: bool = True
+    max_entries: int = 5000
+    ttl_seconds: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_TTLS))
+    shared_limit: int = 3
+    user_min_importance: float = 0.7
+
+    @classmethod
+    def from_env(cls) -> "MemoryLayerConfig":
+        return cls(
+            enabled=os.getenv("MEMORY_LAYERS", "true").lower() == "true",
+            max_entries=int(os.getenv("MEMORY_LAYER_MAX_ENTRIES", 5000)),
+            ttl_seconds={
+                layer: float(os.getenv(f"MEMORY_LAYER_TTL_{layer.upper()}", default))
+                for layer, default in DEFAULT_TTLS.items()
+            },
+            shared_limit=int(os.getenv("MEMORY_LAYER_SHARED_LIMIT", 3)),
+            user_min_importance=float(os.getenv("MEMORY_LAYER_USER_MIN_IMPORTANCE", 0.7)),
+        )
+
+
+class LayerCache:
+    """LRU + TTL cache for one layer. Keys start with the user id."""
+
+    def __init__(self, name: str, ttl_seconds: float, max_entries: int):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() > entry[0]:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def invalidate_prefix(self, prefix: Tuple[str, ...]) -> None:
+        """Drop every key starting with prefix (all variants of one scope)."""
+        n = len(prefix)
+        for key in [k for k in self._entries if k[:n] == prefix]:
+            del self._entries[key]
+
+    def invalidate_user(self, user_id: str) -> None:
+        for key in [k for k in self._entries if k[0] == user_id]:
+            del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class MemoryLayerCache:
+    """One LayerCache per layer, plus the invalidation rules between them."""
+
+    _instance: Optional["MemoryLayerCache"] = None
+
+    def __init__(self, config: Optional[MemoryLayerConfig] = None):
+        self.config = config or MemoryLayerConfig.from_env()
+        self.layers = {
+            layer: LayerCache(layer, self.config.ttl_seconds[layer], self.config.max_entries)
+            for layer in LAYERS
+        }
+
+    @classmethod
+    def get_instance(cls) -> "MemoryLayerCache":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    async def get_or_load(self, layer: str, key: Tuple[str, ...], load: Callable[[], Any]) -> Any:
+        """Cached value for (layer, key), loading it on a miss."""
+        cache = self.layers[layer]
+        if self.config.enabled:
+            value = cache.get(key)
+            if value is not None:
+                return value
+        value = await load()
+        if self.config.enabled:
+            cache.set(key, value)
+        return value
+
+    def invalidate_memories(self, memories: Iterable[MemoryEvent]) -> None:
+        """Drop the layers newly written/changed memories belong to."""
+        for m in memories:
+            user_id = str(m.user_id)
+            if m.episode_id:
+                self.layers[SESSION_LAYER].invalidate((user_id, str(m.episode_id)))
+            if m.series_id:
+                self.layers[SERIES_LAYER].invalidate_prefix((user_id, str(m.series_id)))
+            if m.character_id:
+                self.layers[CHARACTER_LAYER].invalidate_prefix((user_id, str(m.character_id)))
+            if m.type == "fact":
+                self.layers[USER_LAYER].invalidate_prefix((user_id,))
+
+    def invalidate_hooks(self, user_id: UUID, character_id: UUID) -> None:
+        self.layers[HOOKS_LAYER].invalidate((str(user_id), str(character_id)))
+
+    def get_relationship(self, user_id: UUID, character_id: UUID) -> Optional[Dict[str, Any]]:
+        """Cached relationship state ({"dynamic", "milestones"}), if fresh."""
+        if not self.config.enabled:
+            return None
+        return self.layers[RELATIONSHIP_LAYER].get((str(user_id), str(character_id)))
+
+    def set_relationship(self, user_id: UUID, character_id: UUID, state: Dict[str, Any]) -> None:
+        """Store the state a relationship write returned (write-through)."""
+        if self.config.enabled:
+            self.layers[RELATIONSHIP_LAYER].set((str(user_id), str(character_id)), state)
+
+    def invalidate_user(self, user_id: UUID, layers: Sequence[str] = LAYERS) -> None:
+        """Drop every cached scope of a user (bulk edits, deletes, imports)."""
+        for layer in layers:
+            self.layers[layer].invalidate_user(str(user_id))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.config.enabled,
+            "layers": {layer: cache.stats() for layer, cache in self.layers.items()},
+        }
+
+
+def _summary_key(memory: MemoryEvent) -> str:
+    return " ".join(memory.summary.lower().split())
+
+
+def merge_layers(
+    layers: Sequence[Tuple[str, Sequence[MemoryEvent]]],
+    primary: str,
+    limit: int,
+    shared_limit: int,
+) -> List[MemoryEvent]:
+    """Merge layer results (most specific first) into at most `limit` memories.
+
+    One deduplication pass in layer order; every non-primary layer keeps at
+    most shared_limit memories and the primary layer fills the remaining
+    budget. Returned by importance, then recency, like the single-scope
+    ranking.
+    """
+    seen_ids = set()
+    seen_summaries = set()
+    deduped: Dict[str, List[MemoryEvent]] = {}
+    for name, memories in layers:
+        kept = deduped.setdefault(name, [])
+        for m in memories:
+            key = _summary_key(m)
+            if m.id in seen_ids or key in seen_summaries:
+                continue
+            seen_ids.add(m.id)
+            seen_summaries.add(key)
+            kept.append(m)
+
+    shared = {name: kept[:shared_limit] for name, kept in deduped.items() if name != primary}
+    budget = max(0, limit - sum(len(kept) for kept in shared.values()))
+    selected: List[MemoryEvent] = []
+    for name, _ in layers:
+        selected.extend(deduped[name][:budget] if name == primary else shared[name])
+    selected = selected[:limit]
+
+    selected.sort(key=lambda m: (float(m.importance_score), m.created_at), reverse=True)
+    return selected
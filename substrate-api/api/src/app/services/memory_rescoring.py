@@ -0,0 +1,206 @@
+"""Memory importance re-scoring: decay plus reference reinforcement.
+
+importance_score used to be fixed at extraction time, so an early trivial
+memory competed forever with a recent meaningful one. A nightly batch now
+re-derives it from the extraction-time score (base_importance, migration 072):
+
+    age        = days since last_referenced_at, else created_at
+    half_life  = half_life_days * (1 + valence_boost * |emotional_valence| / 2)
+    retention  = floor[type] + (1 - floor[type]) * 0.5 ** (age / half_life)
+    reinforce  = min(reinforcement_cap, reinforcement_weight * ln(1 + reference_count))
+    score      = clip(base_importance * retention + reinforce, 0, 1)
+
+- Per-type floors keep durable memories (facts, relationships) from fading
+  the way events and passing emotions do.
+- Strong feelings (valence +-2) decay more slowly than neutral ones.
+- Every POST /memory/{id}/reference resets the age and adds reinforcement.
+
+The score is a pure function of the row, so re-running the job is idempotent.
+All arithmetic is vectorised with NumPy over chunks of users, and only rows
+whose rounded score changed are written back in one UPDATE ... FROM unnest.
+Nothing is added to the chat path.
+
+Run: python -m app.scripts.rescore_memories
+"""
+
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+DEFAULT_TYPE_FLOORS = {
+    "fact": 0.8,
+    "relationship": 0.8,
+    "preference": 0.6,
+    "goal": 0.5,
+    "event": 0.3,
+    "emotion": 0.3,
+}
+
+
+@dataclass
+class RescoringConfig:
+    """Settings for importance re-scoring."""
+
+    half_life_days: float = 30.0
+    valence_boost: float = 1.0
+    reinforcement_weight: float = 0.05
+    reinforcement_cap: float = 0.2
+    default_floor: float = 0.5
+    type_floors: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_TYPE_FLOORS))
+    users_per_chunk: int = 200
+
+    @classmethod
+    def from_env(cls) -> "RescoringConfig":
+        return cls(
+            half_life_days=float(os.getenv("MEMORY_RESCORE_HALF_LIFE_DAYS", 30)),
+            valence_boost=float(os.getenv("MEMORY_RESCORE_VALENCE_BOOST", 1.0)),
+            reinforcement_weight=float(os.getenv("MEMORY_RESCORE_REINFORCEMENT_WEIGHT", 0.05)),
+            reinforcement_cap=float(os.getenv("MEMORY_RESCORE_REINFORCEMENT_CAP", 0.2)),
+            users_per_chunk=int(os.getenv("MEMORY_RESCORE_USERS_PER_CHUNK", 200)),
+        )
+
+
+@dataclass
+class RescoringReport:
+    """Outcome of a re-scoring run."""
+
+    users: int = 0
+    memories_scanned: int = 0
+    memories_updated: int = 0
+    raised: int = 0
+    lowered: int = 0
+    duration_ms: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, object]:
+        data = asdict(self)
+        data["duration_ms"] = round(self.duration_ms, 1)
+        return data
+
+
+def rescore(
+    base: np.ndarray,
+    age_days: np.ndarray,
+    reference_count: np.ndarray,
+    valence: np.ndarray,
+    floors: np.ndarray,
+    config: RescoringConfig,
+) -> np.ndarray:
+    """Vectorised importance score for aligned arrays, rounded to 2 decimals."""
+    half_life = config.half_life_days * (1.0 + config.valence_boost * np.abs(valence) / 2.0)
+    retention = floors + (1.0 - floors) * np.power(0.5, np.maximum(age_days, 0.0) / half_life)
+    reinforcement = np.minimum(
+        config.reinforcement_cap,
+        config.reinforcement_weight * np.log1p(np.maximum(reference_count, 0)),
+    )
+    return np.round(np.clip(base * retention + reinforcement, 0.0, 1.0), 2)
+
+
+class MemoryRescoringService:
+    """Re-derives importance_score for active memories in chunks of users."""
+
+    def __init__(self, db, config: Optional[RescoringConfig] = None):
+        self.db = db
+        self.config = config or RescoringConfig.from_env()
+
+    async def run(self, user_id: Optional[str] = None, dry_run: bool = False) -> RescoringReport:
+        """Re-score every active memory (or one user's). Returns a report."""
+        started = time.perf_counter()
+        report = RescoringReport()
+
+        if user_id:
+            await self._rescore_users([user_id], report, dry_run)
+        else:
+            after = None
+            while True:
+                users = await self._next_users(after)
+                if not users:
+                    break
+                try:
+                    await self._rescore_users(users, report, dry_run)
+                except Exception as e:
+                    log.error(f"Re-scoring failed for users {users[0]}..{users[-1]}: {e}")
+                    report.errors.append(f"{users[0]}..{users[-1]}: {e}")
+                after = users[-1]
+
+        report.duration_ms = (time.perf_counter() - started) * 1000
+        log.info(f"Memory re-scoring{' (dry run)' if dry_run else ''}: {report.to_dict()}")
+        return report
+
+    async def _next_users(self, after: Optional[str]) -> List[str]:
+        """Next chunk of user ids with active memories (keyset on user_id)."""
+        rows = await self.db.fetch_all(
+            """
+            SELECT DISTINCT user_id
+            FROM memory_events
+            WHERE is_active = TRUE
+                AND (CAST(:after AS uuid) IS NULL OR user_id > CAST(:after AS uuid))
+            ORDER BY user_id
+            LIMIT :limit
+            """,
+            {"after": after, "limit": self.config.users_per_chunk},
+        )
+        return [str(row["user_id"]) for row in rows]
+
+    async def _rescore_users(self, users: List[str], report: RescoringReport, dry_run: bool) -> None:
+        rows = await self.db.fetch_all(
+            """
+            SELECT id, type, importance_score,
+                   COALESCE(base_importance, importance_score) AS base_importance,
+                   COALESCE(emotional_valence, 0) AS emotional_valence,
+                   COALESCE(reference_count, 0) AS reference_count,
+                   COALESCE(last_referenced_at, created_at) AS last_touched_at
+            FROM memory_events
+            WHERE user_id = ANY(CAST(:users AS uuid[]))
+                AND is_active = TRUE
+            """,
+            {"users": users},
+        )
+        report.users += len(users)
+        report.memories_scanned += len(rows)
+        if not rows:
+            return
+
+        now = datetime.now(timezone.utc)
+        current = np.array([float(r["importance_score"] or 0) for r in rows])
+        base = np.array([float(r["base_importance"] or 0) for r in rows])
+        age_days = np.array([(now - r["last_touched_at"]).total_seconds() / 86400 for r in rows])
+        references = np.array([r["reference_count"] for r in rows], dtype=float)
+        valence = np.array([r["emotional_valence"] for r in rows], dtype=float)
+        floors = np.array([self.config.type_floors.get(r["type"], self.config.default_floor) for r in rows])
+
+        scores = rescore(base, age_days, references, valence, floors, self.config)
+        changed = np.flatnonzero(np.abs(scores - current) >= 0.005)
+        report.raised += int(np.count_nonzero(scores[changed] > current[changed]))
+        report.lowered += int(np.count_nonzero(scores[changed] < current[changed]))
+        report.memories_updated += len(changed)
+
+        if dry_run or not len(changed):
+            return
+
+        await self.db.execute(
+            """
+            UPDATE memory_events m
+            SET importance_score = v.score,
+                base_importance = v.base,
+                rescored_at = NOW()
+            FROM unnest(
+                CAST(:ids AS uuid[]),
+                CAST(:scores AS float8[]),
+                CAST(:bases AS float8[])
+            ) AS v(id, score, base)
+            WHERE m.id = v.id
+            """,
+            {
+                "ids": [str(rows[i]["id"]) for i in changed],
+                "scores": scores[changed].tolist(),
+                "bases": base[changed].tolist(),
+            },
+        )
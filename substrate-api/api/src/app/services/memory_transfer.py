@@ -0,0 +1,465 @@
+"""Streaming memory export and bulk import.
+
+Export streams a user's memories, hooks and engagement dynamics as NDJSON
+(see app/models/memory_transfer.py). Each table is read with a keyset cursor
+on (created_at, id) in fixed-size pages, so memory use stays constant however
+much a user has accumulated. Embeddings are not exported; they are
+model-specific and recomputed on import.
+
+Import reads NDJSON line by line, validates each record and flushes batches:
+records are COPYed into a temp staging table, then moved into the real table
+with one INSERT ... SELECT per batch, which
+
+- forces user_id to the importing user
+- drops records whose character doesn't exist, and unlinks sessions/series
+  that don't exist or belong to someone else
+- keeps exported ids and skips ones already present (re-importing an export
+  is a no-op)
+
+Row triggers (hook ready_at) and statement triggers (memory working sets)
+fire once per batch rather than once per record.
+
+Environment variables:
+- MEMORY_EXPORT_PAGE_SIZE: Rows per keyset page (default: 500)
+- MEMORY_IMPORT_BATCH_SIZE: Records per COPY batch (default: 1000)
+- MEMORY_IMPORT_MAX_RECORDS: Records accepted per import (default: 50000)
+"""
+
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID, uuid4
+
+from pydantic import ValidationError
+
+from app.models.memory_transfer import (
+    EXPORT_FORMAT_VERSION,
+    EngagementDynamicImportRecord,
+    HookImportRecord,
+    MemoryImportRecord,
+    MemoryImportReport,
+)
+from app.services.memory_index import SemanticMemoryIndex, to_pgvector
+from app.services.memory_layers import MemoryLayerCache
+
+log = logging.getLogger(__name__)
+
+EXPORT_KINDS = ("memories", "hooks", "engagements")
+
+MAX_REPORTED_ERRORS = 50
+
+MEMORY_EXPORT_COLUMNS = """
+    id, character_id, episode_id, series_id, type, category, content, summary,
+    emotional_valence, importance_score, base_importance, reference_count,
+    last_referenced_at, is_active, created_at
+"""
+
+HOOK_EXPORT_COLUMNS = """
+    id, character_id, episode_id, type, priority, content, suggested_opener,
+    trigger_after, trigger_before, triggered_at, is_active, metadata, created_at
+"""
+
+MEMORY_STAGING_COLUMNS = (
+    "id", "character_id", "episode_id", "series_id", "type", "category", "content", "summary",
+    "emotional_valence", "importance_score", "base_importance", "reference_count",
+    "last_referenced_at", "is_active", "created_at", "embedding",
+)
+
+HOOK_STAGING_COLUMNS = (
+    "id", "character_id", "episode_id", "type", "priority", "content", "suggested_opener",
+    "trigger_after", "trigger_before", "triggered_at", "is_active", "metadata", "created_at",
+)
+
+# JSON columns are staged as text so COPY needs no custom codec
+CREATE_MEMORY_STAGING = """
+    CREATE TEMP TABLE memory_import_staging (
+        id UUID, character_id UUID, episode_id UUID, series_id UUID,
+        type TEXT, category TEXT, content TEXT, summary TEXT,
+        emotional_valence INTEGER, importance_score FLOAT8, base_importance FLOAT8,
+        reference_count INTEGER, last_referenced_at TIMESTAMPTZ, is_active BOOLEAN,
+        created_at TIMESTAMPTZ, embedding TEXT
+    ) ON COMMIT DROP
+"""
+
+CREATE_HOOK_STAGING = """
+    CREATE TEMP TABLE hook_import_staging (
+        id UUID, character_id UUID, episode_id UUID,
+        type TEXT, priority INTEGER, content TEXT, suggested_opener TEXT,
+        trigger_after TIMESTAMPTZ, trigger_before TIMESTAMPTZ, triggered_at TIMESTAMPTZ,
+        is_active BOOLEAN, metadata TEXT, created_at TIMESTAMPTZ
+    ) ON COMMIT DROP
+"""
+
+INSERT_STAGED_MEMORIES = """
+    INSERT INTO memory_events (
+        id, user_id, character_id, episode_id, series_id, type, category, content, summary,
+        emotional_valence, importance_score, base_importance, reference_count,
+        last_referenced_at, is_active, created_at, embedding, embedding_model
+    )
+    SELECT
+        s.id, CAST(:user_id AS uuid), s.character_id,
+        (SELECT id FROM sessions WHERE id = s.episode_id AND user_id = CAST(:user_id AS uuid)),
+        (SELECT id FROM series WHERE id = s.series_id),
+        s.type, s.category, CAST(s.content AS jsonb), s.summary,
+        s.emotional_valence, s.importance_score, COALESCE(s.base_importance, s.importance_score),
+        s.reference_count, s.last_referenced_at, s.is_active, s.created_at,
+        CAST(s.embedding AS vector),
+        CASE WHEN s.embedding IS NOT NULL THEN :embedding_model END
+    FROM memory_import_staging s
+    WHERE s.character_id IS NULL OR EXISTS (SELECT 1 FROM characters c WHERE c.id = s.character_id)
+    ON CONFLICT (id) DO NOTHING
+"""
+
+INSERT_STAGED_HOOKS = """
+    INSERT INTO hooks (
+        id, user_id, character_id, episode_id, type, priority, content, suggested_opener,
+        trigger_after, trigger_before, triggered_at, is_active, metadata, created_at
+    )
+    SELECT
+        s.id, CAST(:user_id AS uuid), s.character_id,
+        (SELECT id FROM sessions WHERE id = s.episode_id AND user_id = CAST(:user_id AS uuid)),
+        s.type, s.priority, s.content, s.suggested_opener,
+        s.trigger_after, s.trigger_before, s.triggered_at, s.is_active,
+        CAST(s.metadata AS jsonb), s.created_at
+    FROM hook_import_staging s
+    WHERE EXISTS (SELECT 1 FROM characters c WHERE c.id = s.character_id)
+    ON CONFLICT (id) DO NOTHING
+"""
+
+
+@dataclass
+class MemoryTransferConfig:
+    """Settings for memory export/import."""
+
+    page_size: int = 500
+    batch_size: int = 1000
+    max_records: int = 50000
+
+    @classmethod
+    def from_env(cls) -> "MemoryTransferConfig":
+        return cls(
+            page_size=int(os.getenv("MEMORY_EXPORT_PAGE_SIZE", 500)),
+            batch_size=int(os.getenv("MEMORY_IMPORT_BATCH_SIZE", 1000)),
+            max_records=int(os.getenv("MEMORY_IMPORT_MAX_RECORDS", 50000)),
+        )
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def ndjson_line(kind: str, data: Dict[str, Any]) -> str:
+    return json.dumps({"kind": kind, "data": data}, default=_json_default, separators=(",", ":")) + "\n"
+
+
+class MemoryExporter:
+    """Streams one user's memories, hooks and engagement dynamics as NDJSON."""
+
+    def __init__(self, db, config: Optional[MemoryTransferConfig] = None):
+        self.db = db
+        self.config = config or MemoryTransferConfig.from_env()
+
+    async def stream(
+        self,
+        user_id: UUID,
+        series_id: Optional[UUID] = None,
+        character_id: Optional[UUID] = None,
+        include: Sequence[str] = EXPORT_KINDS,
+        include_inactive: bool = False,
+    ) -> AsyncIterator[str]:
+        """Yield NDJSON lines. series_id filters memories only (hooks are cross-series)."""
+        counts = {kind: 0 for kind in include}
+        yield ndjson_line("export", {
+            "version": EXPORT_FORMAT_VERSION,
+            "user_id": user_id,
+            "series_id": series_id,
+            "character_id": character_id,
+            "include": list(include),
+            "exported_at": datetime.now(timezone.utc),
+        })
+
+        filters = {"series_id": series_id, "character_id": character_id}
+        if "memories" in include:
+            async for row in self._paginate("memory_events", MEMORY_EXPORT_COLUMNS, user_id, filters, include_inactive):
+                counts["memories"] += 1
+                yield ndjson_line("memory", row)
+        if "hooks" in include:
+            hook_filters = {"character_id": character_id}
+            async for row in self._paginate("hooks", HOOK_EXPORT_COLUMNS, user_id, hook_filters, include_inactive):
+                counts["hooks"] += 1
+                yield ndjson_line("hook", row)
+        if "engagements" in include:
+            for row in await self._engagements(user_id, character_id):
+                counts["engagements"] += 1
+                yield ndjson_line("engagement", row)
+
+        yield ndjson_line("end", {"counts": counts})
+
+    async def _paginate(
+        self,
+        table: str,
+        columns: str,
+        user_id: UUID,
+        filters: Dict[str, Optional[UUID]],
+        include_inactive: bool,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Keyset pages ordered by (created_at, id)."""
+        conditions = ["user_id = :user_id"]
+        values: Dict[str, Any] = {"user_id": str(user_id), "limit": self.config.page_size}
+        if not include_inactive:
+            conditions.append("is_active = TRUE")
+        for column, value in filters.items():
+            if value:
+                conditions.append(f"{column} = :{column}")
+                values[column] = str(value)
+
+        first_page = f"""
+            SELECT {columns} FROM {table}
+            WHERE {" AND ".join(conditions)}
+            ORDER BY created_at, id
+            LIMIT :limit
+        """
+        next_page = f"""
+            SELECT {columns} FROM {table}
+            WHERE {" AND ".join(conditions)}
+                AND (created_at, id) > (:after_created_at, CAST(:after_id AS uuid))
+            ORDER BY created_at, id
+            LIMIT :limit
+        """
+
+        rows = await self.db.fetch_all(first_page, values)
+        while rows:
+            for row in rows:
+                yield dict(row)
+            if len(rows) < self.config.page_size:
+                return
+            last = rows[-1]
+            values["after_created_at"] = last["created_at"]
+            values["after_id"] = str(last["id"])
+            rows = await self.db.fetch_all(next_page, values)
+
+    async def _engagements(self, user_id: UUID, character_id: Optional[UUID]) -> List[Dict[str, Any]]:
+        """One row per character the user has met, so no pagination needed."""
+        rows = await self.db.fetch_all(
+            """
+            SELECT character_id, dynamic, milestones
+            FROM engagements
+            WHERE user_id = :user_id
+                AND (CAST(:character_id AS uuid) IS NULL OR character_id = CAST(:character_id AS uuid))
+            ORDER BY character_id
+            """,
+            {"user_id": str(user_id), "character_id": str(character_id) if character_id else None},
+        )
+        return [dict(row) for row in rows]
+
+
+class MemoryImporter:
+    """Validates NDJSON records and inserts them in COPY batches."""
+
+    RECORD_MODELS = {
+        "memory": MemoryImportRecord,
+        "hook": HookImportRecord,
+        "engagement": EngagementDynamicImportRecord,
+    }
+
+    def __init__(self, db, config: Optional[MemoryTransferConfig] = None):
+        self.db = db
+        self.config = config or MemoryTransferConfig.from_env()
+        self.semantic_index = SemanticMemoryIndex.get_instance()
+
+    async def run(
+        self,
+        user_id: UUID,
+        chunks: AsyncIterator[bytes],
+        dry_run: bool = False,
+    ) -> MemoryImportReport:
+        """Import every record in an NDJSON byte stream for user_id."""
+        started = time.perf_counter()
+        report = MemoryImportReport(dry_run=dry_run)
+        batches: Dict[str, List[Any]] = {kind: [] for kind in self.RECORD_MODELS}
+        records = 0
+
+        async for line_number, line in _iter_lines(chunks):
+            report.lines = line_number
+            record = self._parse(line_number, line, report)
+            if record is None:
+                continue
+            kind, parsed = record
+            records += 1
+            if records > self.config.max_records:
+                self._reject(report, line_number, f"more than {self.config.max_records} records; stopping")
+                break
+            batches[kind].append(parsed)
+            if len(batches[kind]) >= self.config.batch_size:
+                await self._flush(user_id, kind, batches[kind], report, dry_run)
+                batches[kind] = []
+
+        for kind, batch in batches.items():
+            if batch:
+                await self._flush(user_id, kind, batch, report, dry_run)
+
+        if not dry_run:
+            MemoryLayerCache.get_instance().invalidate_user(user_id)
+
+        report.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        log.info(
+            f"Memory import for {user_id}{' (dry run)' if dry_run else ''}: "
+            f"{report.memories_inserted} memories, {report.hooks_inserted} hooks, "
+            f"{report.engagements_updated} engagements, {report.skipped} skipped, "
+            f"{report.rejected} rejected in {report.duration_ms:.0f}ms"
+        )
+        return report
+
+    def _parse(self, line_number: int, line: bytes, report: MemoryImportReport) -> Optional[Tuple[str, Any]]:
+        try:
+            obj = json.loads(line)
+        except ValueError:
+            self._reject(report, line_number, "invalid JSON")
+            return None
+        if not isinstance(obj, dict):
+            self._reject(report, line_number, "expected an object")
+            return None
+        kind = obj.get("kind")
+        if kind in ("export", "end"):
+            return None
+        model = self.RECORD_MODELS.get(kind)
+        if model is None:
+            self._reject(report, line_number, f"unknown kind {kind!r}")
+            return None
+        try:
+            return kind, model.model_validate(obj.get("data") or {})
+        except ValidationError as e:
+            first = e.errors()[0]
+            self._reject(report, line_number, f"{kind}: {'.'.join(map(str, first['loc']))}: {first['msg']}")
+            return None
+
+    def _reject(self, report: MemoryImportReport, line_number: int, message: str) -> None:
+        report.rejected += 1
+        if len(report.errors) < MAX_REPORTED_ERRORS:
+            report.errors.append(f"line {line_number}: {message}")
+
+    async def _flush(self, user_id: UUID, kind: str, batch: List[Any], report: MemoryImportReport, dry_run: bool) -> None:
+        if dry_run:
+            return
+        if kind == "memory":
+            inserted = await self._copy_memories(user_id, batch)
+            report.memories_inserted += inserted
+        elif kind == "hook":
+            inserted = await self._copy_hooks(user_id, batch)
+            report.hooks_inserted += inserted
+        else:
+            updated = await self._update_engagements(user_id, batch)
+            report.engagements_updated += updated
+            report.rejected += len(batch) - updated
+            return
+        report.skipped += len(batch) - inserted
+
+    async def _copy_memories(self, user_id: UUID, batch: List[MemoryImportRecord]) -> int:
+        embeddings: List[Optional[str]] = [None] * len(batch)
+        if self.semantic_index.enabled:
+            try:
+                vectors = await self.semantic_index.embedder.embed([m.summary for m in batch])
+                embeddings = [to_pgvector(v) for v in vectors]
+            except Exception as e:
+                log.warning(f"Failed to embed {len(batch)} imported memories: {e}")
+
+        now = datetime.now(timezone.utc)
+        rows = [
+            (
+                m.id or uuid4(), m.character_id, m.episode_id, m.series_id,
+                m.type.value, m.category, json.dumps(m.content), m.summary,
+                m.emotional_valence, m.importance_score, m.base_importance, m.reference_count,
+                m.last_referenced_at, m.is_active, m.created_at or now, embedding,
+            )
+            for m, embedding in zip(batch, embeddings, strict=True)
+        ]
+        return await self._copy_and_insert(
+            CREATE_MEMORY_STAGING, "memory_import_staging", MEMORY_STAGING_COLUMNS, rows,
+            INSERT_STAGED_MEMORIES,
+            {"user_id": str(user_id), "embedding_model": self.semantic_index.embedder.model},
+        )
+
+    async def _copy_hooks(self, user_id: UUID, batch: List[HookImportRecord]) -> int:
+        now = datetime.now(timezone.utc)
+        rows = [
+            (
+                h.id or uuid4(), h.character_id, h.episode_id, h.type.value, h.priority,
+                h.content, h.suggested_opener, h.trigger_after, h.trigger_before,
+                h.triggered_at, h.is_active, json.dumps(h.metadata), h.created_at or now,
+            )
+            for h in batch
+        ]
+        return await self._copy_and_insert(
+            CREATE_HOOK_STAGING, "hook_import_staging", HOOK_STAGING_COLUMNS, rows,
+            INSERT_STAGED_HOOKS, {"user_id": str(user_id)},
+        )
+
+    async def _copy_and_insert(
+        self,
+        create_staging: str,
+        staging_table: str,
+        columns: Sequence[str],
+        rows: List[tuple],
+        insert_query: str,
+        values: Dict[str, Any],
+    ) -> int:
+        """COPY rows into a transaction-scoped staging table, then INSERT ... SELECT."""
+        async with self.db.connection() as conn:
+            async with conn.transaction():
+                await conn.execute(create_staging)
+                await conn.raw_connection.copy_records_to_table(
+                    staging_table, records=rows, columns=list(columns),
+                )
+                inserted = await conn.fetch_all(insert_query + " RETURNING id", values)
+        return len(inserted)
+
+    async def _update_engagements(self, user_id: UUID, batch: List[EngagementDynamicImportRecord]) -> int:
+        """Overwrite dynamic/milestones on engagements the user already has."""
+        rows = await self.db.fetch_all(
+            """
+            UPDATE engagements e
+            SET dynamic = CAST(v.dynamic AS jsonb),
+                milestones = ARRAY(SELECT jsonb_array_elements_text(CAST(v.milestones AS jsonb))),
+                updated_at = NOW()
+            FROM unnest(
+                CAST(:character_ids AS uuid[]),
+                CAST(:dynamics AS text[]),
+                CAST(:milestones AS text[])
+            ) AS v(character_id, dynamic, milestones)
+            WHERE e.user_id = :user_id AND e.character_id = v.character_id
+            RETURNING e.id
+            """,
+            {
+                "user_id": str(user_id),
+                "character_ids": [str(r.character_id) for r in batch],
+                "dynamics": [json.dumps(r.dynamic) for r in batch],
+                "milestones": [json.dumps(r.milestones) for r in batch],
+            },
+        )
+        return len(rows)
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    """Split a byte stream into non-empty lines, numbered from 1."""
+    buffer = b""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+    if buffer.strip():
+        yield line_number + 1, buffer
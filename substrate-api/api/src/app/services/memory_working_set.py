@@ -0,0 +1,176 @@
+"""Precomputed memory working sets per (user, series).
+
+memory_working_sets (migration 069) holds, per scope, the only memories that
+can appear in the get_relevant_memories ranking: everything from the last 7
+days plus the top (3 + that many) by importance per type. Triggers on
+memory_events keep it current, so a read is one primary-key lookup and a
+window over a few dozen rows instead of over the whole scope.
+
+This module reads working sets and provides the rebuild and consistency
+check used by app.scripts.memory_working_set.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from app.models.memory import MEMORY_EVENT_COLUMNS, MemoryEvent
+
+log = logging.getLogger(__name__)
+
+_MEMORY_COLUMNS = ", ".join(f"m.{column}" for column in MEMORY_EVENT_COLUMNS.split(", "))
+
+# The ranking get_relevant_memories has always used; {source} is either the
+# whole scope or the working set
+_RANKED_QUERY = """
+    WITH ranked_memories AS (
+        SELECT """ + _MEMORY_COLUMNS + """,
+            ROW_NUMBER() OVER (
+                PARTITION BY m.type
+                ORDER BY
+                    CASE WHEN m.created_at > NOW() - INTERVAL '7 days' THEN 1 ELSE 0 END DESC,
+                    m.importance_score DESC,
+                    m.created_at DESC
+            ) as rn
+        FROM {source}
+    )
+    SELECT * FROM ranked_memories
+    WHERE rn <= 3
+    ORDER BY importance_score DESC, created_at DESC
+    LIMIT :limit
+"""
+
+_SCOPE_SOURCE = """memory_events m
+        WHERE m.user_id = :user_id
+            AND m.series_id = :series_id
+            AND m.is_active = TRUE"""
+
+_WORKING_SET_SOURCE = """memory_working_sets ws
+        JOIN memory_events m ON m.id = ANY(ws.memory_ids)
+        WHERE ws.user_id = :user_id
+            AND ws.series_id = :series_id
+            AND m.is_active = TRUE"""
+
+
+@dataclass
+class WorkingSetCheckReport:
+    """Outcome of comparing working sets against the live ranking."""
+
+    scopes_checked: int = 0
+    missing: List[Tuple[str, str]] = field(default_factory=list)
+    mismatched: List[Tuple[str, str]] = field(default_factory=list)
+    orphaned: int = 0
+    repaired: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return not self.missing and not self.mismatched and not self.orphaned
+
+
+class MemoryWorkingSetService:
+    """Reads, rebuilds and verifies memory working sets."""
+
+    def __init__(self, db):
+        self.db = db
+
+    async def get_ranked(
+        self,
+        user_id: UUID,
+        series_id: UUID,
+        limit: int,
+    ) -> Optional[List[MemoryEvent]]:
+        """Ranked memories from the working set; None if the scope has no working set."""
+        params = {"user_id": str(user_id), "series_id": str(series_id), "limit": limit}
+        rows = await self.db.fetch_all(_RANKED_QUERY.format(source=_WORKING_SET_SOURCE), params)
+        if rows:
+            return [MemoryEvent(**dict(row)) for row in rows]
+
+        # Empty result: either nothing to remember or no working set yet
+        exists = await self.db.fetch_one(
+            "SELECT 1 FROM memory_working_sets WHERE user_id = :user_id AND series_id = :series_id",
+            {"user_id": str(user_id), "series_id": str(series_id)},
+        )
+        return [] if exists else None
+
+    async def get_ranked_live(self, user_id: UUID, series_id: UUID, limit: int) -> List[MemoryEvent]:
+        """The same ranking computed over every active memory in the scope."""
+        params = {"user_id": str(user_id), "series_id": str(series_id), "limit": limit}
+        rows = await self.db.fetch_all(_RANKED_QUERY.format(source=_SCOPE_SOURCE), params)
+        return [MemoryEvent(**dict(row)) for row in rows]
+
+    async def rebuild_scope(self, user_id: UUID, series_id: UUID) -> int:
+        """Recompute one working set. Returns its size."""
+        row = await self.db.fetch_one(
+            "SELECT refresh_memory_working_set(CAST(:user_id AS uuid), CAST(:series_id AS uuid)) AS size",
+            {"user_id": str(user_id), "series_id": str(series_id)},
+        )
+        return row["size"]
+
+    async def rebuild_all(self) -> Dict[str, int]:
+        """Recompute every working set and drop ones for scopes with no active memories."""
+        scopes = await self._active_scopes()
+        sizes = 0
+        for user_id, series_id in scopes:
+            sizes += await self.rebuild_scope(user_id, series_id)
+        orphaned = await self._delete_orphans()
+        return {"scopes": len(scopes), "memories": sizes, "orphans_deleted": orphaned}
+
+    async def check(self, limit: int = 20, sample: Optional[int] = None, repair: bool = False) -> WorkingSetCheckReport:
+        """Compare working-set reads with the live ranking for each scope.
+
+        Args:
+            limit: Ranking limit to compare (20 covers the Director's read)
+            sample: Only check this many random scopes
+            repair: Rebuild scopes that are missing or mismatched
+        """
+        report = WorkingSetCheckReport()
+        for user_id, series_id in await self._active_scopes(sample):
+            report.scopes_checked += 1
+            key = (str(user_id), str(series_id))
+            cached = await self.get_ranked(user_id, series_id, limit)
+            live = await self.get_ranked_live(user_id, series_id, limit)
+            if cached is None:
+                report.missing.append(key)
+            elif [m.id for m in cached] != [m.id for m in live]:
+                report.mismatched.append(key)
+            else:
+                continue
+            log.warning(f"Memory working set {'missing' if cached is None else 'stale'} for {key}")
+            if repair:
+                await self.rebuild_scope(user_id, series_id)
+                report.repaired += 1
+
+        orphans = await self.db.fetch_one("""
+            SELECT COUNT(*) AS n FROM memory_working_sets ws
+            WHERE NOT EXISTS (
+                SELECT 1 FROM memory_events m
+                WHERE m.user_id = ws.user_id AND m.series_id = ws.series_id AND m.is_active = TRUE
+            )
+        """)
+        report.orphaned = orphans["n"]
+        if repair and report.orphaned:
+            report.repaired += await self._delete_orphans()
+        return report
+
+    async def _active_scopes(self, sample: Optional[int] = None) -> List[Tuple[UUID, UUID]]:
+        query = """
+            SELECT DISTINCT user_id, series_id
+            FROM memory_events
+            WHERE series_id IS NOT NULL AND is_active = TRUE
+        """
+        if sample:
+            query = f"SELECT * FROM ({query}) scopes ORDER BY random() LIMIT {int(sample)}"
+        rows = await self.db.fetch_all(query)
+        return [(row["user_id"], row["series_id"]) for row in rows]
+
+    async def _delete_orphans(self) -> int:
+        rows = await self.db.fetch_all("""
+            DELETE FROM memory_working_sets ws
+            WHERE NOT EXISTS (
+                SELECT 1 FROM memory_events m
+                WHERE m.user_id = ws.user_id AND m.series_id = ws.series_id AND m.is_active = TRUE
+            )
+            RETURNING user_id
+        """)
+        return len(rows)
@@ -10,6 +10,7 @@ For manual scene generation, see routes/scenes.py which has fuller avatar kit su
 import logging
 import uuid
 import os
+from dataclasses import dataclass
 from typing import Optional, Dict, Any
 from uuid import UUID
 
@@ -161,6 +162,20 @@ Example: "webtoon illustration, flat cel shading, clean lineart, empty convenien
 Your prompt:"""
 
 
+@dataclass
+class PreparedVisual:
+    """A generated Director visual that has not been saved yet.
+
+    Produced by prepare_director_visual(); nothing is uploaded or inserted
+    until save_prepared_visual(). Lets the caller generate ahead of time and
+    decide later whether to keep the image (see visual_speculation).
+    """
+    visual_type: str
+    scene_prompt: str
+    image_response: Any  # ImageResponse
+    trigger_type: str = "director_auto"
+
+
 class SceneService:
     """Service for generating and managing scene cards."""
 
@@ -455,13 +470,42 @@ Think cinematically but ALWAYS put style descriptors FIRST. Never put "anime sty
 
         Returns the generated scene data or None if generation fails.
         """
+        prepared = await self.prepare_director_visual(
+            visual_type=visual_type,
+            episode_id=episode_id,
+            scene_setting=scene_setting,
+            visual_hint=visual_hint,
+            appearance_prompt=appearance_prompt,
+            style_prompt=style_prompt,
+        )
+        if not prepared:
+            return None
+
+        return await self.save_prepared_visual(
+            prepared,
+            episode_id=episode_id,
+            user_id=user_id,
+            character_id=character_id,
+        )
+
+    async def prepare_director_visual(
+        self,
+        visual_type: str,
+        episode_id: UUID,
+        scene_setting: str,
+        visual_hint: str,
+        appearance_prompt: Optional[str] = None,
+        style_prompt: Optional[str] = None,
+    ) -> Optional[PreparedVisual]:
+        """Write the prompt and synthesize the image, without saving anything.
+
+        Returns None if generation fails or visual_type has no image pipeline.
+        """
         if visual_type == "character":
             # Character type generates cinematic insert with appearance context
             # Uses character's appearance_prompt for visual consistency
-            return await self._generate_cinematic_insert(
+            return await self._prepare_cinematic_insert(
                 episode_id=episode_id,
-                user_id=user_id,
-                character_id=character_id,
                 scene_setting=scene_setting,
                 visual_hint=visual_hint,
                 appearance_prompt=appearance_prompt,
@@ -469,20 +513,14 @@ Think cinematically but ALWAYS put style descriptors FIRST. Never put "anime sty
             )
 
         elif visual_type == "object":
-            return await self._generate_object_visual(
-                episode_id=episode_id,
-                user_id=user_id,
-                character_id=character_id,
+            return await self._prepare_object_visual(
                 scene_setting=scene_setting,
                 visual_hint=visual_hint,
                 style_prompt=style_prompt,
             )
 
         elif visual_type == "atmosphere":
-            return await self._generate_atmosphere_visual(
-                episode_id=episode_id,
-                user_id=user_id,
-                character_id=character_id,
+            return await self._prepare_atmosphere_visual(
                 scene_setting=scene_setting,
                 visual_hint=visual_hint,
                 style_prompt=style_prompt,
@@ -492,16 +530,35 @@ Think cinematically but ALWAYS put style descriptors FIRST. Never put "anime sty
             log.warning(f"Unknown visual_type '{visual_type}', skipping generation")
             return None
 
-    async def _generate_cinematic_insert(
+    async def save_prepared_visual(
         self,
+        prepared: PreparedVisual,
         episode_id: UUID,
         user_id: UUID,
         character_id: UUID,
+    ) -> Optional[Dict[str, Any]]:
+        """Upload a prepared visual, caption it and add it to the episode."""
+        try:
+            return await self._save_generated_image(
+                image_response=prepared.image_response,
+                episode_id=episode_id,
+                user_id=user_id,
+                character_id=character_id,
+                scene_prompt=prepared.scene_prompt,
+                trigger_type=prepared.trigger_type,
+            )
+        except Exception as e:
+            log.error(f"Saving {prepared.visual_type} visual failed for episode {episode_id}: {e}")
+            return None
+
+    async def _prepare_cinematic_insert(
+        self,
+        episode_id: UUID,
         scene_setting: str,
         visual_hint: str,
         appearance_prompt: Optional[str] = None,
         style_prompt: Optional[str] = None,
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Optional[PreparedVisual]:
         """Generate narrative moment image (auto-gen, manual T2I quality).
 
         Captures the emotional beat through compositional framing, similar to manual generation
@@ -622,28 +679,22 @@ Think: Narrative moments that ground emotion in physical space and action."""
                 height=768,  # 4:3 for insert shots
             )
 
-            return await self._save_generated_image(
-                image_response=image_response,
-                episode_id=episode_id,
-                user_id=user_id,
-                character_id=character_id,
+            return PreparedVisual(
+                visual_type="character",
                 scene_prompt=scene_prompt,
-                trigger_type="director_auto",
+                image_response=image_response,
             )
 
         except Exception as e:
             log.error(f"Cinematic insert generation failed: {e}")
             return None
 
-    async def _generate_object_visual(
+    async def _prepare_object_visual(
         self,
-        episode_id: UUID,
-        user_id: UUID,
-        character_id: UUID,
         scene_setting: str,
         visual_hint: str,
         style_prompt: Optional[str] = None,
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Optional[PreparedVisual]:
         """Generate object close-up visual (no character)."""
         try:
             # Generate prompt for object close-up
@@ -677,28 +728,22 @@ NEVER include people or faces in your prompt."""
                 height=1024,
             )
 
-            return await self._save_generated_image(
-                image_response=image_response,
-                episode_id=episode_id,
-                user_id=user_id,
-                character_id=character_id,
+            return PreparedVisual(
+                visual_type="object",
                 scene_prompt=scene_prompt,
-                trigger_type="director_auto",
+                image_response=image_response,
             )
 
         except Exception as e:
             log.error(f"Object visual generation failed: {e}")
             return None
 
-    async def _generate_atmosphere_visual(
+    async def _prepare_atmosphere_visual(
         self,
-        episode_id: UUID,
-        user_id: UUID,
-        character_id: UUID,
         scene_setting: str,
         visual_hint: str,
         style_prompt: Optional[str] = None,
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Optional[PreparedVisual]:
         """Generate atmospheric/setting visual (no character)."""
         try:
             # Generate prompt for atmosphere shot
@@ -732,13 +777,10 @@ Focus on the feeling of the space itself."""
                 height=576,  # 16:9 for atmospheric shots
             )
 
-            return await self._save_generated_image(
-                image_response=image_response,
-                episode_id=episode_id,
-                user_id=user_id,
-                character_id=character_id,
+            return PreparedVisual(
+                visual_type="atmosphere",
                 scene_prompt=scene_prompt,
-                trigger_type="director_auto",
+                image_response=image_response,
             )
 
         except Exception as e:
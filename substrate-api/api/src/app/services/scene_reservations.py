@@ -0,0 +1,129 @@
+"""Per-session scene generation leases and budget reservation.
+
+Wraps reserve_scene_generation / release_scene_generation (migration 075).
+Every scene generation for a session takes a lease on (session, trigger)
+first: a second request for the same trigger while the first is in flight
+is turned away instead of paying for another prediction, and for Director
+auto-gen the generation_budget slot is claimed atomically with the lease
+rather than checked and incremented separately.
+
+    reservation = await reservations.reserve(session_id, director_trigger(turn), budget)
+    if not reservation.ok:
+        return
+    succeeded = False
+    try:
+        ...generate...
+        succeeded = True
+    finally:
+        await reservations.release(reservation, succeeded)
+
+Environment variables:
+- SCENE_GENERATION_LEASE_SECONDS: How long a lease lives if its holder never
+  releases it (default: 300). Must exceed the slowest generation.
+"""
+
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Optional
+from uuid import UUID
+
+log = logging.getLogger(__name__)
+
+LEASE_SECONDS = int(os.getenv("SCENE_GENERATION_LEASE_SECONDS", 300))
+
+RESERVED = "reserved"
+IN_FLIGHT = "in_flight"
+BUDGET_EXHAUSTED = "budget_exhausted"
+NOT_FOUND = "not_found"
+
+# Trigger key for user-initiated generations: one in flight per session
+MANUAL_TRIGGER = "manual"
+
+
+def director_trigger(turn: int) -> str:
+    """Trigger key for the Director auto-gen of a turn."""
+    return f"director:turn:{turn}"
+
+
+@dataclass
+class SceneReservation:
+    """Outcome of a lease request."""
+
+    session_id: str
+    trigger_key: str
+    status: str
+    lease_token: Optional[str] = None  # Identifies this holder's lease (set when reserved)
+
+    @property
+    def ok(self) -> bool:
+        return self.status == RESERVED
+
+
+class SceneGenerationReservations:
+    """Takes and releases scene generation leases for sessions."""
+
+    def __init__(self, db):
+        self.db = db
+
+    async def reserve(
+        self,
+        session_id: Any,
+        trigger_key: str,
+        budget: Optional[int] = None,
+        user_id: Optional[UUID] = None,
+    ) -> SceneReservation:
+        """Lease (session, trigger); with a budget, also claim a generation slot.
+
+        user_id, when given, must own the session.
+        """
+        row = await self.db.fetch_one(
+            """
+            SELECT status, lease_token FROM reserve_scene_generation(
+                CAST(:session_id AS uuid), :trigger_key, CAST(:budget AS integer),
+                :lease_seconds, CAST(:user_id AS uuid)
+            )
+            """,
+            {
+                "session_id": str(session_id),
+                "trigger_key": trigger_key,
+                "budget": budget,
+                "lease_seconds": LEASE_SECONDS,
+                "user_id": str(user_id) if user_id else None,
+            },
+        )
+        reservation = SceneReservation(
+            session_id=str(session_id),
+            trigger_key=trigger_key,
+            status=row["status"] if row else NOT_FOUND,
+            lease_token=str(row["lease_token"]) if row and row["lease_token"] else None,
+        )
+        if not reservation.ok:
+            log.info(f"Scene generation {trigger_key} for session {session_id} not started: {reservation.status}")
+        return reservation
+
+    async def release(self, reservation: SceneReservation, succeeded: bool) -> None:
+        """End the lease; a failed generation gets its budget slot back.
+
+        A no-op if the lease expired and was taken over by another request:
+        that holder's lease and budget slot are left alone.
+        """
+        if not reservation.ok:
+            return
+        try:
+            await self.db.execute(
+                """
+                SELECT release_scene_generation(
+                    CAST(:session_id AS uuid), :trigger_key, CAST(:lease_token AS uuid), :succeeded
+                )
+                """,
+                {
+                    "session_id": reservation.session_id,
+                    "trigger_key": reservation.trigger_key,
+                    "lease_token": reservation.lease_token,
+                    "succeeded": succeeded,
+                },
+            )
+        except Exception as e:
+            # The lease expires on its own; a failed generation's slot stays spent
+            log.error(f"Releasing scene generation {reservation.trigger_key} for session {reservation.session_id} failed: {e}")
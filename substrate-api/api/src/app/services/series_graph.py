@@ -0,0 +1,281 @@
+"""Cached per-series episode navigation.
+
+Working out episode order and "what comes next" used to be a separate
+episode_templates query in each caller: the next-episode suggestion on the
+turn that hits turn_budget (ConversationService._get_next_episode_in_series),
+DirectorService.suggest_next_episode, and the series progress and
+user-context routes. Templates change only when they are edited, so a
+series' navigation is loaded once into a SeriesGraph and answered from
+memory:
+
+- every template of the series, ordered (sort_order, episode_number), with
+  its entry / free-chat / active flags
+- next/previous links along the active episodes by episode_number
+- branches from on_success/on_failure: the flag each outcome sets, the
+  episode it suggests, and the episodes whose success_condition waits on
+  that flag
+
+Graphs are cached per process (LRU + TTL). Template writes through the API
+invalidate the affected series here; edits made by other workers or scripts
+are picked up when the TTL expires.
+
+Environment variables:
+- SERIES_GRAPH_CACHE_SIZE: Series graphs kept per process (default: 256)
+- SERIES_GRAPH_TTL_SECONDS: Seconds before a graph is reloaded (default: 300)
+"""
+
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.models.episode_template import EpisodeTemplate, EpisodeType
+from app.services.episode_plan import parse_condition
+
+log = logging.getLogger(__name__)
+
+SUCCESS = "success"
+FAILURE = "failure"
+
+_GRAPH_QUERY = """
+    SELECT id, series_id, character_id, episode_number, title, slug, situation,
+           episode_type, is_free_chat, sort_order, status,
+           success_condition, on_success, on_failure
+    FROM episode_templates
+    WHERE series_id = :series_id
+"""
+
+
+@dataclass(frozen=True)
+class Branch:
+    """Where an episode outcome leads."""
+
+    outcome: str  # SUCCESS | FAILURE
+    set_flag: Optional[str] = None
+    suggest_episode: Optional[str] = None  # As authored (slug or id)
+    suggested_id: Optional[str] = None  # Resolved template id, if in this series
+    unlocks: Tuple[str, ...] = ()  # Templates whose success_condition is flag:<set_flag>
+
+
+@dataclass(frozen=True)
+class EpisodeNode:
+    """One episode template in a series graph."""
+
+    id: str
+    episode_number: int
+    title: str
+    slug: str
+    situation: Optional[str]
+    character_id: Optional[str]
+    episode_type: str
+    sort_order: int
+    status: str
+    is_free_chat: bool
+    requires_flag: Optional[str] = None
+    next_id: Optional[str] = None
+    previous_id: Optional[str] = None
+    branches: Tuple[Branch, ...] = ()
+
+    @property
+    def is_active(self) -> bool:
+        return self.status == "active"
+
+    @property
+    def is_entry(self) -> bool:
+        return self.episode_type == EpisodeType.ENTRY
+
+    def branch(self, outcome: str) -> Optional[Branch]:
+        return next((b for b in self.branches if b.outcome == outcome), None)
+
+
+@dataclass(frozen=True)
+class SeriesGraph:
+    """Navigation for one series; read-only once built."""
+
+    series_id: str
+    nodes: Dict[str, EpisodeNode]
+    ordered: Tuple[EpisodeNode, ...]  # All templates by (sort_order, episode_number)
+    by_number: Tuple[EpisodeNode, ...]  # Active templates by (episode_number, sort_order)
+    loaded_at: float = 0.0
+
+    def get(self, template_id: Any) -> Optional[EpisodeNode]:
+        return self.nodes.get(str(template_id))
+
+    def episodes(self, active_only: bool = False) -> List[EpisodeNode]:
+        """Story episodes (no free chat) in display order."""
+        return [
+            n for n in self.ordered
+            if not n.is_free_chat and (n.is_active or not active_only)
+        ]
+
+    def entry(self) -> Optional[EpisodeNode]:
+        """Where a new player starts: the entry episode, else the first active one."""
+        episodes = self.episodes(active_only=True)
+        return next((n for n in episodes if n.is_entry), episodes[0] if episodes else None)
+
+    def with_number(self, episode_number: int) -> Optional[EpisodeNode]:
+        """The active template with this episode number."""
+        return next((n for n in self.by_number if n.episode_number == episode_number), None)
+
+    def next_after(self, episode_number: int) -> Optional[EpisodeNode]:
+        """The first active template numbered after episode_number."""
+        return next((n for n in self.by_number if n.episode_number > episode_number), None)
+
+
+def build_graph(series_id: Any, rows: Sequence[Any]) -> SeriesGraph:
+    """Build a SeriesGraph from episode_templates rows (_GRAPH_QUERY columns)."""
+    raw = []
+    for row in rows:
+        raw.append({
+            "id": str(row["id"]),
+            "episode_number": row["episode_number"] or 0,
+            "title": row["title"],
+            "slug": row["slug"],
+            "situation": row["situation"],
+            "character_id": str(row["character_id"]) if row["character_id"] else None,
+            "episode_type": row["episode_type"] or EpisodeType.CORE,
+            "sort_order": row["sort_order"] or 0,
+            "status": row["status"],
+            "is_free_chat": bool(row["is_free_chat"]),
+            "requires_flag": _required_flag(row["success_condition"]),
+            "on_success": EpisodeTemplate.ensure_dict(row["on_success"]),
+            "on_failure": EpisodeTemplate.ensure_dict(row["on_failure"]),
+        })
+
+    ids = {r["id"] for r in raw}
+    by_slug = {r["slug"]: r["id"] for r in raw}
+    waiting_on: Dict[str, List[str]] = {}
+    for r in raw:
+        if r["requires_flag"]:
+            waiting_on.setdefault(r["requires_flag"], []).append(r["id"])
+
+    active = sorted(
+        (r for r in raw if r["status"] == "active"),
+        key=lambda r: (r["episode_number"], r["sort_order"]),
+    )
+    next_ids: Dict[str, str] = {}
+    previous_ids: Dict[str, str] = {}
+    for r in raw:
+        following = next((a for a in active if a["episode_number"] > r["episode_number"]), None)
+        if following:
+            next_ids[r["id"]] = following["id"]
+        preceding = [a for a in active if a["episode_number"] < r["episode_number"]]
+        if preceding:
+            previous_ids[r["id"]] = preceding[-1]["id"]
+
+    nodes: Dict[str, EpisodeNode] = {}
+    for r in raw:
+        branches = []
+        for outcome, action in ((SUCCESS, r["on_success"]), (FAILURE, r["on_failure"])):
+            if not action:
+                continue
+            set_flag = action.get("set_flag") or None
+            suggest = action.get("suggest_episode") or None
+            suggest_key = str(suggest) if suggest is not None else None
+            branches.append(Branch(
+                outcome=outcome,
+                set_flag=set_flag,
+                suggest_episode=suggest,
+                suggested_id=by_slug.get(suggest_key) or (suggest_key if suggest_key in ids else None),
+                unlocks=tuple(i for i in waiting_on.get(set_flag, ()) if i != r["id"]),
+            ))
+        nodes[r["id"]] = EpisodeNode(
+            id=r["id"],
+            episode_number=r["episode_number"],
+            title=r["title"],
+            slug=r["slug"],
+            situation=r["situation"],
+            character_id=r["character_id"],
+            episode_type=r["episode_type"],
+            sort_order=r["sort_order"],
+            status=r["status"],
+            is_free_chat=r["is_free_chat"],
+            requires_flag=r["requires_flag"],
+            next_id=next_ids.get(r["id"]),
+            previous_id=previous_ids.get(r["id"]),
+            branches=tuple(branches),
+        )
+
+    ordered = sorted(nodes.values(), key=lambda n: (n.sort_order, n.episode_number))
+    return SeriesGraph(
+        series_id=str(series_id),
+        nodes=nodes,
+        ordered=tuple(ordered),
+        by_number=tuple(nodes[a["id"]] for a in active),
+        loaded_at=time.monotonic(),
+    )
+
+
+def _required_flag(success_condition: Optional[str]) -> Optional[str]:
+    condition = parse_condition(success_condition)
+    return condition.value if condition.kind == "flag" and condition.value else None
+
+
+class SeriesGraphCache:
+    """LRU + TTL of series graphs keyed by series id."""
+
+    _instance: Optional["SeriesGraphCache"] = None
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries or int(os.getenv("SERIES_GRAPH_CACHE_SIZE", 256))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("SERIES_GRAPH_TTL_SECONDS", 300))
+        self._graphs: "OrderedDict[str, SeriesGraph]" = OrderedDict()
+        self.hits = 0
+        self.loads = 0
+        self.invalidations = 0
+
+    @classmethod
+    def get_instance(cls) -> "SeriesGraphCache":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    async def get(self, db, series_id: Any) -> SeriesGraph:
+        key = str(series_id)
+        graph = self._graphs.get(key)
+        if graph is not None and time.monotonic() - graph.loaded_at <= self.ttl_seconds:
+            self._graphs.move_to_end(key)
+            self.hits += 1
+            return graph
+
+        rows = await db.fetch_all(_GRAPH_QUERY, {"series_id": key})
+        graph = build_graph(key, rows)
+        self.loads += 1
+        self._graphs[key] = graph
+        self._graphs.move_to_end(key)
+        while len(self._graphs) > self.max_entries:
+            self._graphs.popitem(last=False)
+        return graph
+
+    def invalidate(self, series_id: Any) -> None:
+        if series_id and self._graphs.pop(str(series_id), None) is not None:
+            self.invalidations += 1
+
+    def invalidate_template(self, template_id: Any, series_id: Any = None) -> None:
+        """Drop graphs affected by a template write.
+
+        Covers the template's current series and any cached series it was in
+        before (a template moved to another series, or deleted).
+        """
+        self.invalidate(series_id)
+        for key in [k for k, g in self._graphs.items() if str(template_id) in g.nodes]:
+            self.invalidate(key)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.loads
+        return {
+            "graphs": len(self._graphs),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "loads": self.loads,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+async def get_series_graph(db, series_id: Any) -> SeriesGraph:
+    """Navigation graph for the series (cached)."""
+    return await SeriesGraphCache.get_instance().get(db, series_id)
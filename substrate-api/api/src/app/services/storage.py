@@ -26,7 +26,7 @@ import os
 from typing import Optional
 from uuid import UUID
 
-import httpx
+from app.services.http_pool import POOL_STORAGE, get_http_client
 
 log = logging.getLogger(__name__)
 
@@ -43,7 +43,7 @@ class StorageService:
         if not self.supabase_url or not self.service_role_key:
             log.warning("SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY not set")
 
-        self.client = httpx.AsyncClient(timeout=60.0)
+        self.client = get_http_client(POOL_STORAGE, timeout=60.0)
 
     @classmethod
     def get_instance(cls) -> "StorageService":
@@ -0,0 +1,251 @@
+"""Shared byte-level decoder for LLM provider streams.
+
+All provider clients stream either Server-Sent Events (OpenAI, OpenRouter,
+Anthropic, Gemini alt=sse) or newline-delimited JSON (Ollama). This module
+frames those streams directly from raw bytes (no per-line str decoding),
+pre-filters events by byte markers so irrelevant events (pings, block
+start/stop) are never JSON-parsed, and decodes the rest with orjson when
+installed (stdlib json otherwise).
+
+Extractors pull only the fields we use: the text delta, plus token usage,
+which is collected into a StreamUsage as it streams by (usage normally
+arrives in the final events).
+
+Usage:
+    usage = StreamUsage()
+    async with client.stream("POST", url, json=payload) as response:
+        async for text in iter_deltas(response.aiter_bytes(), SSEDecoder(), extract_openai_delta, usage):
+            ...
+    usage.tokens_output
+
+Benchmark: python -m app.scripts.benchmark_stream_decoder
+"""
+
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
+
+log = logging.getLogger(__name__)
+
+try:
+    import orjson
+
+    json_loads: Callable[[Union[bytes, str]], Any] = orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:
+    json_loads = json.loads  # Accepts bytes (UTF-8) as well
+    JSON_BACKEND = "json"
+
+
+@dataclass
+class StreamUsage:
+    """Token usage reported by a provider during a stream."""
+
+    tokens_input: Optional[int] = None
+    tokens_output: Optional[int] = None
+    model: Optional[str] = None  # Model that served the stream (the hedge, if it won)
+
+
+class SSEDecoder:
+    """Incremental Server-Sent Events decoder over raw bytes.
+
+    feed() returns the data payload of each completed event. Events are split
+    on blank lines in one pass; the common single-line "data: ..." event is
+    sliced without per-line work. Multi-line data fields are joined with
+    newlines; event/id/retry fields and comments are ignored (no provider we
+    use needs them).
+    """
+
+    def __init__(self):
+        self._pending = b""
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        data = self._pending + chunk if self._pending else chunk
+        carry = b""
+        if b"\r" in data:
+            # CRLF framing (Gemini); hold a trailing CR until its LF arrives
+            if data.endswith(b"\r"):
+                data, carry = data[:-1], b"\r"
+            data = data.replace(b"\r\n", b"\n")
+
+        blocks = data.split(b"\n\n")
+        self._pending = blocks.pop() + carry
+        events: List[bytes] = []
+        for block in blocks:
+            if block.startswith(b"data: ") and b"\n" not in block:
+                events.append(block[6:])
+            elif block:
+                payload = self._block_data(block)
+                if payload is not None:
+                    events.append(payload)
+        return events
+
+    def flush(self) -> List[bytes]:
+        """Dispatch whatever is left when the stream ends without a blank line."""
+        block = self._pending.replace(b"\r\n", b"\n").strip(b"\r\n")
+        self._pending = b""
+        payload = self._block_data(block) if block else None
+        return [payload] if payload is not None else []
+
+    @staticmethod
+    def _block_data(block: bytes) -> Optional[bytes]:
+        data = [
+            line[6:] if line[5:6] == b" " else line[5:]
+            for line in block.split(b"\n")
+            if line.startswith(b"data:")
+        ]
+        if not data:
+            return None
+        return data[0] if len(data) == 1 else b"\n".join(data)
+
+
+class NDJSONDecoder:
+    """Incremental newline-delimited JSON framer over raw bytes."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        buffer = self._buffer
+        buffer += chunk
+        last = buffer.rfind(b"\n")
+        if last == -1:
+            return []
+        lines = [line for line in bytes(buffer[:last]).split(b"\n") if line.strip()]
+        del buffer[:last + 1]
+        return lines
+
+    def flush(self) -> List[bytes]:
+        remaining = bytes(self._buffer).strip()
+        self._buffer.clear()
+        return [remaining] if remaining else []
+
+
+# =============================================================================
+# Extractors: (event, usage) -> text delta or None
+# =============================================================================
+
+Extractor = Callable[[Dict[str, Any], Optional[StreamUsage]], Optional[str]]
+
+
+def extract_openai_delta(event: Dict[str, Any], usage: Optional[StreamUsage]) -> Optional[str]:
+    """OpenAI/OpenRouter chat.completion.chunk. Usage arrives in a final chunk
+    (stream_options.include_usage) with empty choices."""
+    if usage is not None and event.get("usage"):
+        usage.tokens_input = event["usage"].get("prompt_tokens")
+        usage.tokens_output = event["usage"].get("completion_tokens")
+    choices = event.get("choices")
+    if choices:
+        return (choices[0].get("delta") or {}).get("content")
+    return None
+
+
+def make_anthropic_extractor(delta_field: str = "text") -> Extractor:
+    """Anthropic messages stream; delta_field is "text" or "partial_json" (tool input)."""
+
+    def extract(event: Dict[str, Any], usage: Optional[StreamUsage]) -> Optional[str]:
+        event_type = event.get("type")
+        if event_type == "content_block_delta":
+            return event["delta"].get(delta_field)
+        if usage is not None:
+            if event_type == "message_start":
+                usage.tokens_input = event.get("message", {}).get("usage", {}).get("input_tokens")
+            elif event_type == "message_delta":
+                usage.tokens_output = event.get("usage", {}).get("output_tokens")
+        return None
+
+    return extract
+
+
+# Only these Anthropic events carry text or usage; pings and block start/stop are skipped unparsed
+ANTHROPIC_MARKERS = (b'"content_block_delta"', b'"message_start"', b'"message_delta"')
+
+
+def extract_gemini_delta(event: Dict[str, Any], usage: Optional[StreamUsage]) -> Optional[str]:
+    """Gemini streamGenerateContent chunk. usageMetadata is cumulative; the last one wins."""
+    if usage is not None and "usageMetadata" in event:
+        usage.tokens_input = event["usageMetadata"].get("promptTokenCount")
+        usage.tokens_output = event["usageMetadata"].get("candidatesTokenCount")
+    candidates = event.get("candidates")
+    if not candidates:
+        return None
+    parts = candidates[0].get("content", {}).get("parts")
+    if not parts:
+        return None
+    if len(parts) == 1:
+        return parts[0].get("text")
+    return "".join(part.get("text", "") for part in parts if not part.get("thought"))
+
+
+def extract_ollama_delta(event: Dict[str, Any], usage: Optional[StreamUsage]) -> Optional[str]:
+    """Ollama /api/chat NDJSON line. Counts arrive on the final (done) line."""
+    if usage is not None and event.get("done"):
+        usage.tokens_input = event.get("prompt_eval_count")
+        usage.tokens_output = event.get("eval_count")
+    return event.get("message", {}).get("content")
+
+
+# =============================================================================
+# Stream driver
+# =============================================================================
+
+async def iter_deltas(
+    chunks: AsyncIterator[bytes],
+    decoder: Union[SSEDecoder, NDJSONDecoder],
+    extract: Extractor,
+    usage: Optional[StreamUsage] = None,
+    markers: Optional[Tuple[bytes, ...]] = None,
+) -> AsyncIterator[str]:
+    """Decode a raw byte stream into text deltas.
+
+    Args:
+        chunks: Raw bytes (e.g. httpx Response.aiter_bytes())
+        decoder: SSEDecoder or NDJSONDecoder
+        extract: Provider extractor
+        usage: Filled in with token usage as it streams by
+        markers: If set, payloads containing none of these bytes are skipped unparsed
+    """
+    async for chunk in chunks:
+        payloads = decoder.feed(chunk)
+        if not payloads:
+            continue
+        text, done = _decode_all(payloads, extract, usage, markers)
+        if text:
+            yield text
+        if done:
+            return
+
+    text, _ = _decode_all(decoder.flush(), extract, usage, markers)
+    if text:
+        yield text
+
+
+def _decode_all(
+    payloads: List[bytes],
+    extract: Extractor,
+    usage: Optional[StreamUsage],
+    markers: Optional[Tuple[bytes, ...]],
+) -> Tuple[str, bool]:
+    """Decode the payloads from one network read into (combined text, done).
+
+    Deltas that arrive in the same network read are yielded together, which
+    saves an await per token without delaying anything. done is True at the
+    [DONE] sentinel.
+    """
+    texts = []
+    for payload in payloads:
+        if payload == b"[DONE]":
+            return "".join(texts), True
+        if markers is not None and not any(marker in payload for marker in markers):
+            continue
+        try:
+            event = json_loads(payload)
+        except ValueError:  # json.JSONDecodeError and orjson.JSONDecodeError
+            log.debug(f"Skipping undecodable stream event: {payload[:200]!r}")
+            continue
+        if isinstance(event, dict):
+            text = extract(event, usage)
+            if text:
+                texts.append(text)
+    return "".join(texts), False
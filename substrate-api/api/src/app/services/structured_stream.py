@@ -0,0 +1,216 @@
+"""Incremental parsing of streamed structured character responses.
+
+Structured output (CHARACTER_RESPONSE_SCHEMA) arrives as a JSON object spread
+over many stream chunks. Instead of waiting for the whole object, the parser
+decodes top-level string fields (action, dialogue) as their characters arrive,
+and the renderer turns those deltas into display text with the same shape as
+render_structured_response(): *action* "dialogue". Non-streamed fields (mood,
+tension_shift) are available once the object is complete.
+
+Usage:
+    renderer = StructuredResponseRenderer()
+    for chunk in stream:
+        text = renderer.feed(chunk)
+        if text:
+            yield text
+    structured = renderer.parser.result()
+"""
+
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+# JSON escape sequences (other than \uXXXX)
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+# (field, delta) for decoded text; (field, None) when the field's string closes
+FieldEvent = Tuple[str, Optional[str]]
+
+
+class _End:
+    """Sentinel for the closing quote of a string."""
+
+
+_END = _End()
+
+
+def _is_hex(value: str) -> bool:
+    try:
+        int(value, 16)
+        return True
+    except ValueError:
+        return False
+
+
+@dataclass
+class StructuredStreamEvent:
+    """Event from LLMService.generate_structured_stream().
+
+    type:
+    - "chunk": content is display text to append
+    - "complete": structured is the full parsed response, content the
+      canonical render_structured_response() text
+    """
+
+    type: str
+    content: str = ""
+    structured: Optional[Dict[str, Any]] = None
+
+
+class IncrementalJSONObjectParser:
+    """Incremental parser for a JSON object streamed in arbitrary chunks.
+
+    Emits decoded text for top-level string fields listed in stream_fields
+    as soon as it arrives. Anything before the opening brace (e.g. a ```json
+    fence) is ignored; nested values are skipped and left to result().
+    """
+
+    def __init__(self, stream_fields: Iterable[str]):
+        self.stream_fields = set(stream_fields)
+        self._buffer: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._unicode: Optional[str] = None  # Hex digits of a pending \uXXXX
+        self._high_surrogate: Optional[int] = None
+        self._expect_key = False
+        self._string_is_key = False
+        self._key_chars: List[str] = []
+        self._key: Optional[str] = None
+        self._streaming_field: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        """Raw text received so far."""
+        return "".join(self._buffer)
+
+    def feed(self, chunk: str) -> List[FieldEvent]:
+        """Consume a chunk; return decoded deltas for streamed fields."""
+        self._buffer.append(chunk)
+        events: List[FieldEvent] = []
+        delta: List[str] = []
+
+        for char in chunk:
+            if self._in_string:
+                decoded = self._string_char(char)
+                if decoded is None:
+                    continue
+                if decoded is _END:
+                    if self._streaming_field:
+                        if delta:
+                            events.append((self._streaming_field, "".join(delta)))
+                            delta = []
+                        events.append((self._streaming_field, None))
+                        self._streaming_field = None
+                    elif self._string_is_key:
+                        self._key = "".join(self._key_chars)
+                        self._key_chars = []
+                        self._expect_key = False
+                    continue
+                if self._streaming_field:
+                    delta.append(decoded)
+                elif self._string_is_key:
+                    self._key_chars.append(decoded)
+                continue
+
+            if char == '"':
+                if self._depth == 0:
+                    continue
+                self._in_string = True
+                self._string_is_key = self._depth == 1 and self._expect_key
+                if self._depth == 1 and not self._expect_key and self._key in self.stream_fields:
+                    self._streaming_field = self._key
+            elif char in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    self._expect_key = char == "{"
+            elif char in "}]":
+                self._depth = max(0, self._depth - 1)
+            elif char == "," and self._depth == 1:
+                self._expect_key = True
+                self._key = None
+
+        if delta and self._streaming_field:
+            events.append((self._streaming_field, "".join(delta)))
+        return events
+
+    def _string_char(self, char: str):
+        """Decode one character inside a string. Returns text, None (nothing yet) or _END."""
+        if self._unicode is not None:
+            self._unicode += char
+            if len(self._unicode) < 4:
+                return None
+            code = int(self._unicode, 16) if _is_hex(self._unicode) else 0xFFFD
+            self._unicode = None
+            if 0xD800 <= code <= 0xDBFF:
+                self._high_surrogate = code
+                return None
+            if 0xDC00 <= code <= 0xDFFF and self._high_surrogate is not None:
+                code = 0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)
+            self._high_surrogate = None
+            return chr(code)
+
+        if self._escape:
+            self._escape = False
+            if char == "u":
+                self._unicode = ""
+                return None
+            return _ESCAPES.get(char, char)
+
+        if char == "\\":
+            self._escape = True
+            return None
+        if char == '"':
+            self._in_string = False
+            return _END
+        return char
+
+    def result(self) -> Dict[str, Any]:
+        """Parse the complete object. Raises json.JSONDecodeError if malformed."""
+        text = self.text
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end < start:
+            raise json.JSONDecodeError("No JSON object in stream", text, 0)
+        return json.loads(text[start:end + 1])
+
+
+class StructuredResponseRenderer:
+    """Turns streamed action/dialogue deltas into display text.
+
+    Mirrors render_structured_response(): action wrapped in *asterisks*,
+    dialogue in quotes, joined by a space. Fields are rendered in arrival
+    order, so schemas used for streaming should list action before dialogue.
+    """
+
+    STREAM_FIELDS = ("action", "dialogue")
+    _WRAP = {"action": ("*", "*"), "dialogue": ('"', '"')}
+
+    def __init__(self):
+        self.parser = IncrementalJSONObjectParser(self.STREAM_FIELDS)
+        self._open: Optional[str] = None
+        self._emitted = False
+
+    @property
+    def emitted(self) -> bool:
+        """Whether any display text has been produced."""
+        return self._emitted
+
+    def feed(self, chunk: str) -> str:
+        """Consume a raw stream chunk; return display text to append ('' if none)."""
+        out: List[str] = []
+        for field, delta in self.parser.feed(chunk):
+            opening, closing = self._WRAP[field]
+            if delta is None:
+                if self._open == field:
+                    out.append(closing)
+                    self._open = None
+                continue
+            if self._open != field:
+                out.append((" " if self._emitted else "") + opening)
+                self._open = field
+                self._emitted = True
+            out.append(delta)
+        return "".join(out)
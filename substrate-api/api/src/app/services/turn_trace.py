@@ -0,0 +1,191 @@
+"""Per-turn latency traces for send_message_stream.
+
+A TurnTrace records where one chat turn spent its time as a flat list of
+spans, each an offset and duration in ms from the start of the turn:
+
+    trace = TurnTrace.start(session_id=..., debug=debug_timing)
+    with trace.span("context"):
+        context = await self.get_context(...)
+    stop = trace.timer("objective")          # same, for blocks too long to indent
+    ...
+    stop()
+    trace.mark("ttft")                       # point in time, no duration
+    ...
+    with trace.span("director", phase="background"):
+        await self.director_service.process_exchange(...)
+    await trace.save(db)                     # once the background phase ends
+
+Inline spans cover the request up to the last SSE event; background spans
+cover Director Phase 2 (which finishes after the stream closes). Sampled
+turns are written to turn_traces (migration 076). When an admin sends the
+X-Debug-Timing header the inline spans are also returned at the end of the
+stream as a "server_timing" event with a Server-Timing style string, since
+HTTP headers can't be added once streaming has started. The header does not
+affect sampling: a debug turn is persisted only if it was sampled anyway.
+
+Turns that are neither sampled nor debugged get a no-op trace.
+
+Environment variables:
+- TURN_TRACE_SAMPLE_RATE: Fraction of turns written to turn_traces (default: 0.05)
+"""
+
+import json
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+SAMPLE_RATE = float(os.getenv("TURN_TRACE_SAMPLE_RATE", 0.05))
+
+# Request header that asks for the server_timing trailer event (admins only)
+DEBUG_HEADER = "X-Debug-Timing"
+
+INLINE = "inline"
+BACKGROUND = "background"
+
+
+def _noop() -> None:
+    pass
+
+
+@dataclass
+class Span:
+    """One timed phase of a turn (offsets relative to the turn start)."""
+
+    name: str
+    start_ms: float
+    duration_ms: Optional[float]  # None for marks
+    phase: str = INLINE
+
+    def to_list(self) -> List[Any]:
+        return [self.name, round(self.start_ms, 1), None if self.duration_ms is None else round(self.duration_ms, 1)]
+
+
+@dataclass
+class TurnTrace:
+    """Spans for one chat turn."""
+
+    session_id: Optional[str] = None
+    sampled: bool = False
+    debug: bool = False
+    spans: List[Span] = field(default_factory=list)
+    meta: Dict[str, Any] = field(default_factory=dict)
+    started: float = field(default_factory=time.perf_counter)
+
+    @classmethod
+    def start(cls, session_id: Any = None, debug: bool = False, sample_rate: float = SAMPLE_RATE) -> "TurnTrace":
+        sampled = random.random() < sample_rate
+        return cls(session_id=str(session_id) if session_id else None, sampled=sampled, debug=debug)
+
+    @property
+    def enabled(self) -> bool:
+        return self.sampled or self.debug
+
+    def _offset_ms(self, at: Optional[float] = None) -> float:
+        return ((at if at is not None else time.perf_counter()) - self.started) * 1000
+
+    def span(self, name: str, phase: str = INLINE):
+        """Context manager timing the enclosed block."""
+        if not self.enabled:
+            return nullcontext()
+        return self._span(name, phase)
+
+    @contextmanager
+    def _span(self, name: str, phase: str):
+        stop = self.timer(name, phase)
+        try:
+            yield
+        finally:
+            stop()
+
+    def timer(self, name: str, phase: str = INLINE) -> Callable[[], None]:
+        """Start a span; call the returned function to end it."""
+        if not self.enabled:
+            return _noop
+        began = time.perf_counter()
+
+        def stop() -> None:
+            self.spans.append(Span(name, self._offset_ms(began), (time.perf_counter() - began) * 1000, phase))
+
+        return stop
+
+    def mark(self, name: str, phase: str = INLINE) -> None:
+        """Record a point in time (e.g. first token)."""
+        if self.enabled:
+            self.spans.append(Span(name, self._offset_ms(), None, phase))
+
+    def phase_spans(self, phase: str) -> List[Span]:
+        return [s for s in self.spans if s.phase == phase]
+
+    def phase_end_ms(self, phase: str) -> float:
+        return max(
+            (s.start_ms + (s.duration_ms or 0) for s in self.phase_spans(phase)),
+            default=0.0,
+        )
+
+    def phase_ms(self, phase: str) -> Optional[float]:
+        """Wall time from the phase's first span start to its last span end."""
+        spans = self.phase_spans(phase)
+        if not spans:
+            return None
+        return self.phase_end_ms(phase) - min(s.start_ms for s in spans)
+
+    def server_timing(self) -> str:
+        """Inline spans as a Server-Timing header value."""
+        entries = []
+        for s in self.phase_spans(INLINE):
+            if s.duration_ms is None:
+                entries.append(f"{s.name};dur={s.start_ms:.1f};desc=\"at\"")
+            else:
+                entries.append(f"{s.name};dur={s.duration_ms:.1f}")
+        entries.append(f"total;dur={self.phase_end_ms(INLINE):.1f}")
+        return ", ".join(entries)
+
+    def trailer_event(self) -> Dict[str, Any]:
+        """SSE event sent at the end of the stream for debug requests."""
+        return {
+            "type": "server_timing",
+            "server_timing": self.server_timing(),
+            "spans": [s.to_list() for s in self.phase_spans(INLINE)],
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "inline": [s.to_list() for s in self.phase_spans(INLINE)],
+            "background": [s.to_list() for s in self.phase_spans(BACKGROUND)],
+        }
+
+    async def save(self, db) -> None:
+        """Write a sampled trace to turn_traces (no-op otherwise)."""
+        if not self.sampled:
+            return
+        ttft = next((s for s in self.spans if s.name == "ttft"), None)
+        background_ms = self.phase_ms(BACKGROUND)
+        try:
+            await db.execute(
+                """
+                INSERT INTO turn_traces (
+                    session_id, turn, inline_ms, ttft_ms, background_ms, spans, meta
+                )
+                VALUES (
+                    CAST(:session_id AS uuid), :turn, :inline_ms, :ttft_ms, :background_ms,
+                    CAST(:spans AS jsonb), CAST(:meta AS jsonb)
+                )
+                """,
+                {
+                    "session_id": self.session_id,
+                    "turn": self.meta.get("turn"),
+                    "inline_ms": round(self.phase_end_ms(INLINE), 1),
+                    "ttft_ms": round(ttft.start_ms, 1) if ttft else None,
+                    "background_ms": round(background_ms, 1) if background_ms is not None else None,
+                    "spans": json.dumps(self.to_dict()),
+                    "meta": json.dumps(self.meta, default=str),
+                },
+            )
+        except Exception as e:
+            log.warning(f"Saving turn trace for session {self.session_id} failed: {e}")
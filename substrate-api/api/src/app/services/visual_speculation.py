@@ -0,0 +1,215 @@
+"""Speculative pre-generation of Director visuals.
+
+Director visuals fire at deterministic turn positions (25/50/75% of
+turn_budget for cinematic episodes, see
+DirectorService._should_generate_visual_deterministic). Generating only after
+the trigger turn's background evaluation means the image shows up long after
+the reply. Since the trigger turn is known in advance, the exchange before it
+starts writing the prompt and synthesizing the image from the current
+context, and the result is held here in memory:
+
+    turn N-1 background: Director reports next_visual_trigger
+                         -> start(session_id, N, prepare)
+    turn N background:   visual triggered -> take(session_id, N, "character")
+                         -> save (scene_images insert, generations_used + 1)
+                         not triggered   -> discard(session_id)
+
+Nothing is saved or charged until the trigger turn commits it. A held image
+that is not taken within the TTL, or whose session moves past its target
+turn, is dropped; the image call it made is the cost of a wrong guess.
+Speculations are per process: if turn N lands on another worker the
+visual is generated the usual way.
+
+Environment variables:
+- SPECULATIVE_VISUALS_ENABLED: Pre-generate visuals one turn early (default: true)
+- SPECULATIVE_VISUAL_TTL_SECONDS: How long a held visual stays usable (default: 900)
+- SPECULATIVE_VISUAL_MAX_PENDING: Max held visuals per process, oldest dropped first (default: 200)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.services.scene import PreparedVisual
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class SpeculativeVisualConfig:
+    """Speculative visual settings."""
+
+    enabled: bool = True
+    ttl_seconds: float = 900.0
+    max_pending: int = 200
+
+    @classmethod
+    def from_env(cls) -> "SpeculativeVisualConfig":
+        return cls(
+            enabled=os.getenv("SPECULATIVE_VISUALS_ENABLED", "true").lower() in ("1", "true", "yes"),
+            ttl_seconds=float(os.getenv("SPECULATIVE_VISUAL_TTL_SECONDS", 900)),
+            max_pending=int(os.getenv("SPECULATIVE_VISUAL_MAX_PENDING", 200)),
+        )
+
+
+@dataclass
+class Speculation:
+    """A visual being generated (or already generated) for a future turn."""
+
+    session_id: str
+    target_turn: int
+    visual_type: str
+    task: "asyncio.Task[Optional[PreparedVisual]]"
+    started_at: float
+
+    def expired(self, ttl_seconds: float) -> bool:
+        return time.monotonic() - self.started_at > ttl_seconds
+
+
+class SpeculativeVisuals:
+    """In-process store of speculative Director visuals, one per session."""
+
+    _instance: Optional["SpeculativeVisuals"] = None
+
+    def __init__(self, config: Optional[SpeculativeVisualConfig] = None):
+        self.config = config or SpeculativeVisualConfig.from_env()
+        self._pending: "OrderedDict[str, Speculation]" = OrderedDict()
+        self.started = 0
+        self.committed = 0
+        self.committed_ready = 0
+        self.discarded = 0
+        self.expired = 0
+        self.failed = 0
+        self.misses = 0
+        self.wait_ms_total = 0.0
+
+    @classmethod
+    def get_instance(cls) -> "SpeculativeVisuals":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.enabled
+
+    def start(
+        self,
+        session_id: Any,
+        target_turn: int,
+        visual_type: str,
+        prepare: Callable[[], Awaitable[Optional[PreparedVisual]]],
+    ) -> bool:
+        """Begin generating the visual for target_turn in the background.
+
+        Returns False if disabled or a speculation for that turn already exists.
+        """
+        if not self.config.enabled:
+            return False
+
+        key = str(session_id)
+        existing = self._pending.get(key)
+        if existing and existing.target_turn == target_turn and not existing.expired(self.config.ttl_seconds):
+            return False
+        if existing:
+            self._drop(key, "superseded")
+
+        self._sweep()
+        while len(self._pending) >= self.config.max_pending:
+            oldest = next(iter(self._pending))
+            self._drop(oldest, "evicted")
+
+        self._pending[key] = Speculation(
+            session_id=key,
+            target_turn=target_turn,
+            visual_type=visual_type,
+            task=asyncio.create_task(prepare()),
+            started_at=time.monotonic(),
+        )
+        self.started += 1
+        log.info(f"Speculative {visual_type} visual started for session {key} turn {target_turn}")
+        return True
+
+    async def take(self, session_id: Any, turn: int, visual_type: str) -> Optional[PreparedVisual]:
+        """Claim the visual prepared for this turn, waiting if it is still rendering.
+
+        Returns None (and drops any stale speculation) if there is nothing
+        usable; the caller then generates the visual the usual way.
+        """
+        key = str(session_id)
+        speculation = self._pending.pop(key, None)
+        if speculation is None:
+            self.misses += 1
+            return None
+
+        if speculation.target_turn != turn or speculation.visual_type != visual_type:
+            self._cancel(speculation, f"target turn {speculation.target_turn}/{speculation.visual_type}, landed {turn}/{visual_type}")
+            self.misses += 1
+            return None
+        if speculation.expired(self.config.ttl_seconds):
+            self._cancel(speculation, "expired")
+            self.expired += 1
+            return None
+
+        ready = speculation.task.done()
+        wait_start = time.perf_counter()
+        try:
+            prepared = await speculation.task
+        except Exception as e:
+            log.warning(f"Speculative visual for session {key} failed: {e}")
+            prepared = None
+        if prepared is None:
+            self.failed += 1
+            return None
+
+        self.committed += 1
+        if ready:
+            self.committed_ready += 1
+        self.wait_ms_total += (time.perf_counter() - wait_start) * 1000
+        log.info(f"Speculative visual committed for session {key} turn {turn} (ready={ready})")
+        return prepared
+
+    def discard(self, session_id: Any) -> None:
+        """Drop the session's speculation (trigger turn did not fire)."""
+        key = str(session_id)
+        if key in self._pending:
+            self._drop(key, "not triggered")
+            self.discarded += 1
+
+    def _sweep(self) -> None:
+        for key in [k for k, s in self._pending.items() if s.expired(self.config.ttl_seconds)]:
+            self._drop(key, "expired")
+            self.expired += 1
+
+    def _drop(self, key: str, reason: str) -> None:
+        speculation = self._pending.pop(key, None)
+        if speculation:
+            self._cancel(speculation, reason)
+
+    def _cancel(self, speculation: Speculation, reason: str) -> None:
+        if not speculation.task.done():
+            speculation.task.cancel()
+        log.debug(
+            f"Speculative visual for session {speculation.session_id} "
+            f"turn {speculation.target_turn} dropped: {reason}"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        resolved = self.committed + self.discarded + self.expired + self.failed + self.misses
+        return {
+            "enabled": self.config.enabled,
+            "pending": len(self._pending),
+            "started": self.started,
+            "committed": self.committed,
+            "committed_ready": self.committed_ready,
+            "discarded": self.discarded,
+            "expired": self.expired,
+            "failed": self.failed,
+            "misses": self.misses,
+            "hit_rate": round(self.committed / resolved, 4) if resolved else 0.0,
+            "avg_wait_ms": round(self.wait_ms_total / self.committed, 1) if self.committed else 0.0,
+        }
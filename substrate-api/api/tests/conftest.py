@@ -0,0 +1,6 @@
+import os
+import sys
+
+tests_dir = os.path.dirname(__file__)
+# Import the app from api/src, as `make test` does with PYTHONPATH=src
+sys.path.insert(0, os.path.join(tests_dir, "../src"))
@@ -0,0 +1,105 @@
+"""DirectorGuidance.to_prompt_section() against the per-turn renderer it replaced.
+
+Doctrine sections are pre-rendered (guidance_sections); the prompt the
+character LLM sees must stay byte-identical to what the legacy renderer
+produced for every input combination it branches on.
+"""
+
+import itertools
+from typing import List, Optional
+
+import pytest
+
+from app.services.director import (
+    GENRE_DOCTRINES,
+    PACING_PHASES,
+    BeatDirective,
+    DirectorGuidance,
+)
+
+
+def legacy(guidance: DirectorGuidance) -> str:
+    """The renderer to_prompt_section() used before sections were pre-rendered."""
+    doctrine = GENRE_DOCTRINES.get(guidance.genre, GENRE_DOCTRINES["romantic_tension"])
+
+    lines = [
+        "═══════════════════════════════════════════════════════════════",
+        f"DIRECTOR: {doctrine['name']}",
+        "═══════════════════════════════════════════════════════════════",
+    ]
+
+    if guidance.physical_anchor:
+        lines.append("")
+        lines.append(f"Ground in: {guidance.physical_anchor}")
+
+    lines.append("")
+    lines.append(f"Pacing: {guidance.pacing.upper()}")
+
+    energy_desc = doctrine["energy_descriptions"].get(
+        guidance.energy_level,
+        doctrine["energy_descriptions"].get("playful", "")
+    )
+    if energy_desc:
+        lines.append(f"Energy: {energy_desc}")
+
+    if guidance.beat_directive:
+        urgency_labels = {
+            "suggested": "OPPORTUNITY",
+            "required": "THIS TURN",
+            "overdue": "MUST HAPPEN NOW",
+        }
+        urgency_label = urgency_labels.get(guidance.beat_directive.urgency, "OPPORTUNITY")
+
+        lines.append("")
+        lines.append("─────────────────────────────────────────────────────────────────")
+        lines.append(f"BEAT [{urgency_label}]: {guidance.beat_directive.instruction}")
+        lines.append("─────────────────────────────────────────────────────────────────")
+        if guidance.beat_directive.context:
+            lines.append(guidance.beat_directive.context)
+        lines.append("")
+        lines.append("Work this into your response naturally. Don't force it—find the organic moment.")
+
+    lines.append("")
+    lines.append(f"Remember: {doctrine['closing']}")
+
+    return "\n".join(lines)
+
+
+def all_guidance() -> List[DirectorGuidance]:
+    """Every doctrine input combination the renderer branches on.
+
+    Every genre, pacing phase and energy level (plus unknown genre/energy
+    fallbacks), with and without a physical anchor, and every beat directive
+    urgency with and without context.
+    """
+    beats: List[Optional[BeatDirective]] = [None]
+    for urgency in ("suggested", "required", "overdue", "unknown"):
+        for context in ("", "This beat was due by turn 5. Deliver it now."):
+            beats.append(BeatDirective(beat_id="b1", instruction="Ask about the salary.", urgency=urgency, context=context))
+
+    cases = []
+    for genre, doctrine in list(GENRE_DOCTRINES.items()) + [("no_such_genre", GENRE_DOCTRINES["romantic_tension"])]:
+        energies = list(doctrine["energy_descriptions"]) + ["no_such_energy"]
+        for pacing, energy, anchor, beat in itertools.product(
+            PACING_PHASES, energies, (None, "The rooftop bar, rain on the glass"), beats
+        ):
+            cases.append(DirectorGuidance(
+                pacing=pacing, physical_anchor=anchor, genre=genre, energy_level=energy, beat_directive=beat,
+            ))
+    return cases
+
+
+CASES = all_guidance()
+
+
+def test_covers_every_combination():
+    genres = len(GENRE_DOCTRINES) + 1
+    assert len({c.genre for c in CASES}) == genres
+    assert {c.pacing for c in CASES} == set(PACING_PHASES)
+    assert len(CASES) > 1000
+
+
+@pytest.mark.parametrize("genre", list(GENRE_DOCTRINES) + ["no_such_genre"])
+def test_prompt_section_byte_identical_to_legacy(genre):
+    for guidance in (c for c in CASES if c.genre == genre):
+        assert guidance.to_prompt_section().encode() == legacy(guidance).encode(), guidance
@@ -0,0 +1,165 @@
+"""Condition language of episode plans: parse_condition / evaluate / resolve."""
+
+import logging
+
+import pytest
+
+from app.services.episode_plan import (
+    ConditionFacts,
+    _parse_condition,
+    evaluate_condition,
+    parse_condition,
+    resolve_condition,
+)
+
+
+def facts(turn_count=1, flags=None, response="", turn_budget=None, failure=False):
+    return ConditionFacts(
+        turn_count=turn_count,
+        turn_budget=turn_budget,
+        flags=flags or {},
+        response=response,
+        failure=failure,
+    )
+
+
+class Judge:
+    """Semantic judge stub that records the criteria it was asked about."""
+
+    def __init__(self, verdict=True):
+        self.verdict = verdict
+        self.calls = []
+
+    async def __call__(self, criteria):
+        self.calls.append(criteria)
+        return self.verdict
+
+
+# =============================================================================
+# Parsing
+# =============================================================================
+
+
+def test_single_terms():
+    assert parse_condition("flag:file_read").kind == "flag"
+    assert parse_condition("flag:file_read").value == "file_read"
+    assert parse_condition("turn:5").turn == 5
+    assert parse_condition("turn_budget_exceeded").kind == "turn_budget_exceeded"
+    assert parse_condition("semantic:user apologizes and leaves").has_semantic
+    assert parse_condition("").kind == "none"
+    assert parse_condition(None).kind == "none"
+
+
+def test_and_binds_tighter_than_or():
+    condition = parse_condition("flag:a AND flag:b OR turn:3")
+    assert condition.kind == "any"
+    kinds = sorted(t.kind for t in condition.terms)
+    assert kinds == ["all", "turn"]
+    conjunction = next(t for t in condition.terms if t.kind == "all")
+    assert [t.value for t in conjunction.terms] == ["a", "b"]
+
+
+def test_semantic_terms_are_ordered_last():
+    condition = parse_condition("semantic:admits reading the file OR flag:file_read")
+    assert [t.kind for t in condition.terms] == ["flag", "semantic"]
+    assert condition.has_semantic
+
+
+def test_non_term_parts_keep_criteria_whole():
+    condition = parse_condition("semantic:she says yes OR no")
+    assert condition.kind == "semantic"
+    assert condition.value == "she says yes OR no"
+
+
+def test_keywords_are_trimmed_and_lowered_at_parse_time():
+    condition = parse_condition("keyword: Salary , MONEY,,")
+    assert condition.keywords == ("salary", "money")
+
+
+@pytest.mark.parametrize("raw", [
+    "flag:a AND",
+    "flag:a OR",
+    "flag:a and flag:b",
+    "flag:a or flag:b",
+    "turn:3 and flag:b",
+])
+def test_stray_operator_is_unknown_and_logged(raw, caplog):
+    _parse_condition.cache_clear()  # the warning is logged when a string is first parsed
+    with caplog.at_level(logging.WARNING, logger="app.services.episode_plan"):
+        condition = parse_condition(raw)
+    assert condition.kind == "unknown"
+    assert not evaluate_condition(condition, facts(flags={"a": True, "b": True, "a AND": True}))
+    assert any("Malformed episode condition" in r.message for r in caplog.records)
+
+
+def test_lowercase_operator_inside_a_group_never_completes():
+    condition = parse_condition("flag:a AND flag:b or flag:c")
+    assert condition.kind == "all"
+    assert "unknown" in [t.kind for t in condition.terms]
+    assert evaluate_condition(condition, facts(flags={"a": True, "b": True, "c": True})) is False
+
+
+# =============================================================================
+# Evaluation
+# =============================================================================
+
+
+def test_precedence_when_evaluating():
+    condition = parse_condition("flag:a AND flag:b OR turn:3")
+    assert evaluate_condition(condition, facts(turn_count=1, flags={"a": True})) is False
+    assert evaluate_condition(condition, facts(turn_count=1, flags={"a": True, "b": True})) is True
+    assert evaluate_condition(condition, facts(turn_count=3)) is True
+
+
+def test_failure_turn_means_past_the_turn():
+    condition = parse_condition("turn:3")
+    assert evaluate_condition(condition, facts(turn_count=3)) is True
+    assert evaluate_condition(condition, facts(turn_count=3, failure=True)) is False
+    assert evaluate_condition(condition, facts(turn_count=4, failure=True)) is True
+
+
+def test_keyword_match_is_case_insensitive():
+    condition = parse_condition("keyword:Salary, money")
+    assert evaluate_condition(condition, facts(response="Let's talk MONEY.")) is True
+    assert evaluate_condition(condition, facts(response="Let's talk shop.")) is False
+
+
+def test_semantic_term_is_undecided_without_a_judge():
+    condition = parse_condition("flag:a AND semantic:she admits it")
+    assert evaluate_condition(condition, facts(flags={"a": True})) is None
+    assert evaluate_condition(condition, facts()) is False
+
+
+# =============================================================================
+# Lazy semantic resolution
+# =============================================================================
+
+
+async def test_decided_without_judging_when_a_flag_settles_it():
+    judge = Judge()
+    condition = parse_condition("semantic:she admits it OR flag:file_read")
+    assert await resolve_condition(condition, facts(flags={"file_read": True}), judge) is True
+    assert judge.calls == []
+
+
+async def test_and_short_circuits_before_the_judge():
+    judge = Judge()
+    condition = parse_condition("semantic:she admits it AND flag:file_read")
+    assert await resolve_condition(condition, facts(), judge) is False
+    assert judge.calls == []
+
+
+async def test_at_most_one_judge_call_per_criteria():
+    judge = Judge(verdict=False)
+    condition = parse_condition(
+        "semantic:she admits it AND flag:a OR semantic:she admits it AND turn:2 OR semantic:she admits it"
+    )
+    assert await resolve_condition(condition, facts(turn_count=2, flags={"a": True}), judge) is False
+    assert judge.calls == ["she admits it"]
+
+
+async def test_judge_decides_when_needed():
+    judge = Judge(verdict=True)
+    condition = parse_condition("flag:a AND semantic:she admits it")
+    assert await resolve_condition(condition, facts(flags={"a": True}), judge) is True
+    assert judge.calls == ["she admits it"]
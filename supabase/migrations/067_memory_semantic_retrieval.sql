@@ -0,0 +1,28 @@
+-- Migration: 067_memory_semantic_retrieval.sql
+-- Semantic memory retrieval
+--
+-- Memories are now embedded on save (app/services/memory_index.py) and
+-- ranked by similarity to the current user message, blended with importance
+-- and recency. The embedding column has existed since 005 but was never
+-- populated.
+
+-- Which embedder produced each vector. Vectors from different embedders
+-- (hashing vs provider models) are not comparable, so searches filter on it.
+ALTER TABLE memory_events
+ADD COLUMN IF NOT EXISTS embedding_model TEXT;
+
+COMMENT ON COLUMN memory_events.embedding_model IS 'Embedder that produced embedding (e.g. hashing-v1-1536, text-embedding-3-small). Only vectors from the active embedder are searched.';
+
+-- The 005 ivfflat index was built on an empty column, so its lists are
+-- meaningless. Retrieval is always scoped to one user's series, which is
+-- small; an exact scan of that scope via the btree below is both faster and
+-- exact. No global ANN index: with one, the planner may walk it ordered by
+-- distance and filter by scope afterwards, returning few or no candidates
+-- for a scoped query.
+DROP INDEX IF EXISTS idx_memory_embedding;
+DROP INDEX IF EXISTS idx_memory_embedding_hnsw;
+
+-- Candidate lookup for semantic ranking: active, embedded memories in a series scope
+CREATE INDEX IF NOT EXISTS idx_memory_events_semantic_scope
+ON memory_events (user_id, series_id, embedding_model)
+WHERE is_active = TRUE AND embedding IS NOT NULL;
@@ -0,0 +1,20 @@
+-- Migration: 068_memory_consolidation.sql
+-- Memory consolidation (app/services/memory_consolidation.py)
+--
+-- Near-duplicate memories in a (user, series) scope are periodically merged
+-- into one row. Originals are deactivated and point at the merged row; they
+-- are only purged when a retention window is configured.
+
+ALTER TABLE memory_events
+ADD COLUMN IF NOT EXISTS merged_into UUID REFERENCES memory_events(id) ON DELETE SET NULL;
+
+ALTER TABLE memory_events
+ADD COLUMN IF NOT EXISTS consolidated_at TIMESTAMPTZ;
+
+COMMENT ON COLUMN memory_events.merged_into IS 'Memory this row was merged into by consolidation (row is then inactive).';
+COMMENT ON COLUMN memory_events.consolidated_at IS 'When this row was merged away; merged rows are purged after MEMORY_CONSOLIDATION_PURGE_DAYS, if set.';
+
+-- Opt-in purge scan: merged originals by age
+CREATE INDEX IF NOT EXISTS idx_memory_events_merged
+ON memory_events (consolidated_at)
+WHERE merged_into IS NOT NULL;
@@ -0,0 +1,176 @@
+-- Migration: 069_memory_working_sets.sql
+-- Precomputed memory working set per (user, series)
+--
+-- get_relevant_memories ranks memories with ROW_NUMBER() OVER (PARTITION BY
+-- type ...) on every chat turn (and again in Director process_exchange),
+-- scanning every active memory in the scope. This maintains, per scope, the
+-- small set of memories that can ever appear in that ranking, so reads
+-- become one primary-key lookup plus a window over a few dozen rows.
+--
+-- The ranking per type is: created in the last 7 days first, then
+-- importance_score DESC, created_at DESC; top 3 per type. Because "recent"
+-- depends on read time, the working set stores per type:
+--   - every memory created in the last 7 days, and
+--   - the top (3 + number of those recent memories) by importance_score, created_at
+-- Memories only ever leave the 7-day window between refreshes, so whatever
+-- the read time, the true top 3 per type is a subset of this set.
+--
+-- Maintained by statement-level triggers on memory_events (insert, delete,
+-- and updates that change is_active, importance_score, type, series_id or
+-- created_at). Rebuild and consistency check:
+--   python -m app.scripts.memory_working_set rebuild
+--   python -m app.scripts.memory_working_set check
+
+-- ============================================================================
+-- TABLE
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS memory_working_sets (
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    series_id UUID NOT NULL REFERENCES series(id) ON DELETE CASCADE,
+    memory_ids UUID[] NOT NULL DEFAULT '{}',
+    refreshed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (user_id, series_id)
+);
+
+COMMENT ON TABLE memory_working_sets IS 'Candidate memories for get_relevant_memories per (user, series); maintained by triggers on memory_events.';
+
+ALTER TABLE memory_working_sets ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS memory_working_sets_select_own ON memory_working_sets;
+CREATE POLICY memory_working_sets_select_own ON memory_working_sets
+    FOR SELECT USING (auth.uid() = user_id);
+
+-- ============================================================================
+-- REFRESH FUNCTION
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION refresh_memory_working_set(
+    p_user_id UUID,
+    p_series_id UUID,
+    p_per_type INTEGER DEFAULT 3
+)
+RETURNS INTEGER AS $$
+DECLARE
+    v_ids UUID[];
+BEGIN
+    -- Serialise refreshes of one scope. Without this, two transactions
+    -- inserting into the same scope each compute the set from a snapshot
+    -- missing the other's memory, and the last upsert wins. Held until
+    -- commit; the SELECT below then runs with a fresh (READ COMMITTED)
+    -- snapshot that includes the other writer's committed rows.
+    PERFORM pg_advisory_xact_lock(hashtext(p_user_id::text || p_series_id::text));
+
+    SELECT COALESCE(array_agg(c.id ORDER BY c.id), '{}')
+    INTO v_ids
+    FROM (
+        SELECT
+            id,
+            created_at > NOW() - INTERVAL '7 days' AS is_recent,
+            ROW_NUMBER() OVER (
+                PARTITION BY type
+                ORDER BY importance_score DESC, created_at DESC
+            ) AS importance_rank,
+            COUNT(*) FILTER (WHERE created_at > NOW() - INTERVAL '7 days')
+                OVER (PARTITION BY type) AS recent_count
+        FROM memory_events
+        WHERE user_id = p_user_id
+            AND series_id = p_series_id
+            AND is_active = TRUE
+    ) c
+    WHERE c.is_recent OR c.importance_rank <= p_per_type + c.recent_count;
+
+    IF cardinality(v_ids) = 0 THEN
+        DELETE FROM memory_working_sets
+        WHERE user_id = p_user_id AND series_id = p_series_id;
+    ELSE
+        INSERT INTO memory_working_sets (user_id, series_id, memory_ids, refreshed_at)
+        VALUES (p_user_id, p_series_id, v_ids, NOW())
+        ON CONFLICT (user_id, series_id) DO UPDATE
+        SET memory_ids = EXCLUDED.memory_ids,
+            refreshed_at = EXCLUDED.refreshed_at;
+    END IF;
+
+    RETURN cardinality(v_ids);
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================================
+-- TRIGGERS
+-- ============================================================================
+
+-- One refresh per affected scope per statement (bulk inserts/updates touch
+-- each scope once). Updates to fields the ranking doesn't use (embedding,
+-- reference_count, last_referenced_at, ...) don't refresh anything. Scopes
+-- are refreshed in (user_id, series_id) order so statements touching several
+-- scopes take the per-scope locks in the same order and can't deadlock.
+CREATE OR REPLACE FUNCTION memory_working_set_maintain()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM refresh_memory_working_set(s.user_id, s.series_id)
+        FROM (
+            SELECT DISTINCT user_id, series_id FROM new_rows WHERE series_id IS NOT NULL
+            ORDER BY user_id, series_id
+        ) s;
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM refresh_memory_working_set(s.user_id, s.series_id)
+        FROM (
+            SELECT DISTINCT user_id, series_id FROM old_rows WHERE series_id IS NOT NULL
+            ORDER BY user_id, series_id
+        ) s;
+    ELSE
+        PERFORM refresh_memory_working_set(s.user_id, s.series_id)
+        FROM (
+            SELECT DISTINCT scope.user_id, scope.series_id
+            FROM old_rows o
+            JOIN new_rows n ON n.id = o.id
+            CROSS JOIN LATERAL (
+                VALUES (o.user_id, o.series_id), (n.user_id, n.series_id)
+            ) AS scope(user_id, series_id)
+            WHERE (o.is_active, o.importance_score, o.type, o.series_id, o.created_at, o.user_id)
+                IS DISTINCT FROM (n.is_active, n.importance_score, n.type, n.series_id, n.created_at, n.user_id)
+                AND scope.series_id IS NOT NULL
+            ORDER BY scope.user_id, scope.series_id
+        ) s;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_memory_working_set_insert ON memory_events;
+CREATE TRIGGER trg_memory_working_set_insert
+    AFTER INSERT ON memory_events
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION memory_working_set_maintain();
+
+DROP TRIGGER IF EXISTS trg_memory_working_set_update ON memory_events;
+CREATE TRIGGER trg_memory_working_set_update
+    AFTER UPDATE ON memory_events
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION memory_working_set_maintain();
+
+DROP TRIGGER IF EXISTS trg_memory_working_set_delete ON memory_events;
+CREATE TRIGGER trg_memory_working_set_delete
+    AFTER DELETE ON memory_events
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION memory_working_set_maintain();
+
+-- ============================================================================
+-- BACKFILL
+-- ============================================================================
+
+SELECT refresh_memory_working_set(s.user_id, s.series_id)
+FROM (
+    SELECT DISTINCT user_id, series_id
+    FROM memory_events
+    WHERE series_id IS NOT NULL AND is_active = TRUE
+) s;
+
+DO $$
+DECLARE
+    v_count INTEGER;
+BEGIN
+    SELECT COUNT(*) INTO v_count FROM memory_working_sets;
+    RAISE NOTICE 'memory_working_sets: % scopes built', v_count;
+END $$;
@@ -0,0 +1,111 @@
+-- Migration: 070_apply_relationship_beat.sql
+-- Atomic relationship dynamic updates
+--
+-- MemoryService.update_relationship_dynamic used to read engagements.dynamic
+-- and milestones, recompute in Python and write both back. Two background
+-- Director tasks for the same user/character could interleave and lose a
+-- beat. apply_relationship_beat does the whole read-modify-write under a row
+-- lock in one call and returns the new state.
+--
+-- The tone table (MemoryService.RELATIONSHIP_TONE_RULES) is passed in as
+-- JSONB so Python and SQL share one definition:
+--   [{"above": 75, "beats": ["conflict", "tense"], "tone": "heated"}, ...]
+-- The first rule whose tension threshold is exceeded and whose beats contain
+-- the dominant beat (or whose beats is null) wins.
+
+CREATE OR REPLACE FUNCTION apply_relationship_beat(
+    p_user_id UUID,
+    p_character_id UUID,
+    p_beat_type TEXT,
+    p_tension_change INTEGER,
+    p_milestone TEXT,
+    p_tone_rules JSONB,
+    p_max_beats INTEGER DEFAULT 10
+)
+RETURNS TABLE (new_dynamic JSONB, new_milestones TEXT[], milestone_added BOOLEAN) AS $$
+DECLARE
+    v_id UUID;
+    v_dynamic JSONB;
+    v_milestones TEXT[];
+    v_beats JSONB;
+    v_tension INTEGER;
+    v_dominant TEXT;
+    v_tone TEXT;
+    v_added BOOLEAN := FALSE;
+BEGIN
+    SELECT e.id, e.dynamic, COALESCE(e.milestones, '{}')
+    INTO v_id, v_dynamic, v_milestones
+    FROM engagements e
+    WHERE e.user_id = p_user_id AND e.character_id = p_character_id
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    -- Genre 01 baseline
+    IF v_dynamic IS NULL OR jsonb_typeof(v_dynamic) <> 'object' THEN
+        v_dynamic := '{"tone": "intrigued", "tension_level": 45, "recent_beats": []}'::jsonb;
+    END IF;
+
+    -- Append the beat, keep the last p_max_beats
+    SELECT COALESCE(jsonb_agg(b.value ORDER BY b.ord), '[]'::jsonb)
+    INTO v_beats
+    FROM (
+        SELECT a.value, a.ord, COUNT(*) OVER () AS n
+        FROM jsonb_array_elements(
+            CASE WHEN jsonb_typeof(v_dynamic->'recent_beats') = 'array'
+                 THEN v_dynamic->'recent_beats' ELSE '[]'::jsonb END
+            || jsonb_build_array(p_beat_type)
+        ) WITH ORDINALITY AS a(value, ord)
+    ) b
+    WHERE b.ord > b.n - p_max_beats;
+
+    -- Clamp tension to 0-100
+    v_tension := GREATEST(0, LEAST(100,
+        COALESCE(ROUND((v_dynamic->>'tension_level')::numeric)::integer, 30) + p_tension_change
+    ));
+
+    -- Dominant beat of the last 5 (ties: earliest first occurrence)
+    SELECT d.beat
+    INTO v_dominant
+    FROM (
+        SELECT a.value #>> '{}' AS beat, a.ord
+        FROM jsonb_array_elements(v_beats) WITH ORDINALITY AS a(value, ord)
+        ORDER BY a.ord DESC
+        LIMIT 5
+    ) d
+    GROUP BY d.beat
+    ORDER BY COUNT(*) DESC, MIN(d.ord)
+    LIMIT 1;
+
+    SELECT t.rule->>'tone'
+    INTO v_tone
+    FROM jsonb_array_elements(p_tone_rules) WITH ORDINALITY AS t(rule, ord)
+    WHERE v_tension > (t.rule->>'above')::integer
+        AND (jsonb_typeof(t.rule->'beats') IS DISTINCT FROM 'array' OR t.rule->'beats' ? v_dominant)
+    ORDER BY t.ord
+    LIMIT 1;
+
+    IF p_milestone IS NOT NULL AND p_milestone <> '' AND NOT (p_milestone = ANY(v_milestones)) THEN
+        v_milestones := array_append(v_milestones, p_milestone);
+        v_added := TRUE;
+    END IF;
+
+    v_dynamic := jsonb_build_object(
+        'tone', COALESCE(v_tone, 'intrigued'),
+        'tension_level', v_tension,
+        'recent_beats', v_beats
+    );
+
+    UPDATE engagements
+    SET dynamic = v_dynamic,
+        milestones = v_milestones,
+        updated_at = NOW()
+    WHERE id = v_id;
+
+    RETURN QUERY SELECT v_dynamic, v_milestones, v_added;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION apply_relationship_beat IS 'Atomically append a beat to engagements.dynamic (last N), clamp tension, derive tone from p_tone_rules and record a new milestone. Returns the new state.';
@@ -0,0 +1,92 @@
+-- Migration: 071_hook_ready_set.sql
+-- Due-hook scheduling (app/services/hook_scheduler.py)
+--
+-- get_active_hooks filtered every hook for the user/character on each chat
+-- turn (is_active, triggered_at, both trigger windows) and expired hooks were
+-- never cleaned up. Hooks now move through:
+--
+--   scheduled (ready_at IS NULL, trigger_after in the future)
+--     -> ready (ready_at set: promoted by the scheduler, or immediately on
+--        insert when already due)
+--     -> triggered (triggered_at set) or retired (trigger_before passed)
+--
+-- The chat path reads the ready set through idx_hooks_ready, already in
+-- priority order, so its cost doesn't depend on how many hooks are scheduled.
+-- It also picks up scheduled hooks whose trigger_after has passed but that
+-- the scheduler hasn't promoted yet (idx_hooks_due, keyed by user and
+-- character), so a hook is visible as soon as it is due, not on the next
+-- scheduler run.
+
+ALTER TABLE hooks ADD COLUMN IF NOT EXISTS ready_at TIMESTAMPTZ;
+ALTER TABLE hooks ADD COLUMN IF NOT EXISTS retired_at TIMESTAMPTZ;
+
+COMMENT ON COLUMN hooks.ready_at IS 'When the hook became due and entered the ready set read by the chat path.';
+COMMENT ON COLUMN hooks.retired_at IS 'When the scheduler deactivated the hook because trigger_before passed.';
+
+-- ============================================================================
+-- INDEXES
+-- ============================================================================
+
+-- Ready set, in the order the chat path reads it
+CREATE INDEX IF NOT EXISTS idx_hooks_ready
+ON hooks (user_id, character_id, priority DESC, trigger_after ASC NULLS LAST)
+WHERE ready_at IS NOT NULL AND is_active = TRUE AND triggered_at IS NULL;
+
+-- Promotion scan: scheduled hooks by due time, across all users
+CREATE INDEX IF NOT EXISTS idx_hooks_scheduled
+ON hooks (trigger_after)
+WHERE ready_at IS NULL AND is_active = TRUE AND triggered_at IS NULL;
+
+-- Chat path: one user/character's scheduled hooks that are already due but
+-- not yet promoted (the scheduler runs every 15 minutes)
+CREATE INDEX IF NOT EXISTS idx_hooks_due
+ON hooks (user_id, character_id, trigger_after)
+WHERE ready_at IS NULL AND is_active = TRUE AND triggered_at IS NULL;
+
+-- Retirement scan: untriggered hooks by expiry
+CREATE INDEX IF NOT EXISTS idx_hooks_expiring
+ON hooks (trigger_before)
+WHERE trigger_before IS NOT NULL AND is_active = TRUE AND triggered_at IS NULL;
+
+-- Superseded by idx_hooks_ready / idx_hooks_due / idx_hooks_scheduled
+DROP INDEX IF EXISTS idx_hooks_pending;
+
+-- ============================================================================
+-- READY ON INSERT
+-- ============================================================================
+
+-- Hooks that are already due when written (no trigger_after, or one in the
+-- past) go straight into the ready set instead of waiting for the scheduler.
+CREATE OR REPLACE FUNCTION hooks_set_ready_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.trigger_after IS NULL OR NEW.trigger_after <= NOW() THEN
+        NEW.ready_at := COALESCE(NEW.ready_at, NOW());
+    ELSE
+        NEW.ready_at := NULL;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_hooks_set_ready_at ON hooks;
+CREATE TRIGGER trg_hooks_set_ready_at
+    BEFORE INSERT OR UPDATE OF trigger_after ON hooks
+    FOR EACH ROW EXECUTE FUNCTION hooks_set_ready_at();
+
+-- ============================================================================
+-- BACKFILL
+-- ============================================================================
+
+UPDATE hooks
+SET ready_at = NOW()
+WHERE ready_at IS NULL
+    AND is_active = TRUE
+    AND triggered_at IS NULL
+    AND (trigger_after IS NULL OR trigger_after <= NOW());
+
+UPDATE hooks
+SET is_active = FALSE, retired_at = NOW()
+WHERE is_active = TRUE
+    AND triggered_at IS NULL
+    AND trigger_before < NOW();
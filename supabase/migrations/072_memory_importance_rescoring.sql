@@ -0,0 +1,24 @@
+-- Migration: 072_memory_importance_rescoring.sql
+-- Importance decay and re-scoring (app/services/memory_rescoring.py)
+--
+-- importance_score was fixed at extraction time, so early trivial memories
+-- competed forever with recent meaningful ones. A nightly batch now derives
+-- importance_score from the extraction-time score, age, references
+-- (POST /memory/{id}/reference) and emotional valence.
+--
+-- base_importance keeps the extraction-time score so re-scoring is a pure
+-- function of the row (running it twice doesn't decay twice). Rows written
+-- without one are picked up on their first re-score.
+
+ALTER TABLE memory_events
+ADD COLUMN IF NOT EXISTS base_importance DECIMAL(3,2) CHECK (base_importance BETWEEN 0 AND 1);
+
+ALTER TABLE memory_events
+ADD COLUMN IF NOT EXISTS rescored_at TIMESTAMPTZ;
+
+COMMENT ON COLUMN memory_events.base_importance IS 'Extraction-time importance; importance_score is re-derived from it by the re-scoring job.';
+COMMENT ON COLUMN memory_events.rescored_at IS 'Last time the re-scoring job changed importance_score.';
+
+UPDATE memory_events
+SET base_importance = importance_score
+WHERE base_importance IS NULL;
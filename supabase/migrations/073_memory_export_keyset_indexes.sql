@@ -0,0 +1,13 @@
+-- Migration: 073_memory_export_keyset_indexes.sql
+-- Keyset pagination for memory/hook export (app/services/memory_transfer.py)
+--
+-- GET /memory/export streams a user's rows in (created_at, id) order, one
+-- page at a time: WHERE user_id = $1 AND (created_at, id) > ($2, $3). These
+-- indexes make every page an index range scan regardless of how deep into
+-- the export it is.
+
+CREATE INDEX IF NOT EXISTS idx_memory_events_user_keyset
+ON memory_events (user_id, created_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_hooks_user_keyset
+ON hooks (user_id, created_at, id);
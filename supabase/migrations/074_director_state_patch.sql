@@ -0,0 +1,101 @@
+-- Migration: 074_director_state_patch.sql
+-- Partial updates for sessions.director_state
+--
+-- The Director (process_exchange), the objective/beat paths in
+-- send_message_stream and the choice endpoint each read director_state,
+-- changed a few keys in Python and wrote the whole document back. The
+-- inline and background writers for the same session could interleave and
+-- drop each other's keys, and every write re-sent the visual_decisions
+-- history and the last evaluation's raw LLM output.
+--
+-- director_state_patch applies a list of path operations to the current
+-- value inside the UPDATE, so writers only send what they changed and never
+-- overwrite keys they didn't touch:
+--
+--   {"op": "set",        "path": ["beats", "b1"], "value": {...}}
+--   {"op": "merge",      "path": ["flags"],       "value": {"met": true}}
+--   {"op": "append",     "path": ["visual_decisions"], "value": {...}, "keep": 10}
+--   {"op": "add_unique", "path": ["triggered_choices"], "value": "cp_1"}
+--
+-- Missing intermediate objects are created. "merge" and "append" treat a
+-- missing or wrongly-typed target as {} / [].
+--
+-- Usage:
+--   UPDATE sessions
+--   SET director_state = director_state_patch(director_state, CAST(:ops AS jsonb))
+--   WHERE id = :session_id
+
+CREATE OR REPLACE FUNCTION director_state_patch(p_state JSONB, p_ops JSONB)
+RETURNS JSONB AS $$
+DECLARE
+    v_state JSONB := CASE WHEN jsonb_typeof(p_state) = 'object' THEN p_state ELSE '{}'::jsonb END;
+    v_op JSONB;
+    v_path TEXT[];
+    v_current JSONB;
+    v_keep INTEGER;
+    i INTEGER;
+BEGIN
+    FOR v_op IN SELECT value FROM jsonb_array_elements(COALESCE(p_ops, '[]'::jsonb))
+    LOOP
+        SELECT array_agg(p.value ORDER BY p.ord)
+        INTO v_path
+        FROM jsonb_array_elements_text(v_op->'path') WITH ORDINALITY AS p(value, ord);
+
+        IF v_path IS NULL OR array_length(v_path, 1) IS NULL THEN
+            CONTINUE;
+        END IF;
+
+        -- Create missing parents so jsonb_set can add the leaf
+        FOR i IN 1 .. array_length(v_path, 1) - 1 LOOP
+            IF jsonb_typeof(v_state #> v_path[1:i]) IS DISTINCT FROM 'object' THEN
+                v_state := jsonb_set(v_state, v_path[1:i], '{}'::jsonb, true);
+            END IF;
+        END LOOP;
+
+        v_current := v_state #> v_path;
+
+        CASE v_op->>'op'
+        WHEN 'set' THEN
+            v_state := jsonb_set(v_state, v_path, COALESCE(v_op->'value', 'null'::jsonb), true);
+
+        WHEN 'merge' THEN
+            IF jsonb_typeof(v_current) IS DISTINCT FROM 'object' THEN
+                v_current := '{}'::jsonb;
+            END IF;
+            v_state := jsonb_set(v_state, v_path, v_current || COALESCE(v_op->'value', '{}'::jsonb), true);
+
+        WHEN 'append' THEN
+            IF jsonb_typeof(v_current) IS DISTINCT FROM 'array' THEN
+                v_current := '[]'::jsonb;
+            END IF;
+            v_current := v_current || jsonb_build_array(v_op->'value');
+            v_keep := (v_op->>'keep')::integer;
+            IF v_keep IS NOT NULL AND jsonb_array_length(v_current) > v_keep THEN
+                SELECT COALESCE(jsonb_agg(a.value ORDER BY a.ord), '[]'::jsonb)
+                INTO v_current
+                FROM jsonb_array_elements(v_current) WITH ORDINALITY AS a(value, ord)
+                WHERE a.ord > jsonb_array_length(v_current) - v_keep;
+            END IF;
+            v_state := jsonb_set(v_state, v_path, v_current, true);
+
+        WHEN 'add_unique' THEN
+            IF jsonb_typeof(v_current) IS DISTINCT FROM 'array' THEN
+                v_current := '[]'::jsonb;
+            END IF;
+            IF NOT v_current @> jsonb_build_array(v_op->'value') THEN
+                v_state := jsonb_set(v_state, v_path, v_current || jsonb_build_array(v_op->'value'), true);
+            ELSIF v_state #> v_path IS DISTINCT FROM v_current THEN
+                v_state := jsonb_set(v_state, v_path, v_current, true);
+            END IF;
+
+        ELSE
+            RAISE EXCEPTION 'director_state_patch: unknown op %', v_op->>'op';
+        END CASE;
+    END LOOP;
+
+    RETURN v_state;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+COMMENT ON FUNCTION director_state_patch(JSONB, JSONB) IS
+    'Apply set/merge/append/add_unique path operations to a director_state document';
@@ -0,0 +1,158 @@
+-- Migration: 075_scene_generation_leases.sql
+-- Per-session scene generation coordination
+--
+-- Director auto-gen (_generate_auto_scene) checked generations_used against
+-- generation_budget, generated, then incremented generations_used in a
+-- separate UPDATE. Concurrent generations for the same session (overlapping
+-- background Director runs, retried requests, double-clicked "Capture
+-- Moment") could all pass the check, overshoot the budget and each pay for
+-- an image prediction.
+--
+-- reserve_scene_generation takes a lease on (session, trigger) and, when a
+-- budget is given, claims a budget slot in the same transaction. It returns
+-- (status, lease_token):
+--   'reserved'          caller owns the lease (lease_token) and should generate
+--   'in_flight'         another live lease exists for this (session, trigger)
+--   'budget_exhausted'  generations_used already reached the budget
+--   'not_found'         no such session (or not owned by p_user_id)
+-- release_scene_generation ends the lease and refunds the budget slot if the
+-- generation failed. A lease whose holder died expires after p_lease_seconds;
+-- the next reservation for that trigger takes it over with a new token and
+-- reuses its slot. Release only acts on the caller's own token, so a holder
+-- whose lease was taken over can't delete the new holder's lease or refund
+-- the slot it is still using.
+--
+-- Usage:
+--   SELECT * FROM reserve_scene_generation(:session_id, 'director:turn:5', 3)
+--   SELECT release_scene_generation(:session_id, 'director:turn:5', :lease_token, TRUE)
+
+-- ============================================================================
+-- TABLE
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS scene_generation_leases (
+    session_id UUID NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    trigger_key TEXT NOT NULL,
+    lease_token UUID NOT NULL DEFAULT gen_random_uuid(),
+    reserved_budget BOOLEAN NOT NULL DEFAULT FALSE,
+    acquired_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    expires_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (session_id, trigger_key)
+);
+
+ALTER TABLE scene_generation_leases
+ADD COLUMN IF NOT EXISTS lease_token UUID NOT NULL DEFAULT gen_random_uuid();
+
+COMMENT ON TABLE scene_generation_leases IS 'In-flight scene generations per (session, trigger); see reserve_scene_generation.';
+
+ALTER TABLE scene_generation_leases ENABLE ROW LEVEL SECURITY;
+
+-- ============================================================================
+-- RESERVE
+-- ============================================================================
+
+-- Return type changed from TEXT to (status, lease_token)
+DROP FUNCTION IF EXISTS reserve_scene_generation(UUID, TEXT, INTEGER, INTEGER, UUID);
+
+CREATE OR REPLACE FUNCTION reserve_scene_generation(
+    p_session_id UUID,
+    p_trigger_key TEXT,
+    p_budget INTEGER DEFAULT NULL,
+    p_lease_seconds INTEGER DEFAULT 300,
+    p_user_id UUID DEFAULT NULL
+)
+RETURNS TABLE (status TEXT, lease_token UUID) AS $$
+DECLARE
+    v_lease scene_generation_leases%ROWTYPE;
+    v_reserved BOOLEAN := FALSE;
+BEGIN
+    PERFORM 1 FROM sessions
+    WHERE id = p_session_id
+        AND (p_user_id IS NULL OR user_id = p_user_id);
+    IF NOT FOUND THEN
+        RETURN QUERY SELECT 'not_found'::TEXT, NULL::UUID;
+        RETURN;
+    END IF;
+
+    -- Take the lease, or take over one whose holder let it expire (new token)
+    INSERT INTO scene_generation_leases AS l (session_id, trigger_key, expires_at)
+    VALUES (p_session_id, p_trigger_key, NOW() + make_interval(secs => p_lease_seconds))
+    ON CONFLICT (session_id, trigger_key) DO UPDATE
+        SET lease_token = gen_random_uuid(),
+            acquired_at = NOW(),
+            expires_at = EXCLUDED.expires_at
+        WHERE l.expires_at <= NOW()
+    RETURNING l.* INTO v_lease;
+
+    IF NOT FOUND THEN
+        RETURN QUERY SELECT 'in_flight'::TEXT, NULL::UUID;
+        RETURN;
+    END IF;
+
+    IF p_budget IS NULL OR v_lease.reserved_budget THEN
+        RETURN QUERY SELECT 'reserved'::TEXT, v_lease.lease_token;
+        RETURN;
+    END IF;
+
+    UPDATE sessions
+    SET generations_used = COALESCE(generations_used, 0) + 1
+    WHERE id = p_session_id
+        AND COALESCE(generations_used, 0) < p_budget
+    RETURNING TRUE INTO v_reserved;
+
+    IF v_reserved IS NOT TRUE THEN
+        DELETE FROM scene_generation_leases l
+        WHERE l.session_id = p_session_id
+            AND l.trigger_key = p_trigger_key
+            AND l.lease_token = v_lease.lease_token;
+        RETURN QUERY SELECT 'budget_exhausted'::TEXT, NULL::UUID;
+        RETURN;
+    END IF;
+
+    UPDATE scene_generation_leases l
+    SET reserved_budget = TRUE
+    WHERE l.session_id = p_session_id
+        AND l.trigger_key = p_trigger_key
+        AND l.lease_token = v_lease.lease_token;
+
+    RETURN QUERY SELECT 'reserved'::TEXT, v_lease.lease_token;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================================
+-- RELEASE
+-- ============================================================================
+
+-- Signature gained p_lease_token
+DROP FUNCTION IF EXISTS release_scene_generation(UUID, TEXT, BOOLEAN);
+
+CREATE OR REPLACE FUNCTION release_scene_generation(
+    p_session_id UUID,
+    p_trigger_key TEXT,
+    p_lease_token UUID,
+    p_succeeded BOOLEAN
+)
+RETURNS VOID AS $$
+DECLARE
+    v_reserved BOOLEAN;
+BEGIN
+    -- Only the caller's own lease: after a takeover the row belongs to the
+    -- new holder, and nothing is deleted or refunded here
+    DELETE FROM scene_generation_leases
+    WHERE session_id = p_session_id
+        AND trigger_key = p_trigger_key
+        AND lease_token = p_lease_token
+    RETURNING reserved_budget INTO v_reserved;
+
+    IF v_reserved AND NOT p_succeeded THEN
+        UPDATE sessions
+        SET generations_used = GREATEST(COALESCE(generations_used, 0) - 1, 0)
+        WHERE id = p_session_id;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION reserve_scene_generation(UUID, TEXT, INTEGER, INTEGER, UUID) IS
+    'Lease a (session, trigger) scene generation and atomically claim a generation_budget slot';
+COMMENT ON FUNCTION release_scene_generation(UUID, TEXT, UUID, BOOLEAN) IS
+    'End the scene generation lease held with this token, refunding its budget slot on failure';
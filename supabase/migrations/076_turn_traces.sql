@@ -0,0 +1,35 @@
+-- Migration: 076_turn_traces.sql
+-- Sampled per-turn latency traces for send_message_stream
+--
+-- One row per sampled chat turn (TURN_TRACE_SAMPLE_RATE, default 5%; the
+-- X-Debug-Timing header does not force a row). spans holds
+--   {"inline": [[name, start_ms, duration_ms], ...],
+--    "background": [[name, start_ms, duration_ms], ...]}
+-- with offsets from the start of the turn; marks (e.g. "ttft") have a null
+-- duration. The row is written when the background Director phase ends,
+-- so background spans are included.
+--
+-- Example: slowest phases over the last day
+--   SELECT s->>0 AS span, percentile_cont(0.95) WITHIN GROUP (ORDER BY (s->>2)::float) AS p95_ms
+--   FROM turn_traces, jsonb_array_elements(spans->'inline' || spans->'background') s
+--   WHERE created_at > NOW() - INTERVAL '1 day' AND s->>2 IS NOT NULL
+--   GROUP BY 1 ORDER BY 2 DESC;
+
+CREATE TABLE IF NOT EXISTS turn_traces (
+    id BIGSERIAL PRIMARY KEY,
+    session_id UUID REFERENCES sessions(id) ON DELETE CASCADE,
+    turn INTEGER,
+    inline_ms REAL NOT NULL,
+    ttft_ms REAL,
+    background_ms REAL,
+    spans JSONB NOT NULL,
+    meta JSONB NOT NULL DEFAULT '{}',
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+COMMENT ON TABLE turn_traces IS 'Sampled latency breakdown of chat turns; see app/services/turn_trace.py.';
+
+CREATE INDEX IF NOT EXISTS idx_turn_traces_created_at ON turn_traces (created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_turn_traces_session ON turn_traces (session_id, created_at DESC);
+
+ALTER TABLE turn_traces ENABLE ROW LEVEL SECURITY;